@@ -0,0 +1,167 @@
+"""
+Import Time Benchmark for Trump Tariff Analysis Website
+
+Measures cold-start cost of the data service and prediction model modules.
+Every sample runs in a fresh interpreter: the module import is timed, the
+heavy dependencies (numpy, pandas, requests, websocket) that were actually
+executed during import are recorded, and then the first access to the
+module's shared instance is timed.
+
+A module that executes a heavy dependency at import time, or whose median
+import time exceeds --max-import-ms, is reported and the run exits non-zero.
+
+Usage:
+    python data/benchmarks/import_time_benchmark.py --repeats 10
+    python data/benchmarks/import_time_benchmark.py --max-import-ms 100
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+DATA_DIR = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+MODELS_DIR = os.path.join(DATA_DIR, 'prediction_models')
+
+HEAVY_MODULES = ["numpy", "pandas", "requests", "websocket"]
+
+# (module, directories put on sys.path, singleton accessor or None)
+TARGETS = [
+    ("symbol_registry", [DATA_DIR], None),
+    ("history_retention", [DATA_DIR], None),
+    ("real_time_data_integration", [DATA_DIR], "get_real_time_data"),
+    ("stock_prediction_model", [DATA_DIR, MODELS_DIR], "get_prediction_model")
+]
+
+# Runs in the child interpreter; prints one JSON line
+PROBE = """
+import importlib, json, sys, time
+sys.path[:0] = {paths!r}
+start = time.perf_counter()
+module = importlib.import_module({module!r})
+import_ms = (time.perf_counter() - start) * 1000
+loaded = [name for name in {heavy!r}
+          if name in sys.modules and type(sys.modules[name]).__name__ != '_LazyModule']
+singleton_ms = None
+if {accessor!r}:
+    start = time.perf_counter()
+    getattr(module, {accessor!r})()
+    singleton_ms = (time.perf_counter() - start) * 1000
+print(json.dumps({{"import_ms": import_ms, "singleton_ms": singleton_ms, "heavy_loaded": loaded}}))
+"""
+
+
+def probe(module, paths, accessor):
+    """
+    Import a module in a fresh interpreter
+
+    Args:
+        module (str): Module name
+        paths (list): Directories to put on sys.path
+        accessor (str): Name of the singleton accessor, or None
+
+    Returns:
+        dict: import_ms, singleton_ms, heavy_loaded and process_ms
+    """
+    code = PROBE.format(paths=paths, module=module, heavy=HEAVY_MODULES, accessor=accessor)
+
+    start = time.perf_counter()
+    completed = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True)
+    process_ms = (time.perf_counter() - start) * 1000
+
+    result = json.loads(completed.stdout.strip().splitlines()[-1])
+    result["process_ms"] = process_ms
+    return result
+
+
+def run_benchmark(repeats):
+    """
+    Benchmark every target module
+
+    Args:
+        repeats (int): Fresh interpreters per module
+
+    Returns:
+        dict: Per-module medians and the heavy modules executed at import
+    """
+    results = {"repeats": repeats, "modules": {}}
+
+    # Interpreter startup alone, for reference
+    baseline = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, '-c', 'pass'], check=True)
+        baseline.append((time.perf_counter() - start) * 1000)
+    results["interpreter_startup_ms"] = round(statistics.median(baseline), 2)
+
+    for module, paths, accessor in TARGETS:
+        samples = [probe(module, paths, accessor) for _ in range(repeats)]
+
+        entry = {
+            "import_ms": round(statistics.median(s["import_ms"] for s in samples), 2),
+            "process_ms": round(statistics.median(s["process_ms"] for s in samples), 2),
+            "heavy_loaded": sorted({name for s in samples for name in s["heavy_loaded"]})
+        }
+        if accessor:
+            entry["first_singleton_ms"] = round(statistics.median(s["singleton_ms"] for s in samples), 2)
+
+        results["modules"][module] = entry
+
+    return results
+
+
+def check(results, max_import_ms):
+    """
+    Find modules that load heavy dependencies or import too slowly
+
+    Args:
+        results (dict): Benchmark results
+        max_import_ms (float): Allowed median import time, or None
+
+    Returns:
+        list: Failure descriptions
+    """
+    failures = []
+
+    for module, entry in results["modules"].items():
+        if entry["heavy_loaded"]:
+            failures.append(f"{module}: executes {', '.join(entry['heavy_loaded'])} at import time")
+        if max_import_ms is not None and entry["import_ms"] > max_import_ms:
+            failures.append(f"{module}: import takes {entry['import_ms']:.2f} ms (limit {max_import_ms:g} ms)")
+
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark module import and first-use times')
+    parser.add_argument('--repeats', type=int, default=5, help='fresh interpreters per module')
+    parser.add_argument('--max-import-ms', type=float, default=None, help='fail if a median import is slower')
+    parser.add_argument('--json', action='store_true', help='emit results as JSON')
+    args = parser.parse_args()
+
+    results = run_benchmark(args.repeats)
+
+    failures = check(results, args.max_import_ms)
+    results["failures"] = failures
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print(f"Interpreter startup: {results['interpreter_startup_ms']:.2f} ms")
+        for module, entry in results["modules"].items():
+            line = f"  {module:<30} import {entry['import_ms']:>8.2f} ms   process {entry['process_ms']:>8.2f} ms"
+            if "first_singleton_ms" in entry:
+                line += f"   first instance {entry['first_singleton_ms']:>8.2f} ms"
+            print(line)
+        for failure in failures:
+            print(f"FAIL {failure}")
+
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,154 @@
+"""
+Portfolio Analysis Benchmark for Trump Tariff Analysis Website
+
+Times StockPredictionModel.analyze_portfolios on a seeded synthetic universe
+over batches of random portfolios, with the symbol matrix warm (model
+unchanged between calls) and cold (a price update before every call), and
+reports portfolios analyzed per second. For comparison it also times the
+per-symbol path the API replaces: one get_prediction per holding, summed in
+Python.
+
+Usage:
+    python data/benchmarks/portfolio_benchmark.py --size 1000 --portfolios 500 --positions 40
+    python data/benchmarks/portfolio_benchmark.py --size 10000 --portfolios 2000 --json
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from prediction_model_benchmark import build_model  # noqa: E402
+
+
+def generate_portfolios(symbols, count, positions, seed):
+    """
+    Generate seeded random long-only portfolios
+
+    Args:
+        symbols (list): Universe symbols
+        count (int): Number of portfolios
+        positions (int): Holdings per portfolio
+        seed (int): Random seed
+
+    Returns:
+        dict: Portfolio name -> {symbol: quantity}
+    """
+    rng = np.random.default_rng(seed)
+    positions = min(positions, len(symbols))
+    return {
+        f"portfolio-{index}": {
+            symbol: int(quantity)
+            for symbol, quantity in zip(rng.choice(symbols, positions, replace=False),
+                                        rng.integers(10, 5000, positions))
+        }
+        for index in range(count)
+    }
+
+
+def time_calls(function, repeats, before=None):
+    """
+    Time repeated calls
+
+    Args:
+        function (callable): Function to time
+        repeats (int): Number of calls
+        before (callable, optional): Untimed setup run before each call
+
+    Returns:
+        float: Median wall time in milliseconds
+    """
+    samples = []
+    for _ in range(repeats):
+        if before is not None:
+            before()
+        start = time.perf_counter()
+        function()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def per_symbol_path(model, portfolios, timeframe="medium_term"):
+    """
+    Aggregate expected moves one prediction at a time, as callers did before
+    the portfolio API
+    """
+    results = {}
+    for name, holdings in portfolios.items():
+        total = 0.0
+        weighted = 0.0
+        for symbol, quantity in holdings.items():
+            prediction = model.get_prediction(symbol, timeframe)
+            value = quantity * prediction["current_price"]
+            total += value
+            weighted += value * prediction["movement_pct"]
+        results[name] = weighted / total if total else 0.0
+    return results
+
+
+def run_benchmark(size, count, positions, seed, repeats):
+    """
+    Benchmark portfolio analysis
+
+    Returns:
+        dict: Median timings and portfolios per second
+    """
+    model = build_model(size, seed)
+    symbols = list(model.stocks["symbol"])
+    portfolios = generate_portfolios(symbols, count, positions, seed)
+    rng = np.random.default_rng(seed)
+
+    def tick():
+        symbol = symbols[int(rng.integers(len(symbols)))]
+        model.update_price(symbol, float(rng.uniform(5.0, 200.0)))
+
+    model.analyze_portfolios(portfolios)
+    warm_ms = time_calls(lambda: model.analyze_portfolios(portfolios), repeats)
+    cold_ms = time_calls(lambda: model.analyze_portfolios(portfolios), repeats, before=tick)
+
+    # The per-symbol path is slow; time it on a sample of portfolios
+    sample = dict(list(portfolios.items())[:max(1, min(count, 50))])
+    per_symbol_ms = time_calls(lambda: per_symbol_path(model, sample), 1)
+
+    return {
+        "size": size,
+        "portfolios": count,
+        "positions": positions,
+        "warm_ms": round(warm_ms, 3),
+        "cold_ms": round(cold_ms, 3),
+        "warm_portfolios_per_s": round(count / warm_ms * 1000, 1),
+        "cold_portfolios_per_s": round(count / cold_ms * 1000, 1),
+        "per_symbol_portfolios_per_s": round(len(sample) / per_symbol_ms * 1000, 1)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark batched portfolio analysis')
+    parser.add_argument('--size', type=int, default=1000, help='synthetic universe size')
+    parser.add_argument('--portfolios', type=int, default=500, help='portfolios per call')
+    parser.add_argument('--positions', type=int, default=40, help='holdings per portfolio')
+    parser.add_argument('--seed', type=int, default=42, help='random seed')
+    parser.add_argument('--repeats', type=int, default=5, help='timing repeats per measurement')
+    parser.add_argument('--json', action='store_true', help='emit results as JSON')
+    args = parser.parse_args()
+
+    results = run_benchmark(args.size, args.portfolios, args.positions, args.seed, args.repeats)
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(f"{results['portfolios']:,} portfolios x {results['positions']} positions "
+          f"over {results['size']:,} stocks")
+    print(f"  warm symbol matrix   {results['warm_ms']:>10.3f} ms   {results['warm_portfolios_per_s']:>12,.1f} portfolios/s")
+    print(f"  after a price tick   {results['cold_ms']:>10.3f} ms   {results['cold_portfolios_per_s']:>12,.1f} portfolios/s")
+    print(f"  per-symbol path      {'':>13}   {results['per_symbol_portfolios_per_s']:>12,.1f} portfolios/s")
+
+
+if __name__ == '__main__':
+    main()
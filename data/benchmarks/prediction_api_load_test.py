@@ -0,0 +1,232 @@
+"""
+Prediction API Load Test for Trump Tariff Analysis Website
+
+Starts PredictionServer over a seeded synthetic universe in a separate
+process and drives it with keep-alive connections from an asyncio client
+for a fixed duration. Requests are drawn from a weighted mix of the API's
+routes over random symbols; a share of them revalidate with the last ETag
+seen for their URL, as browsers do. Reports throughput, latency percentiles,
+status counts and the server's batching and response cache counters.
+
+Usage:
+    python data/benchmarks/prediction_api_load_test.py --connections 64 --duration 10
+    python data/benchmarks/prediction_api_load_test.py --size 10000 --revalidate 0.5 --json
+"""
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import random
+import statistics
+import sys
+import time
+from urllib.parse import quote
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'prediction_models'))
+
+# Route mix: (label, weight)
+DEFAULT_MIX = [("prediction", 70), ("screen", 10), ("sectors", 10), ("factors", 10)]
+
+TIMEFRAMES = ["short_term", "medium_term", "long_term"]
+SECTORS = ["Materials", "Energy", "Financials", "Healthcare", "Information Technology"]
+
+
+def serve(size, seed, batch_window, ready):
+    """
+    Server process entry point
+
+    Args:
+        size (int): Synthetic universe size
+        seed (int): Random seed
+        batch_window (float): Batching window in seconds
+        ready (multiprocessing.Queue): Receives the bound port
+    """
+    from prediction_model_benchmark import build_model
+    from prediction_server import PredictionServer
+
+    server = PredictionServer(build_model(size, seed), port=0, batch_window=batch_window)
+
+    async def main():
+        ready.put(await server.serve())
+        async with server._server:
+            await server._server.serve_forever()
+
+    asyncio.run(main())
+
+
+def make_target(route, symbols, rng):
+    """
+    Build a request path for a route
+
+    Args:
+        route (str): Route label from the mix
+        symbols (list): Universe symbols
+        rng (random.Random): Random source
+
+    Returns:
+        str: Request path with query
+    """
+    timeframe = rng.choice(TIMEFRAMES)
+    if route == "prediction":
+        return f"/predictions/{rng.choice(symbols)}?timeframe={timeframe}"
+    if route == "screen":
+        return f"/predictions?timeframe={timeframe}&sector={quote(rng.choice(SECTORS))}&min_movement=0&limit=10"
+    if route == "sectors":
+        return f"/sectors?timeframe={timeframe}"
+    return f"/factors/{rng.choice(symbols)}?timeframe={timeframe}"
+
+
+async def request(reader, writer, target, headers):
+    """
+    Send one GET and read its response
+
+    Returns:
+        tuple: (status, response headers, body)
+    """
+    lines = [f"GET {target} HTTP/1.1", "Host: localhost"]
+    lines.extend(f"{name}: {value}" for name, value in headers.items())
+    writer.write(("\r\n".join(lines) + "\r\n\r\n").encode('latin-1'))
+    await writer.drain()
+
+    head = await reader.readuntil(b'\r\n\r\n')
+    status_line, *header_lines = head.decode('latin-1').split('\r\n')
+    response_headers = {}
+    for line in header_lines:
+        if line:
+            name, _, value = line.partition(':')
+            response_headers[name.strip().lower()] = value.strip()
+
+    length = int(response_headers.get('content-length') or 0)
+    body = await reader.readexactly(length) if length else b''
+    return int(status_line.split(' ')[1]), response_headers, body
+
+
+async def client(port, symbols, mix, deadline, seed, revalidate, compress, latencies, statuses):
+    """
+    Drive one keep-alive connection until the deadline
+    """
+    rng = random.Random(seed)
+    routes = [route for route, _ in mix]
+    weights = [weight for _, weight in mix]
+    etags = {}
+
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    try:
+        while time.perf_counter() < deadline:
+            target = make_target(rng.choices(routes, weights)[0], symbols, rng)
+
+            headers = {}
+            if compress:
+                headers["Accept-Encoding"] = "gzip"
+            if target in etags and rng.random() < revalidate:
+                headers["If-None-Match"] = etags[target]
+
+            start = time.perf_counter()
+            status, response_headers, _ = await request(reader, writer, target, headers)
+            latencies.append(time.perf_counter() - start)
+            statuses[status] = statuses.get(status, 0) + 1
+
+            if 'etag' in response_headers:
+                etags[target] = response_headers['etag']
+    finally:
+        writer.close()
+
+
+async def fetch_json(port, target):
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    try:
+        _, _, body = await request(reader, writer, target, {})
+        return json.loads(body)
+    finally:
+        writer.close()
+
+
+async def drive(port, symbols, args):
+    """
+    Run the load and collect results
+    """
+    # Warm the factor matrix and ranking indexes before timing
+    await fetch_json(port, "/predictions?min_movement=0&limit=1")
+
+    latencies = []
+    statuses = {}
+    start = time.perf_counter()
+    deadline = start + args.duration
+
+    await asyncio.gather(*[
+        client(port, symbols, DEFAULT_MIX, deadline, args.seed + index, args.revalidate, not args.no_gzip,
+               latencies, statuses)
+        for index in range(args.connections)
+    ])
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+
+    def percentile(q):
+        return round(latencies[min(len(latencies) - 1, int(q * len(latencies)))] * 1000, 3)
+
+    return {
+        "size": args.size,
+        "connections": args.connections,
+        "duration_s": round(elapsed, 2),
+        "requests": len(latencies),
+        "rps": round(len(latencies) / elapsed, 1),
+        "latency_ms": {
+            "mean": round(statistics.fmean(latencies) * 1000, 3),
+            "p50": percentile(0.50),
+            "p90": percentile(0.90),
+            "p99": percentile(0.99),
+            "max": round(latencies[-1] * 1000, 3)
+        },
+        "status_counts": {str(status): count for status, count in sorted(statuses.items())},
+        "server": await fetch_json(port, "/stats")
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Load test the prediction HTTP API')
+    parser.add_argument('--size', type=int, default=1000, help='synthetic universe size')
+    parser.add_argument('--seed', type=int, default=42, help='random seed')
+    parser.add_argument('--connections', type=int, default=32, help='concurrent keep-alive connections')
+    parser.add_argument('--duration', type=float, default=10, help='seconds of load')
+    parser.add_argument('--revalidate', type=float, default=0.3, help='share of repeat URLs sent with If-None-Match')
+    parser.add_argument('--batch-window-ms', type=float, default=2.0, help='server batching window')
+    parser.add_argument('--no-gzip', action='store_true', help='do not accept gzip responses')
+    parser.add_argument('--json', action='store_true', help='emit results as JSON')
+    args = parser.parse_args()
+
+    from prediction_model_benchmark import generate_universe
+    symbols = list(generate_universe(args.size, args.seed, SECTORS)["symbol"])
+
+    context = multiprocessing.get_context('spawn')
+    ready = context.Queue()
+    process = context.Process(target=serve, args=(args.size, args.seed, args.batch_window_ms / 1000, ready), daemon=True)
+    process.start()
+
+    try:
+        port = ready.get(timeout=120)
+        results = asyncio.run(drive(port, symbols, args))
+    finally:
+        process.terminate()
+        process.join()
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    latency = results["latency_ms"]
+    batching = results["server"]["batching"]
+    print(f"{results['requests']:,} requests over {results['duration_s']} s "
+          f"with {results['connections']} connections ({results['size']:,} stocks)")
+    print(f"  throughput   {results['rps']:>10,.1f} req/s")
+    print(f"  latency      p50 {latency['p50']} ms   p90 {latency['p90']} ms   p99 {latency['p99']} ms   max {latency['max']} ms")
+    print(f"  statuses     {results['status_counts']}")
+    print(f"  batching     {batching['batches']} batches, mean {batching['mean_batch_size']}, largest {batching['largest_batch']}")
+    print(f"  cache        hit rate {results['server']['response_cache']['hit_rate']}")
+
+
+if __name__ == '__main__':
+    main()
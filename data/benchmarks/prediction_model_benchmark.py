@@ -0,0 +1,300 @@
+"""
+Prediction Model Benchmark for Trump Tariff Analysis Website
+
+Times StockPredictionModel's query paths on seeded synthetic universes of
+increasing size: get_prediction (cold and warm cache), get_all_predictions
+with several filters, get_sector_predictions and
+get_prediction_factors_importance, plus peak traced memory per universe.
+
+Results can be saved as a baseline and later runs compared against it; any
+timing slower than the baseline by more than the tolerance factor is
+reported and the run exits non-zero.
+
+Usage:
+    python data/benchmarks/prediction_model_benchmark.py --sizes 30 1000 10000 50000
+    python data/benchmarks/prediction_model_benchmark.py --save-baseline
+    python data/benchmarks/prediction_model_benchmark.py --compare
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'prediction_models'))
+
+from stock_prediction_model import StockPredictionModel  # noqa: E402
+from stock_universe import StockUniverseTable  # noqa: E402
+
+DEFAULT_SIZES = [30, 1_000, 10_000, 50_000]
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baselines', 'prediction_model.json')
+
+RISK_PROFILES = ["low", "medium", "high", "very_high"]
+MARKET_CAPS = ["small", "mid", "large", "mega"]
+
+# get_all_predictions filter combinations: (label, kwargs)
+SCREENS = [
+    ("unfiltered", {"min_movement": 0, "limit": 10}),
+    ("min_movement_10", {"min_movement": 10, "limit": 10}),
+    ("sector", {"sector": "Materials", "min_movement": 0, "limit": 10}),
+    ("risk_profile", {"risk_profile": "high", "min_movement": 0, "limit": 10}),
+    ("sector_and_risk", {"sector": "Energy", "risk_profile": "very_high", "min_movement": 5, "limit": 10}),
+    ("limit_100", {"min_movement": 0, "limit": 100})
+]
+
+
+def generate_universe(size, seed, sectors):
+    """
+    Generate a seeded synthetic stock universe
+
+    Args:
+        size (int): Number of stocks
+        seed (int): Random seed
+        sectors (list): Sector names to draw from
+
+    Returns:
+        StockUniverseTable: Universe with the model's columns
+    """
+    rng = np.random.default_rng(seed)
+
+    us_revenue = rng.integers(0, 41, size)
+    china_revenue = rng.integers(5, 71, size)
+    exposed = (us_revenue > 20) | (china_revenue > 40)
+
+    return StockUniverseTable({
+        "symbol": [f"SYN{i:05d}.AX" for i in range(size)],
+        "name": [f"Synthetic {i}" for i in range(size)],
+        "sector": rng.choice(sectors, size),
+        "market_cap": rng.choice(MARKET_CAPS, size),
+        "risk_profile": rng.choice(RISK_PROFILES, size),
+        "us_revenue_pct": us_revenue,
+        "china_revenue_pct": china_revenue,
+        "tariff_sensitivity": np.where(exposed, rng.integers(50, 96, size), rng.integers(20, 50, size)),
+        "rsi": rng.integers(30, 71, size),
+        "macd": rng.uniform(-2.0, 2.0, size),
+        "bollinger_position": rng.uniform(-1.0, 1.0, size),
+        "beta": rng.uniform(0.5, 2.0, size),
+        "annualized_volatility": rng.uniform(15.0, 45.0, size),
+        "current_price": np.round(rng.uniform(5.0, 200.0, size), 2),
+        "price_change_pct": np.round(rng.uniform(-5.0, 5.0, size), 2),
+        "volume": rng.integers(500_000, 5_000_001, size)
+    })
+
+
+def build_model(size, seed):
+    """
+    Build a model over a synthetic universe
+
+    Args:
+        size (int): Number of stocks
+        seed (int): Random seed
+
+    Returns:
+        StockPredictionModel: Model with a cold cache
+    """
+    model = StockPredictionModel(seed=seed)
+    model.set_universe(generate_universe(size, seed, sorted(model.sector_mappings)))
+    return model
+
+
+def time_calls(function, repeats):
+    """
+    Time repeated calls
+
+    Args:
+        function (callable): Function to time
+        repeats (int): Number of calls
+
+    Returns:
+        dict: Median and best wall time in milliseconds
+    """
+    samples = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        function()
+        samples.append((time.perf_counter() - start) * 1000)
+    return {"median_ms": round(statistics.median(samples), 4), "best_ms": round(min(samples), 4)}
+
+
+def run_size(size, seed, repeats, sample_symbols):
+    """
+    Benchmark one universe size
+
+    Args:
+        size (int): Number of stocks
+        seed (int): Random seed
+        repeats (int): Timing repeats per measurement
+        sample_symbols (int): Symbols queried for per-symbol timings
+
+    Returns:
+        dict: Timings keyed by measurement, plus build and memory figures
+    """
+    results = {}
+
+    start = time.perf_counter()
+    model = build_model(size, seed)
+    results["build_model"] = {"median_ms": round((time.perf_counter() - start) * 1000, 4)}
+
+    rng = np.random.default_rng(seed)
+    symbols = list(rng.choice(model.stocks["symbol"], min(sample_symbols, size), replace=False))
+
+    # First call pays for the factor matrix and prediction indexes
+    start = time.perf_counter()
+    model.get_all_predictions(min_movement=0, limit=10)
+    results["first_query"] = {"median_ms": round((time.perf_counter() - start) * 1000, 4)}
+
+    # Per-symbol predictions, cold then warm cache
+    def per_symbol_cold():
+        model.prediction_cache.clear()
+        for symbol in symbols:
+            model.get_prediction(symbol)
+
+    def per_symbol_warm():
+        for symbol in symbols:
+            model.get_prediction(symbol)
+
+    cold = time_calls(per_symbol_cold, repeats)
+    per_symbol_warm()
+    warm = time_calls(per_symbol_warm, repeats)
+    results["get_prediction_cold"] = {key: round(value / len(symbols), 4) for key, value in cold.items()}
+    results["get_prediction_warm"] = {key: round(value / len(symbols), 4) for key, value in warm.items()}
+
+    for label, kwargs in SCREENS:
+        results[f"get_all_predictions_{label}"] = time_calls(lambda: model.get_all_predictions(**kwargs), repeats)
+
+    results["get_sector_predictions"] = time_calls(model.get_sector_predictions, repeats)
+
+    def factors_importance():
+        for symbol in symbols:
+            model.get_prediction_factors_importance(symbol)
+
+    importance = time_calls(factors_importance, repeats)
+    results["get_prediction_factors_importance"] = {key: round(value / len(symbols), 4) for key, value in importance.items()}
+
+    # Peak traced memory of a fresh build and one pass over the workload
+    del model
+    tracemalloc.start()
+    model = build_model(size, seed)
+    model.get_all_predictions(min_movement=0, limit=10)
+    per_symbol_warm()
+    model.get_sector_predictions()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    results["peak_memory_mb"] = round(peak / 1024 / 1024, 2)
+
+    return results
+
+
+def run_benchmark(sizes, seed, repeats, sample_symbols):
+    """
+    Benchmark every universe size
+
+    Args:
+        sizes (list): Universe sizes
+        seed (int): Random seed
+        repeats (int): Timing repeats per measurement
+        sample_symbols (int): Symbols queried for per-symbol timings
+
+    Returns:
+        dict: Benchmark results
+    """
+    return {
+        "seed": seed,
+        "repeats": repeats,
+        "sample_symbols": sample_symbols,
+        "sizes": {str(size): run_size(size, seed, repeats, sample_symbols) for size in sizes}
+    }
+
+
+def compare(results, baseline, tolerance):
+    """
+    Find measurements that regressed against a baseline
+
+    Args:
+        results (dict): Current results
+        baseline (dict): Baseline results
+        tolerance (float): Allowed slowdown factor
+
+    Returns:
+        list: Regression descriptions
+    """
+    regressions = []
+
+    for size, measurements in results["sizes"].items():
+        base_measurements = baseline.get("sizes", {}).get(size)
+        if base_measurements is None:
+            continue
+
+        for name, value in measurements.items():
+            base_value = base_measurements.get(name)
+            if base_value is None:
+                continue
+
+            if isinstance(value, dict):
+                current, previous = value["median_ms"], base_value["median_ms"]
+                unit = "ms"
+            else:
+                current, previous = value, base_value
+                unit = "MB"
+
+            if previous > 0 and current > previous * tolerance:
+                regressions.append(f"{size} stocks, {name}: {current:.4f} {unit} vs baseline {previous:.4f} {unit} ({current / previous:.2f}x)")
+
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark StockPredictionModel across universe sizes')
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES, help='universe sizes')
+    parser.add_argument('--seed', type=int, default=42, help='random seed')
+    parser.add_argument('--repeats', type=int, default=5, help='timing repeats per measurement')
+    parser.add_argument('--sample-symbols', type=int, default=100, help='symbols queried for per-symbol timings')
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help='baseline results file')
+    parser.add_argument('--save-baseline', action='store_true', help='store these results as the baseline')
+    parser.add_argument('--compare', action='store_true', help='fail if slower than the baseline')
+    parser.add_argument('--tolerance', type=float, default=1.5, help='allowed slowdown factor against the baseline')
+    parser.add_argument('--json', action='store_true', help='emit results as JSON')
+    args = parser.parse_args()
+
+    results = run_benchmark(args.sizes, args.seed, args.repeats, args.sample_symbols)
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        for size, measurements in results["sizes"].items():
+            print(f"\n{int(size):,} stocks (peak memory {measurements['peak_memory_mb']} MB):")
+            for name, value in measurements.items():
+                if isinstance(value, dict):
+                    print(f"  {name:<40} {value['median_ms']:>12.4f} ms")
+
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(os.path.abspath(args.baseline)), exist_ok=True)
+        with open(args.baseline, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"\nBaseline saved to {args.baseline}")
+
+    if args.compare:
+        if not os.path.exists(args.baseline):
+            print(f"\nNo baseline at {args.baseline}; run with --save-baseline first")
+            sys.exit(2)
+
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print(f"\nREGRESSIONS (more than {args.tolerance}x slower than baseline):")
+            for regression in regressions:
+                print(f"  {regression}")
+            sys.exit(1)
+
+        print(f"\nNo regressions against {args.baseline}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,516 @@
+"""
+Real-Time Ingest Benchmark for Trump Tariff Analysis Website
+
+Measures RealTimeDataIntegration's ingest, storage and query paths fully
+offline, in a temporary data directory:
+
+- tick handling throughput through _handle_market_data_message
+- persistence write amplification and bytes per tick (WAL + history tier)
+- get_historical_data latency against raw histories of increasing size
+- subscriber fan-out latency with 1 to 10k callbacks
+- cold start() time against a persisted cache snapshot and WAL
+
+Every input comes from a seeded generator, so runs on the same machine are
+comparable. Results are printed as JSON with --json or appended to a file
+with --output for trend tracking.
+
+Usage:
+    python data/benchmarks/real_time_ingest_benchmark.py
+    python data/benchmarks/real_time_ingest_benchmark.py --history-rows 10000 1000000 100000000
+    python data/benchmarks/real_time_ingest_benchmark.py --json --output ingest_trend.jsonl
+"""
+
+import argparse
+import json
+import logging
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+from datetime import datetime
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from real_time_data_integration import RealTimeDataIntegration  # noqa: E402
+from history_retention import HistoryRetentionEngine, timestamps_to_datetime  # noqa: E402
+
+# Fixed epoch anchor so generated histories are identical between runs
+ANCHOR_MS = 1_700_000_000_000
+
+# Rows generated and written per chunk when building large histories
+HISTORY_CHUNK_ROWS = 1_000_000
+
+DEFAULT_HISTORY_ROWS = [10_000, 100_000, 1_000_000]
+DEFAULT_FANOUT = [1, 10, 100, 1_000, 10_000]
+
+# get_historical_data queries: (label, resolution, span ending at the last row)
+HISTORY_QUERIES = [
+    ("raw_last_hour", "raw", pd.Timedelta(hours=1)),
+    ("1min_last_day", "1min", pd.Timedelta(days=1)),
+    ("1d_full_history", "1d", None)
+]
+
+
+def generate_trades(count, symbol_count, seed):
+    """
+    Generate seeded trade messages as sent by the market data websocket
+
+    Args:
+        count (int): Number of messages
+        symbol_count (int): Number of distinct symbols
+        seed (int): Random seed
+
+    Returns:
+        list: Message dicts
+    """
+    rng = np.random.default_rng(seed)
+
+    symbols = rng.integers(0, symbol_count, count)
+    start_prices = rng.uniform(5.0, 100.0, symbol_count)
+    prices = start_prices[symbols] * np.exp(rng.normal(0, 0.002, count))
+    volumes = rng.integers(1_000, 10_000, count)
+    timestamps = ANCHOR_MS + np.cumsum(rng.integers(1, 50, count))
+
+    return [
+        {
+            'type': 'trade',
+            'symbol': f"SYN{symbol:04d}.AX",
+            'price': round(price, 3),
+            'volume': volume,
+            'timestamp': timestamp
+        }
+        for symbol, price, volume, timestamp in zip(symbols.tolist(), prices.tolist(), volumes.tolist(), timestamps.tolist())
+    ]
+
+
+def generate_history(rows, seed, symbol):
+    """
+    Generate a seeded raw tick history in chunks
+
+    Args:
+        rows (int): Total number of ticks
+        seed (int): Random seed
+        symbol (str): Stock symbol
+
+    Yields:
+        pandas.DataFrame: Chunks in the raw tier layout
+    """
+    rng = np.random.default_rng(seed)
+    last_timestamp = ANCHOR_MS
+    last_price = 45.0
+
+    for start in range(0, rows, HISTORY_CHUNK_ROWS):
+        size = min(HISTORY_CHUNK_ROWS, rows - start)
+
+        # Irregular arrivals around the 5 second simulator cadence
+        timestamps = last_timestamp + np.cumsum(rng.integers(4_000, 6_000, size)).astype(np.int64)
+        prices = last_price * np.exp(np.cumsum(rng.normal(0, 0.001, size)))
+        last_timestamp, last_price = int(timestamps[-1]), float(prices[-1])
+
+        yield pd.DataFrame({
+            'symbol': symbol,
+            'price': np.round(prices, 3),
+            'volume': rng.integers(1_000, 10_000, size).astype(np.int64),
+            'timestamp': timestamps,
+            'datetime': timestamps_to_datetime(timestamps)
+        })
+
+
+def make_integration(data_dir, storage_format):
+    """
+    Create an integration writing to a benchmark directory
+
+    Args:
+        data_dir (str): Data directory
+        storage_format (str): "csv" or "tsc" for the history tiers
+
+    Returns:
+        RealTimeDataIntegration: Integration with its WAL open
+    """
+    integration = RealTimeDataIntegration(data_dir=data_dir)
+    integration.retention = HistoryRetentionEngine(
+        os.path.join(data_dir, 'historical'),
+        storage_format=storage_format
+    )
+    return integration
+
+
+def directory_bytes(path):
+    """
+    Total size of the files under a directory
+
+    Args:
+        path (str): Directory
+
+    Returns:
+        int: Size in bytes
+    """
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            total += os.path.getsize(os.path.join(root, name))
+    return total
+
+
+def summarize(samples_ms):
+    """
+    Summarize latency samples
+
+    Args:
+        samples_ms (list): Latencies in milliseconds
+
+    Returns:
+        dict: Median, p99 and best in milliseconds
+    """
+    samples = np.asarray(samples_ms)
+    return {
+        "median_ms": round(float(np.median(samples)), 4),
+        "p99_ms": round(float(np.percentile(samples, 99)), 4),
+        "best_ms": round(float(samples.min()), 4)
+    }
+
+
+def bench_ingest(work_dir, ticks, symbol_count, seed, storage_format):
+    """
+    Measure tick handling throughput and persistence cost
+
+    Args:
+        work_dir (str): Scratch directory
+        ticks (int): Number of trade messages
+        symbol_count (int): Number of distinct symbols
+        seed (int): Random seed
+        storage_format (str): "csv" or "tsc"
+
+    Returns:
+        dict: Throughput, latency and write amplification figures
+    """
+    data_dir = os.path.join(work_dir, f"ingest_{storage_format}")
+    integration = make_integration(data_dir, storage_format)
+    integration._restore_cache()
+
+    messages = generate_trades(ticks, symbol_count, seed)
+    payload_bytes = sum(len(json.dumps(message)) for message in messages)
+
+    latencies = []
+    start = time.perf_counter()
+    for message in messages:
+        tick_start = time.perf_counter()
+        integration._handle_market_data_message(message)
+        latencies.append((time.perf_counter() - tick_start) * 1000)
+    integration.retention.flush()
+    elapsed = time.perf_counter() - start
+
+    integration.persistence.close()
+
+    wal_bytes = os.path.getsize(integration.persistence.wal.file_path)
+    history_bytes = directory_bytes(os.path.join(data_dir, 'historical'))
+
+    return {
+        "ticks": ticks,
+        "symbols": symbol_count,
+        "ticks_per_sec": round(ticks / elapsed),
+        "tick_latency": summarize(latencies),
+        "payload_bytes_per_tick": round(payload_bytes / ticks, 2),
+        "wal_bytes_per_tick": round(wal_bytes / ticks, 2),
+        "history_bytes_per_tick": round(history_bytes / ticks, 2),
+        "write_amplification": round((wal_bytes + history_bytes) / payload_bytes, 2)
+    }
+
+
+def bench_history(work_dir, rows, seed, storage_format, repeats):
+    """
+    Measure get_historical_data latency against one history size
+
+    Args:
+        work_dir (str): Scratch directory
+        rows (int): Number of raw ticks in the history
+        seed (int): Random seed
+        storage_format (str): "csv" or "tsc"
+        repeats (int): Timing repeats per query
+
+    Returns:
+        dict: Query latencies keyed by query label, plus file size
+    """
+    data_dir = os.path.join(work_dir, f"history_{storage_format}")
+    integration = make_integration(data_dir, storage_format)
+    retention = integration.retention
+
+    symbol = f"HIST{rows}.AX"
+    os.makedirs(retention.historical_dir, exist_ok=True)
+
+    start = time.perf_counter()
+    last_datetime = None
+    for chunk in generate_history(rows, seed, symbol):
+        retention.write_tier(symbol, 'raw', chunk, append=True)
+        last_datetime = chunk['datetime'].iloc[-1]
+    write_seconds = time.perf_counter() - start
+
+    results = {
+        "rows": rows,
+        "file_bytes": os.path.getsize(retention.tier_path(symbol, 'raw')),
+        "write_rows_per_sec": round(rows / write_seconds)
+    }
+
+    for label, resolution, span in HISTORY_QUERIES:
+        start_date = None if span is None else (last_datetime - span).isoformat()
+        end_date = last_datetime.isoformat()
+
+        samples = []
+        for _ in range(repeats):
+            query_start = time.perf_counter()
+            df = integration.get_historical_data(symbol, start_date, end_date, resolution=resolution)
+            samples.append((time.perf_counter() - query_start) * 1000)
+
+        results[label] = summarize(samples)
+        results[label]["rows_returned"] = 0 if df is None else len(df)
+
+    os.remove(retention.tier_path(symbol, 'raw'))
+
+    return results
+
+
+def bench_fanout(work_dir, callback_counts, seed, dispatches):
+    """
+    Measure subscriber fan-out latency
+
+    Args:
+        work_dir (str): Scratch directory
+        callback_counts (list): Subscriber counts to measure
+        seed (int): Random seed
+        dispatches (int): Notifications per subscriber count
+
+    Returns:
+        dict: Subscriber count -> dispatch latency figures
+    """
+    integration = make_integration(os.path.join(work_dir, "fanout"), 'csv')
+    messages = generate_trades(dispatches, 50, seed)
+
+    results = {}
+    for count in callback_counts:
+        # Each callback records when it ran, so the last stamp marks the end
+        # of the fan-out
+        stamps = [0.0] * count
+
+        def make_callback(index):
+            def callback(data):
+                stamps[index] = time.perf_counter()
+            return callback
+
+        integration.subscribers = {'stock_quotes': [make_callback(index) for index in range(count)]}
+
+        samples = []
+        for message in messages:
+            update = {key: message[key] for key in ('symbol', 'price', 'volume', 'timestamp')}
+            start = time.perf_counter()
+            integration._notify_subscribers('stock_quotes', update)
+            samples.append((stamps[-1] - start) * 1000)
+
+        results[str(count)] = summarize(samples)
+        results[str(count)]["per_callback_us"] = round(results[str(count)]["median_ms"] * 1000 / count, 4)
+
+    integration.subscribers = {}
+
+    return results
+
+
+def prepare_cold_start(work_dir, symbol_count, wal_records, seed):
+    """
+    Persist a cache snapshot followed by a WAL tail, as left by a stopped
+    service
+
+    Args:
+        work_dir (str): Scratch directory
+        symbol_count (int): Stocks in the snapshotted quotes
+        wal_records (int): Tick updates logged after the snapshot
+        seed (int): Random seed
+
+    Returns:
+        str: Prepared data directory
+    """
+    data_dir = os.path.join(work_dir, "cold_start_template")
+    integration = make_integration(data_dir, 'csv')
+    integration._restore_cache()
+
+    rng = np.random.default_rng(seed)
+    quotes = {
+        f"SYN{index:04d}.AX": {
+            'symbol': f"SYN{index:04d}.AX",
+            'name': f"Synthetic {index}",
+            'price': float(price),
+            'change_pct': float(change),
+            'volume': int(volume),
+            'timestamp': ANCHOR_MS
+        }
+        for index, (price, change, volume) in enumerate(zip(
+            rng.uniform(5, 100, symbol_count), rng.uniform(-2, 2, symbol_count), rng.integers(100_000, 1_000_000, symbol_count)))
+    }
+    integration._set_cache('stock_quotes', quotes)
+    integration.snapshot_cache()
+
+    for message in generate_trades(wal_records, symbol_count, seed):
+        integration._update_cache_item('stock_quotes', message['symbol'], {
+            key: message[key] for key in ('symbol', 'price', 'volume', 'timestamp')
+        })
+
+    integration.persistence.close()
+
+    return data_dir
+
+
+def bench_cold_start(work_dir, symbol_count, wal_records, seed, repeats):
+    """
+    Measure construction, cache restore and start() on a persisted state
+
+    Args:
+        work_dir (str): Scratch directory
+        symbol_count (int): Stocks in the snapshotted quotes
+        wal_records (int): Tick updates logged after the snapshot
+        seed (int): Random seed
+        repeats (int): Cold starts to time
+
+    Returns:
+        dict: Construction, restore and start() latency figures
+    """
+    template = prepare_cold_start(work_dir, symbol_count, wal_records, seed)
+
+    init_samples, restore_samples, start_samples = [], [], []
+    for attempt in range(repeats):
+        # Restore alone, on its own copy
+        data_dir = os.path.join(work_dir, f"cold_restore_{attempt}")
+        shutil.copytree(template, data_dir)
+        integration = RealTimeDataIntegration(data_dir=data_dir)
+        start = time.perf_counter()
+        integration._restore_cache()
+        restore_samples.append((time.perf_counter() - start) * 1000)
+        integration.persistence.close()
+
+        # Full construction and start(), including its background threads
+        data_dir = os.path.join(work_dir, f"cold_start_{attempt}")
+        shutil.copytree(template, data_dir)
+        start = time.perf_counter()
+        integration = RealTimeDataIntegration(data_dir=data_dir)
+        init_samples.append((time.perf_counter() - start) * 1000)
+
+        start = time.perf_counter()
+        integration.start()
+        start_samples.append((time.perf_counter() - start) * 1000)
+
+        restored = len(integration.data_cache.get('stock_quotes', {}))
+        integration.stop()
+
+    return {
+        "snapshot_symbols": symbol_count,
+        "wal_records": wal_records,
+        "restored_symbols": restored,
+        "init": summarize(init_samples),
+        "restore": summarize(restore_samples),
+        "start": summarize(start_samples)
+    }
+
+
+def run_benchmark(args):
+    """
+    Run every benchmark section
+
+    Args:
+        args (argparse.Namespace): Parsed command line options
+
+    Returns:
+        dict: Benchmark results
+    """
+    results = {
+        "generated_at": datetime.now().isoformat(timespec='seconds'),
+        "seed": args.seed,
+        "environment": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count()
+        },
+        "ingest": {},
+        "history": {},
+        "fanout": {},
+        "cold_start": {}
+    }
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        for storage_format in args.formats:
+            results["ingest"][storage_format] = bench_ingest(work_dir, args.ticks, args.symbols, args.seed, storage_format)
+
+            results["history"][storage_format] = [
+                bench_history(work_dir, rows, args.seed, storage_format, args.repeats)
+                for rows in args.history_rows
+            ]
+
+        results["fanout"] = bench_fanout(work_dir, args.fanout, args.seed, args.dispatches)
+        results["cold_start"] = bench_cold_start(work_dir, args.cold_start_symbols, args.wal_records, args.seed, args.repeats)
+
+    return results
+
+
+def print_report(results):
+    """
+    Print a human-readable summary
+
+    Args:
+        results (dict): Benchmark results
+    """
+    print(f"Seed {results['seed']}, Python {results['environment']['python']}, {results['environment']['cpu_count']} CPUs")
+
+    for storage_format, stats in results["ingest"].items():
+        print(f"\nIngest ({storage_format}, {stats['ticks']:,} ticks over {stats['symbols']} symbols):")
+        print(f"  {stats['ticks_per_sec']:,} ticks/s, median {stats['tick_latency']['median_ms']:.4f} ms, p99 {stats['tick_latency']['p99_ms']:.4f} ms")
+        print(f"  {stats['wal_bytes_per_tick']:.2f} WAL + {stats['history_bytes_per_tick']:.2f} history bytes/tick, "
+              f"write amplification {stats['write_amplification']:.2f}x")
+
+    for storage_format, sizes in results["history"].items():
+        print(f"\nget_historical_data ({storage_format}):")
+        for stats in sizes:
+            queries = ", ".join(f"{label} {stats[label]['median_ms']:.2f} ms" for label, _, _ in HISTORY_QUERIES)
+            print(f"  {stats['rows']:>12,} rows: {queries}")
+
+    print("\nSubscriber fan-out:")
+    for count, stats in results["fanout"].items():
+        print(f"  {int(count):>6,} callbacks: median {stats['median_ms']:.4f} ms, p99 {stats['p99_ms']:.4f} ms, {stats['per_callback_us']:.4f} us/callback")
+
+    stats = results["cold_start"]
+    print(f"\nCold start ({stats['snapshot_symbols']:,} snapshot symbols, {stats['wal_records']:,} WAL records):")
+    print(f"  init {stats['init']['median_ms']:.2f} ms, restore {stats['restore']['median_ms']:.2f} ms, start() {stats['start']['median_ms']:.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark RealTimeDataIntegration ingest, storage and query paths offline')
+    parser.add_argument('--ticks', type=int, default=10_000, help='trade messages for the ingest benchmark')
+    parser.add_argument('--symbols', type=int, default=50, help='distinct symbols in the ingest benchmark')
+    parser.add_argument('--formats', nargs='+', default=['csv', 'tsc'], choices=['csv', 'tsc'], help='history storage formats')
+    parser.add_argument('--history-rows', type=int, nargs='+', default=DEFAULT_HISTORY_ROWS, help='history sizes in raw ticks')
+    parser.add_argument('--fanout', type=int, nargs='+', default=DEFAULT_FANOUT, help='subscriber counts')
+    parser.add_argument('--dispatches', type=int, default=200, help='notifications per subscriber count')
+    parser.add_argument('--cold-start-symbols', type=int, default=1_000, help='stocks in the persisted snapshot')
+    parser.add_argument('--wal-records', type=int, default=10_000, help='WAL records after the snapshot')
+    parser.add_argument('--seed', type=int, default=42, help='random seed')
+    parser.add_argument('--repeats', type=int, default=5, help='timing repeats per measurement')
+    parser.add_argument('--json', action='store_true', help='emit results as JSON')
+    parser.add_argument('--output', help='append results as one JSON line to this file')
+    args = parser.parse_args()
+
+    # Per-call info logging would dominate the measurements
+    logging.getLogger('real_time_data').setLevel(logging.WARNING)
+
+    results = run_benchmark(args)
+
+    if args.output:
+        with open(args.output, 'a') as f:
+            f.write(json.dumps(results) + '\n')
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print_report(results)
+
+
+if __name__ == '__main__':
+    main()
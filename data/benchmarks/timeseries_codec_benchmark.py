@@ -0,0 +1,170 @@
+"""
+Time-Series Codec Benchmark for Trump Tariff Analysis Website
+
+Compares the compressed time-series encoding against the historical CSV
+format written by RealTimeDataIntegration: bytes per tick and decode
+throughput for stock ticks (price + volume) and forex ticks (rate).
+
+Usage:
+    python data/benchmarks/timeseries_codec_benchmark.py --ticks 1000000
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from timeseries_codec import TimeSeriesFile, KIND_TIMESTAMP, KIND_FLOAT, KIND_UINT  # noqa: E402
+
+
+def generate_ticks(count, seed, kind):
+    """
+    Generate a seeded random-walk tick series
+
+    Args:
+        count (int): Number of ticks
+        seed (int): Random seed
+        kind (str): "stock" or "forex"
+
+    Returns:
+        dict: Column name -> array
+    """
+    rng = np.random.default_rng(seed)
+
+    # Irregular arrivals around the 5 second simulator cadence
+    timestamps = 1_700_000_000_000 + np.cumsum(rng.integers(4_000, 6_000, count)).astype(np.int64)
+
+    if kind == 'stock':
+        prices = np.round(45.0 * np.exp(np.cumsum(rng.normal(0, 0.001, count))), 3)
+        volumes = rng.integers(1_000, 10_000, count).astype(np.int64)
+        return {'timestamp': timestamps, 'price': prices, 'volume': volumes}
+
+    rates = 0.67 * np.exp(np.cumsum(rng.normal(0, 0.0002, count)))
+    return {'timestamp': timestamps, 'rate': rates}
+
+
+def to_csv_frame(columns, kind):
+    """
+    Build a frame in the historical CSV layout
+
+    Args:
+        columns (dict): Column name -> array
+        kind (str): "stock" or "forex"
+
+    Returns:
+        pandas.DataFrame: Frame with the CSV writer's columns
+    """
+    df = pd.DataFrame(columns)
+    df.insert(0, 'pair' if kind == 'forex' else 'symbol', 'AUD/USD' if kind == 'forex' else 'BHP.AX')
+    df['datetime'] = pd.to_datetime(df['timestamp'], unit='ms').dt.strftime('%Y-%m-%d %H:%M:%S')
+    return df
+
+
+def time_call(function, repeats):
+    """
+    Time the best of several calls
+
+    Args:
+        function (callable): Function to time
+        repeats (int): Number of calls
+
+    Returns:
+        float: Best wall time in seconds
+    """
+    best = float('inf')
+    for _ in range(repeats):
+        start = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def run_benchmark(count, seed, repeats):
+    """
+    Run the CSV vs compressed comparison for stock and forex ticks
+
+    Args:
+        count (int): Number of ticks per series
+        seed (int): Random seed
+        repeats (int): Timing repeats per measurement
+
+    Returns:
+        dict: Benchmark results
+    """
+    results = {'ticks': count, 'seed': seed, 'series': {}}
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for kind in ('stock', 'forex'):
+            columns = generate_ticks(count, seed, kind)
+            value = 'price' if kind == 'stock' else 'rate'
+
+            schema = [('timestamp', KIND_TIMESTAMP), (value, KIND_FLOAT)]
+            if kind == 'stock':
+                schema.append(('volume', KIND_UINT))
+
+            csv_path = os.path.join(tmp_dir, f"{kind}.csv")
+            to_csv_frame(columns, kind).to_csv(csv_path, index=False)
+
+            tsc_path = os.path.join(tmp_dir, f"{kind}.tsc")
+            tsc_file = TimeSeriesFile(tsc_path)
+            encode_seconds = time_call(lambda: tsc_file.write(columns, schema), repeats)
+
+            def read_csv():
+                df = pd.read_csv(csv_path)
+                df['datetime'] = pd.to_datetime(df['datetime'])
+                return df
+
+            csv_seconds = time_call(read_csv, repeats)
+            tsc_seconds = time_call(tsc_file.read, repeats)
+
+            # Round-trip check so a fast but wrong codec cannot pass
+            decoded, _, _ = tsc_file.read()
+            for name, _ in schema:
+                if not np.array_equal(decoded[name], columns[name]):
+                    raise AssertionError(f"Round-trip mismatch in {kind} column {name}")
+
+            csv_bytes = os.path.getsize(csv_path)
+            tsc_bytes = os.path.getsize(tsc_path)
+
+            results['series'][kind] = {
+                'csv_bytes_per_tick': round(csv_bytes / count, 2),
+                'tsc_bytes_per_tick': round(tsc_bytes / count, 2),
+                'compression_ratio': round(csv_bytes / tsc_bytes, 2),
+                'csv_decode_ticks_per_sec': round(count / csv_seconds),
+                'tsc_decode_ticks_per_sec': round(count / tsc_seconds),
+                'tsc_encode_ticks_per_sec': round(count / encode_seconds)
+            }
+
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the time-series codec against CSV history files')
+    parser.add_argument('--ticks', type=int, default=1_000_000, help='ticks per series')
+    parser.add_argument('--seed', type=int, default=42, help='random seed')
+    parser.add_argument('--repeats', type=int, default=3, help='timing repeats per measurement')
+    parser.add_argument('--json', action='store_true', help='emit results as JSON')
+    args = parser.parse_args()
+
+    results = run_benchmark(args.ticks, args.seed, args.repeats)
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(f"Ticks per series: {results['ticks']:,} (seed {results['seed']})")
+    for kind, stats in results['series'].items():
+        print(f"\n{kind}:")
+        print(f"  CSV:        {stats['csv_bytes_per_tick']:7.2f} bytes/tick  {stats['csv_decode_ticks_per_sec']:>14,} ticks/s decode")
+        print(f"  Compressed: {stats['tsc_bytes_per_tick']:7.2f} bytes/tick  {stats['tsc_decode_ticks_per_sec']:>14,} ticks/s decode")
+        print(f"  Ratio:      {stats['compression_ratio']:.2f}x smaller, encode {stats['tsc_encode_ticks_per_sec']:,} ticks/s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,427 @@
+"""
+Cache Persistence Module for Trump Tariff Analysis Website
+
+This module implements binary snapshots and a write-ahead log (WAL) for the
+real-time data cache, so a restarted service can restore its last consistent
+state before any network I/O happens.
+"""
+
+import os
+import pickle
+import struct
+import threading
+import time
+import zlib
+import logging
+
+logger = logging.getLogger('real_time_data')
+
+# Snapshot file layout: magic, format version, WAL sequence covered, payload
+SNAPSHOT_MAGIC = b'RTDS'
+SNAPSHOT_HEADER = struct.Struct('<4sHQI')  # magic, version, wal_seq, crc32
+
+# WAL record layout: payload length, crc32 of payload, sequence number
+WAL_RECORD_HEADER = struct.Struct('<IIQ')
+
+FORMAT_VERSION = 1
+
+# Supported fsync policies for the write-ahead log
+FSYNC_ALWAYS = 'always'      # fsync after every record
+FSYNC_INTERVAL = 'interval'  # fsync at most once per fsync_interval seconds, and
+                             # within fsync_interval seconds of every record
+FSYNC_NEVER = 'never'        # leave flushing to the operating system
+
+
+class WriteAheadLog:
+    """
+    Append-only log of cache mutations with CRC-framed records
+    """
+
+    def __init__(self, file_path, fsync_policy=FSYNC_INTERVAL, fsync_interval=1.0):
+        if fsync_policy not in (FSYNC_ALWAYS, FSYNC_INTERVAL, FSYNC_NEVER):
+            raise ValueError(f"Invalid fsync policy: {fsync_policy}")
+
+        self.file_path = file_path
+        self.sealed_path = file_path + '.1'
+        self.fsync_policy = fsync_policy
+        self.fsync_interval = fsync_interval
+        self.sequence = 0
+        self._file = None
+        self._last_fsync = 0.0
+        self._unsynced = False
+        self._flush_timer = None
+        self._lock = threading.Lock()
+
+    def open(self, sequence):
+        """
+        Open the log for appending
+
+        Args:
+            sequence (int): Sequence number of the last record already applied
+        """
+        with self._lock:
+            self.sequence = sequence
+            self._file = open(self.file_path, 'ab')
+
+    def close(self):
+        """
+        Flush and close the log
+        """
+        with self._lock:
+            self._cancel_flush()
+            if self._file is None:
+                return
+            self._file.flush()
+            if self.fsync_policy != FSYNC_NEVER:
+                os.fsync(self._file.fileno())
+            self._file.close()
+            self._file = None
+            self._unsynced = False
+
+    def append(self, record):
+        """
+        Append a record to the log
+
+        Args:
+            record (tuple): Cache mutation to log
+
+        Returns:
+            int: Sequence number assigned to the record
+        """
+        payload = pickle.dumps(record, protocol=pickle.HIGHEST_PROTOCOL)
+
+        with self._lock:
+            if self._file is None:
+                return None
+
+            self.sequence += 1
+            header = WAL_RECORD_HEADER.pack(len(payload), zlib.crc32(payload), self.sequence)
+            self._file.write(header + payload)
+            self._file.flush()
+
+            if self.fsync_policy == FSYNC_ALWAYS:
+                os.fsync(self._file.fileno())
+            elif self.fsync_policy == FSYNC_INTERVAL:
+                now = time.monotonic()
+                if now - self._last_fsync >= self.fsync_interval:
+                    os.fsync(self._file.fileno())
+                    self._last_fsync = now
+                    self._unsynced = False
+                else:
+                    # Sync when the interval ends even if the stream goes
+                    # quiet, so no record stays unsynced for longer
+                    self._unsynced = True
+                    if self._flush_timer is None:
+                        delay = self.fsync_interval - (now - self._last_fsync)
+                        self._flush_timer = threading.Timer(delay, self._flush_pending)
+                        self._flush_timer.daemon = True
+                        self._flush_timer.start()
+
+            return self.sequence
+
+    def _flush_pending(self):
+        """
+        Fsync records appended since the last fsync (interval policy timer)
+        """
+        with self._lock:
+            self._flush_timer = None
+            if self._file is None or not self._unsynced:
+                return
+            try:
+                os.fsync(self._file.fileno())
+            except OSError as e:
+                logger.error(f"Error syncing WAL: {e}")
+                return
+            self._last_fsync = time.monotonic()
+            self._unsynced = False
+
+    def _cancel_flush(self):
+        """
+        Cancel a pending interval fsync; the lock must be held
+        """
+        if self._flush_timer is not None:
+            self._flush_timer.cancel()
+            self._flush_timer = None
+
+    def rotate(self):
+        """
+        Seal the current log segment and start a new one
+
+        The sealed segment is kept until the snapshot covering it has been
+        written, so a crash in between loses nothing.
+        """
+        with self._lock:
+            self._cancel_flush()
+            if self._file is not None:
+                self._file.flush()
+                if self._unsynced:
+                    os.fsync(self._file.fileno())
+                    self._unsynced = False
+                self._file.close()
+            if os.path.isfile(self.file_path):
+                if os.path.isfile(self.sealed_path):
+                    # A previous snapshot never completed; keep its records too
+                    with open(self.file_path, 'rb') as src, open(self.sealed_path, 'ab') as dst:
+                        dst.write(src.read())
+                    os.remove(self.file_path)
+                else:
+                    os.replace(self.file_path, self.sealed_path)
+            self._file = open(self.file_path, 'ab')
+
+    def discard_sealed(self):
+        """
+        Remove the sealed segment once a snapshot covers it
+        """
+        if os.path.isfile(self.sealed_path):
+            os.remove(self.sealed_path)
+
+    def replay(self, after_sequence=0):
+        """
+        Read valid records from the sealed and active log segments
+
+        Replay of a segment stops at the first truncated or corrupt record;
+        anything after it is treated as a torn write and cut off the file.
+
+        Args:
+            after_sequence (int): Skip records with a sequence at or below this
+
+        Returns:
+            tuple: (list of (sequence, record), last valid sequence number)
+        """
+        records = []
+        last_sequence = after_sequence
+
+        for segment_path in (self.sealed_path, self.file_path):
+            if not os.path.isfile(segment_path):
+                continue
+
+            segment_records = self._replay_segment(segment_path)
+            for sequence, record in segment_records:
+                if sequence > after_sequence:
+                    records.append((sequence, record))
+                last_sequence = max(last_sequence, sequence)
+
+        return records, last_sequence
+
+    def _replay_segment(self, segment_path):
+        """
+        Read valid records from a single log segment
+
+        Args:
+            segment_path (str): Path of the segment file
+
+        Returns:
+            list: (sequence, record) tuples in file order
+        """
+        records = []
+
+        with open(segment_path, 'rb') as f:
+            data = f.read()
+
+        offset = 0
+        while offset + WAL_RECORD_HEADER.size <= len(data):
+            length, crc, sequence = WAL_RECORD_HEADER.unpack_from(data, offset)
+            start = offset + WAL_RECORD_HEADER.size
+            end = start + length
+
+            if end > len(data):
+                logger.warning(f"Truncated WAL record in {segment_path} at offset {offset}, discarding tail")
+                break
+
+            payload = data[start:end]
+            if zlib.crc32(payload) != crc:
+                logger.warning(f"Corrupt WAL record in {segment_path} at offset {offset}, discarding tail")
+                break
+
+            try:
+                record = pickle.loads(payload)
+            except Exception as e:
+                logger.warning(f"Unreadable WAL record in {segment_path} at offset {offset}: {e}")
+                break
+
+            records.append((sequence, record))
+            offset = end
+
+        if offset < len(data):
+            # Cut off the torn tail so new appends start from a clean boundary
+            with open(segment_path, 'r+b') as f:
+                f.truncate(offset)
+
+        return records
+
+
+class CachePersistence:
+    """
+    Snapshot + WAL persistence for RealTimeDataIntegration.data_cache
+    """
+
+    def __init__(self, data_dir, fsync_policy=FSYNC_INTERVAL, fsync_interval=1.0, snapshot_interval=300):
+        self.data_dir = data_dir
+        self.snapshot_path = os.path.join(data_dir, 'cache.snapshot')
+        self.snapshot_interval = snapshot_interval
+        self.wal = WriteAheadLog(
+            os.path.join(data_dir, 'cache.wal'),
+            fsync_policy=fsync_policy,
+            fsync_interval=fsync_interval
+        )
+        self._snapshot_lock = threading.Lock()
+
+    def restore(self):
+        """
+        Restore the last consistent cache state from snapshot and WAL
+
+        Returns:
+            tuple: (data_cache dict, cache_timestamps dict)
+        """
+        data_cache = {}
+        cache_timestamps = {}
+        snapshot_sequence = 0
+
+        snapshot = self._read_snapshot()
+        if snapshot is not None:
+            snapshot_sequence, data_cache, cache_timestamps = snapshot
+
+        records, last_sequence = self.wal.replay(after_sequence=snapshot_sequence)
+
+        for _, record in records:
+            try:
+                apply_record(data_cache, cache_timestamps, record)
+            except Exception as e:
+                logger.warning(f"Skipping unappliable WAL record: {e}")
+
+        self.wal.open(last_sequence)
+
+        logger.info(
+            f"Restored cache from snapshot (seq {snapshot_sequence}) "
+            f"and {len(records)} WAL records"
+        )
+
+        return data_cache, cache_timestamps
+
+    def log(self, record):
+        """
+        Append a cache mutation to the WAL
+
+        Args:
+            record (tuple): ('set', data_type, value, cache_time) or
+                ('update', data_type, key, fields, cache_time)
+
+        Returns:
+            int: Sequence number of the record, None if it was not written
+        """
+        try:
+            return self.wal.append(record)
+        except Exception as e:
+            logger.error(f"Error writing WAL record: {e}")
+            return None
+
+    def capture(self, data_cache, cache_timestamps):
+        """
+        Serialize the cache and rotate the WAL at the same point
+
+        Callers must hold the lock that guards cache mutations, so the
+        serialized state matches the WAL sequence exactly.
+
+        Args:
+            data_cache (dict): Current data cache
+            cache_timestamps (dict): Current cache timestamps
+
+        Returns:
+            tuple: (wal sequence, serialized cache) to pass to write_snapshot
+        """
+        payload = pickle.dumps((data_cache, cache_timestamps), protocol=pickle.HIGHEST_PROTOCOL)
+        self.wal.rotate()
+        return self.wal.sequence, payload
+
+    def write_snapshot(self, captured):
+        """
+        Write a captured cache state to disk and drop the WAL it covers
+
+        Args:
+            captured (tuple): Result of capture()
+        """
+        sequence, payload = captured
+
+        with self._snapshot_lock:
+            try:
+                payload = zlib.compress(payload, 1)
+                header = SNAPSHOT_HEADER.pack(SNAPSHOT_MAGIC, FORMAT_VERSION, sequence, zlib.crc32(payload))
+
+                tmp_path = self.snapshot_path + '.tmp'
+                with open(tmp_path, 'wb') as f:
+                    f.write(header + payload)
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(tmp_path, self.snapshot_path)
+
+                self.wal.discard_sealed()
+
+            except Exception as e:
+                logger.error(f"Error writing cache snapshot: {e}")
+
+    def close(self):
+        """
+        Close the WAL
+        """
+        self.wal.close()
+
+    def _read_snapshot(self):
+        """
+        Read and validate the snapshot file
+
+        Returns:
+            tuple: (wal sequence, data_cache, cache_timestamps) or None
+        """
+        if not os.path.isfile(self.snapshot_path):
+            return None
+
+        try:
+            with open(self.snapshot_path, 'rb') as f:
+                data = f.read()
+
+            magic, version, sequence, crc = SNAPSHOT_HEADER.unpack_from(data, 0)
+            payload = data[SNAPSHOT_HEADER.size:]
+
+            if magic != SNAPSHOT_MAGIC or version != FORMAT_VERSION:
+                logger.warning("Ignoring cache snapshot with unknown format")
+                return None
+
+            if zlib.crc32(payload) != crc:
+                logger.warning("Ignoring corrupt cache snapshot")
+                return None
+
+            data_cache, cache_timestamps = pickle.loads(zlib.decompress(payload))
+            return sequence, data_cache, cache_timestamps
+
+        except Exception as e:
+            logger.warning(f"Error reading cache snapshot: {e}")
+            return None
+
+
+def apply_record(data_cache, cache_timestamps, record):
+    """
+    Apply a WAL record to a cache
+
+    Args:
+        data_cache (dict): Cache to mutate
+        cache_timestamps (dict): Cache timestamps to mutate
+        record (tuple): WAL record
+    """
+    op = record[0]
+
+    if op == 'set':
+        _, data_type, value, cache_time = record
+        data_cache[data_type] = value
+        cache_timestamps[data_type] = cache_time
+
+    elif op == 'update':
+        _, data_type, key, fields, cache_time = record
+        entries = data_cache.setdefault(data_type, {})
+        if key in entries:
+            entries[key].update(fields)
+        else:
+            entries[key] = dict(fields)
+        cache_timestamps[data_type] = cache_time
+
+    else:
+        raise ValueError(f"Unknown WAL operation: {op}")
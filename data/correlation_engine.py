@@ -0,0 +1,447 @@
+"""
+Correlation Engine for Trump Tariff Analysis Website
+
+This module maintains streaming correlations, covariances and betas between
+every tracked stock and every forex pair and market index. Ticks from
+RealTimeDataIntegration's streams are aligned onto fixed-length bars: each
+series keeps its last value, and when a bar closes the log return of every
+series since the previous close is taken at once.
+
+Each (stock, factor) pair keeps two sets of accumulators, updated in O(1) per
+pair per bar without rescanning history:
+
+- rolling: Welford mean and co-moment sums over the last `window` bars; the
+  oldest bar is removed with the inverse update when a new one arrives
+- ewma: exponentially weighted mean, variance and covariance with the given
+  half-life in bars
+
+Pairs only count bars where both series have a return, so a stock that
+started trading late is measured over the bars it has. Bar listeners receive
+every bar's returns, so per-series estimators can share the alignment.
+"""
+
+import math
+import threading
+import time
+import logging
+
+try:
+    from .lazy_imports import lazy_import
+except ImportError:
+    from lazy_imports import lazy_import
+
+# Heavy dependencies load on first use, keeping module import cheap
+np = lazy_import('numpy')
+
+logger = logging.getLogger('real_time_data')
+
+METHODS = ["rolling", "ewma"]
+
+
+class CorrelationEngine:
+    """
+    Rolling and EWMA stock-factor correlations over aligned bars
+    """
+
+    def __init__(self, stocks, factors, bar_seconds=60, window=390, halflife=30, min_bars=20):
+        """
+        Args:
+            stocks (list): Stock symbols (rows)
+            factors (list): Forex pairs and market indices (columns)
+            bar_seconds (float, optional): Bar length returns are taken over
+            window (int, optional): Bars in the rolling window; the default
+                is one trading day of minute bars
+            halflife (float, optional): EWMA half-life in bars
+            min_bars (int, optional): Bars a pair needs before its
+                statistics are reported
+        """
+        self.stocks = list(stocks)
+        self.factors = list(factors)
+        self.bar_ms = int(bar_seconds * 1000)
+        self.window = window
+        self.alpha = 1 - 0.5 ** (1 / halflife)
+        self.min_bars = min_bars
+
+        self._stock_slots = {symbol: slot for slot, symbol in enumerate(self.stocks)}
+        self._factor_slots = {symbol: slot for slot, symbol in enumerate(self.factors)}
+
+        series = len(self.stocks) + len(self.factors)
+        shape = (len(self.stocks), len(self.factors))
+
+        # Latest value of each series (stocks first), and its value at the
+        # last bar close
+        self._values = np.full(series, np.nan)
+        self._closes = np.full(series, np.nan)
+        self._bar = None
+
+        # Ring buffer of bar returns, needed to remove bars from the window
+        self._returns = np.full((window, series), np.nan)
+        self._head = 0
+        self._filled = 0
+
+        # Rolling accumulators per pair
+        self._count = np.zeros(shape, dtype=np.int64)
+        self._mean_x = np.zeros(shape)
+        self._mean_y = np.zeros(shape)
+        self._m2_x = np.zeros(shape)
+        self._m2_y = np.zeros(shape)
+        self._co = np.zeros(shape)
+
+        # EWMA accumulators per pair
+        self._ew_count = np.zeros(shape, dtype=np.int64)
+        self._ew_mean_x = np.zeros(shape)
+        self._ew_mean_y = np.zeros(shape)
+        self._ew_var_x = np.zeros(shape)
+        self._ew_var_y = np.zeros(shape)
+        self._ew_cov = np.zeros(shape)
+
+        self.bars = 0
+        self.last_bar_ms = None
+        self.late_ticks = 0
+
+        self._lock = threading.RLock()
+        self._source = None
+        self._callbacks = {}
+        self._bar_listeners = []
+
+    def _series_slot(self, symbol):
+        slot = self._stock_slots.get(symbol)
+        if slot is not None:
+            return slot
+        slot = self._factor_slots.get(symbol)
+        if slot is not None:
+            return len(self.stocks) + slot
+        return None
+
+    def update(self, symbol, value, timestamp=None):
+        """
+        Record a stock price, forex rate or index value
+
+        A tick in a later bar first closes the current one. Ticks older than
+        the current bar are dropped.
+
+        Args:
+            symbol (str): Stock symbol, forex pair or index symbol
+            value (float): Price, rate or index level
+            timestamp (int, optional): Tick time in epoch milliseconds, now
+                if None
+
+        Returns:
+            bool: True if the tick was recorded
+        """
+        slot = self._series_slot(symbol)
+        if slot is None or value is None or not value > 0:
+            return False
+
+        if timestamp is None:
+            timestamp = time.time() * 1000
+        bar = int(timestamp // self.bar_ms)
+
+        with self._lock:
+            if self._bar is None:
+                self._bar = bar
+            elif bar > self._bar:
+                # A gap of several bars yields one return over the gap
+                self._close_bar()
+                self._bar = bar
+            elif bar < self._bar:
+                self.late_ticks += 1
+                return False
+
+            self._values[slot] = value
+            return True
+
+    def _close_bar(self):
+        """
+        Take every series' return over the bar and update the accumulators;
+        the lock must be held
+        """
+        with np.errstate(invalid='ignore', divide='ignore'):
+            returns = np.log(self._values / self._closes)
+        self._closes = self._values.copy()
+        self.last_bar_ms = (self._bar + 1) * self.bar_ms
+
+        if np.isnan(returns).all():
+            return
+
+        removed = None
+        if self._filled == self.window:
+            removed = self._returns[self._head].copy()
+            self._remove(removed)
+        self._returns[self._head] = returns
+        self._head = (self._head + 1) % self.window
+        self._filled = min(self._filled + 1, self.window)
+
+        self._add(returns)
+        self._add_ewma(returns)
+        self.bars += 1
+
+        for listener in self._bar_listeners:
+            try:
+                listener(returns, removed, self.last_bar_ms)
+            except Exception as e:
+                logger.error(f"Error in correlation bar listener: {e}")
+
+    def add_bar_listener(self, listener):
+        """
+        Receive every closed bar
+
+        Listeners run under the engine's lock and must be quick.
+
+        Args:
+            listener (callable): Called with (returns, removed, bar_ms):
+                the bar's log return per series (stocks, then factors, NaN
+                where unknown), the returns leaving the rolling window or
+                None, and the bar's close time in epoch milliseconds
+        """
+        with self._lock:
+            self._bar_listeners.append(listener)
+
+    def remove_bar_listener(self, listener):
+        """
+        Stop receiving closed bars
+
+        Args:
+            listener (callable): Listener previously added
+        """
+        with self._lock:
+            if listener in self._bar_listeners:
+                self._bar_listeners.remove(listener)
+
+    def _pairs(self, returns):
+        """
+        Broadcast a bar's returns to (stocks, factors) with a validity mask
+        """
+        x = returns[:len(self.stocks), None]
+        y = returns[None, len(self.stocks):]
+        valid = ~(np.isnan(x) | np.isnan(y))
+        return x, y, valid
+
+    def _add(self, returns):
+        """
+        Welford update of the rolling accumulators with one bar
+        """
+        x, y, valid = self._pairs(returns)
+
+        # Invalid pairs see their own mean, which leaves them unchanged
+        x = np.where(valid, x, self._mean_x)
+        y = np.where(valid, y, self._mean_y)
+        self._count += valid
+        count = np.maximum(self._count, 1)
+
+        dx = x - self._mean_x
+        dy = y - self._mean_y
+        self._mean_x += dx / count
+        self._mean_y += dy / count
+        self._m2_x += dx * (x - self._mean_x)
+        self._m2_y += dy * (y - self._mean_y)
+        self._co += dx * (y - self._mean_y)
+
+    def _remove(self, returns):
+        """
+        Inverse Welford update removing the bar leaving the rolling window
+        """
+        x, y, valid = self._pairs(returns)
+
+        x = np.where(valid, x, self._mean_x)
+        y = np.where(valid, y, self._mean_y)
+        self._count -= valid
+        count = np.maximum(self._count, 1)
+
+        old_mean_y = self._mean_y.copy()
+        dx = x - self._mean_x
+        dy = y - self._mean_y
+        self._mean_x -= dx / count
+        self._mean_y -= dy / count
+        self._m2_x -= (x - self._mean_x) * dx
+        self._m2_y -= (y - self._mean_y) * dy
+        self._co -= (x - self._mean_x) * (y - old_mean_y)
+
+        empty = self._count == 0
+        if empty.any():
+            for accumulator in (self._mean_x, self._mean_y, self._m2_x, self._m2_y, self._co):
+                accumulator[empty] = 0.0
+
+    def _add_ewma(self, returns):
+        """
+        Exponentially weighted update with one bar
+        """
+        x, y, valid = self._pairs(returns)
+        alpha = self.alpha
+
+        x = np.where(valid, x, self._ew_mean_x)
+        y = np.where(valid, y, self._ew_mean_y)
+        first = valid & (self._ew_count == 0)
+        self._ew_count += valid
+
+        dx = x - self._ew_mean_x
+        dy = y - self._ew_mean_y
+        self._ew_mean_x = np.where(first, x, self._ew_mean_x + alpha * dx)
+        self._ew_mean_y = np.where(first, y, self._ew_mean_y + alpha * dy)
+        self._ew_var_x = np.where(valid & ~first, (1 - alpha) * (self._ew_var_x + alpha * dx * dx), self._ew_var_x)
+        self._ew_var_y = np.where(valid & ~first, (1 - alpha) * (self._ew_var_y + alpha * dy * dy), self._ew_var_y)
+        self._ew_cov = np.where(valid & ~first, (1 - alpha) * (self._ew_cov + alpha * dx * dy), self._ew_cov)
+
+    def _moments(self, method, rows=slice(None), columns=slice(None)):
+        """
+        Get (count, var_x, var_y, cov) for pairs; the lock must be held
+        """
+        if method == "rolling":
+            count = self._count[rows, columns]
+            denominator = np.maximum(count - 1, 1)
+            return (count, self._m2_x[rows, columns] / denominator, self._m2_y[rows, columns] / denominator,
+                    self._co[rows, columns] / denominator)
+        if method == "ewma":
+            return (self._ew_count[rows, columns], self._ew_var_x[rows, columns], self._ew_var_y[rows, columns],
+                    self._ew_cov[rows, columns])
+        raise ValueError(f"Unknown method {method!r}; expected one of {METHODS}")
+
+    def _statistic(self, kind, method, rows=slice(None), columns=slice(None)):
+        """
+        Compute correlations, covariances or betas, NaN where a pair has
+        fewer than min_bars bars or a series did not move; the lock must be
+        held
+        """
+        count, var_x, var_y, cov = self._moments(method, rows, columns)
+        if kind == "covariance":
+            values = np.array(cov, dtype=np.float64)
+        elif kind == "beta":
+            with np.errstate(invalid='ignore', divide='ignore'):
+                values = np.where(var_y > 0, cov / var_y, np.nan)
+        elif kind == "correlation":
+            with np.errstate(invalid='ignore', divide='ignore'):
+                values = np.clip(cov / np.sqrt(var_x * var_y), -1.0, 1.0)
+            values = np.where((var_x > 0) & (var_y > 0), values, np.nan)
+        else:
+            raise ValueError(f"Unknown statistic {kind!r}")
+        return np.where(count >= self.min_bars, values, np.nan)
+
+    def matrix(self, kind="correlation", method="rolling"):
+        """
+        Get a statistic for every stock and factor
+
+        Args:
+            kind (str, optional): "correlation", "covariance" or "beta"
+                (stock on factor) of bar log returns
+            method (str, optional): "rolling" or "ewma"
+
+        Returns:
+            dict: stocks, factors, values (stocks x factors array, NaN where
+                not yet measurable) and the number of bars seen
+        """
+        with self._lock:
+            values = self._statistic(kind, method)
+            bars = self.bars
+
+        return {"stocks": list(self.stocks), "factors": list(self.factors), "values": values, "bars": bars}
+
+    def get(self, stock, factor, kind="correlation", method="rolling"):
+        """
+        Get a statistic for one stock and factor
+
+        Args:
+            stock (str): Stock symbol
+            factor (str): Forex pair or index symbol
+            kind (str, optional): "correlation", "covariance" or "beta"
+            method (str, optional): "rolling" or "ewma"
+
+        Returns:
+            float: Statistic, or None if either symbol is unknown or the pair
+                is not yet measurable
+        """
+        row = self._stock_slots.get(stock)
+        column = self._factor_slots.get(factor)
+        if row is None or column is None:
+            return None
+
+        with self._lock:
+            value = float(self._statistic(kind, method, row, column))
+        return None if math.isnan(value) else value
+
+    def correlations(self, stock, method="rolling"):
+        """
+        Get a stock's correlation with every factor
+
+        Args:
+            stock (str): Stock symbol
+            method (str, optional): "rolling" or "ewma"
+
+        Returns:
+            dict: Factor -> correlation, measurable factors only
+        """
+        row = self._stock_slots.get(stock)
+        if row is None:
+            return {}
+
+        with self._lock:
+            values = self._statistic("correlation", method, row)
+        return {factor: float(value) for factor, value in zip(self.factors, values) if not math.isnan(value)}
+
+    def _on_quotes(self, data):
+        # Streamed trades arrive one at a time, fetches as symbol -> quote
+        if 'symbol' in data and 'price' in data:
+            self.update(data['symbol'], data['price'], data.get('timestamp'))
+            return
+        for quote in data.values():
+            self.update(quote['symbol'], quote['price'], quote.get('timestamp'))
+
+    def _on_fx(self, data):
+        if 'pair' in data and 'rate' in data:
+            self.update(data['pair'], data['rate'], data.get('timestamp'))
+            return
+        for quote in data.values():
+            self.update(quote['pair'], quote['rate'], quote.get('timestamp'))
+
+    def _on_indices(self, data):
+        for quote in data.values():
+            self.update(quote['symbol'], quote['value'], quote.get('timestamp'))
+
+    def attach(self, source):
+        """
+        Subscribe to a RealTimeDataIntegration's stock, forex and index
+        streams
+
+        Args:
+            source (RealTimeDataIntegration): Stream source
+        """
+        if self._source is not None:
+            return
+
+        self._source = source
+        self._callbacks = {
+            'stock_quotes': self._on_quotes,
+            'forex_rates': self._on_fx,
+            'market_indices': self._on_indices
+        }
+        for data_type, callback in self._callbacks.items():
+            source.subscribe(data_type, callback)
+
+    def detach(self):
+        """
+        Unsubscribe from the source
+        """
+        if self._source is None:
+            return
+
+        for data_type, callback in self._callbacks.items():
+            self._source.unsubscribe(data_type, callback)
+        self._source = None
+        self._callbacks = {}
+
+    def stats(self):
+        """
+        Get engine counters
+
+        Returns:
+            dict: Series tracked, bars seen and in the window, the last bar
+                close time and dropped late ticks
+        """
+        with self._lock:
+            return {
+                "stocks": len(self.stocks),
+                "factors": len(self.factors),
+                "bars": self.bars,
+                "window_bars": self._filled,
+                "last_bar_ms": self.last_bar_ms,
+                "late_ticks": self.late_ticks
+            }
@@ -0,0 +1,609 @@
+"""
+Feature Store Module for Trump Tariff Analysis Website
+
+This module implements the incremental link between RealTimeDataIntegration's
+streams and StockPredictionModel. It subscribes to the stock quote, forex,
+tariff news and economic indicator streams and keeps one feature vector per
+stock in columnar arrays:
+
+- price, change_pct, volume: latest quote
+- volatility: annualized EWMA volatility of tick log returns, in percent
+- fx_exposure: revenue-weighted AUD move against its 1-day EWMA reference,
+  in percent; positive when the currency moves in the stock's favour
+- sentiment: tariff news sentiment in [-1, 1], market-wide blended with
+  articles naming the stock
+
+Every update stamps the touched stocks with the store's increasing version,
+so consumers pull only what changed since the version they last saw.
+Snapshots are written atomically and restored on start, so a restarted
+service resumes with warm features.
+"""
+
+import json
+import math
+import os
+import re
+import threading
+import time
+import logging
+from collections import deque
+
+try:
+    from .lazy_imports import lazy_import
+except ImportError:
+    from lazy_imports import lazy_import
+
+# Heavy dependencies load on first use, keeping module import cheap
+np = lazy_import('numpy')
+
+logger = logging.getLogger('real_time_data')
+
+# Feature column order of the value matrix
+FEATURE_NAMES = ["price", "change_pct", "volume", "volatility", "fx_exposure", "sentiment"]
+
+# Volatility: RiskMetrics decay per return, returns normalized by elapsed
+# seconds and annualized over the trading year; gaps longer than a trading
+# day count as one day so overnight moves are not overweighted
+VOLATILITY_DECAY = 0.94
+TRADING_SECONDS_PER_YEAR = 252 * 6.5 * 3600
+MIN_RETURN_SECONDS = 1.0
+MAX_RETURN_SECONDS = 6.5 * 3600
+MIN_VOLATILITY_RETURNS = 10
+
+# FX: pairs quoted as AUD/<currency> whose moves drive exposure, keyed by the
+# revenue share weighting them, and the reference EWMA time constant
+FX_PAIRS = {"us": "AUD/USD", "china": "AUD/CNY"}
+FX_REFERENCE_SECONDS = 24 * 3600
+
+# Sentiment: EWMA weight of each new article, and how much an article naming
+# a stock counts against the market-wide mood for that stock
+SENTIMENT_WEIGHT = 0.2
+SENTIMENT_SCORES = {"positive": 1.0, "negative": -1.0, "neutral": 0.0}
+SPECIFIC_SENTIMENT_SHARE = 0.5
+SEEN_NEWS_IDS = 10000
+
+# Slot capacity grows in steps of at least this many stocks
+MIN_CAPACITY = 64
+
+
+class FeatureStore:
+    """
+    Versioned per-stock feature vectors maintained from live streams
+    """
+
+    def __init__(self, snapshot_path=None, snapshot_interval=60):
+        """
+        Args:
+            snapshot_path (str, optional): File snapshots are written to and
+                restored from; no persistence if None
+            snapshot_interval (float, optional): Seconds between background
+                snapshots while attached
+        """
+        self.snapshot_path = snapshot_path
+        self.snapshot_interval = snapshot_interval
+
+        self.symbols = []
+        self.names = []
+        self._slots = {}
+        self._name_patterns = []
+        self._capacity = 0
+
+        # Per-slot state; NaN means not yet observed
+        self.values = np.zeros((0, len(FEATURE_NAMES)), dtype=np.float64)
+        self.versions = np.zeros(0, dtype=np.int64)
+        self.updated_ms = np.zeros(0, dtype=np.int64)
+        self.exposure = np.zeros((0, len(FX_PAIRS)), dtype=np.float64)
+        self._last_price = np.zeros(0, dtype=np.float64)
+        self._last_tick_ms = np.zeros(0, dtype=np.int64)
+        self._variance_rate = np.zeros(0, dtype=np.float64)
+        self._return_count = np.zeros(0, dtype=np.int64)
+        self._specific_sentiment = np.zeros(0, dtype=np.float64)
+
+        # Market-wide state
+        self.version = 0
+        self.market_sentiment = 0.0
+        self.fx_rates = {}
+        self.fx_reference = {}
+        self._fx_updated_ms = {}
+        self.macro = {}
+        self._seen_news = deque(maxlen=SEEN_NEWS_IDS)
+        self._seen_news_set = set()
+
+        self._lock = threading.RLock()
+        self._restored = False
+        self._source = None
+        self._callbacks = {}
+        self._snapshot_thread = None
+        self._stop_event = threading.Event()
+
+    def __len__(self):
+        return len(self.symbols)
+
+    def __contains__(self, symbol):
+        return symbol in self._slots
+
+    def _grow(self, count):
+        """
+        Grow per-slot arrays to hold count stocks; the lock must be held
+        """
+        if count <= self._capacity:
+            return
+
+        capacity = max(count, self._capacity * 2, MIN_CAPACITY)
+        used = len(self.symbols)
+
+        def grown(array, fill):
+            result = np.full((capacity,) + array.shape[1:], fill, dtype=array.dtype)
+            result[:used] = array[:used]
+            return result
+
+        self.values = grown(self.values, np.nan)
+        self.versions = grown(self.versions, 0)
+        self.updated_ms = grown(self.updated_ms, 0)
+        self.exposure = grown(self.exposure, 0.0)
+        self._last_price = grown(self._last_price, np.nan)
+        self._last_tick_ms = grown(self._last_tick_ms, 0)
+        self._variance_rate = grown(self._variance_rate, 0.0)
+        self._return_count = grown(self._return_count, 0)
+        self._specific_sentiment = grown(self._specific_sentiment, np.nan)
+        self._capacity = capacity
+
+    def _slot(self, symbol):
+        """
+        Get the slot of a stock, adding it if new; the lock must be held
+        """
+        slot = self._slots.get(symbol)
+        if slot is None:
+            slot = len(self.symbols)
+            self._grow(slot + 1)
+            self._slots[symbol] = slot
+            self.symbols.append(symbol)
+            self.names.append(symbol)
+            self._name_patterns.append(self._name_pattern(symbol, symbol))
+        return slot
+
+    @staticmethod
+    def _name_pattern(symbol, name):
+        """
+        Build the headline pattern matching a stock's name or ticker root
+        """
+        terms = {re.escape(symbol.split('.')[0])}
+        if name and name != symbol:
+            terms.add(re.escape(name))
+        return re.compile(r'\b(' + '|'.join(sorted(terms)) + r')\b', re.IGNORECASE)
+
+    def register_stocks(self, symbols, names=None, us_revenue_pct=None, china_revenue_pct=None):
+        """
+        Add stocks with the metadata the features are derived from
+
+        Args:
+            symbols (list): Stock symbols
+            names (list, optional): Company names, matched in news headlines
+            us_revenue_pct (array-like, optional): Share of revenue from the
+                US, in percent, weighting AUD/USD moves
+            china_revenue_pct (array-like, optional): Share of revenue from
+                China, in percent, weighting AUD/CNY moves
+        """
+        with self._lock:
+            slots = np.array([self._slot(symbol) for symbol in symbols], dtype=np.int64)
+
+            if names is not None:
+                for slot, symbol, name in zip(slots.tolist(), symbols, names):
+                    self.names[slot] = name
+                    self._name_patterns[slot] = self._name_pattern(symbol, name)
+
+            if us_revenue_pct is not None:
+                self.exposure[slots, 0] = np.asarray(us_revenue_pct, dtype=np.float64) / 100
+            if china_revenue_pct is not None:
+                self.exposure[slots, 1] = np.asarray(china_revenue_pct, dtype=np.float64) / 100
+
+            if len(slots):
+                self._update_fx_exposure(slots)
+
+    def _stamp(self, slots, timestamp_ms=None):
+        """
+        Mark slots as changed in a new version; the lock must be held
+        """
+        self.version += 1
+        self.versions[slots] = self.version
+        self.updated_ms[slots] = timestamp_ms if timestamp_ms is not None else int(time.time() * 1000)
+
+    def update_quote(self, symbol, price, volume=None, change_pct=None, timestamp_ms=None, cumulative_volume=False):
+        """
+        Apply one stock quote or trade
+
+        Args:
+            symbol (str): Stock symbol
+            price (float): Last price
+            volume (float, optional): Volume of the quote or trade
+            change_pct (float, optional): Daily change percentage
+            timestamp_ms (int, optional): Quote time in epoch milliseconds
+            cumulative_volume (bool, optional): Add volume to the running
+                total (trades) instead of replacing it (quotes)
+        """
+        timestamp_ms = int(timestamp_ms if timestamp_ms is not None else time.time() * 1000)
+
+        with self._lock:
+            slot = self._slot(symbol)
+            row = self.values[slot]
+
+            # EWMA of squared log returns per second
+            last_price = self._last_price[slot]
+            if last_price > 0 and price > 0:
+                seconds = (timestamp_ms - self._last_tick_ms[slot]) / 1000
+                seconds = min(max(seconds, MIN_RETURN_SECONDS), MAX_RETURN_SECONDS)
+                log_return = math.log(price / last_price)
+                rate = log_return * log_return / seconds
+                if self._return_count[slot] == 0:
+                    self._variance_rate[slot] = rate
+                else:
+                    self._variance_rate[slot] = VOLATILITY_DECAY * self._variance_rate[slot] + (1 - VOLATILITY_DECAY) * rate
+                self._return_count[slot] += 1
+                if self._return_count[slot] >= MIN_VOLATILITY_RETURNS:
+                    row[3] = math.sqrt(self._variance_rate[slot] * TRADING_SECONDS_PER_YEAR) * 100
+
+                # Trades carry no daily change; roll the last one forward
+                if change_pct is None and not math.isnan(row[1]):
+                    change_pct = ((1 + row[1] / 100) * price / last_price - 1) * 100
+
+            self._last_price[slot] = price
+            self._last_tick_ms[slot] = timestamp_ms
+
+            row[0] = price
+            if change_pct is not None:
+                row[1] = change_pct
+            if volume is not None:
+                row[2] = (0 if math.isnan(row[2]) else row[2]) + volume if cumulative_volume else volume
+
+            self._stamp(slot, timestamp_ms)
+
+    def update_fx_rate(self, pair, rate, timestamp_ms=None):
+        """
+        Apply one forex rate, updating the FX exposure of exposed stocks
+
+        Args:
+            pair (str): Currency pair, e.g. "AUD/USD"
+            rate (float): Rate
+            timestamp_ms (int, optional): Rate time in epoch milliseconds
+        """
+        timestamp_ms = int(timestamp_ms if timestamp_ms is not None else time.time() * 1000)
+
+        with self._lock:
+            reference = self.fx_reference.get(pair)
+            if reference is None:
+                self.fx_reference[pair] = rate
+            else:
+                seconds = max(0.0, (timestamp_ms - self._fx_updated_ms.get(pair, timestamp_ms)) / 1000)
+                alpha = 1 - math.exp(-seconds / FX_REFERENCE_SECONDS)
+                self.fx_reference[pair] = reference + alpha * (rate - reference)
+
+            self.fx_rates[pair] = rate
+            self._fx_updated_ms[pair] = timestamp_ms
+
+            if pair in FX_PAIRS.values() and self.symbols:
+                column = list(FX_PAIRS.values()).index(pair)
+                slots = np.flatnonzero(self.exposure[:len(self.symbols), column] > 0)
+                if len(slots):
+                    self._update_fx_exposure(slots)
+                    self._stamp(slots, timestamp_ms)
+
+    def _update_fx_exposure(self, slots):
+        """
+        Recompute fx_exposure for slots; the lock must be held
+        """
+        moves = np.zeros(len(FX_PAIRS))
+        for column, pair in enumerate(FX_PAIRS.values()):
+            rate, reference = self.fx_rates.get(pair), self.fx_reference.get(pair)
+            if rate is not None and reference:
+                # A weaker AUD raises the value of foreign revenue
+                moves[column] = -(rate / reference - 1) * 100
+
+        self.values[slots, 4] = self.exposure[slots] @ moves
+
+    def update_news(self, article):
+        """
+        Apply one tariff news article to market and stock sentiment
+
+        Args:
+            article (dict): Article with id, headline and sentiment
+
+        Returns:
+            bool: False if the article was already applied
+        """
+        score = SENTIMENT_SCORES.get(article.get('sentiment'), 0.0)
+        headline = article.get('headline', '')
+
+        with self._lock:
+            article_id = article.get('id')
+            if article_id is not None and not self._remember_news(article_id):
+                return False
+
+            self.market_sentiment += SENTIMENT_WEIGHT * (score - self.market_sentiment)
+
+            count = len(self.symbols)
+            named = [slot for slot in range(count) if self._name_patterns[slot].search(headline)]
+            if named:
+                specific = self._specific_sentiment[named]
+                self._specific_sentiment[named] = np.where(
+                    np.isnan(specific), score, specific + SENTIMENT_WEIGHT * (score - specific))
+
+            specific = self._specific_sentiment[:count]
+            self.values[:count, 5] = np.where(
+                np.isnan(specific),
+                self.market_sentiment,
+                (1 - SPECIFIC_SENTIMENT_SHARE) * self.market_sentiment + SPECIFIC_SENTIMENT_SHARE * specific
+            )
+
+            if count:
+                self._stamp(np.arange(count), article.get('timestamp'))
+            else:
+                self.version += 1
+            return True
+
+    def _remember_news(self, article_id):
+        """
+        Record an article id; the lock must be held
+
+        Returns:
+            bool: False if the id was already recorded
+        """
+        if article_id in self._seen_news_set:
+            return False
+        if len(self._seen_news) == self._seen_news.maxlen:
+            self._seen_news_set.discard(self._seen_news[0])
+        self._seen_news.append(article_id)
+        self._seen_news_set.add(article_id)
+        return True
+
+    def update_macro(self, indicators):
+        """
+        Store economic indicators as market-wide features
+
+        Args:
+            indicators (dict): Country -> indicator name -> dict with value,
+                previous and timestamp
+        """
+        with self._lock:
+            for country, values in indicators.items():
+                for name, data in values.items():
+                    value = float(data['value'])
+                    previous = data.get('previous')
+                    self.macro[f"{country}:{name}"] = {
+                        "value": value,
+                        "change": value - float(previous) if previous is not None else None,
+                        "timestamp": data.get('timestamp')
+                    }
+            self.version += 1
+
+    def _on_quotes(self, data):
+        # Streamed trades arrive one at a time, fetches as symbol -> quote
+        if 'symbol' in data and 'price' in data:
+            self.update_quote(data['symbol'], data['price'], data.get('volume'), data.get('change_pct'),
+                              data.get('timestamp'), cumulative_volume='change_pct' not in data)
+            return
+        for quote in data.values():
+            self.update_quote(quote['symbol'], quote['price'], quote.get('volume'), quote.get('change_pct'),
+                              quote.get('timestamp'))
+
+    def _on_fx(self, data):
+        if 'pair' in data and 'rate' in data:
+            self.update_fx_rate(data['pair'], data['rate'], data.get('timestamp'))
+            return
+        for quote in data.values():
+            self.update_fx_rate(quote['pair'], quote['rate'], quote.get('timestamp'))
+
+    def _on_news(self, data):
+        for article in (data if isinstance(data, list) else [data]):
+            self.update_news(article)
+
+    def attach(self, source):
+        """
+        Subscribe to a RealTimeDataIntegration's streams, restoring the last
+        snapshot on the first attach
+
+        Args:
+            source (RealTimeDataIntegration): Stream source
+        """
+        if self._source is not None:
+            return
+
+        # Only the first attach restores; later ones keep the live state
+        if not self._restored:
+            self._restored = True
+            self.restore()
+
+        self._source = source
+        self._callbacks = {
+            'stock_quotes': self._on_quotes,
+            'forex_rates': self._on_fx,
+            'tariff_news': self._on_news,
+            'economic_indicators': self.update_macro
+        }
+        for data_type, callback in self._callbacks.items():
+            source.subscribe(data_type, callback)
+
+        if self.snapshot_path is not None:
+            self._stop_event.clear()
+            self._snapshot_thread = threading.Thread(target=self._snapshot_loop, name='feature-snapshots', daemon=True)
+            self._snapshot_thread.start()
+
+    def detach(self):
+        """
+        Unsubscribe from the source and write a final snapshot
+        """
+        if self._source is None:
+            return
+
+        for data_type, callback in self._callbacks.items():
+            self._source.unsubscribe(data_type, callback)
+        self._source = None
+        self._callbacks = {}
+
+        if self._snapshot_thread is not None:
+            self._stop_event.set()
+            self._snapshot_thread.join()
+            self._snapshot_thread = None
+
+        self.snapshot()
+
+    def _snapshot_loop(self):
+        while not self._stop_event.wait(self.snapshot_interval):
+            try:
+                self.snapshot()
+            except Exception as e:
+                logger.error(f"Error writing feature snapshot: {e}")
+
+    def changed_since(self, version):
+        """
+        Get the stocks updated after a version
+
+        Args:
+            version (int): Version the caller last saw
+
+        Returns:
+            tuple: (symbols list, store version to pass next time)
+        """
+        with self._lock:
+            slots = np.flatnonzero(self.versions[:len(self.symbols)] > version)
+            return [self.symbols[slot] for slot in slots.tolist()], self.version
+
+    def features(self, symbols):
+        """
+        Get feature vectors of stocks
+
+        Args:
+            symbols (list): Stock symbols
+
+        Returns:
+            dict: Feature name -> float64 array in the order of symbols, NaN
+                where unknown, plus "version" -> int64 stamps
+        """
+        with self._lock:
+            slots = np.array([self._slots.get(symbol, -1) for symbol in symbols], dtype=np.int64)
+            known = slots >= 0
+            values = np.full((len(symbols), len(FEATURE_NAMES)), np.nan)
+            values[known] = self.values[slots[known]]
+            versions = np.zeros(len(symbols), dtype=np.int64)
+            versions[known] = self.versions[slots[known]]
+
+        result = {name: values[:, column] for column, name in enumerate(FEATURE_NAMES)}
+        result["version"] = versions
+        return result
+
+    def get(self, symbol):
+        """
+        Get one stock's features
+
+        Args:
+            symbol (str): Stock symbol
+
+        Returns:
+            dict: Feature values (None where unknown), version and
+                updated_ms, or None if the stock is unknown
+        """
+        with self._lock:
+            slot = self._slots.get(symbol)
+            if slot is None:
+                return None
+            result = {name: None if math.isnan(value) else float(value)
+                      for name, value in zip(FEATURE_NAMES, self.values[slot].tolist())}
+            result["version"] = int(self.versions[slot])
+            result["updated_ms"] = int(self.updated_ms[slot])
+            return result
+
+    def snapshot(self, path=None):
+        """
+        Write every feature and the streaming state behind them atomically
+
+        Args:
+            path (str, optional): Target file, snapshot_path if None
+        """
+        path = path or self.snapshot_path
+        if path is None:
+            return
+
+        with self._lock:
+            count = len(self.symbols)
+            arrays = {
+                "symbols": np.array(self.symbols, dtype=str),
+                "names": np.array(self.names, dtype=str),
+                "values": self.values[:count].copy(),
+                "versions": self.versions[:count].copy(),
+                "updated_ms": self.updated_ms[:count].copy(),
+                "exposure": self.exposure[:count].copy(),
+                "last_price": self._last_price[:count].copy(),
+                "last_tick_ms": self._last_tick_ms[:count].copy(),
+                "variance_rate": self._variance_rate[:count].copy(),
+                "return_count": self._return_count[:count].copy(),
+                "specific_sentiment": self._specific_sentiment[:count].copy()
+            }
+            state = {
+                "version": self.version,
+                "market_sentiment": self.market_sentiment,
+                "fx_rates": self.fx_rates,
+                "fx_reference": self.fx_reference,
+                "fx_updated_ms": self._fx_updated_ms,
+                "macro": self.macro,
+                "seen_news": list(self._seen_news)
+            }
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            np.savez(f, state=np.array(json.dumps(state)), **arrays)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+
+    def restore(self, path=None):
+        """
+        Load a snapshot, keeping stocks already registered
+
+        Args:
+            path (str, optional): Snapshot file, snapshot_path if None
+
+        Returns:
+            bool: True if a snapshot was loaded
+        """
+        path = path or self.snapshot_path
+        if path is None or not os.path.exists(path):
+            return False
+
+        try:
+            with np.load(path) as snapshot:
+                arrays = {name: snapshot[name] for name in snapshot.files}
+            state = json.loads(str(arrays.pop("state")))
+        except Exception as e:
+            logger.error(f"Error restoring feature snapshot {path}: {e}")
+            return False
+
+        with self._lock:
+            symbols = arrays["symbols"].tolist()
+            names = arrays["names"].tolist()
+            slots = np.array([self._slot(symbol) for symbol in symbols], dtype=np.int64)
+
+            for slot, symbol, name in zip(slots.tolist(), symbols, names):
+                self.names[slot] = name
+                self._name_patterns[slot] = self._name_pattern(symbol, name)
+
+            self.values[slots] = arrays["values"]
+            self.versions[slots] = arrays["versions"]
+            self.updated_ms[slots] = arrays["updated_ms"]
+            self.exposure[slots] = arrays["exposure"]
+            self._last_price[slots] = arrays["last_price"]
+            self._last_tick_ms[slots] = arrays["last_tick_ms"]
+            self._variance_rate[slots] = arrays["variance_rate"]
+            self._return_count[slots] = arrays["return_count"]
+            self._specific_sentiment[slots] = arrays["specific_sentiment"]
+
+            self.version = max(self.version, state["version"])
+            self.market_sentiment = state["market_sentiment"]
+            self.fx_rates.update(state["fx_rates"])
+            self.fx_reference.update(state["fx_reference"])
+            self._fx_updated_ms.update(state["fx_updated_ms"])
+            self.macro.update(state["macro"])
+            for article_id in state["seen_news"]:
+                self._remember_news(article_id)
+
+        logger.info(f"Restored features of {len(symbols)} stocks from {path} (version {self.version})")
+        return True
@@ -0,0 +1,705 @@
+"""
+History Retention Module for Trump Tariff Analysis Website
+
+This module implements tiered retention for the per-symbol historical tick
+files: raw ticks are kept for a configurable number of days, then rolled up
+into 1-minute bars, and later into daily bars. Compaction runs in a
+background worker under an I/O budget so it never competes with ingest.
+Tiers are stored either as CSV or in the compressed time-series format.
+"""
+
+import os
+import threading
+import logging
+from datetime import datetime
+
+try:
+    from .lazy_imports import lazy_import
+    from .timeseries_codec import TimeSeriesFile, KIND_TIMESTAMP, KIND_FLOAT, KIND_UINT
+except ImportError:
+    from lazy_imports import lazy_import
+    from timeseries_codec import TimeSeriesFile, KIND_TIMESTAMP, KIND_FLOAT, KIND_UINT
+
+# Heavy dependencies load on first use, keeping module import cheap
+np = lazy_import('numpy')
+pd = lazy_import('pandas')
+
+logger = logging.getLogger('real_time_data')
+
+# Resolution tiers from finest to coarsest, with their file suffixes and
+# pandas resample rules
+RESOLUTIONS = ['raw', '1min', '1d']
+TIER_SUFFIXES = {
+    'raw': 'historical',
+    '1min': 'historical_1min',
+    '1d': 'historical_1d'
+}
+RESAMPLE_RULES = {
+    '1min': '1min',
+    '1d': '1D'
+}
+
+# On-disk storage formats and their file extensions
+STORAGE_EXTENSIONS = {
+    'csv': 'csv',
+    'tsc': 'tsc'
+}
+
+# Local timezone used to derive the datetime column from tick timestamps,
+# matching datetime.fromtimestamp in the CSV writers
+LOCAL_TIMEZONE = datetime.now().astimezone().tzinfo
+
+
+class HistoryRetentionEngine:
+    """
+    Tiered retention, downsampling and compaction of historical tick files
+    """
+
+    def __init__(self, historical_dir, raw_retention_days=2, minute_retention_days=30,
+                 compaction_interval=3600, io_budget_bytes_per_sec=5 * 1024 * 1024,
+                 storage_format='csv', tick_block_size=256):
+        if storage_format not in STORAGE_EXTENSIONS:
+            raise ValueError(f"Invalid storage format: {storage_format}")
+
+        self.historical_dir = historical_dir
+        self.storage_format = storage_format
+        self.tick_block_size = tick_block_size
+        self.raw_retention_days = raw_retention_days
+        self.minute_retention_days = minute_retention_days
+        self.compaction_interval = compaction_interval
+        self.io_budget_bytes_per_sec = io_budget_bytes_per_sec
+
+        # Spans up to these limits are served from the given tier
+        self.span_limits = {
+            'raw': pd.Timedelta(days=1),
+            '1min': pd.Timedelta(days=14)
+        }
+
+        # Ticks waiting to fill a compressed block, keyed by file symbol
+        self._pending_ticks = {}
+
+        self._file_locks = {}
+        self._file_locks_guard = threading.Lock()
+        self._worker = None
+        self._stop_event = threading.Event()
+
+    def file_lock(self, file_path):
+        """
+        Get the lock guarding a historical file
+
+        Writers appending ticks must hold this lock so compaction never
+        rewrites a file underneath them.
+
+        Args:
+            file_path (str): Path of the historical file
+
+        Returns:
+            threading.Lock: Lock for the file
+        """
+        with self._file_locks_guard:
+            lock = self._file_locks.get(file_path)
+            if lock is None:
+                lock = threading.Lock()
+                self._file_locks[file_path] = lock
+            return lock
+
+    def tier_path(self, file_symbol, resolution):
+        """
+        Get the file path of a symbol's tier
+
+        Args:
+            file_symbol (str): Symbol as used in file names (e.g. "AUD_USD")
+            resolution (str): One of RESOLUTIONS
+
+        Returns:
+            str: File path
+        """
+        extension = STORAGE_EXTENSIONS[self.storage_format]
+        return os.path.join(self.historical_dir, f"{file_symbol}_{TIER_SUFFIXES[resolution]}.{extension}")
+
+    def append_tick(self, file_symbol, row):
+        """
+        Append a tick to a symbol's raw tier
+
+        In the compressed format ticks are buffered until a full block can be
+        written; call flush() to write partial blocks.
+
+        Args:
+            file_symbol (str): Symbol as used in file names
+            row (dict): Tick with symbol/pair, price/rate, volume, timestamp
+                and datetime fields
+        """
+        file_path = self.tier_path(file_symbol, 'raw')
+
+        with self.file_lock(file_path):
+            if self.storage_format == 'csv':
+                new_data = pd.DataFrame([row])
+                if os.path.isfile(file_path):
+                    # Append to existing file
+                    new_data.to_csv(file_path, mode='a', header=False, index=False)
+                else:
+                    # Create new file
+                    new_data.to_csv(file_path, index=False)
+                return
+
+            pending = self._pending_ticks.setdefault(file_symbol, [])
+            pending.append(row)
+
+            if len(pending) >= self.tick_block_size:
+                self._flush_pending(file_symbol)
+
+    def flush(self):
+        """
+        Write all buffered ticks to disk
+        """
+        for file_symbol in list(self._pending_ticks):
+            with self.file_lock(self.tier_path(file_symbol, 'raw')):
+                self._flush_pending(file_symbol)
+
+    def pending_tick_count(self):
+        """
+        Count ticks buffered for the compressed format
+
+        Returns:
+            int: Ticks not yet written to disk
+        """
+        return sum(len(pending) for pending in list(self._pending_ticks.values()))
+
+    def _flush_pending(self, file_symbol):
+        """
+        Write a symbol's buffered ticks; the raw tier lock must be held
+
+        Args:
+            file_symbol (str): Symbol as used in file names
+        """
+        pending = self._pending_ticks.pop(file_symbol, None)
+        if not pending:
+            return
+
+        df = pd.DataFrame(pending).drop(columns=['datetime'], errors='ignore')
+        self.write_tier(file_symbol, 'raw', df, append=True)
+
+    def read_tier(self, file_symbol, resolution):
+        """
+        Read a tier, including buffered ticks for the raw tier
+
+        Args:
+            file_symbol (str): Symbol as used in file names
+            resolution (str): One of RESOLUTIONS
+
+        Returns:
+            pandas.DataFrame: Tier rows with parsed datetime or None if missing
+        """
+        file_path = self.tier_path(file_symbol, resolution)
+
+        if self.storage_format == 'csv':
+            return read_csv_tier(file_path)
+
+        df = read_tsc_tier(file_path, resolution)
+
+        pending = self._pending_ticks.get(file_symbol) if resolution == 'raw' else None
+        if pending:
+            pending_df = pd.DataFrame(list(pending))
+            pending_df['datetime'] = timestamps_to_datetime(pending_df['timestamp'].to_numpy())
+            df = pending_df if df is None else pd.concat([df, pending_df], ignore_index=True)
+
+        return df
+
+    def write_tier(self, file_symbol, resolution, df, append):
+        """
+        Write rows to a tier; the tier lock must be held
+
+        Args:
+            file_symbol (str): Symbol as used in file names
+            resolution (str): One of RESOLUTIONS
+            df (pandas.DataFrame): Rows to write
+            append (bool): Append to an existing file instead of replacing it
+        """
+        file_path = self.tier_path(file_symbol, resolution)
+
+        if self.storage_format == 'csv':
+            write_csv_tier(file_path, df, append)
+        else:
+            write_tsc_tier(file_path, resolution, df, append)
+
+    def start(self):
+        """
+        Start the background compaction worker
+        """
+        if self._worker is not None and self._worker.is_alive():
+            return
+
+        self._stop_event.clear()
+        self._worker = threading.Thread(target=self._compaction_loop, daemon=True)
+        self._worker.start()
+
+    def stop(self):
+        """
+        Stop the background compaction worker
+        """
+        self._stop_event.set()
+
+    def _compaction_loop(self):
+        """
+        Continuous loop running compaction at the compaction interval
+        """
+        logger.info("History compaction worker started")
+
+        while not self._stop_event.is_set():
+            try:
+                self.compact_all()
+            except Exception as e:
+                logger.error(f"Error in history compaction: {e}")
+
+            self._stop_event.wait(self.compaction_interval)
+
+        logger.info("History compaction worker stopped")
+
+    def compact_all(self, now=None):
+        """
+        Compact every symbol found in the historical directory
+
+        Args:
+            now (pandas.Timestamp, optional): Reference time for retention cutoffs
+        """
+        if not os.path.isdir(self.historical_dir):
+            return
+
+        raw_suffix = f"_{TIER_SUFFIXES['raw']}.{STORAGE_EXTENSIONS[self.storage_format]}"
+
+        for file_name in sorted(os.listdir(self.historical_dir)):
+            if self._stop_event.is_set():
+                break
+
+            if not file_name.endswith(raw_suffix):
+                continue
+
+            file_symbol = file_name[:-len(raw_suffix)]
+            self.compact_symbol(file_symbol, now=now)
+
+    def compact_symbol(self, file_symbol, now=None):
+        """
+        Roll expired raw ticks into 1-minute bars and expired 1-minute bars
+        into daily bars for a single symbol
+
+        Args:
+            file_symbol (str): Symbol as used in file names
+            now (pandas.Timestamp, optional): Reference time for retention cutoffs
+        """
+        now = pd.Timestamp.now() if now is None else pd.Timestamp(now)
+
+        io_bytes = self._roll_up(file_symbol, 'raw', '1min', now - pd.Timedelta(days=self.raw_retention_days))
+        io_bytes += self._roll_up(file_symbol, '1min', '1d', now - pd.Timedelta(days=self.minute_retention_days))
+
+        self._throttle(io_bytes)
+
+    def _roll_up(self, file_symbol, source, target, cutoff):
+        """
+        Move rows older than cutoff from the source tier into the target tier
+
+        Only whole target buckets are rolled up, so a bar is never split
+        across tiers.
+
+        Args:
+            file_symbol (str): Symbol as used in file names
+            source (str): Source resolution
+            target (str): Target resolution
+            cutoff (pandas.Timestamp): Rows before this time are rolled up
+
+        Returns:
+            int: Number of bytes read and written
+        """
+        source_path = self.tier_path(file_symbol, source)
+        target_path = self.tier_path(file_symbol, target)
+
+        if not os.path.isfile(source_path) and not self._pending_ticks.get(file_symbol):
+            return 0
+
+        cutoff = cutoff.floor(RESAMPLE_RULES[target])
+
+        with self.file_lock(source_path):
+            if source == 'raw' and self.storage_format != 'csv':
+                self._flush_pending(file_symbol)
+
+            io_bytes = os.path.getsize(source_path)
+            df = self.read_tier(file_symbol, source)
+
+            if df is None or df.empty:
+                return io_bytes
+
+            expired = df[df['datetime'] < cutoff]
+            if expired.empty:
+                return io_bytes
+
+            bars = downsample(expired, RESAMPLE_RULES[target])
+
+            with self.file_lock(target_path):
+                self.write_tier(file_symbol, target, bars, append=True)
+                io_bytes += os.path.getsize(target_path)
+
+            # Rewrite the source tier with only the retained rows
+            retained = df[df['datetime'] >= cutoff]
+            self.write_tier(file_symbol, source, retained, append=False)
+            io_bytes += os.path.getsize(source_path)
+
+        logger.info(f"Rolled {len(expired)} {source} rows of {file_symbol} into {len(bars)} {target} bars")
+
+        return io_bytes
+
+    def _throttle(self, io_bytes):
+        """
+        Sleep long enough to keep compaction under the I/O budget
+
+        Args:
+            io_bytes (int): Bytes read and written by the last step
+        """
+        if not self.io_budget_bytes_per_sec:
+            return
+
+        self._stop_event.wait(io_bytes / self.io_budget_bytes_per_sec)
+
+    def pick_resolution(self, start_date=None, end_date=None, now=None):
+        """
+        Pick the finest resolution that covers the requested span
+
+        Without a start date the raw tier is picked, as undated queries
+        returned the raw ticks before tiering existed.
+
+        Args:
+            start_date (pandas.Timestamp, optional): Start of the span
+            end_date (pandas.Timestamp, optional): End of the span
+            now (pandas.Timestamp, optional): Reference time for retention cutoffs
+
+        Returns:
+            str: One of RESOLUTIONS
+        """
+        now = pd.Timestamp.now() if now is None else pd.Timestamp(now)
+
+        if start_date is None:
+            return 'raw'
+
+        end_date = now if end_date is None else end_date
+        span = end_date - start_date
+
+        # Coarsest tier required by the length of the span
+        if span <= self.span_limits['raw']:
+            by_span = 'raw'
+        elif span <= self.span_limits['1min']:
+            by_span = '1min'
+        else:
+            by_span = '1d'
+
+        # Coarsest tier required by the age of the oldest requested row
+        age = now - start_date
+        if age <= pd.Timedelta(days=self.raw_retention_days):
+            by_age = 'raw'
+        elif age <= pd.Timedelta(days=self.minute_retention_days):
+            by_age = '1min'
+        else:
+            by_age = '1d'
+
+        return max(by_span, by_age, key=RESOLUTIONS.index)
+
+    def load(self, file_symbol, resolution, start_date=None, end_date=None):
+        """
+        Load a symbol's history at a resolution, merging all finer tiers
+
+        Recent rows still live in finer tiers, so they are downsampled on the
+        fly and combined with the requested tier.
+
+        Args:
+            file_symbol (str): Symbol as used in file names
+            resolution (str): One of RESOLUTIONS
+            start_date (pandas.Timestamp, optional): Start of the span
+            end_date (pandas.Timestamp, optional): End of the span
+
+        Returns:
+            pandas.DataFrame: History or None if no tier has data
+        """
+        frames = []
+
+        for tier in RESOLUTIONS[:RESOLUTIONS.index(resolution) + 1]:
+            df = self.read_tier(file_symbol, tier)
+            if df is None or df.empty:
+                continue
+
+            if start_date is not None:
+                df = df[df['datetime'] >= start_date.floor(RESAMPLE_RULES.get(resolution, '1s'))]
+            if end_date is not None:
+                df = df[df['datetime'] <= end_date]
+
+            if tier != resolution and not df.empty:
+                df = downsample(df, RESAMPLE_RULES[resolution])
+
+            frames.append(df)
+
+        if not frames:
+            return None
+
+        df = pd.concat(frames, ignore_index=True)
+
+        if resolution != 'raw':
+            # Buckets split across tiers are merged back into one bar
+            df = merge_bars(df)
+
+        return df.sort_values('timestamp').reset_index(drop=True)
+
+
+def value_column(df):
+    """
+    Get the value column of a history frame
+
+    Args:
+        df (pandas.DataFrame): History frame
+
+    Returns:
+        str: "price" for stocks, "rate" for forex pairs
+    """
+    return 'rate' if 'rate' in df.columns else 'price'
+
+
+def key_column(df):
+    """
+    Get the identifier column of a history frame
+
+    Args:
+        df (pandas.DataFrame): History frame
+
+    Returns:
+        str: "pair" for forex pairs, "symbol" for stocks
+    """
+    return 'pair' if 'pair' in df.columns else 'symbol'
+
+
+def downsample(df, rule):
+    """
+    Aggregate ticks or bars into OHLC(V) bars
+
+    Args:
+        df (pandas.DataFrame): Raw ticks or bars
+        rule (str): pandas resample rule
+
+    Returns:
+        pandas.DataFrame: Bars keyed by bucket start
+    """
+    value = value_column(df)
+    key = key_column(df)
+
+    # Raw ticks only carry the value; bars carry full OHLC
+    if 'open' not in df.columns:
+        df = df.assign(open=df[value], high=df[value], low=df[value], close=df[value])
+
+    aggregations = {
+        'open': 'first',
+        'high': 'max',
+        'low': 'min',
+        'close': 'last',
+        'timestamp': 'first'
+    }
+    if 'volume' in df.columns:
+        aggregations['volume'] = 'sum'
+
+    bars = (
+        df.sort_values('timestamp')
+        .set_index('datetime')
+        .resample(rule)
+        .agg(aggregations)
+        .dropna(subset=['close'])
+        .reset_index()
+    )
+
+    bars.insert(0, key, df[key].iloc[0])
+    bars[value] = bars['close']
+    bars['timestamp'] = bars['timestamp'].astype('int64')
+
+    return bars
+
+
+def merge_bars(df):
+    """
+    Merge bars sharing a bucket start into a single bar
+
+    Bars are keyed by their bucket start in "datetime"; "timestamp" holds the
+    epoch milliseconds of the first tick in the bucket.
+
+    Args:
+        df (pandas.DataFrame): Bars, possibly with duplicate buckets
+
+    Returns:
+        pandas.DataFrame: Bars with unique buckets
+    """
+    if not df['datetime'].duplicated().any():
+        return df
+
+    value = value_column(df)
+    key = key_column(df)
+
+    aggregations = {
+        key: 'first',
+        'open': 'first',
+        'high': 'max',
+        'low': 'min',
+        'close': 'last',
+        'timestamp': 'first'
+    }
+    if 'volume' in df.columns:
+        aggregations['volume'] = 'sum'
+
+    merged = df.sort_values('timestamp', kind='stable').groupby('datetime', as_index=False).agg(aggregations)
+    merged[value] = merged['close']
+
+    return merged
+
+
+def timestamps_to_datetime(timestamps):
+    """
+    Convert epoch-millisecond timestamps to naive local datetimes
+
+    Args:
+        timestamps (numpy.ndarray): int64 epoch milliseconds
+
+    Returns:
+        pandas.DatetimeIndex: Local datetimes truncated to seconds
+    """
+    return (
+        pd.to_datetime(timestamps, unit='ms', utc=True)
+        .tz_convert(LOCAL_TIMEZONE)
+        .tz_localize(None)
+        .floor('s')
+    )
+
+
+def tier_schema(df, resolution):
+    """
+    Get the codec schema for a tier frame
+
+    Args:
+        df (pandas.DataFrame): Tier rows
+        resolution (str): One of RESOLUTIONS
+
+    Returns:
+        list: (column name, kind) pairs
+    """
+    if resolution == 'raw':
+        schema = [('timestamp', KIND_TIMESTAMP), (value_column(df), KIND_FLOAT)]
+    else:
+        # Bars keep their bucket start; raw ticks derive datetime from timestamp
+        schema = [
+            ('datetime', KIND_TIMESTAMP),
+            ('timestamp', KIND_TIMESTAMP),
+            ('open', KIND_FLOAT),
+            ('high', KIND_FLOAT),
+            ('low', KIND_FLOAT),
+            ('close', KIND_FLOAT)
+        ]
+
+    if 'volume' in df.columns:
+        schema.append(('volume', KIND_UINT))
+
+    return schema
+
+
+def read_csv_tier(file_path):
+    """
+    Read a CSV tier file
+
+    Args:
+        file_path (str): Path of the tier file
+
+    Returns:
+        pandas.DataFrame: Tier rows with parsed datetime or None if missing
+    """
+    if not os.path.isfile(file_path):
+        return None
+
+    df = pd.read_csv(file_path)
+    df['datetime'] = pd.to_datetime(df['datetime'])
+
+    return df
+
+
+def write_csv_tier(file_path, df, append):
+    """
+    Write rows to a CSV tier file
+
+    Args:
+        file_path (str): Path of the tier file
+        df (pandas.DataFrame): Rows to write
+        append (bool): Append to an existing file instead of replacing it
+    """
+    df = df.assign(datetime=df['datetime'].dt.strftime('%Y-%m-%d %H:%M:%S'))
+
+    if append and os.path.isfile(file_path):
+        df.to_csv(file_path, mode='a', header=False, index=False)
+    else:
+        # Replace atomically so readers never see a partial file
+        tmp_path = file_path + '.tmp'
+        df.to_csv(tmp_path, index=False)
+        os.replace(tmp_path, file_path)
+
+
+def read_tsc_tier(file_path, resolution):
+    """
+    Read a compressed tier file
+
+    Args:
+        file_path (str): Path of the tier file
+        resolution (str): One of RESOLUTIONS
+
+    Returns:
+        pandas.DataFrame: Tier rows with datetime or None if missing
+    """
+    if not os.path.isfile(file_path):
+        return None
+
+    columns, schema, metadata = TimeSeriesFile(file_path).read()
+
+    metadata = dict(metadata)
+    bar_value_column = metadata.pop('value_column', 'price')
+
+    df = pd.DataFrame(columns)
+    for key, value in metadata.items():
+        df.insert(0, key, value)
+
+    if resolution == 'raw':
+        df['datetime'] = timestamps_to_datetime(columns['timestamp'])
+    else:
+        df['datetime'] = pd.to_datetime(columns['datetime'], unit='ms')
+        df[bar_value_column] = df['close']
+
+    return df
+
+
+def write_tsc_tier(file_path, resolution, df, append):
+    """
+    Write rows to a compressed tier file
+
+    Args:
+        file_path (str): Path of the tier file
+        resolution (str): One of RESOLUTIONS
+        df (pandas.DataFrame): Rows to write
+        append (bool): Append to an existing file instead of replacing it
+    """
+    if df.empty and append:
+        return
+
+    key = key_column(df)
+    metadata = {key: str(df[key].iloc[0]) if not df.empty else ''}
+    if resolution != 'raw':
+        metadata['value_column'] = value_column(df)
+
+    schema = tier_schema(df, resolution)
+
+    columns = {}
+    for name, kind in schema:
+        if name == 'datetime':
+            # Naive bucket start stored as milliseconds since the epoch
+            columns[name] = df[name].to_numpy().astype('datetime64[ms]').astype(np.int64)
+        else:
+            columns[name] = df[name].to_numpy()
+
+    tsc_file = TimeSeriesFile(file_path)
+    if append:
+        tsc_file.append(columns, schema, metadata)
+    else:
+        tsc_file.write(columns, schema, metadata)
@@ -0,0 +1,97 @@
+"""
+Lazy Imports for Trump Tariff Analysis Website
+
+This module defers loading heavy dependencies (numpy, pandas, requests,
+websocket) and heavy internal modules until their first attribute is used,
+so importing the data service or the prediction model costs milliseconds and
+short-lived tools that never touch them never pay for them.
+"""
+
+import importlib
+import importlib.util
+import sys
+import threading
+import types
+
+_lock = threading.RLock()
+
+# One lock per lazily imported module, so a slow first load of one module
+# does not hold up the first use of another
+_load_locks = {}
+
+# Modules whose code is executing; guarded by their load locks
+_loading = set()
+
+
+class _LazyModule(types.ModuleType):
+    """
+    Module whose code has not run yet
+
+    importlib.util.LazyLoader swaps the module's class before executing it
+    and does so without a lock on Python 3.11, so a second thread touching
+    the module mid-load sees a half-initialized module. Here the first
+    attribute miss executes the module under a per-module lock, and the
+    class only becomes a plain module once execution has finished; threads
+    that arrive meanwhile wait for it.
+    """
+
+    def __getattr__(self, attr):
+        name = self.__spec__.name
+        with _load_locks[name]:
+            if type(self) is _LazyModule:
+                if name in _loading:
+                    # Re-entered from the module's own code, as with any
+                    # circular import of a partially initialized module
+                    raise AttributeError(
+                        f"partially initialized module {name!r} has no attribute {attr!r}")
+                _loading.add(name)
+                try:
+                    self.__spec__.loader.exec_module(self)
+                finally:
+                    _loading.discard(name)
+                self.__class__ = types.ModuleType
+        return getattr(self, attr)
+
+
+def lazy_import(name, package=None):
+    """
+    Import a module on first attribute access
+
+    The module is registered in sys.modules right away, so later imports of
+    the same name get the same object; its code runs the first time any
+    attribute is read, after which it behaves as a normal module. The first
+    load is safe to trigger from several threads at once.
+
+    Args:
+        name (str): Module name; relative names need package
+        package (str, optional): Package to resolve relative names against
+
+    Returns:
+        module: The module, possibly not yet executed
+    """
+    if name.startswith('.'):
+        name = importlib.util.resolve_name(name, package)
+
+    with _lock:
+        module = sys.modules.get(name)
+        if module is not None:
+            return module
+
+        spec = importlib.util.find_spec(name)
+        if spec is None:
+            raise ImportError(f"No module named {name!r}", name=name)
+        if not hasattr(spec.loader, 'exec_module'):
+            raise TypeError(f"loader of {name!r} cannot load lazily")
+
+        module = importlib.util.module_from_spec(spec)
+        _load_locks[name] = threading.RLock()
+        module.__class__ = _LazyModule
+        sys.modules[name] = module
+
+        # Submodules are bound on their parent by the import system; do the
+        # same for lazily imported ones so attribute access finds them
+        parent, _, child = name.rpartition('.')
+        if parent and parent in sys.modules:
+            setattr(sys.modules[parent], child, module)
+
+        return module
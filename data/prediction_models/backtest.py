@@ -0,0 +1,348 @@
+"""
+Prediction Backtesting for Trump Tariff Analysis Website
+
+This module replays the daily price history kept by RealTimeDataIntegration
+and scores the prediction model against it. Technical and volatility inputs
+are rebuilt point-in-time for every (date, stock) pair as (dates x stocks)
+arrays. All pairs are scored with the batch prediction engine at once, and
+hit rates are grouped by sector, confidence level, timeframe, direction and
+movement magnitude.
+
+History files are loaded on a process pool, sharded by symbol. The feature
+and factor matrices are cached against the files' sizes and modification
+times, so a re-run after a factor weight change only redoes the weighted
+scoring, and the scored result is cached against the same fingerprint plus
+the weights and confidence levels.
+"""
+
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    from ..lazy_imports import lazy_import
+    from ..history_retention import HistoryRetentionEngine, TIER_SUFFIXES, STORAGE_EXTENSIONS
+    from .prediction_engine import TIMEFRAMES, compute_factor_matrix, compute_predictions
+except ImportError:
+    from lazy_imports import lazy_import
+    from history_retention import HistoryRetentionEngine, TIER_SUFFIXES, STORAGE_EXTENSIONS
+    from prediction_engine import TIMEFRAMES, compute_factor_matrix, compute_predictions
+
+# Heavy dependencies load on first use, keeping module import cheap
+np = lazy_import('numpy')
+pd = lazy_import('pandas')
+
+# Historical files written by RealTimeDataIntegration
+DEFAULT_HISTORICAL_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'real_time', 'historical')
+
+# Trading days after the prediction date at which each timeframe is scored
+TIMEFRAME_HORIZON_DAYS = {"short_term": 5, "medium_term": 21, "long_term": 63}
+
+# Trading days of history needed before a date can be scored
+WARMUP_DAYS = 26
+
+# Absolute predicted movement buckets, (label, lower bound) in ascending order
+MOVEMENT_BUCKETS = [("small (0-10%)", 0), ("medium (10-20%)", 10), ("large (20%+)", 20)]
+
+# Static universe columns carried into every (date, stock) row
+STATIC_COLUMNS = ["sector", "risk_profile", "tariff_sensitivity", "us_revenue_pct", "china_revenue_pct"]
+
+
+def load_daily_closes(historical_dir, storage_format, symbols):
+    """
+    Load daily closing prices for a shard of symbols
+
+    Args:
+        historical_dir (str): Directory of historical tier files
+        storage_format (str): "csv" or "tsc"
+        symbols (list): Stock symbols
+
+    Returns:
+        dict: Symbol -> pandas.Series of closes indexed by day
+    """
+    retention = HistoryRetentionEngine(historical_dir, storage_format=storage_format)
+
+    closes = {}
+    for symbol in symbols:
+        df = retention.load(symbol, '1d')
+        if df is None or df.empty:
+            continue
+        series = df.set_index(df['datetime'].dt.normalize())['close'].astype(np.float64)
+        closes[symbol] = series[~series.index.duplicated(keep='last')]
+
+    return closes
+
+
+def compute_features(closes):
+    """
+    Rebuild point-in-time technical and volatility inputs from daily closes
+
+    Every value at date d only uses closes up to d.
+
+    Args:
+        closes (pandas.DataFrame): Daily closes, dates x stocks, forward-filled
+
+    Returns:
+        dict: Feature name -> (dates, stocks) float64 array
+    """
+    returns = closes.pct_change()
+
+    # RSI over 14 days from average gains and losses
+    change = closes.diff()
+    gains = change.clip(lower=0).rolling(14).mean()
+    losses = (-change.clip(upper=0)).rolling(14).mean()
+    rsi = 100 - 100 / (1 + gains / losses.replace(0, np.nan))
+    rsi = rsi.mask(losses == 0, 100.0)
+
+    # MACD line as a percentage of price, on the model's -2..2 scale
+    macd = (closes.ewm(span=12, adjust=False).mean() - closes.ewm(span=26, adjust=False).mean()) / closes * 100
+
+    # Position within 2-sigma Bollinger Bands, -1..1
+    mean20 = closes.rolling(20).mean()
+    std20 = closes.rolling(20).std()
+    bollinger = (closes - mean20) / (2 * std20.replace(0, np.nan))
+
+    volatility = returns.rolling(20).std() * np.sqrt(252) * 100
+
+    # Beta over 60 days against the equal-weighted universe
+    market = returns.mean(axis=1)
+    market_mean = market.rolling(60).mean()
+    covariance = returns.mul(market, axis=0).rolling(60).mean().sub(returns.rolling(60).mean().mul(market_mean, axis=0))
+    market_variance = market.rolling(60).var(ddof=0)
+    beta = covariance.div(market_variance.replace(0, np.nan), axis=0)
+
+    return {
+        "rsi": rsi.fillna(50).to_numpy(),
+        "macd": macd.clip(-2, 2).fillna(0).to_numpy(),
+        "bollinger_position": bollinger.clip(-1, 1).fillna(0).to_numpy(),
+        "annualized_volatility": volatility.fillna(25).to_numpy(),
+        "beta": beta.fillna(1).to_numpy(),
+        "price_change_pct": (returns * 100).fillna(0).to_numpy()
+    }
+
+
+class BacktestEngine:
+    """
+    Scores the prediction model against replayed price history
+    """
+
+    def __init__(self, historical_dir=DEFAULT_HISTORICAL_DIR, storage_format='csv', workers=None):
+        """
+        Args:
+            historical_dir (str, optional): Directory of historical tier files
+            storage_format (str, optional): "csv" or "tsc", as configured in
+                RealTimeDataIntegration
+            workers (int, optional): Worker processes for loading; one per CPU
+                if None, 1 to load in this process
+        """
+        self.historical_dir = historical_dir
+        self.storage_format = storage_format
+        self.workers = workers
+
+        # (fingerprint, cached matrices) of the last feature build, and
+        # (fingerprint, weights, confidence levels, result) of the last run
+        self._cache = None
+        self._scored = None
+        self._lock = threading.Lock()
+
+    def _fingerprint(self, symbols, static_key):
+        """
+        Identify the state of the history files and static inputs
+
+        Args:
+            symbols (list): Stock symbols
+            static_key (tuple): Hashable snapshot of static inputs
+
+        Returns:
+            tuple: Fingerprint, equal only if nothing relevant changed
+        """
+        extension = STORAGE_EXTENSIONS[self.storage_format]
+        files = []
+        for symbol in symbols:
+            for suffix in TIER_SUFFIXES.values():
+                try:
+                    stat = os.stat(os.path.join(self.historical_dir, f"{symbol}_{suffix}.{extension}"))
+                    files.append((symbol, suffix, stat.st_mtime_ns, stat.st_size))
+                except OSError:
+                    continue
+        return (tuple(files), static_key)
+
+    def _load_closes(self, symbols):
+        """
+        Load and align daily closes, sharding symbols across worker processes
+
+        Args:
+            symbols (list): Stock symbols
+
+        Returns:
+            pandas.DataFrame: Dates x symbols closes, forward-filled; None if
+                no history exists
+        """
+        workers = os.cpu_count() if self.workers is None else self.workers
+        shards = [list(shard) for shard in np.array_split(np.asarray(symbols, dtype=object), max(1, workers)) if len(shard)]
+
+        if len(shards) <= 1:
+            results = [load_daily_closes(self.historical_dir, self.storage_format, symbols)]
+        else:
+            with ProcessPoolExecutor(max_workers=len(shards)) as executor:
+                results = list(executor.map(
+                    load_daily_closes,
+                    [self.historical_dir] * len(shards),
+                    [self.storage_format] * len(shards),
+                    shards
+                ))
+
+        closes = {}
+        for result in results:
+            closes.update(result)
+        if not closes:
+            return None
+
+        return pd.DataFrame(closes).reindex(columns=symbols).sort_index().ffill()
+
+    def _build(self, universe, sector_mappings):
+        """
+        Build the weight-independent matrices for every scorable (date, stock)
+
+        Args:
+            universe (StockUniverseTable): Stock universe
+            sector_mappings (dict): Sector characteristics
+
+        Returns:
+            dict: Factor matrix and inputs of the scorable rows plus realized
+                returns per timeframe; None without enough history
+        """
+        symbols = list(universe["symbol"])
+        closes = self._load_closes(symbols)
+        if closes is None or len(closes) <= WARMUP_DAYS:
+            return None
+
+        features = compute_features(closes)
+        prices = closes.to_numpy()
+        date_count, stock_count = prices.shape
+
+        # Realized forward returns per timeframe, NaN where unknown
+        realized = {}
+        for timeframe in TIMEFRAMES:
+            horizon = TIMEFRAME_HORIZON_DAYS[timeframe]
+            forward = np.full_like(prices, np.nan)
+            if horizon < date_count:
+                forward[:-horizon] = (prices[horizon:] / prices[:-horizon] - 1) * 100
+            realized[timeframe] = forward
+
+        # Rows worth scoring: past the warm-up, priced, with at least the
+        # shortest horizon realized
+        scorable = np.isfinite(prices)
+        scorable[:WARMUP_DAYS] = False
+        scorable &= np.isfinite(realized[TIMEFRAMES[0]])
+        dates, stocks = np.nonzero(scorable)
+        if len(dates) == 0:
+            return None
+
+        rows = {name: universe[name][stocks] for name in STATIC_COLUMNS}
+        for name, values in features.items():
+            rows[name] = values[dates, stocks]
+
+        return {
+            # Random factor draws are replaced by their expected values so
+            # replays are deterministic
+            "factor_matrix": compute_factor_matrix(rows, sector_mappings, None),
+            "volatility": rows["annualized_volatility"],
+            "price": prices[dates, stocks],
+            "sector_codes": universe.columns["sector"][stocks],
+            "realized": np.vstack([realized[timeframe][dates, stocks] for timeframe in TIMEFRAMES]),
+            "first_date": closes.index[dates.min()],
+            "last_date": closes.index[dates.max()]
+        }
+
+    def run(self, universe, sector_mappings, factor_weights, confidence_levels):
+        """
+        Backtest the model over the available history
+
+        Args:
+            universe (StockUniverseTable): Stock universe
+            sector_mappings (dict): Sector characteristics
+            factor_weights (dict): Factor name -> weight
+            confidence_levels (dict): Level name -> (min, max) score bounds
+
+        Returns:
+            dict: Hit rates and sample counts, or None without enough history;
+                the result is shared by runs with the same inputs and must not
+                be modified
+        """
+        static_key = (
+            tuple(universe["symbol"]),
+            tuple((sector, tuple(sorted(mapping.items()))) for sector, mapping in sorted(sector_mappings.items()))
+        )
+        scoring_key = (tuple(sorted(factor_weights.items())), tuple(sorted(confidence_levels.items())))
+
+        with self._lock:
+            fingerprint = self._fingerprint(list(universe["symbol"]), static_key)
+            if self._scored is not None and self._scored[:2] == (fingerprint, scoring_key):
+                return self._scored[2]
+
+            if self._cache is None or self._cache[0] != fingerprint:
+                self._cache = (fingerprint, self._build(universe, sector_mappings))
+            built = self._cache[1]
+
+            if built is None:
+                result = None
+            else:
+                batch = compute_predictions(
+                    built["factor_matrix"],
+                    factor_weights,
+                    built["volatility"],
+                    built["price"],
+                    confidence_levels
+                )
+                result = score_predictions(batch, built, universe.categories["sector"])
+
+            self._scored = (fingerprint, scoring_key, result)
+            return result
+
+
+def score_predictions(batch, built, sectors):
+    """
+    Group hit rates of backtested predictions
+
+    A prediction hits when its direction matches the sign of the realized
+    return over its timeframe; rows without a realized or with a flat return
+    are skipped.
+
+    Args:
+        batch (dict): compute_predictions result over the scorable rows
+        built (dict): Cached matrices from BacktestEngine
+        sectors (list): Sector names, in sector code order
+
+    Returns:
+        dict: Hit rates and sample counts
+    """
+    realized = built["realized"]
+    valid = np.isfinite(realized) & (realized != 0)
+    hits = (batch["bullish"] == (realized > 0)) & valid
+
+    def rates(codes, labels):
+        codes = np.broadcast_to(codes, valid.shape)[valid]
+        totals = np.bincount(codes, minlength=len(labels))
+        correct = np.bincount(codes, weights=hits[valid], minlength=len(labels))
+        return {
+            label: round(float(correct[code] / totals[code]), 4)
+            for code, label in enumerate(labels) if totals[code]
+        }
+
+    timeframe_codes = np.arange(len(batch["timeframes"]))[:, None]
+    direction_codes = np.where(batch["bullish"], 0, 1)
+    magnitude_codes = np.searchsorted([bound for _, bound in MOVEMENT_BUCKETS[1:]], np.abs(batch["movement_pct"]), side="right")
+
+    total = int(valid.sum())
+
+    return {
+        "overall_accuracy": round(float(hits.sum() / total), 4) if total else None,
+        "by_confidence_level": rates(batch["confidence_level"], batch["confidence_level_names"]),
+        "by_sector": rates(built["sector_codes"][None, :], sectors),
+        "by_timeframe": rates(timeframe_codes, batch["timeframes"]),
+        "by_direction": rates(direction_codes, ["bullish", "bearish"]),
+        "by_movement_magnitude": rates(magnitude_codes, [label for label, _ in MOVEMENT_BUCKETS]),
+        "evaluated_predictions": total,
+        "date_range": [built["first_date"].strftime('%Y-%m-%d'), built["last_date"].strftime('%Y-%m-%d')]
+    }
@@ -0,0 +1,250 @@
+"""
+Portfolio Risk Aggregation for Trump Tariff Analysis Website
+
+This module aggregates StockPredictionModel's per-stock outputs over
+portfolios of holdings. Every stock's figures (movement and confidence per
+timeframe, tariff and revenue exposures, FX sensitivity, beta, volatility
+and sector membership) are kept as one row of a cached symbol matrix that is
+rebuilt only when the model's data version changes. A batch of portfolios
+becomes a (portfolios x stocks) position value matrix, and every aggregate
+comes from matrix products with it and its absolute value.
+"""
+
+try:
+    from ..lazy_imports import lazy_import
+    from .prediction_engine import FACTOR_NAMES
+except ImportError:
+    from lazy_imports import lazy_import
+    from prediction_engine import FACTOR_NAMES
+
+# Heavy dependencies load on first use, keeping module import cheap
+np = lazy_import('numpy')
+
+# Stock columns averaged by position value; optional streamed columns are
+# treated as 0 where unknown
+EXPOSURE_COLUMNS = {
+    "tariff_sensitivity": "tariff_sensitivity",
+    "us_revenue_exposure_pct": "us_revenue_pct",
+    "china_revenue_exposure_pct": "china_revenue_pct",
+    "beta": "beta",
+    "average_volatility": "annualized_volatility"
+}
+OPTIONAL_EXPOSURE_COLUMNS = {"fx_exposure_pct": "fx_exposure"}
+
+# Columns a short position does not reverse: how sure the model is and how
+# much a stock moves are the same whichever side of it is held, so these are
+# averaged by absolute position value
+UNSIGNED_COLUMNS = {"confidence_score", "average_volatility"}
+
+# Currency pair whose measured correlation is aggregated when the model has
+# a correlation engine
+FX_CORRELATION_PAIR = "AUD/USD"
+
+# Position value matrices are built for at most this many cells at a time
+MAX_BLOCK_CELLS = 4_000_000
+
+
+class PortfolioAnalyzer:
+    """
+    Batched exposure and risk aggregation over portfolios
+    """
+
+    def __init__(self, model):
+        """
+        Args:
+            model (StockPredictionModel): Model the per-stock figures come from
+        """
+        self.model = model
+        self._vectors = None
+        self._version = None
+
+    def _symbol_vectors(self):
+        """
+        Get the cached symbol matrix, rebuilding it if the model changed
+
+        Returns:
+            dict: matrix (stocks x columns), column layout, the unsigned
+                columns' indexes and sub-matrix, prices and sector membership
+                (stocks x sectors)
+        """
+        model = self.model
+
+        # Refreshing the factor matrix first applies pending streamed
+        # updates, so the version read afterwards covers them
+        factor_matrix = model._get_factor_matrix()
+        version = (model.model_version, model.data_version, len(model.stocks))
+        if self._vectors is not None and self._version == version:
+            return self._vectors
+
+        batch = model.get_batch_predictions()
+        stocks = model.stocks
+        timeframes = batch["timeframes"]
+        columns = []
+        blocks = []
+
+        for index, timeframe in enumerate(timeframes):
+            columns.append(("movement_pct", timeframe))
+            blocks.append(batch["movement_pct"][index])
+        for index, timeframe in enumerate(timeframes):
+            columns.append(("confidence_score", timeframe))
+            blocks.append(batch["confidence_score"][index])
+
+        for name, column in EXPOSURE_COLUMNS.items():
+            columns.append((name, None))
+            blocks.append(stocks[column])
+        for name, column in OPTIONAL_EXPOSURE_COLUMNS.items():
+            if column in stocks.columns:
+                columns.append((name, None))
+                blocks.append(np.nan_to_num(stocks[column]))
+
+        columns.append(("currency_impact_score", None))
+        blocks.append(factor_matrix[:, FACTOR_NAMES.index("currency_impact")])
+
+        engine = model.correlations
+        if engine is not None and FX_CORRELATION_PAIR in engine.factors:
+            measured = engine.matrix()
+            slots = {symbol: slot for slot, symbol in enumerate(measured["stocks"])}
+            values = measured["values"][:, measured["factors"].index(FX_CORRELATION_PAIR)]
+            correlation = np.array([values[slots[symbol]] if symbol in slots else np.nan for symbol in stocks["symbol"]])
+            columns.append(("aud_usd_correlation", None))
+            blocks.append(np.nan_to_num(correlation))
+
+        sectors = list(stocks.categories["sector"])
+        membership = np.zeros((len(stocks), len(sectors)))
+        membership[np.arange(len(stocks)), stocks.columns["sector"]] = 1.0
+
+        matrix = np.column_stack(blocks).astype(np.float64)
+        unsigned = np.array([index for index, (name, _) in enumerate(columns) if name in UNSIGNED_COLUMNS],
+                            dtype=np.int64)
+
+        self._vectors = {
+            "matrix": matrix,
+            "columns": columns,
+            "unsigned": unsigned,
+            "unsigned_matrix": matrix[:, unsigned],
+            "timeframes": timeframes,
+            "prices": stocks["current_price"].astype(np.float64),
+            "sector_membership": membership,
+            "sectors": sectors
+        }
+        self._version = version
+        return self._vectors
+
+    def analyze(self, portfolios):
+        """
+        Aggregate exposures and expected moves of portfolios
+
+        Position values are quantity times current price; short positions
+        (negative quantities) offset long ones. Averages are weighted by
+        position value over gross value, except confidence and volatility,
+        which are weighted by absolute value as sector weights are.
+
+        Args:
+            portfolios (dict): Portfolio name -> {symbol: quantity}
+
+        Returns:
+            dict: Portfolio name -> aggregates: market_value, gross_value,
+                positions, unknown_symbols, expected_move_pct and
+                expected_pnl per timeframe, confidence_score per timeframe,
+                exposure averages, fx_sensitivity, sector_weights,
+                sector_concentration (Herfindahl index) and largest_sector
+        """
+        vectors = self._symbol_vectors()
+        names = list(portfolios)
+        results = {}
+
+        block_size = max(1, MAX_BLOCK_CELLS // max(1, len(vectors["prices"])))
+        for start in range(0, len(names), block_size):
+            results.update(self._analyze_block(vectors, names[start:start + block_size], portfolios))
+
+        return results
+
+    def _analyze_block(self, vectors, names, portfolios):
+        """
+        Aggregate one block of portfolios with matrix products
+        """
+        lookup = self.model.stocks.lookup
+        portfolio_index = []
+        rows = []
+        quantities = []
+        unknown = {}
+
+        for index, name in enumerate(names):
+            for symbol, quantity in portfolios[name].items():
+                row = lookup(symbol)
+                if row is None:
+                    unknown.setdefault(name, []).append(symbol)
+                    continue
+                portfolio_index.append(index)
+                rows.append(row)
+                quantities.append(quantity)
+
+        portfolio_index = np.array(portfolio_index, dtype=np.int64)
+        rows = np.array(rows, dtype=np.int64)
+        position_values = np.array(quantities, dtype=np.float64) * vectors["prices"][rows]
+
+        values = np.zeros((len(names), len(vectors["prices"])))
+        np.add.at(values, (portfolio_index, rows), position_values)
+
+        # Signed value-weighted sums of every symbol column, absolute
+        # value-weighted sums of the unsigned ones, and absolute value per
+        # sector
+        sums = values @ vectors["matrix"]
+        absolute = np.abs(values)
+        unsigned_sums = absolute @ vectors["unsigned_matrix"]
+        sector_values = absolute @ vectors["sector_membership"]
+
+        net = values.sum(axis=1)
+        gross = absolute.sum(axis=1)
+        positions = np.bincount(portfolio_index, minlength=len(names))
+        safe_gross = np.where(gross > 0, gross, 1.0)
+        averages = sums / safe_gross[:, None]
+        averages[:, vectors["unsigned"]] = unsigned_sums / safe_gross[:, None]
+        sector_weights = sector_values / safe_gross[:, None]
+
+        column_index = {column: index for index, column in enumerate(vectors["columns"])}
+        timeframes = vectors["timeframes"]
+        results = {}
+
+        for index, name in enumerate(names):
+            average = averages[index]
+            weights = sector_weights[index]
+            held = np.flatnonzero(weights > 0)
+
+            result = {
+                "market_value": round(float(net[index]), 2),
+                "gross_value": round(float(gross[index]), 2),
+                "positions": int(positions[index]),
+                "unknown_symbols": unknown.get(name, []),
+                "expected_move_pct": {
+                    timeframe: round(float(average[column_index[("movement_pct", timeframe)]]), 2)
+                    for timeframe in timeframes
+                },
+                "expected_pnl": {
+                    timeframe: round(float(sums[index, column_index[("movement_pct", timeframe)]]) / 100, 2)
+                    for timeframe in timeframes
+                },
+                "confidence_score": {
+                    timeframe: round(float(average[column_index[("confidence_score", timeframe)]]), 1)
+                    for timeframe in timeframes
+                }
+            }
+            for exposure in EXPOSURE_COLUMNS:
+                result[exposure] = round(float(average[column_index[(exposure, None)]]), 2)
+
+            fx_sensitivity = {"currency_impact_score": round(float(average[column_index[("currency_impact_score", None)]]), 1)}
+            for key in ("fx_exposure_pct", "aud_usd_correlation"):
+                if (key, None) in column_index:
+                    fx_sensitivity[key] = round(float(average[column_index[(key, None)]]), 3)
+            result["fx_sensitivity"] = fx_sensitivity
+
+            result["sector_weights"] = {
+                vectors["sectors"][code]: round(float(weights[code]), 4)
+                for code in held[np.argsort(-weights[held], kind="stable")].tolist()
+            }
+            result["sector_concentration"] = round(float(np.sum(weights ** 2)), 4)
+            result["largest_sector"] = vectors["sectors"][int(np.argmax(weights))] if len(held) else None
+
+            results[name] = result
+
+        return results
@@ -0,0 +1,176 @@
+"""
+Prediction Cache for Trump Tariff Analysis Website
+
+This module implements the bounded cache behind StockPredictionModel's
+predictions. Entries are evicted least-recently-used once the size bound is
+reached, expire on a monotonic-clock TTL, and carry the set of inputs they
+were computed from so that changing an input (a price, a stock's indicators,
+a sector's momentum, the factor weights, measured correlations, the quoted
+historical accuracy) invalidates exactly the entries that used it.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+# Dependency kinds; a dependency is a (kind, key) tuple, key None for
+# model-wide inputs
+DEPENDENCY_PRICE = "price"
+DEPENDENCY_INDICATORS = "indicators"
+DEPENDENCY_SECTOR_MOMENTUM = "sector_momentum"
+DEPENDENCY_FACTOR_WEIGHTS = "factor_weights"
+DEPENDENCY_CORRELATIONS = "correlations"
+DEPENDENCY_ACCURACY = "accuracy"
+
+
+class PredictionCache:
+    """
+    Size-bounded LRU cache with TTL expiry and dependency invalidation
+    """
+
+    def __init__(self, max_entries=4096, ttl_seconds=3600, clock=time.monotonic):
+        """
+        Args:
+            max_entries (int, optional): Maximum number of entries
+            ttl_seconds (float, optional): Entry lifetime in seconds
+            clock (callable, optional): Monotonic time source
+        """
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.clock = clock
+
+        # key -> (value, expires_at, dependencies), in LRU order
+        self._entries = OrderedDict()
+        # dependency -> keys of entries computed from it
+        self._dependents = {}
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry is not None and entry[1] > self.clock()
+
+    def get(self, key, default=None):
+        """
+        Get a live entry, marking it most recently used
+
+        Args:
+            key: Cache key
+            default (optional): Value returned on a miss
+
+        Returns:
+            Cached value, or default if missing or expired
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+
+            if entry is None:
+                self.misses += 1
+                return default
+
+            if entry[1] <= self.clock():
+                self._remove(key)
+                self.expirations += 1
+                self.misses += 1
+                return default
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def set(self, key, value, dependencies=()):
+        """
+        Store an entry, evicting the least recently used ones over the bound
+
+        Args:
+            key: Cache key
+            value: Value to cache
+            dependencies (iterable, optional): (kind, key) inputs the value
+                was computed from
+        """
+        dependencies = frozenset(dependencies)
+
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+
+            self._entries[key] = (value, self.clock() + self.ttl_seconds, dependencies)
+            for dependency in dependencies:
+                self._dependents.setdefault(dependency, set()).add(key)
+
+            while len(self._entries) > self.max_entries:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+
+    def invalidate(self, kind, key=None):
+        """
+        Drop every entry computed from an input
+
+        Args:
+            kind (str): Dependency kind
+            key (optional): Dependency key, None for model-wide inputs
+
+        Returns:
+            int: Number of entries dropped
+        """
+        with self._lock:
+            keys = self._dependents.pop((kind, key), ())
+            for cache_key in list(keys):
+                self._remove(cache_key)
+
+            self.invalidations += len(keys)
+            return len(keys)
+
+    def clear(self):
+        """
+        Drop every entry; counters are kept
+        """
+        with self._lock:
+            self._entries.clear()
+            self._dependents.clear()
+
+    def _remove(self, key):
+        """
+        Remove an entry and its dependency links; the lock must be held
+
+        Args:
+            key: Cache key
+        """
+        _, _, dependencies = self._entries.pop(key)
+        for dependency in dependencies:
+            keys = self._dependents.get(dependency)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._dependents[dependency]
+
+    def stats(self):
+        """
+        Get cache counters
+
+        Returns:
+            dict: Size, bound and hit/miss/eviction/expiration/invalidation counts
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations
+            }
@@ -0,0 +1,319 @@
+"""
+Batch Prediction Engine for Trump Tariff Analysis Website
+
+This module implements the vectorized form of StockPredictionModel's
+scoring: a (symbols x factors) score matrix is drawn for the whole universe
+at once, and weighted scores, direction, confidence, movement and price
+targets for every symbol and timeframe come from a handful of NumPy array
+operations.
+"""
+
+try:
+    from ..lazy_imports import lazy_import
+except ImportError:
+    from lazy_imports import lazy_import
+
+# Heavy dependencies load on first use, keeping module import cheap
+np = lazy_import('numpy')
+
+# Factor column order of the score matrix
+FACTOR_NAMES = [
+    "tariff_sensitivity",
+    "technical_indicators",
+    "market_sentiment",
+    "sector_momentum",
+    "currency_impact",
+    "historical_patterns"
+]
+
+TIMEFRAMES = ["short_term", "medium_term", "long_term"]
+
+# Inputs each factor score is computed from: universe columns, plus
+# "sector_momentum" for the sector mappings' current momentum
+FACTOR_INPUTS = {
+    "tariff_sensitivity": {"tariff_sensitivity"},
+    "technical_indicators": {"rsi", "macd", "bollinger_position"},
+    "market_sentiment": {"sector", "sector_momentum", "sentiment", "price_change_pct"},
+    "sector_momentum": {"sector", "sector_momentum"},
+    "currency_impact": {"us_revenue_pct", "china_revenue_pct", "fx_exposure"},
+    "historical_patterns": {"risk_profile", "beta"}
+}
+
+# Confidence scaling and movement multipliers per timeframe
+TIMEFRAME_CONFIDENCE = {"short_term": 0.9, "medium_term": 1.0, "long_term": 0.85}
+TIMEFRAME_MOVEMENT = {"short_term": 0.5, "medium_term": 1.0, "long_term": 2.5}
+
+# Sentiment draw ranges per sector (inclusive), keyed by sector momentum
+# where the sector's range depends on it
+SENTIMENT_RANGES = {
+    "Materials": {"positive": (60, 85), None: (30, 59)},
+    "Consumer Staples": {None: (45, 65)},
+    "Healthcare": {None: (50, 75)},
+    "Financials": {None: (40, 60)},
+    "Information Technology": {None: (30, 70)},
+    "Industrials": {None: (40, 60)},
+    "Utilities": {None: (45, 55)},
+    "Energy": {"positive": (50, 80), None: (30, 60)}
+}
+
+# Sector momentum score draw ranges (inclusive)
+MOMENTUM_RANGES = {
+    "positive": (65, 90),
+    "neutral": (40, 65),
+    "negative": (10, 40)
+}
+
+# Score points per unit of streamed news sentiment ([-1, 1]) and per percent
+# of revenue-weighted FX move, replacing the draws where they are known
+SENTIMENT_SCORE_SCALE = 30
+FX_EXPOSURE_SCORE_SCALE = 25
+
+# Betas beyond these bounds shift the historical patterns score
+HIGH_BETA = 1.5
+LOW_BETA = 0.8
+
+# Sentiment points added for a daily move beyond the threshold (percent)
+PRICE_CHANGE_THRESHOLD = 3
+PRICE_CHANGE_SENTIMENT = 10
+
+
+def _draw(rng, low, high):
+    """
+    Draw one integer per row from inclusive per-row ranges
+
+    Args:
+        rng (numpy.random.Generator): Random generator, or None for the
+            midpoint of each range
+        low (numpy.ndarray): Inclusive lower bounds
+        high (numpy.ndarray): Inclusive upper bounds
+
+    Returns:
+        numpy.ndarray: Draws (int64), or float midpoints when rng is None
+    """
+    if rng is None:
+        return (np.asarray(low) + np.asarray(high)) / 2
+    return rng.integers(low, np.asarray(high) + 1)
+
+
+def sentiment_bounds(sectors, sector_mappings):
+    """
+    Get per-row sentiment draw bounds
+
+    Args:
+        sectors (numpy.ndarray): Sector name per row
+        sector_mappings (dict): Sector characteristics
+
+    Returns:
+        tuple: (low, high) int64 arrays; rows of unknown sectors get (50, 50)
+    """
+    low = np.full(len(sectors), 50, dtype=np.int64)
+    high = np.full(len(sectors), 50, dtype=np.int64)
+
+    for sector, ranges in SENTIMENT_RANGES.items():
+        momentum = sector_mappings.get(sector, {}).get("current_momentum")
+        sector_low, sector_high = ranges.get(momentum, ranges[None])
+        mask = sectors == sector
+        low[mask] = sector_low
+        high[mask] = sector_high
+
+    return low, high
+
+
+def price_change_adjustment(price_change_pct):
+    """
+    Get the sentiment points a daily price move adds
+
+    Adjusted sentiment stays within [10, 95], so clipping never binds and a
+    stock's score can be moved between adjustments by their difference alone.
+
+    Args:
+        price_change_pct (numpy.ndarray): Daily change percentage per row
+
+    Returns:
+        numpy.ndarray: +PRICE_CHANGE_SENTIMENT, -PRICE_CHANGE_SENTIMENT or 0
+    """
+    return np.where(price_change_pct > PRICE_CHANGE_THRESHOLD, PRICE_CHANGE_SENTIMENT,
+                    np.where(price_change_pct < -PRICE_CHANGE_THRESHOLD, -PRICE_CHANGE_SENTIMENT, 0))
+
+
+def beta_regime(beta):
+    """
+    Classify betas for the historical patterns score
+
+    Args:
+        beta (numpy.ndarray): Beta per row
+
+    Returns:
+        numpy.ndarray: 1 above HIGH_BETA, -1 below LOW_BETA, 0 otherwise
+    """
+    return np.where(beta > HIGH_BETA, 1, np.where(beta < LOW_BETA, -1, 0))
+
+
+def _live_column(universe, name):
+    """
+    Get an optional streamed feature column, None if the universe has none
+    """
+    try:
+        return universe[name]
+    except KeyError:
+        return None
+
+
+def compute_factor_matrix(universe, sector_mappings, rng):
+    """
+    Compute factor scores for every symbol
+
+    Only one random draw is made per symbol and factor, rather than drawing
+    for every sector and discarding all but one.
+
+    Args:
+        universe (dict): Column arrays with sector, risk_profile,
+            tariff_sensitivity, us_revenue_pct, china_revenue_pct, rsi, macd,
+            bollinger_position, beta and price_change_pct, and optionally the
+            streamed sentiment and fx_exposure features (NaN where unknown)
+        sector_mappings (dict): Sector characteristics
+        rng (numpy.random.Generator): Random generator, or None to use the
+            midpoint of every draw range (deterministic, for backtests)
+
+    Returns:
+        numpy.ndarray: float64 matrix of shape (symbols, len(FACTOR_NAMES))
+    """
+    count = len(universe["sector"])
+    scores = np.empty((count, len(FACTOR_NAMES)), dtype=np.float64)
+
+    # Tariff sensitivity
+    scores[:, 0] = universe["tariff_sensitivity"]
+
+    # Technical indicators
+    rsi = universe["rsi"]
+    macd = universe["macd"]
+    technical = (
+        (70 - np.abs(rsi - 50)) / 20 * 30 +
+        np.where(macd > 0, macd * 15, macd * 10) +
+        universe["bollinger_position"] * 20
+    )
+    scores[:, 1] = np.round(np.clip(technical + 50, 0, 100))
+
+    # Market sentiment
+    low, high = sentiment_bounds(universe["sector"], sector_mappings)
+    sentiment = _draw(rng, low, high)
+    live_sentiment = _live_column(universe, "sentiment")
+    if live_sentiment is not None:
+        sentiment = np.where(np.isnan(live_sentiment), sentiment, 50 + live_sentiment * SENTIMENT_SCORE_SCALE)
+    sentiment = sentiment + price_change_adjustment(universe["price_change_pct"])
+    scores[:, 2] = np.clip(sentiment, 0, 100)
+
+    # Sector momentum
+    momentum = sector_momentum_labels(universe["sector"], sector_mappings)
+    momentum_low = np.full(count, 50, dtype=np.int64)
+    momentum_high = np.full(count, 50, dtype=np.int64)
+    for label, (label_low, label_high) in MOMENTUM_RANGES.items():
+        mask = momentum == label
+        momentum_low[mask] = label_low
+        momentum_high[mask] = label_high
+    scores[:, 3] = _draw(rng, momentum_low, momentum_high)
+
+    # Currency impact
+    us_revenue = universe["us_revenue_pct"]
+    china_revenue = universe["china_revenue_pct"]
+    currency = 50 + np.where(
+        us_revenue > 20,
+        _draw(rng, np.full(count, 10), np.full(count, 25)),
+        np.where(china_revenue > 40, _draw(rng, np.full(count, 5), np.full(count, 15)), 0)
+    )
+    live_exposure = _live_column(universe, "fx_exposure")
+    if live_exposure is not None:
+        currency = np.where(np.isnan(live_exposure), currency, 50 + live_exposure * FX_EXPOSURE_SCORE_SCALE)
+    scores[:, 4] = np.clip(currency, 0, 100)
+
+    # Historical patterns
+    high_risk = np.isin(universe["risk_profile"], ["high", "very_high"])
+    regime = beta_regime(universe["beta"])
+    historical = (
+        50 +
+        np.where(high_risk, _draw(rng, np.full(count, 5), np.full(count, 15)), 0) +
+        np.where(regime > 0, _draw(rng, np.full(count, 5), np.full(count, 15)),
+                 np.where(regime < 0, -_draw(rng, np.full(count, 5), np.full(count, 15)), 0))
+    )
+    scores[:, 5] = np.clip(historical, 0, 100)
+
+    return scores
+
+
+def sector_momentum_labels(sectors, sector_mappings):
+    """
+    Get the sector momentum label of every row
+
+    Args:
+        sectors (numpy.ndarray): Sector name per row
+        sector_mappings (dict): Sector characteristics
+
+    Returns:
+        numpy.ndarray: Momentum label per row ("neutral" if unknown)
+    """
+    labels = np.full(len(sectors), "neutral", dtype=object)
+    for sector, mapping in sector_mappings.items():
+        labels[sectors == sector] = mapping.get("current_momentum", "neutral")
+    return labels
+
+
+def compute_predictions(factor_matrix, weights, volatility, current_price, confidence_levels, timeframes=None):
+    """
+    Derive predictions for every symbol and timeframe
+
+    Args:
+        factor_matrix (numpy.ndarray): Scores from compute_factor_matrix
+        weights (dict): Factor name -> weight
+        volatility (numpy.ndarray): Annualized volatility per row
+        current_price (numpy.ndarray): Current price per row
+        confidence_levels (dict): Level name -> (min, max) score bounds
+        timeframes (list, optional): Timeframes to compute, all if None
+
+    Returns:
+        dict: Arrays of shape (timeframes, symbols) keyed by output name,
+            plus "timeframes", "weighted_score" (symbols,) and
+            "confidence_level_names"
+    """
+    timeframes = TIMEFRAMES if timeframes is None else list(timeframes)
+
+    # Accumulated column by column rather than with a matrix product, whose
+    # BLAS kernel (and so its last bits) depends on the number of rows; a
+    # row's score must not depend on the batch it is scored in
+    weighted_score = np.zeros(len(factor_matrix))
+    for column, name in enumerate(FACTOR_NAMES):
+        weighted_score += factor_matrix[:, column] * weights[name]
+
+    confidence_scale = np.array([TIMEFRAME_CONFIDENCE[t] for t in timeframes])[:, None]
+    movement_scale = np.array([TIMEFRAME_MOVEMENT[t] for t in timeframes])[:, None]
+
+    # Direction and confidence
+    bullish = weighted_score > 50
+    confidence_score = np.round(np.abs(weighted_score - 50) * 2 * confidence_scale).astype(np.int64)
+
+    level_names = list(confidence_levels)
+    level_floors = np.array([confidence_levels[name][0] for name in level_names[1:]])
+    confidence_level = np.searchsorted(level_floors, confidence_score, side="right")
+
+    # Movement scaled by each stock's own volatility and the timeframe
+    base_movement = (weighted_score - 50) / 10
+    movement = base_movement * (volatility / 20) * movement_scale
+
+    # Ensure movement is significant enough for high-risk trading
+    small = np.abs(movement) < 5
+    movement = np.where(small, np.where(movement < 0, -5.0, 5.0), movement)
+
+    # Cap extreme movements
+    movement = np.clip(movement, -30, 30)
+
+    price_target = np.round(current_price * (1 + movement / 100), 2)
+
+    return {
+        "timeframes": timeframes,
+        "weighted_score": weighted_score,
+        "bullish": np.broadcast_to(bullish, movement.shape),
+        "confidence_score": confidence_score,
+        "confidence_level": confidence_level,
+        "confidence_level_names": level_names,
+        "movement_pct": np.round(movement, 1),
+        "price_target": price_target
+    }
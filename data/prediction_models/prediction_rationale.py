@@ -0,0 +1,249 @@
+"""
+Prediction Rationale for Trump Tariff Analysis Website
+
+This module renders the rationale attached to StockPredictionModel's
+predictions. Phrasing is held in templates keyed by (factor, signal bucket)
+that are bound once at import, and PredictionResult defers rendering until
+the rationale is read or the prediction is serialized, so screens that only
+look at movement or confidence never pay for the text.
+"""
+
+# Primary-factor sentences keyed by (factor, signal bucket); values are bound
+# str.format methods taking the factor's fields plus the stock's sector
+PRIMARY_TEMPLATES = {
+    ("tariff_sensitivity", "high"): "High tariff sensitivity ({score}%) with significant exposure to US ({us_revenue_exposure}% of revenue) and China ({china_revenue_exposure}% of revenue) markets".format,
+    ("tariff_sensitivity", "moderate"): "Moderate tariff sensitivity ({score}%) with exposure to US ({us_revenue_exposure}% of revenue) and China ({china_revenue_exposure}% of revenue) markets".format,
+    ("tariff_sensitivity", "low"): "Low tariff sensitivity ({score}%) with limited exposure to US ({us_revenue_exposure}% of revenue) and China ({china_revenue_exposure}% of revenue) markets".format,
+    ("technical_indicators", "bullish"): "Bullish technical indicators with RSI at {rsi}, positive MACD ({macd}), and favorable Bollinger Band position ({bollinger_position})".format,
+    ("technical_indicators", "bearish"): "Bearish technical indicators with RSI at {rsi}, negative MACD ({macd}), and unfavorable Bollinger Band position ({bollinger_position})".format,
+    ("technical_indicators", "neutral"): "Neutral technical indicators with RSI at {rsi}, MACD at {macd}, and Bollinger Band position at {bollinger_position}".format,
+    ("market_sentiment", "positive"): "Strong positive market sentiment from both news and social media sources".format,
+    ("market_sentiment", "negative"): "Strong negative market sentiment from both news and social media sources".format,
+    ("market_sentiment", "mixed"): "Mixed market sentiment with {news_sentiment} news coverage and {social_media_sentiment} social media sentiment".format,
+    ("sector_momentum", "positive"): "Strong positive momentum in the {sector} sector with {relative_strength} relative strength".format,
+    ("sector_momentum", "negative"): "Negative momentum in the {sector} sector with {relative_strength} relative strength".format,
+    ("sector_momentum", "neutral"): "Neutral momentum in the {sector} sector with {relative_strength} relative strength".format,
+    ("currency_impact", "favorable"): "Favorable currency impact with positive AUD/USD correlation and {fx_amplification} FX amplification".format,
+    ("currency_impact", "unfavorable"): "Unfavorable currency impact with negative AUD/USD correlation and {fx_amplification} FX amplification".format,
+    ("currency_impact", "neutral"): "Neutral currency impact with {aud_usd_correlation} AUD/USD correlation".format,
+    ("historical_patterns", "positive"): "Historical patterns show positive performance during similar tariff events with {seasonal_patterns} seasonal patterns".format,
+    ("historical_patterns", "negative"): "Historical patterns show negative performance during similar tariff events with {seasonal_patterns} seasonal patterns".format,
+    ("historical_patterns", "mixed"): "Historical patterns show mixed performance during similar tariff events with {seasonal_patterns} seasonal patterns".format
+}
+
+# Summary sentences keyed by (direction, strength)
+SUMMARY_TEMPLATES = {
+    ("bullish", "strong"): "Strong bullish outlook for {name} with projected {movement}% upside potential. ".format,
+    ("bullish", "moderate"): "Moderately bullish outlook for {name} with projected {movement}% upside potential. ".format,
+    ("bearish", "strong"): "Strong bearish outlook for {name} with projected {movement}% downside risk. ".format,
+    ("bearish", "moderate"): "Moderately bearish outlook for {name} with projected {movement}% downside risk. ".format
+}
+
+RISK_PROFILE_TEMPLATE = "As a {risk_profile} risk profile stock with {annualized_volatility}% annualized volatility and beta of {beta}, ".format
+
+# Risk profile closing clauses keyed by (risk bucket, direction)
+RISK_PROFILE_CLAUSES = {
+    ("high", "bullish"): "it offers significant upside potential but requires careful risk management.",
+    ("high", "bearish"): "it faces substantial downside risk in the current environment.",
+    ("low", "bullish"): "it offers more moderate but potentially more reliable returns.",
+    ("low", "bearish"): "it may experience less severe downside compared to higher-risk alternatives."
+}
+
+MARKET_CAP_TEMPLATE = "The stock has a {market_cap} market capitalization within the {sector} sector".format
+TECHNICAL_TEMPLATE = "Current technical signals are {signal} with RSI at {rsi}".format
+SECTOR_TEMPLATE = "The {sector} sector currently shows {sector_trend} momentum".format
+CURRENCY_TEMPLATE = "Currency effects are expected to have a {aud_usd_correlation} impact on performance".format
+CONFIDENCE_TEMPLATE = "This prediction has {confidence_level} confidence ({confidence_score}%) based on the consistency of signals across multiple factors and historical model accuracy of {accuracy:.1f}% for similar predictions.".format
+
+
+def _tariff_bucket(factor_data):
+    score = factor_data["score"]
+    return "high" if score > 70 else "moderate" if score > 40 else "low"
+
+
+def _technical_bucket(factor_data):
+    return factor_data["signal"] if factor_data["signal"] in ("bullish", "bearish") else "neutral"
+
+
+def _sentiment_bucket(factor_data):
+    news = factor_data["news_sentiment"]
+    if news in ("positive", "negative") and factor_data["social_media_sentiment"] == news:
+        return news
+    return "mixed"
+
+
+def _momentum_bucket(factor_data):
+    trend = factor_data["sector_trend"]
+    return trend if trend in ("positive", "negative") else "neutral"
+
+
+def _currency_bucket(factor_data):
+    correlation = factor_data["aud_usd_correlation"]
+    if correlation == "positive" and factor_data["score"] > 60:
+        return "favorable"
+    if correlation == "negative" and factor_data["score"] < 40:
+        return "unfavorable"
+    return "neutral"
+
+
+def _historical_bucket(factor_data):
+    events = factor_data["similar_tariff_events"]
+    return events if events in ("positive", "negative") else "mixed"
+
+
+# Factor name -> function mapping the factor's data to its signal bucket
+SIGNAL_BUCKETS = {
+    "tariff_sensitivity": _tariff_bucket,
+    "technical_indicators": _technical_bucket,
+    "market_sentiment": _sentiment_bucket,
+    "sector_momentum": _momentum_bucket,
+    "currency_impact": _currency_bucket,
+    "historical_patterns": _historical_bucket
+}
+
+
+def render_rationale(stock_data, factors, prediction, factor_weights, overall_accuracy):
+    """
+    Render the detailed rationale for a prediction
+
+    Args:
+        stock_data (dict): Stock data
+        factors (dict): Prediction factors
+        prediction (dict): Direction, confidence and movement
+        factor_weights (dict): Factor name -> weight
+        overall_accuracy (float): Historical model accuracy (0-1)
+
+    Returns:
+        dict: Summary, primary factors, additional considerations and
+            confidence explanation
+    """
+    direction = prediction["direction"]
+    confidence = prediction["confidence_level"]
+    movement_pct = prediction["movement_pct"]
+    sector = stock_data["sector"]
+
+    # Primary rationale from the top 3 factors by weighted contribution
+    weighted_factors = sorted(
+        factors.items(),
+        key=lambda item: item[1]["score"] * factor_weights[item[0]],
+        reverse=True
+    )
+
+    primary_rationale = []
+    for factor_name, factor_data in weighted_factors[:3]:
+        bucket = SIGNAL_BUCKETS[factor_name](factor_data)
+        primary_rationale.append(PRIMARY_TEMPLATES[(factor_name, bucket)](sector=sector, **factor_data))
+
+    strength = "strong" if confidence in ("high", "very_high") else "moderate"
+    movement = movement_pct if direction == "bullish" else abs(movement_pct)
+    summary = SUMMARY_TEMPLATES[(direction, strength)](name=stock_data["name"], movement=movement)
+
+    risk_bucket = "high" if stock_data["risk_profile"] in ("high", "very_high") else "low"
+    risk_profile_text = RISK_PROFILE_TEMPLATE(**stock_data) + RISK_PROFILE_CLAUSES[(risk_bucket, direction)]
+
+    return {
+        "summary": summary + risk_profile_text,
+        "primary_factors": primary_rationale,
+        "additional_considerations": [
+            MARKET_CAP_TEMPLATE(**stock_data),
+            TECHNICAL_TEMPLATE(**factors["technical_indicators"]),
+            SECTOR_TEMPLATE(sector=sector, **factors["sector_momentum"]),
+            CURRENCY_TEMPLATE(**factors["currency_impact"])
+        ],
+        "confidence_explanation": CONFIDENCE_TEMPLATE(
+            confidence_level=confidence,
+            confidence_score=prediction["confidence_score"],
+            accuracy=overall_accuracy * 100
+        )
+    }
+
+
+class PredictionResult(dict):
+    """
+    Prediction dict whose "rationale" is rendered on first access
+
+    The rationale is rendered when read by key, by get(), or by anything that
+    walks items() or values(), which includes json.dumps, copy() and to_dict().
+    Overriding __iter__ also makes dict(), {**prediction} and dict.update()
+    take CPython's generic mapping path (keys() plus __getitem__) instead of
+    copying the underlying dict storage, so they render it too.
+    """
+
+    def __init__(self, data, render_rationale=None):
+        """
+        Args:
+            data (dict): Prediction fields; "rationale" is set to None until
+                rendered when render_rationale is given
+            render_rationale (callable, optional): Returns the rationale dict
+        """
+        super().__init__(data)
+        self._render_rationale = render_rationale
+        if render_rationale is not None:
+            dict.__setitem__(self, "rationale", None)
+
+    @property
+    def rationale_rendered(self):
+        """
+        Whether the rationale has been rendered
+        """
+        return self._render_rationale is None
+
+    def _materialize(self):
+        render = self._render_rationale
+        if render is not None:
+            self._render_rationale = None
+            dict.__setitem__(self, "rationale", render())
+
+    def __getitem__(self, key):
+        if key == "rationale":
+            self._materialize()
+        return dict.__getitem__(self, key)
+
+    def get(self, key, default=None):
+        if key == "rationale":
+            self._materialize()
+        return dict.get(self, key, default)
+
+    def __iter__(self):
+        return dict.__iter__(self)
+
+    def items(self):
+        self._materialize()
+        return dict.items(self)
+
+    def values(self):
+        self._materialize()
+        return dict.values(self)
+
+    def __setitem__(self, key, value):
+        if key == "rationale":
+            self._render_rationale = None
+        dict.__setitem__(self, key, value)
+
+    def __repr__(self):
+        self._materialize()
+        return dict.__repr__(self)
+
+    def __eq__(self, other):
+        self._materialize()
+        if isinstance(other, PredictionResult):
+            other._materialize()
+        return dict.__eq__(self, other)
+
+    __hash__ = None
+
+    def to_dict(self):
+        """
+        Get a plain dict copy with the rationale rendered
+
+        Returns:
+            dict: Prediction data
+        """
+        self._materialize()
+        return dict(dict.items(self))
+
+    def copy(self):
+        return self.to_dict()
+
+    def __reduce__(self):
+        return (dict, (self.to_dict(),))
@@ -0,0 +1,654 @@
+"""
+Prediction Server for Trump Tariff Analysis Website
+
+This module serves StockPredictionModel over a local asyncio HTTP/1.1 JSON
+API for the stock prediction and predictive analytics pages:
+
+    GET /predictions/<symbol>?timeframe=      get_prediction
+    GET /predictions/<symbol>/horizons?timeframes=short_term,long_term
+                                              get_multi_horizon_prediction
+    GET /predictions?timeframe=&sector=&min_movement=&risk_profile=&limit=
+                                              get_all_predictions
+    GET /sectors?timeframe=                   get_sector_predictions
+    GET /factors/<symbol>?timeframe=          get_prediction_factors_importance
+    POST /portfolios                          analyze_portfolios, body
+                                              {"portfolios": {name: {symbol: quantity}}}
+    GET /health, GET /stats                   liveness and server counters
+
+Model calls run on one dedicated thread, so the event loop never blocks on
+them and the model is never entered concurrently. Concurrent single-symbol
+requests arriving within a short window are micro-batched into one
+get_predictions call. Encoded responses are cached against the model's
+version and data version; they carry a weak ETag derived from the same
+versions, so revalidating clients get 304 Not Modified without any model
+work, and bodies are gzip-compressed for clients that accept it. Portfolio
+analyses depend on the posted holdings and are never cached.
+"""
+
+import asyncio
+import gzip
+import json
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit, parse_qsl, unquote
+
+try:
+    from .prediction_cache import PredictionCache
+    from .stock_prediction_model import get_prediction_model
+except ImportError:
+    from prediction_cache import PredictionCache
+    from stock_prediction_model import get_prediction_model
+
+logger = logging.getLogger('prediction_model')
+
+# Bodies smaller than this are sent uncompressed
+DEFAULT_COMPRESS_MIN_BYTES = 1024
+
+# Largest accepted request head (request line and headers) and body
+MAX_REQUEST_HEAD = 16 * 1024
+MAX_REQUEST_BODY = 8 * 1024 * 1024
+
+STATUS_REASONS = {
+    200: "OK",
+    304: "Not Modified",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    413: "Content Too Large",
+    431: "Request Header Fields Too Large",
+    500: "Internal Server Error"
+}
+
+
+class RequestError(Exception):
+    """
+    Request that cannot be served, answered with its status code
+    """
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+def encode_json(value):
+    """
+    Encode a response body compactly, converting NumPy scalars
+
+    Args:
+        value: JSON-serializable value
+
+    Returns:
+        bytes: UTF-8 JSON
+    """
+    return json.dumps(value, separators=(',', ':'), default=_json_default).encode('utf-8')
+
+
+def _json_default(value):
+    if hasattr(value, 'item'):
+        return value.item()
+    if hasattr(value, 'tolist'):
+        return value.tolist()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def accepts_gzip(header):
+    """
+    Check whether an Accept-Encoding header allows gzip
+
+    Args:
+        header (str): Accept-Encoding value
+
+    Returns:
+        bool: True if gzip has a non-zero quality
+    """
+    for item in header.split(','):
+        name, _, params = item.strip().partition(';')
+        if name.strip().lower() not in ('gzip', '*'):
+            continue
+        params = params.replace(' ', '')
+        if params.startswith('q='):
+            try:
+                return float(params[2:]) > 0
+            except ValueError:
+                return False
+        return True
+    return False
+
+
+class PredictionBatcher:
+    """
+    Coalesces concurrent single-symbol prediction requests into batches
+    """
+
+    def __init__(self, function, executor, window=0.002, max_batch=256):
+        """
+        Args:
+            function (callable): Called as function(symbols, timeframe) on the
+                executor; returns one result per symbol
+            executor (Executor): Executor running the batches
+            window (float, optional): Seconds to wait for more requests
+                after the first one of a batch
+            max_batch (int, optional): Batch size flushed immediately
+        """
+        self.function = function
+        self.executor = executor
+        self.window = window
+        self.max_batch = max_batch
+
+        # timeframe -> [(symbol, future)] and its pending flush timer
+        self._pending = {}
+        self._timers = {}
+
+        self.batches = 0
+        self.batched_requests = 0
+        self.largest_batch = 0
+
+    async def get(self, symbol, timeframe):
+        """
+        Get one symbol's result from the next batch
+
+        Args:
+            symbol (str): Stock symbol
+            timeframe (str): Prediction timeframe
+
+        Returns:
+            The function's result for symbol
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+
+        pending = self._pending.get(timeframe)
+        if pending is None:
+            pending = self._pending[timeframe] = []
+            self._timers[timeframe] = loop.call_later(self.window, self._flush, timeframe)
+        pending.append((symbol, future))
+
+        if len(pending) >= self.max_batch:
+            self._timers.pop(timeframe).cancel()
+            self._flush(timeframe)
+
+        return await future
+
+    def _flush(self, timeframe):
+        """
+        Submit a timeframe's pending requests as one batch
+        """
+        self._timers.pop(timeframe, None)
+        pending = self._pending.pop(timeframe, None)
+        if not pending:
+            return
+
+        self.batches += 1
+        self.batched_requests += len(pending)
+        self.largest_batch = max(self.largest_batch, len(pending))
+
+        symbols = [symbol for symbol, _ in pending]
+        task = asyncio.get_running_loop().run_in_executor(self.executor, self.function, symbols, timeframe)
+        task.add_done_callback(lambda done: self._resolve(pending, done))
+
+    @staticmethod
+    def _resolve(pending, done):
+        """
+        Hand each waiting request its result
+        """
+        error = done.exception()
+        results = None if error is not None else done.result()
+
+        for index, (_, future) in enumerate(pending):
+            # Waiters whose client went away are cancelled
+            if future.done():
+                continue
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(results[index])
+
+    def stats(self):
+        """
+        Get batching counters
+
+        Returns:
+            dict: Batch count, batched requests, mean and largest batch size
+        """
+        return {
+            "batches": self.batches,
+            "batched_requests": self.batched_requests,
+            "mean_batch_size": round(self.batched_requests / self.batches, 2) if self.batches else 0,
+            "largest_batch": self.largest_batch
+        }
+
+
+class PredictionServer:
+    """
+    Asyncio HTTP JSON API over a StockPredictionModel
+    """
+
+    def __init__(self, model=None, host='127.0.0.1', port=8765, batch_window=0.002, max_batch=256,
+                 cache_entries=4096, cache_ttl=60, compress_min_bytes=DEFAULT_COMPRESS_MIN_BYTES,
+                 allow_origin='*'):
+        """
+        Args:
+            model (StockPredictionModel, optional): Model to serve, the shared
+                instance if None
+            host (str, optional): Interface to bind; local only by default
+            port (int, optional): Port, 0 to pick a free one
+            batch_window (float, optional): Seconds single-symbol requests
+                wait to be batched
+            max_batch (int, optional): Largest single-symbol batch
+            cache_entries (int, optional): Encoded responses kept
+            cache_ttl (float, optional): Seconds an encoded response is reused
+                even while the model's data version is unchanged; bounds how
+                long an hourly factor redraw can go unnoticed
+            compress_min_bytes (int, optional): Smallest body sent gzipped
+            allow_origin (str, optional): Access-Control-Allow-Origin value,
+                None to omit the header
+        """
+        self.model = model if model is not None else get_prediction_model()
+        self.host = host
+        self.port = port
+        self.compress_min_bytes = compress_min_bytes
+        self.allow_origin = allow_origin
+
+        # One thread owns the model
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='prediction-model')
+        self.batcher = PredictionBatcher(self._predict_encoded, self.executor, batch_window, max_batch)
+
+        # (path, params) -> [version, status, body, gzipped body or None]
+        self.responses = PredictionCache(max_entries=cache_entries, ttl_seconds=cache_ttl)
+
+        # Distinguishes ETags of this process from a previous one whose data
+        # versions started from the same numbers
+        self.epoch = format(time.time_ns(), 'x')
+
+        self.requests = 0
+        self.not_modified = 0
+        self.status_counts = {}
+
+        self._server = None
+        self._loop = None
+        self._thread = None
+
+    def current_version(self):
+        """
+        Get the version encoded responses are cached against
+
+        Returns:
+            tuple: (model_version, data_version)
+        """
+        return (self.model.model_version, self.model.data_version)
+
+    def etag(self, version):
+        """
+        Build the weak ETag of responses computed at a version
+
+        Args:
+            version (tuple): (model_version, data_version)
+
+        Returns:
+            str: ETag header value
+        """
+        return f'W/"{version[0]}-{self.epoch}-{version[1]}"'
+
+    def _predict_encoded(self, symbols, timeframe):
+        """
+        Compute and encode a batch of single-symbol predictions; runs on the
+        model thread
+
+        Returns:
+            list: (status, body) per symbol
+        """
+        results = []
+        for prediction in self.model.get_predictions(symbols, timeframe):
+            status = 404 if "error" in prediction else 200
+            results.append((status, encode_json(prediction)))
+        return results
+
+    def _call_encoded(self, function, *args, **kwargs):
+        """
+        Call a model method and encode its result; runs on the model thread
+        """
+        result = function(*args, **kwargs)
+        status = 404 if isinstance(result, dict) and "error" in result else 200
+        return status, encode_json(result)
+
+    def _timeframe(self, params):
+        timeframe = params.get('timeframe', 'medium_term')
+        if timeframe not in self.model.prediction_horizon:
+            raise RequestError(400, f"Unknown timeframe {timeframe!r}")
+        return timeframe
+
+    @staticmethod
+    def _number(params, name, convert, default):
+        value = params.get(name)
+        if value is None or value == '':
+            return default
+        try:
+            return convert(value)
+        except ValueError:
+            raise RequestError(400, f"Invalid {name} {value!r}")
+
+    async def _compute(self, path, params):
+        """
+        Route a request to the model
+
+        Args:
+            path (str): Decoded request path
+            params (dict): Query parameters
+
+        Returns:
+            tuple: (status, encoded body)
+        """
+        loop = asyncio.get_running_loop()
+        parts = [part for part in path.split('/') if part]
+
+        if parts == ['predictions']:
+            kwargs = {
+                "timeframe": self._timeframe(params),
+                "sector": params.get('sector') or None,
+                "min_movement": self._number(params, 'min_movement', float, 10),
+                "risk_profile": params.get('risk_profile') or None,
+                "limit": self._number(params, 'limit', int, 10)
+            }
+            return await loop.run_in_executor(
+                self.executor, lambda: self._call_encoded(self.model.get_all_predictions, **kwargs))
+
+        if len(parts) == 2 and parts[0] == 'predictions':
+            return await self.batcher.get(parts[1], self._timeframe(params))
+
+        if len(parts) == 3 and parts[0] == 'predictions' and parts[2] == 'horizons':
+            timeframes = params.get('timeframes')
+            timeframes = [timeframe for timeframe in timeframes.split(',') if timeframe] if timeframes else None
+            for timeframe in timeframes or []:
+                if timeframe not in self.model.prediction_horizon:
+                    raise RequestError(400, f"Unknown timeframe {timeframe!r}")
+            return await loop.run_in_executor(
+                self.executor, self._call_encoded, self.model.get_multi_horizon_prediction, parts[1], timeframes)
+
+        if parts == ['sectors']:
+            return await loop.run_in_executor(
+                self.executor, self._call_encoded, self.model.get_sector_predictions, self._timeframe(params))
+
+        if len(parts) == 2 and parts[0] == 'factors':
+            return await loop.run_in_executor(
+                self.executor, self._call_encoded, self.model.get_prediction_factors_importance,
+                parts[1], self._timeframe(params))
+
+        raise RequestError(404, f"No route for {path}")
+
+    @staticmethod
+    def _portfolios(body):
+        """
+        Parse and validate a portfolio analysis request body
+
+        Args:
+            body (bytes): JSON body
+
+        Returns:
+            dict: Portfolio name -> {symbol: quantity}
+        """
+        try:
+            portfolios = json.loads(body)["portfolios"]
+        except (ValueError, TypeError, KeyError):
+            raise RequestError(400, "Body must be JSON with a portfolios object")
+
+        if not isinstance(portfolios, dict):
+            raise RequestError(400, "portfolios must map names to holdings")
+        for name, holdings in portfolios.items():
+            if not isinstance(holdings, dict) or not all(
+                    isinstance(quantity, (int, float)) and not isinstance(quantity, bool)
+                    for quantity in holdings.values()):
+                raise RequestError(400, f"Holdings of {name!r} must map symbols to quantities")
+        return portfolios
+
+    def _encode_response(self, status, response_headers, body, headers):
+        """
+        Compress a body for clients that accept gzip
+
+        Returns:
+            tuple: (status, header list, body)
+        """
+        if len(body) >= self.compress_min_bytes and accepts_gzip(headers.get('accept-encoding', '')):
+            body = gzip.compress(body, compresslevel=5, mtime=0)
+            response_headers = response_headers + [('Content-Encoding', 'gzip')]
+        return status, response_headers, body
+
+    async def _respond(self, method, target, headers, body=b''):
+        """
+        Build the response to one request
+
+        Returns:
+            tuple: (status, header list, body)
+        """
+        url = urlsplit(target)
+        path = unquote(url.path)
+        params = dict(parse_qsl(url.query))
+
+        if path == '/portfolios':
+            if method != 'POST':
+                raise RequestError(405, f"Method {method} not allowed")
+            portfolios = self._portfolios(body)
+            status, encoded = await asyncio.get_running_loop().run_in_executor(
+                self.executor, self._call_encoded, self.model.analyze_portfolios, portfolios)
+            return self._encode_response(status, [('Cache-Control', 'no-store'), ('Vary', 'Accept-Encoding')],
+                                         encoded, headers)
+
+        if method not in ('GET', 'HEAD'):
+            raise RequestError(405, f"Method {method} not allowed")
+
+        if path == '/health':
+            version = self.current_version()
+            return 200, [], encode_json({"status": "ok", "model_version": version[0], "data_version": version[1]})
+
+        if path == '/stats':
+            return 200, [], encode_json(self.stats())
+
+        # Responses are cached and validated against the version read before
+        # computing, so a change during the computation is never masked
+        version = self.current_version()
+        etag = self.etag(version)
+
+        # The ETag depends only on the version, so a revalidation is answered
+        # before looking for, or computing, the body
+        if etag in [tag.strip() for tag in headers.get('if-none-match', '').split(',')]:
+            self.not_modified += 1
+            return 304, [('ETag', etag)], b''
+
+        key = (path, tuple(sorted(params.items())))
+        entry = self.responses.get(key)
+        if entry is None or entry[0] != version:
+            status, body = await self._compute(path, params)
+            entry = [version, status, body, None]
+            self.responses.set(key, entry)
+
+        _, status, body, gzipped = entry
+        response_headers = [('ETag', etag), ('Cache-Control', 'no-cache'), ('Vary', 'Accept-Encoding')]
+
+        if len(body) >= self.compress_min_bytes and accepts_gzip(headers.get('accept-encoding', '')):
+            if gzipped is None:
+                gzipped = entry[3] = gzip.compress(body, compresslevel=5, mtime=0)
+            body = gzipped
+            response_headers.append(('Content-Encoding', 'gzip'))
+
+        return status, response_headers, body
+
+    async def _handle_connection(self, reader, writer):
+        """
+        Serve requests on one keep-alive connection
+        """
+        try:
+            while True:
+                try:
+                    head = await reader.readuntil(b'\r\n\r\n')
+                except (asyncio.IncompleteReadError, ConnectionError):
+                    break
+                except asyncio.LimitOverrunError:
+                    await self._write(writer, 'GET', 431, [], encode_json({"error": "Request head too large"}), False)
+                    break
+
+                request_line, *header_lines = head.decode('latin-1').split('\r\n')
+                headers = {}
+                for line in header_lines:
+                    if line:
+                        name, _, value = line.partition(':')
+                        headers[name.strip().lower()] = value.strip()
+
+                try:
+                    method, target, version = request_line.split(' ')
+                except ValueError:
+                    await self._write(writer, 'GET', 400, [], encode_json({"error": "Malformed request line"}), False)
+                    break
+
+                # Only POST /portfolios uses its body
+                try:
+                    length = int(headers.get('content-length') or 0)
+                except ValueError:
+                    await self._write(writer, method, 400, [], encode_json({"error": "Invalid Content-Length"}), False)
+                    break
+                if length > MAX_REQUEST_BODY:
+                    await self._write(writer, method, 413, [], encode_json({"error": "Request body too large"}), False)
+                    break
+                try:
+                    body = await reader.readexactly(length) if length > 0 else b''
+                except asyncio.IncompleteReadError:
+                    break
+
+                connection = headers.get('connection', '').lower()
+                keep_alive = connection != 'close' if version == 'HTTP/1.1' else connection == 'keep-alive'
+
+                self.requests += 1
+                try:
+                    status, response_headers, body = await self._respond(method, target, headers, body)
+                except RequestError as e:
+                    status, response_headers, body = e.status, [], encode_json({"error": str(e)})
+                    if e.status == 405:
+                        allowed = 'POST' if urlsplit(target).path == '/portfolios' else 'GET, HEAD'
+                        response_headers = [('Allow', allowed)]
+                except Exception as e:
+                    logger.error(f"Error serving {target}: {e}")
+                    status, response_headers, body = 500, [], encode_json({"error": "Internal server error"})
+
+                self.status_counts[status] = self.status_counts.get(status, 0) + 1
+                await self._write(writer, method, status, response_headers, body, keep_alive)
+
+                if not keep_alive:
+                    break
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def _write(self, writer, method, status, headers, body, keep_alive):
+        """
+        Write one response
+        """
+        lines = [f"HTTP/1.1 {status} {STATUS_REASONS.get(status, '')}"]
+        if status != 304:
+            lines.append("Content-Type: application/json")
+            lines.append(f"Content-Length: {len(body)}")
+        if self.allow_origin:
+            lines.append(f"Access-Control-Allow-Origin: {self.allow_origin}")
+        lines.extend(f"{name}: {value}" for name, value in headers)
+        lines.append("Connection: keep-alive" if keep_alive else "Connection: close")
+
+        writer.write(("\r\n".join(lines) + "\r\n\r\n").encode('latin-1'))
+        if method != 'HEAD' and status != 304:
+            writer.write(body)
+        await writer.drain()
+
+    async def serve(self):
+        """
+        Start listening on the running event loop
+
+        Returns:
+            int: Bound port
+        """
+        self._server = await asyncio.start_server(self._handle_connection, self.host, self.port,
+                                                  limit=MAX_REQUEST_HEAD)
+        self.port = self._server.sockets[0].getsockname()[1]
+        logger.info(f"Serving predictions on http://{self.host}:{self.port}/")
+        return self.port
+
+    def start(self):
+        """
+        Start serving on an event loop in a background thread
+
+        Returns:
+            int: Bound port
+        """
+        if self._thread is not None:
+            return self.port
+
+        self._loop = asyncio.new_event_loop()
+        self._loop.run_until_complete(self.serve())
+        self._thread = threading.Thread(target=self._loop.run_forever, name='prediction-server', daemon=True)
+        self._thread.start()
+        return self.port
+
+    def stop(self):
+        """
+        Stop a server started with start()
+        """
+        if self._thread is None:
+            return
+
+        async def close():
+            self._server.close()
+            await self._server.wait_closed()
+
+        asyncio.run_coroutine_threadsafe(close(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
+        self._thread = None
+        self._loop = None
+        self._server = None
+
+    def run(self):
+        """
+        Serve on the current thread until interrupted
+        """
+        async def main():
+            await self.serve()
+            async with self._server:
+                await self._server.serve_forever()
+
+        try:
+            asyncio.run(main())
+        except KeyboardInterrupt:
+            pass
+
+    def stats(self):
+        """
+        Get server counters
+
+        Returns:
+            dict: Request, status, 304, response cache and batching counters,
+                plus repricing counters while the model reprices live ticks
+        """
+        stats = {
+            "requests": self.requests,
+            "status_counts": {str(status): count for status, count in sorted(self.status_counts.items())},
+            "not_modified": self.not_modified,
+            "response_cache": self.responses.stats(),
+            "batching": self.batcher.stats()
+        }
+        repricer = self.model.repricer
+        if repricer is not None:
+            stats["repricing"] = repricer.stats()
+        return stats
+
+
+# Example usage
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Serve stock predictions over HTTP')
+    parser.add_argument('--host', default='127.0.0.1', help='interface to bind')
+    parser.add_argument('--port', type=int, default=8765, help='port to listen on')
+    parser.add_argument('--batch-window-ms', type=float, default=2.0, help='single-symbol batching window')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    PredictionServer(host=args.host, port=args.port, batch_window=args.batch_window_ms / 1000).run()
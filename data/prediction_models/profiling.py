@@ -0,0 +1,378 @@
+"""
+Prediction Profiling for Trump Tariff Analysis Website
+
+This module implements the opt-in instrumentation behind StockPredictionModel:
+
+- Tracer: nested timing spans aggregated per call path (e.g.
+  "get_prediction/factors/technical_indicators") plus named counters. While
+  disabled, span() hands back a shared no-op context manager, so the
+  instrumented code only pays for a method call.
+- traced: decorator running every call of a method in a span.
+- SamplingProfiler: a background thread that samples every other thread's
+  Python stack at a fixed interval and writes the samples as collapsed
+  stacks ("frame;frame;frame count" lines), the input format of flamegraph
+  tools. It can be toggled at runtime through the API or a signal.
+"""
+
+import os
+import sys
+import functools
+import time
+import signal
+import threading
+import logging
+from collections import deque
+
+logger = logging.getLogger('prediction_model')
+
+# Spans kept for recent_spans(), oldest dropped first
+RECENT_SPANS = 1000
+
+# Default sampling interval in seconds
+DEFAULT_SAMPLE_INTERVAL = 0.005
+
+
+class _NullSpan:
+    """
+    Span used while tracing is disabled
+    """
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return False
+
+
+NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    """
+    Active timing span
+    """
+
+    __slots__ = ('tracer', 'name', 'path', 'start')
+
+    def __init__(self, tracer, name):
+        self.tracer = tracer
+        self.name = name
+
+    def __enter__(self):
+        stack = self.tracer._stack()
+        stack.append(self.name)
+        self.path = "/".join(stack)
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        duration = time.perf_counter_ns() - self.start
+        self.tracer._stack().pop()
+        self.tracer._record(self.path, self.start, duration)
+        return False
+
+
+class Tracer:
+    """
+    Aggregates nested timing spans and counters while enabled
+    """
+
+    def __init__(self, enabled=False):
+        """
+        Args:
+            enabled (bool, optional): Start with tracing on
+        """
+        self.enabled = enabled
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        # path -> [count, total_ns, max_ns]
+        self._spans = {}
+        self._counters = {}
+        self._recent = deque(maxlen=RECENT_SPANS)
+
+    def _stack(self):
+        stack = getattr(self._local, 'stack', None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def _record(self, path, start, duration):
+        with self._lock:
+            aggregate = self._spans.get(path)
+            if aggregate is None:
+                self._spans[path] = [1, duration, duration]
+            else:
+                aggregate[0] += 1
+                aggregate[1] += duration
+                if duration > aggregate[2]:
+                    aggregate[2] = duration
+            self._recent.append((path, start, duration, threading.get_ident()))
+
+    def span(self, name):
+        """
+        Time a block as a child of the enclosing span
+
+        Args:
+            name (str): Span name
+
+        Returns:
+            Context manager; a no-op while tracing is disabled
+        """
+        if not self.enabled:
+            return NULL_SPAN
+        return _Span(self, name)
+
+    def count(self, name, amount=1):
+        """
+        Increase a named counter while tracing is enabled
+
+        Args:
+            name (str): Counter name
+            amount (int, optional): Amount to add
+        """
+        if not self.enabled:
+            return
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + amount
+
+    def reset(self):
+        """
+        Drop all recorded spans and counters
+        """
+        with self._lock:
+            self._spans = {}
+            self._counters = {}
+            self._recent.clear()
+
+    def stats(self):
+        """
+        Get span aggregates and counters
+
+        Returns:
+            dict: "spans" maps path -> count, total_ms, mean_ms and max_ms;
+                "counters" maps name -> count
+        """
+        with self._lock:
+            spans = {path: list(aggregate) for path, aggregate in self._spans.items()}
+            counters = dict(self._counters)
+
+        return {
+            "spans": {
+                path: {
+                    "count": count,
+                    "total_ms": round(total / 1e6, 4),
+                    "mean_ms": round(total / count / 1e6, 4),
+                    "max_ms": round(largest / 1e6, 4)
+                }
+                for path, (count, total, largest) in sorted(spans.items())
+            },
+            "counters": counters
+        }
+
+    def recent_spans(self):
+        """
+        Get the most recent individual spans
+
+        Returns:
+            list: dicts with path, start_ns, duration_ms and thread, oldest
+                first
+        """
+        with self._lock:
+            recent = list(self._recent)
+
+        return [
+            {"path": path, "start_ns": start, "duration_ms": round(duration / 1e6, 4), "thread": thread}
+            for path, start, duration, thread in recent
+        ]
+
+    def collapsed(self):
+        """
+        Render traced time as collapsed stacks weighted by self time in
+        microseconds
+
+        Returns:
+            str: One "span;child;grandchild weight" line per path
+        """
+        with self._lock:
+            totals = {path: aggregate[1] for path, aggregate in self._spans.items()}
+
+        # Self time: a span's total minus its direct children's totals
+        self_time = dict(totals)
+        for path, total in totals.items():
+            parent = path.rpartition("/")[0]
+            if parent in self_time:
+                self_time[parent] -= total
+
+        return "".join(
+            f"{path.replace('/', ';')} {max(0, value) // 1000}\n"
+            for path, value in sorted(self_time.items())
+        )
+
+
+def traced(name):
+    """
+    Run every call of a method in a span of its object's tracer
+
+    Args:
+        name (str): Span name
+
+    Returns:
+        callable: Decorator for methods of objects with a tracer attribute
+    """
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            tracer = self.tracer
+            if not tracer.enabled:
+                return method(self, *args, **kwargs)
+            with _Span(tracer, name):
+                return method(self, *args, **kwargs)
+        return wrapper
+    return decorator
+
+
+class SamplingProfiler:
+    """
+    Statistical profiler writing collapsed stacks of the running process
+    """
+
+    def __init__(self, interval=DEFAULT_SAMPLE_INTERVAL, output_dir=None):
+        """
+        Args:
+            interval (float, optional): Seconds between samples
+            output_dir (str, optional): Directory for profiles written by the
+                signal toggle; the working directory if None
+        """
+        self.interval = interval
+        self.output_dir = output_dir
+        self.samples = {}
+        self.sample_count = 0
+        self._thread = None
+        self._stop_event = threading.Event()
+        self._lock = threading.Lock()
+
+    @property
+    def running(self):
+        return self._thread is not None
+
+    def start(self, interval=None):
+        """
+        Start sampling, discarding any previous samples
+
+        Args:
+            interval (float, optional): Seconds between samples
+        """
+        with self._lock:
+            if self._thread is not None:
+                return
+            if interval is not None:
+                self.interval = interval
+
+            self.samples = {}
+            self.sample_count = 0
+            self._stop_event.clear()
+            self._thread = threading.Thread(target=self._run, name='sampling-profiler', daemon=True)
+            self._thread.start()
+
+        logger.info(f"Sampling profiler started ({self.interval * 1000:g} ms interval)")
+
+    def stop(self, output_path=None):
+        """
+        Stop sampling and optionally write the profile
+
+        Args:
+            output_path (str, optional): File to write collapsed stacks to
+
+        Returns:
+            str: Collapsed stacks
+        """
+        with self._lock:
+            thread = self._thread
+            if thread is None:
+                return self.collapsed()
+            self._stop_event.set()
+            self._thread = None
+
+        thread.join()
+        collapsed = self.collapsed()
+
+        if output_path is not None:
+            tmp_path = output_path + '.tmp'
+            with open(tmp_path, 'w') as f:
+                f.write(collapsed)
+            os.replace(tmp_path, output_path)
+            logger.info(f"Wrote {self.sample_count} profile samples to {output_path}")
+
+        return collapsed
+
+    def _run(self):
+        """
+        Sampling loop
+        """
+        own_id = threading.get_ident()
+
+        while not self._stop_event.wait(self.interval):
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+                    frame = frame.f_back
+                stack.append(names.get(thread_id, str(thread_id)))
+
+                key = ";".join(reversed(stack))
+                self.samples[key] = self.samples.get(key, 0) + 1
+
+            self.sample_count += 1
+
+    def collapsed(self):
+        """
+        Render the samples as collapsed stacks
+
+        Returns:
+            str: One "thread;frame;frame count" line per distinct stack
+        """
+        return "".join(f"{stack} {count}\n" for stack, count in sorted(self.samples.items()))
+
+    def toggle(self):
+        """
+        Start sampling, or stop and write a timestamped profile to
+        output_dir
+
+        Returns:
+            str: Path of the written profile, None when sampling started
+        """
+        if not self.running:
+            self.start()
+            return None
+
+        output_dir = self.output_dir or os.getcwd()
+        os.makedirs(output_dir, exist_ok=True)
+        output_path = os.path.join(output_dir, f"profile-{os.getpid()}-{time.strftime('%Y%m%d-%H%M%S')}.collapsed")
+        self.stop(output_path)
+        return output_path
+
+    def install_signal(self, signum=None):
+        """
+        Toggle the profiler whenever the process receives a signal
+
+        Must be called from the main thread.
+
+        Args:
+            signum (int, optional): Signal number, SIGUSR2 by default
+        """
+        signum = signal.SIGUSR2 if signum is None else signum
+
+        def handler(received, frame):
+            # Writing happens off the signal handler so it never blocks the
+            # interrupted code on file I/O
+            threading.Thread(target=self.toggle, daemon=True).start()
+
+        signal.signal(signum, handler)
@@ -0,0 +1,131 @@
+"""
+Prediction Ranking Index for Trump Tariff Analysis Website
+
+This module implements the ranking behind StockPredictionModel's screener
+queries. For each timeframe, stocks are kept in sorted partitions keyed by
+(sector, risk profile) and ordered by descending absolute movement. A filtered
+top-K query heap-merges only the partitions that match its filters, and a
+single stock's new prediction moves one entry instead of re-sorting the
+universe. The entry is found by binary search, but removing and inserting it
+shifts the rest of its partition list, so an update is linear in the
+partition's size (a memory move, not a sort).
+"""
+
+import bisect
+import heapq
+import threading
+
+try:
+    from ..lazy_imports import lazy_import
+except ImportError:
+    from lazy_imports import lazy_import
+
+# Heavy dependencies load on first use, keeping module import cheap
+np = lazy_import('numpy')
+
+
+class RankingIndex:
+    """
+    Per-timeframe rankings of rows by absolute movement, partitioned by
+    sector and risk profile codes
+    """
+
+    def __init__(self, timeframes):
+        """
+        Args:
+            timeframes (list): Timeframes to keep rankings for
+        """
+        # timeframe -> {(sector_code, risk_code): [(-abs_movement, row), ...]}
+        self._partitions = {timeframe: {} for timeframe in timeframes}
+        # timeframe -> {row: (partition, entry)}
+        self._entries = {timeframe: {} for timeframe in timeframes}
+        self._lock = threading.Lock()
+
+    def rebuild(self, timeframe, movement, sector_codes, risk_codes):
+        """
+        Replace a timeframe's rankings from whole-universe arrays
+
+        Args:
+            timeframe (str): Timeframe
+            movement (numpy.ndarray): Movement percentage per row
+            sector_codes (numpy.ndarray): Sector code per row
+            risk_codes (numpy.ndarray): Risk profile code per row
+        """
+        magnitude = np.abs(movement)
+        rows = np.arange(len(movement))
+
+        # Sort once by (-|movement|, row), then split into partitions; each
+        # partition inherits the order
+        order = np.lexsort((rows, -magnitude))
+
+        partitions = {}
+        entries = {}
+        for row in order.tolist():
+            partition = (int(sector_codes[row]), int(risk_codes[row]))
+            entry = (-float(magnitude[row]), row)
+            partitions.setdefault(partition, []).append(entry)
+            entries[row] = (partition, entry)
+
+        with self._lock:
+            self._partitions[timeframe] = partitions
+            self._entries[timeframe] = entries
+
+    def update(self, timeframe, row, movement, sector_code, risk_code):
+        """
+        Move one row to its new position
+
+        O(log p) to locate the entries and O(p) to shift the partition
+        lists, for partitions of p rows.
+
+        Args:
+            timeframe (str): Timeframe
+            row (int): Row index
+            movement (float): New movement percentage
+            sector_code (int): Sector code of the row
+            risk_code (int): Risk profile code of the row
+        """
+        partition = (int(sector_code), int(risk_code))
+        entry = (-abs(float(movement)), int(row))
+
+        with self._lock:
+            partitions = self._partitions[timeframe]
+            entries = self._entries[timeframe]
+
+            previous = entries.get(row)
+            if previous is not None:
+                old_partition, old_entry = previous
+                ranked = partitions[old_partition]
+                position = bisect.bisect_left(ranked, old_entry)
+                if position < len(ranked) and ranked[position] == old_entry:
+                    del ranked[position]
+
+            bisect.insort(partitions.setdefault(partition, []), entry)
+            entries[row] = (partition, entry)
+
+    def top(self, timeframe, limit=None, min_movement=0, sector_code=None, risk_code=None):
+        """
+        Get the rows with the largest absolute movement
+
+        Args:
+            timeframe (str): Timeframe
+            limit (int, optional): Maximum number of rows, all if falsy
+            min_movement (float, optional): Minimum absolute movement
+            sector_code (int, optional): Restrict to one sector
+            risk_code (int, optional): Restrict to one risk profile
+
+        Returns:
+            list: Rows by descending absolute movement, ties by row
+        """
+        with self._lock:
+            ranked = [
+                entries for (sector, risk), entries in self._partitions[timeframe].items()
+                if (sector_code is None or sector == sector_code) and (risk_code is None or risk == risk_code)
+            ]
+
+            rows = []
+            for negative_magnitude, row in heapq.merge(*ranked):
+                if -negative_magnitude < min_movement or (limit and len(rows) >= limit):
+                    break
+                rows.append(row)
+
+        return rows
@@ -0,0 +1,226 @@
+"""
+Debounced Repricing for Trump Tariff Analysis Website
+
+This module turns live price ticks into StockPredictionModel updates. Ticks
+are coalesced per symbol (the latest price wins) until the stream has been
+quiet for the debounce window, or the oldest pending tick has waited
+max_delay, and each burst is then applied to the model as one batch through
+StockPredictionModel.update_prices, which recomputes only the ticked rows.
+"""
+
+import logging
+import threading
+import time
+
+logger = logging.getLogger('prediction_model')
+
+
+class DebouncedRepricer:
+    """
+    Coalesces price ticks and applies them to a model in batches
+    """
+
+    def __init__(self, model, window=0.05, max_delay=0.5, executor=None):
+        """
+        Args:
+            model (StockPredictionModel): Model to reprice
+            window (float, optional): Seconds without ticks before a burst
+                is applied
+            max_delay (float, optional): Longest a tick waits under a
+                continuous stream, in seconds
+            executor (concurrent.futures.Executor, optional): Executor that
+                owns the model; batches run on the repricer's thread if None
+        """
+        self.model = model
+        self.window = window
+        self.max_delay = max_delay
+        self.executor = executor
+
+        # symbol -> [current_price, price_change_pct or None]
+        self._pending = {}
+        self._first_tick = None
+        self._last_tick = None
+        self._condition = threading.Condition()
+        self._running = False
+        self._worker = None
+        self._source = None
+
+        self.ticks = 0
+        self.coalesced = 0
+        self.batches = 0
+        self.repriced = 0
+        self.last_batch_ms = 0.0
+
+    def submit(self, symbol, current_price, price_change_pct=None):
+        """
+        Queue a price tick
+
+        Args:
+            symbol (str): Stock symbol
+            current_price (float): New price
+            price_change_pct (float, optional): New daily change percentage
+        """
+        now = time.monotonic()
+        with self._condition:
+            self.ticks += 1
+            pending = self._pending.get(symbol)
+            if pending is None:
+                self._pending[symbol] = [current_price, price_change_pct]
+            else:
+                self.coalesced += 1
+                pending[0] = current_price
+                if price_change_pct is not None:
+                    pending[1] = price_change_pct
+
+            if self._first_tick is None:
+                self._first_tick = now
+            self._last_tick = now
+            self._condition.notify()
+
+    def _on_quotes(self, data):
+        # Streamed trades arrive one at a time, fetches as symbol -> quote
+        if 'symbol' in data and 'price' in data:
+            self.submit(data['symbol'], data['price'], data.get('change_pct'))
+            return
+        for quote in data.values():
+            self.submit(quote['symbol'], quote['price'], quote.get('change_pct'))
+
+    def _take_pending(self):
+        """
+        Take the pending burst; the condition must be held
+        """
+        batch = self._pending
+        self._pending = {}
+        self._first_tick = None
+        self._last_tick = None
+        return batch
+
+    def _apply(self, batch):
+        """
+        Apply a burst of ticks to the model
+
+        Args:
+            batch (dict): Symbol -> [current_price, price_change_pct]
+
+        Returns:
+            int: Stocks repriced
+        """
+        if not batch:
+            return 0
+
+        start = time.perf_counter()
+        if self.executor is None:
+            repriced = self.model.update_prices(batch)
+        else:
+            repriced = self.executor.submit(self.model.update_prices, batch).result()
+
+        self.batches += 1
+        self.repriced += repriced
+        self.last_batch_ms = (time.perf_counter() - start) * 1000
+        return repriced
+
+    def flush(self):
+        """
+        Apply pending ticks now
+
+        Returns:
+            int: Stocks repriced
+        """
+        with self._condition:
+            batch = self._take_pending()
+        return self._apply(batch)
+
+    def _repricing_loop(self):
+        """
+        Wait for each burst to settle and apply it
+        """
+        while True:
+            with self._condition:
+                while self._running:
+                    if self._first_tick is None:
+                        self._condition.wait()
+                        continue
+                    due = min(self._last_tick + self.window, self._first_tick + self.max_delay)
+                    remaining = due - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._condition.wait(remaining)
+
+                if not self._running:
+                    return
+                batch = self._take_pending()
+
+            try:
+                self._apply(batch)
+            except Exception as e:
+                logger.error(f"Error repricing {len(batch)} stocks: {e}")
+
+    def start(self):
+        """
+        Start the background repricing worker
+        """
+        with self._condition:
+            if self._running:
+                return
+            self._running = True
+
+        self._worker = threading.Thread(target=self._repricing_loop, name='repricing', daemon=True)
+        self._worker.start()
+
+    def stop(self):
+        """
+        Stop the worker, applying ticks still pending
+        """
+        self.detach()
+
+        with self._condition:
+            if not self._running:
+                return
+            self._running = False
+            self._condition.notify()
+
+        self._worker.join()
+        self._worker = None
+        self.flush()
+
+    def attach(self, source):
+        """
+        Reprice from a RealTimeDataIntegration's stock quote stream
+
+        Args:
+            source (RealTimeDataIntegration): Stream source
+        """
+        if self._source is not None:
+            return
+        self._source = source
+        source.subscribe('stock_quotes', self._on_quotes)
+
+    def detach(self):
+        """
+        Unsubscribe from the stock quote stream
+        """
+        if self._source is None:
+            return
+        self._source.unsubscribe('stock_quotes', self._on_quotes)
+        self._source = None
+
+    def stats(self):
+        """
+        Get repricing counters
+
+        Returns:
+            dict: Ticks received and coalesced, batches applied, stocks
+                repriced and the last batch's duration
+        """
+        with self._condition:
+            pending = len(self._pending)
+
+        return {
+            "ticks": self.ticks,
+            "coalesced": self.coalesced,
+            "pending": pending,
+            "batches": self.batches,
+            "repriced": self.repriced,
+            "mean_batch_size": round(self.repriced / self.batches, 2) if self.batches else 0,
+            "last_batch_ms": round(self.last_batch_ms, 3)
+        }
@@ -0,0 +1,190 @@
+"""
+Sector Aggregates for Trump Tariff Analysis Website
+
+This module maintains the per-sector figures behind StockPredictionModel's
+sector predictions: movement and confidence sums, stock and bullish counts,
+and the top bullish and bearish picks. They are built once per timeframe from
+batch predictions and then adjusted when a single stock's prediction
+changes: the counts and sums in O(1), and the sorted pick lists with a binary
+search plus a list insert and delete, which shift the rest of the sector's
+list (O(n) in the sector's size, as a memory move rather than a re-sort). A
+sector query costs O(sectors) regardless of universe size. Movement is kept as integer tenths of a percent (predictions
+are rounded to one decimal) so sums never drift under repeated updates.
+"""
+
+import bisect
+import threading
+
+try:
+    from ..lazy_imports import lazy_import
+except ImportError:
+    from lazy_imports import lazy_import
+
+# Heavy dependencies load on first use, keeping module import cheap
+np = lazy_import('numpy')
+
+TOP_PICKS = 3
+
+
+def _tenths(movement):
+    """
+    Convert movement percentages to integer tenths
+
+    Args:
+        movement (float or numpy.ndarray): Movement rounded to one decimal
+
+    Returns:
+        numpy.int64 or numpy.ndarray: Movement in tenths of a percent
+    """
+    return np.rint(np.asarray(movement) * 10).astype(np.int64)
+
+
+class SectorAggregates:
+    """
+    Per-timeframe, per-sector prediction aggregates
+    """
+
+    def __init__(self, timeframes):
+        """
+        Args:
+            timeframes (list): Timeframes to keep aggregates for
+        """
+        # timeframe -> {sector_code: aggregate dict}
+        self._sectors = {timeframe: {} for timeframe in timeframes}
+        # timeframe -> {row: (sector_code, movement, confidence, bullish)}
+        self._rows = {timeframe: {} for timeframe in timeframes}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _empty():
+        return {
+            "count": 0,
+            "movement_tenths": 0,
+            "confidence_sum": 0,
+            "bullish_count": 0,
+            # Sorted best-first: bullish by (-movement, row), bearish by
+            # (movement, row), so ties keep universe order
+            "bullish": [],
+            "bearish": []
+        }
+
+    def rebuild(self, timeframe, sector_codes, movement, confidence, bullish):
+        """
+        Replace a timeframe's aggregates from whole-universe arrays
+
+        Args:
+            timeframe (str): Timeframe
+            sector_codes (numpy.ndarray): Sector code per row
+            movement (numpy.ndarray): Movement percentage per row
+            confidence (numpy.ndarray): Confidence score per row
+            bullish (numpy.ndarray): Bullish flag per row
+        """
+        sectors = {}
+        rows = {}
+
+        for code in np.unique(sector_codes).tolist():
+            members = np.flatnonzero(sector_codes == code)
+            member_movement = movement[members]
+            member_bullish = bullish[members]
+
+            aggregate = self._empty()
+            aggregate["count"] = len(members)
+            aggregate["movement_tenths"] = int(_tenths(member_movement).sum())
+            aggregate["confidence_sum"] = int(confidence[members].sum())
+            aggregate["bullish_count"] = int(member_bullish.sum())
+            aggregate["bullish"] = sorted(zip((-member_movement[member_bullish]).tolist(), members[member_bullish].tolist()))
+            aggregate["bearish"] = sorted(zip(member_movement[~member_bullish].tolist(), members[~member_bullish].tolist()))
+            sectors[code] = aggregate
+
+            for row, row_movement, row_confidence, row_bullish in zip(
+                    members.tolist(), member_movement.tolist(), confidence[members].tolist(), member_bullish.tolist()):
+                rows[row] = (code, row_movement, row_confidence, row_bullish)
+
+        with self._lock:
+            self._sectors[timeframe] = sectors
+            self._rows[timeframe] = rows
+
+    def update(self, timeframe, row, sector_code, movement, confidence, bullish):
+        """
+        Replace one row's contribution
+
+        Args:
+            timeframe (str): Timeframe
+            row (int): Row index
+            sector_code (int): Sector code of the row
+            movement (float): New movement percentage
+            confidence (int): New confidence score
+            bullish (bool): New direction
+        """
+        row = int(row)
+        entry = (int(sector_code), float(movement), int(confidence), bool(bullish))
+
+        with self._lock:
+            sectors = self._sectors[timeframe]
+            rows = self._rows[timeframe]
+
+            previous = rows.get(row)
+            if previous is not None:
+                self._apply(sectors, row, previous, -1)
+
+            self._apply(sectors, row, entry, 1)
+            rows[row] = entry
+
+    def _apply(self, sectors, row, entry, sign):
+        """
+        Add (sign 1) or remove (sign -1) a row's contribution; the lock must
+        be held
+
+        Args:
+            sectors (dict): Sector code -> aggregate
+            row (int): Row index
+            entry (tuple): (sector_code, movement, confidence, bullish)
+            sign (int): 1 to add, -1 to remove
+        """
+        code, movement, confidence, bullish = entry
+        aggregate = sectors.get(code)
+        if aggregate is None:
+            aggregate = sectors[code] = self._empty()
+
+        aggregate["count"] += sign
+        aggregate["movement_tenths"] += sign * int(_tenths(movement))
+        aggregate["confidence_sum"] += sign * confidence
+        aggregate["bullish_count"] += sign * int(bullish)
+
+        ranked = aggregate["bullish"] if bullish else aggregate["bearish"]
+        key = (-movement, row) if bullish else (movement, row)
+
+        if sign > 0:
+            bisect.insort(ranked, key)
+        else:
+            position = bisect.bisect_left(ranked, key)
+            if position < len(ranked) and ranked[position] == key:
+                del ranked[position]
+
+        if aggregate["count"] == 0:
+            del sectors[code]
+
+    def snapshot(self, timeframe):
+        """
+        Get the current aggregates of every sector
+
+        Args:
+            timeframe (str): Timeframe
+
+        Returns:
+            dict: Sector code -> dict with count, movement_sum,
+                confidence_sum, bullish_count and top_bullish / top_bearish
+                lists of (movement, row)
+        """
+        with self._lock:
+            return {
+                code: {
+                    "count": aggregate["count"],
+                    "movement_sum": aggregate["movement_tenths"] / 10,
+                    "confidence_sum": aggregate["confidence_sum"],
+                    "bullish_count": aggregate["bullish_count"],
+                    "top_bullish": [(-key, row) for key, row in aggregate["bullish"][:TOP_PICKS]],
+                    "top_bearish": aggregate["bearish"][:TOP_PICKS]
+                }
+                for code, aggregate in self._sectors[timeframe].items()
+            }
@@ -6,15 +6,123 @@ based on tariff announcements, market conditions, and historical patterns.
 It provides predictions with detailed rationale for trading decisions.
 """
 
-import numpy as np
-import pandas as pd
-from datetime import datetime, timedelta
+from datetime import datetime
 import json
+import logging
 import os
+import sys
+import time
+import threading
+import functools
+import copy
 import random  # For demonstration purposes only
 
+try:
+    from ..lazy_imports import lazy_import
+    from ..symbol_registry import default_registry, KIND_STOCK
+    from .prediction_engine import (FACTOR_NAMES, FACTOR_INPUTS, TIMEFRAMES, compute_factor_matrix,
+                                    compute_predictions, price_change_adjustment, beta_regime)
+    from .stock_universe import StockUniverseTable
+    from .prediction_cache import (PredictionCache, DEPENDENCY_PRICE, DEPENDENCY_INDICATORS,
+                                   DEPENDENCY_SECTOR_MOMENTUM, DEPENDENCY_FACTOR_WEIGHTS,
+                                   DEPENDENCY_CORRELATIONS, DEPENDENCY_ACCURACY)
+    from .prediction_rationale import PredictionResult, render_rationale
+    from .ranking_index import RankingIndex
+    from .sector_aggregates import SectorAggregates
+    tariff_scenarios = lazy_import('.tariff_scenarios', __package__)
+    from .backtest import BacktestEngine
+    from .profiling import Tracer, SamplingProfiler, traced
+    from .repricing import DebouncedRepricer
+    from .portfolio_risk import PortfolioAnalyzer
+except ImportError:
+    sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    from lazy_imports import lazy_import
+    from symbol_registry import default_registry, KIND_STOCK
+    from prediction_engine import (FACTOR_NAMES, FACTOR_INPUTS, TIMEFRAMES, compute_factor_matrix,
+                                   compute_predictions, price_change_adjustment, beta_regime)
+    from stock_universe import StockUniverseTable
+    from prediction_cache import (PredictionCache, DEPENDENCY_PRICE, DEPENDENCY_INDICATORS,
+                                  DEPENDENCY_SECTOR_MOMENTUM, DEPENDENCY_FACTOR_WEIGHTS,
+                                  DEPENDENCY_CORRELATIONS, DEPENDENCY_ACCURACY)
+    from prediction_rationale import PredictionResult, render_rationale
+    from ranking_index import RankingIndex
+    from sector_aggregates import SectorAggregates
+    tariff_scenarios = lazy_import('tariff_scenarios')
+    from backtest import BacktestEngine
+    from profiling import Tracer, SamplingProfiler, traced
+    from repricing import DebouncedRepricer
+    from portfolio_risk import PortfolioAnalyzer
+
+# Heavy dependencies load on first use, keeping module import cheap
+np = lazy_import('numpy')
+
+logger = logging.getLogger('prediction_model')
+
+# Streamed features (FeatureStore names) and the stock columns they update
+FEATURE_COLUMNS = {
+    "price": "current_price",
+    "change_pct": "price_change_pct",
+    "volume": "volume",
+    "volatility": "annualized_volatility",
+    "sentiment": "sentiment",
+    "fx_exposure": "fx_exposure"
+}
+
+# Factors scored from streamed features once they are known
+LIVE_FACTORS = {"market_sentiment": "sentiment", "currency_impact": "fx_exposure"}
+
+# Prediction cache key suffix of the factors shared by a stock's timeframes,
+# stored next to the (symbol, timeframe) prediction entries
+FACTORS_CACHE_KEY = "factors"
+
+# Currency pairs whose measured correlations are reported with the currency
+# impact factor, and the correlation beyond which one is labelled
+CURRENCY_CORRELATION_PAIRS = {"aud_usd": "AUD/USD", "aud_cny": "AUD/CNY"}
+CORRELATION_LABEL_THRESHOLD = 0.2
+
+# Accuracy figures quoted until there is enough history to backtest
+DEFAULT_ACCURACY_STATS = {
+    "overall_accuracy": 0.72,
+    "by_confidence_level": {
+        "very_low": 0.52,
+        "low": 0.61,
+        "moderate": 0.70,
+        "high": 0.78,
+        "very_high": 0.85
+    },
+    "by_sector": {
+        "Materials": 0.75,
+        "Consumer Staples": 0.71,
+        "Healthcare": 0.68,
+        "Financials": 0.70,
+        "Information Technology": 0.65,
+        "Industrials": 0.72,
+        "Utilities": 0.76,
+        "Energy": 0.69
+    },
+    "by_timeframe": {
+        "short_term": 0.68,
+        "medium_term": 0.72,
+        "long_term": 0.64
+    },
+    "by_direction": {
+        "bullish": 0.74,
+        "bearish": 0.70
+    },
+    "by_movement_magnitude": {
+        "small (0-10%)": 0.75,
+        "medium (10-20%)": 0.72,
+        "large (20%+)": 0.65
+    }
+}
+
 class StockPredictionModel:
-    def __init__(self):
+    def __init__(self, seed=None):
+        """
+        Args:
+            seed (int, optional): Seed for factor score draws
+        """
         self.model_version = "1.0.0"
         self.last_updated = datetime.now().isoformat()
         self.prediction_horizon = {
@@ -37,64 +145,91 @@ class StockPredictionModel:
             "currency_impact": 0.15,
             "historical_patterns": 0.10
         }
-        self.historical_accuracy = {
-            "overall": 0.72,
-            "by_sector": {},
-            "by_confidence": {
-                "very_low": 0.52,
-                "low": 0.61,
-                "moderate": 0.70,
-                "high": 0.78,
-                "very_high": 0.85
-            }
-        }
+        # Accuracy quoted in rationale text; only changed through
+        # _set_historical_accuracy, which invalidates predictions quoting it
+        self.historical_accuracy = self._accuracy_from_stats(DEFAULT_ACCURACY_STATS)
         
         # Load stock data and sector mappings
-        self.stocks_data = self._load_stocks_data()
+        self.symbols = default_registry()
+        self.stocks = self._load_stocks_data()
         self.sector_mappings = self._load_sector_mappings()
         
-        # Initialize prediction cache
-        self.prediction_cache = {}
+        # Initialize prediction cache; entries expire after 1 hour and are
+        # invalidated when an input they were computed from changes
+        self.prediction_cache = PredictionCache(max_entries=4096, ttl_seconds=3600)
+        
+        # Increases whenever any prediction input changes, so callers caching
+        # derived results (e.g. encoded API responses) can tell they are stale
+        self.data_version = 0
+        
+        # Optional FeatureStore fed by RealTimeDataIntegration; its changes
+        # are pulled before every prediction
+        self.features = None
+        self.feature_version = 0
+        
+        # Optional CorrelationEngine measuring stock/FX correlations; cached
+        # predictions are refreshed whenever it closes a bar
+        self.correlations = None
+        self.correlation_bars = 0
+        
+        # Optional RiskEstimator replacing the demo beta and volatility with
+        # estimates from the bar stream, pulled like features
+        self.risk_estimator = None
+        self.risk_volatility = "ewma_volatility"
+        self.risk_version = 0
+        
+        # Factor score matrix (stocks x factors) shared by single-symbol and
+        # batch predictions; redrawn hourly (monotonic clock), which also
+        # clears the prediction cache
+        self.rng = np.random.default_rng(seed)
+        self.factor_matrix = None
+        self.factor_matrix_time = None
+        self.factor_matrix_ttl = 3600
+        
+        # Per-timeframe rankings by absolute movement and per-sector
+        # aggregates, rebuilt with the factor matrix and updated row by row
+        # when a stock's prediction changes; indexed_predictions holds the
+        # values they were last given, so unchanged rows are not pushed
+        self.rankings = RankingIndex(TIMEFRAMES)
+        self.sector_aggregates = SectorAggregates(TIMEFRAMES)
+        self.prediction_indexes_current = False
+        self.indexed_predictions = None
+        
+        # Optional DebouncedRepricer applying live ticks in bursts
+        self.repricer = None
+        
+        # Backtests replay RealTimeDataIntegration history files; attach_history
+        # points them at a running integration's directory and format
+        self.backtester = BacktestEngine()
+        
+        # Opt-in tracing spans around prediction stages and factors, and an
+        # on-demand sampling profiler; both are near free until enabled
+        self.tracer = Tracer()
+        self.profiler = SamplingProfiler()
+        
+        # Portfolio aggregates over a cached per-stock figure matrix
+        self.portfolios = PortfolioAnalyzer(self)
         
     def _load_stocks_data(self):
         """
         Load stock data from data source or generate mock data for demonstration
+        
+        Returns:
+            StockUniverseTable: Columnar stock table indexed by symbol
         """
         # In a real implementation, this would load from a database or API
         # For demonstration, we'll create mock data for ASX stocks
         
-        stocks = [
-            {"symbol": "BHP.AX", "name": "BHP Group", "sector": "Materials", "market_cap": "large", "risk_profile": "medium"},
-            {"symbol": "RIO.AX", "name": "Rio Tinto", "sector": "Materials", "market_cap": "large", "risk_profile": "medium"},
-            {"symbol": "FMG.AX", "name": "Fortescue Metals", "sector": "Materials", "market_cap": "large", "risk_profile": "high"},
-            {"symbol": "MIN.AX", "name": "Mineral Resources", "sector": "Materials", "market_cap": "mid", "risk_profile": "high"},
-            {"symbol": "S32.AX", "name": "South32", "sector": "Materials", "market_cap": "mid", "risk_profile": "medium"},
-            {"symbol": "TWE.AX", "name": "Treasury Wine Estates", "sector": "Consumer Staples", "market_cap": "mid", "risk_profile": "high"},
-            {"symbol": "A2M.AX", "name": "A2 Milk", "sector": "Consumer Staples", "market_cap": "mid", "risk_profile": "high"},
-            {"symbol": "WES.AX", "name": "Wesfarmers", "sector": "Consumer Staples", "market_cap": "large", "risk_profile": "low"},
-            {"symbol": "WOW.AX", "name": "Woolworths Group", "sector": "Consumer Staples", "market_cap": "large", "risk_profile": "low"},
-            {"symbol": "COL.AX", "name": "Coles Group", "sector": "Consumer Staples", "market_cap": "large", "risk_profile": "low"},
-            {"symbol": "CSL.AX", "name": "CSL Limited", "sector": "Healthcare", "market_cap": "large", "risk_profile": "low"},
-            {"symbol": "RMD.AX", "name": "ResMed", "sector": "Healthcare", "market_cap": "large", "risk_profile": "medium"},
-            {"symbol": "COH.AX", "name": "Cochlear", "sector": "Healthcare", "market_cap": "mid", "risk_profile": "medium"},
-            {"symbol": "CBA.AX", "name": "Commonwealth Bank", "sector": "Financials", "market_cap": "large", "risk_profile": "low"},
-            {"symbol": "NAB.AX", "name": "National Australia Bank", "sector": "Financials", "market_cap": "large", "risk_profile": "low"},
-            {"symbol": "WBC.AX", "name": "Westpac Banking", "sector": "Financials", "market_cap": "large", "risk_profile": "low"},
-            {"symbol": "ANZ.AX", "name": "ANZ Group", "sector": "Financials", "market_cap": "large", "risk_profile": "low"},
-            {"symbol": "MQG.AX", "name": "Macquarie Group", "sector": "Financials", "market_cap": "large", "risk_profile": "medium"},
-            {"symbol": "WTC.AX", "name": "WiseTech Global", "sector": "Information Technology", "market_cap": "mid", "risk_profile": "high"},
-            {"symbol": "XRO.AX", "name": "Xero", "sector": "Information Technology", "market_cap": "mid", "risk_profile": "high"},
-            {"symbol": "APX.AX", "name": "Appen", "sector": "Information Technology", "market_cap": "small", "risk_profile": "very_high"},
-            {"symbol": "ALU.AX", "name": "Altium", "sector": "Information Technology", "market_cap": "small", "risk_profile": "high"},
-            {"symbol": "MP1.AX", "name": "Megaport", "sector": "Information Technology", "market_cap": "small", "risk_profile": "very_high"},
-            {"symbol": "SYD.AX", "name": "Sydney Airport", "sector": "Industrials", "market_cap": "large", "risk_profile": "low"},
-            {"symbol": "TCL.AX", "name": "Transurban Group", "sector": "Industrials", "market_cap": "large", "risk_profile": "low"},
-            {"symbol": "QAN.AX", "name": "Qantas Airways", "sector": "Industrials", "market_cap": "mid", "risk_profile": "high"},
-            {"symbol": "AGL.AX", "name": "AGL Energy", "sector": "Utilities", "market_cap": "mid", "risk_profile": "medium"},
-            {"symbol": "ORG.AX", "name": "Origin Energy", "sector": "Utilities", "market_cap": "mid", "risk_profile": "medium"},
-            {"symbol": "WPL.AX", "name": "Woodside Energy", "sector": "Energy", "market_cap": "large", "risk_profile": "medium"},
-            {"symbol": "STO.AX", "name": "Santos", "sector": "Energy", "market_cap": "mid", "risk_profile": "high"}
-        ]
+        # Universe and static metadata come from the shared symbol registry
+        stocks = []
+        for record in self.symbols.records(KIND_STOCK):
+            stocks.append({
+                "symbol": record["symbol"],
+                "name": record["name"],
+                "sector": record["sector"],
+                "market_cap": record["market_cap"],
+                "risk_profile": record["risk_profile"]
+            })
         
         # Add additional data for each stock
         for stock in stocks:
@@ -117,7 +252,359 @@ class StockPredictionModel:
             stock["price_change_pct"] = round(random.uniform(-5.0, 5.0), 2)
             stock["volume"] = random.randint(500000, 5000000)
             
-        return stocks
+        return StockUniverseTable.from_records(stocks)
+    
+    def set_universe(self, stocks):
+        """
+        Replace the stock universe, resetting everything derived from it
+        
+        Args:
+            stocks (StockUniverseTable): New universe
+        """
+        self.stocks = stocks
+        self.factor_matrix = None
+        self.prediction_cache.clear()
+        self.prediction_indexes_current = False
+        self.data_version += 1
+        
+        if self.features is not None:
+            self._register_with_feature_store()
+        if self.risk_estimator is not None:
+            self._register_with_risk_estimator()
+    
+    def attach_feature_store(self, store):
+        """
+        Read live prices, volumes, volatility, FX exposure and news sentiment
+        from a feature store instead of the static demo values
+        
+        Args:
+            store (FeatureStore): Store fed by RealTimeDataIntegration, or
+                None to stop reading from one
+        """
+        self.features = store
+        if store is not None:
+            self._register_with_feature_store()
+            self._sync_features()
+    
+    def attach_history(self, source):
+        """
+        Backtest accuracy against a RealTimeDataIntegration's history files
+        
+        Args:
+            source (RealTimeDataIntegration): Integration whose historical
+                directory and storage format are replayed
+        """
+        retention = source.retention
+        self.backtester = BacktestEngine(retention.historical_dir, retention.storage_format)
+    
+    def attach_correlation_engine(self, engine):
+        """
+        Report measured stock/currency correlations with the currency
+        impact factor
+        
+        Args:
+            engine (CorrelationEngine): Engine fed by RealTimeDataIntegration,
+                or None to stop reporting them
+        """
+        self.correlations = engine
+        self.correlation_bars = 0
+        self.prediction_cache.invalidate(DEPENDENCY_CORRELATIONS)
+        self.data_version += 1
+    
+    def attach_risk_estimator(self, estimator, volatility="ewma"):
+        """
+        Read beta and annualized volatility from a risk estimator instead of
+        the static demo values
+        
+        Args:
+            estimator (RiskEstimator): Estimator fed by a CorrelationEngine,
+                or None to stop reading from one
+            volatility (str, optional): "ewma" or "realized" volatility
+        """
+        if volatility not in ("ewma", "realized"):
+            raise ValueError(f"Unknown volatility estimate {volatility!r}")
+        
+        self.risk_estimator = estimator
+        self.risk_volatility = f"{volatility}_volatility"
+        if estimator is not None:
+            self._register_with_risk_estimator()
+            self._sync_risk_estimates()
+    
+    def _register_with_risk_estimator(self):
+        """
+        Add the estimate timestamp column and start syncing from scratch
+        """
+        if "risk_updated_ms" not in self.stocks.columns:
+            self.stocks.add_column("risk_updated_ms", np.zeros(len(self.stocks)))
+        self.risk_version = 0
+    
+    def _sync_risk_estimates(self):
+        """
+        Apply beta and volatility estimates updated since the last sync,
+        rescoring and invalidating only the affected stocks
+        """
+        estimator = self.risk_estimator
+        if estimator is None or estimator.version == self.risk_version:
+            return
+        
+        estimates = estimator.estimates()
+        self.risk_version = estimates["version"]
+        
+        rows = [self.stocks.lookup(symbol) for symbol in estimates["symbols"]]
+        known = np.array([row is not None for row in rows], dtype=bool)
+        rows = np.array([row for row in rows if row is not None], dtype=np.int64)
+        updated_ms = estimates["updated_ms"][known].astype(np.float64)
+        beta = estimates["beta"][known]
+        volatility = estimates[self.risk_volatility][known]
+        
+        changed = updated_ms > self.stocks["risk_updated_ms"][rows]
+        rows, updated_ms, beta, volatility = rows[changed], updated_ms[changed], beta[changed], volatility[changed]
+        if len(rows) == 0:
+            return
+        
+        old_regime = beta_regime(self.stocks["beta"][rows])
+        measured = ~np.isnan(beta)
+        self.stocks.set_values(rows[measured], "beta", beta[measured])
+        measured = ~np.isnan(volatility)
+        self.stocks.set_values(rows[measured], "annualized_volatility", volatility[measured])
+        self.stocks.set_values(rows, "risk_updated_ms", updated_ms)
+        
+        for symbol in self.stocks["symbol"][rows]:
+            self.prediction_cache.invalidate(DEPENDENCY_INDICATORS, symbol)
+        self.data_version += 1
+        
+        # A beta crossing a regime bound needs a rescore; volatility alone
+        # only rescales movement
+        regime_changed = beta_regime(self.stocks["beta"][rows]) != old_regime
+        self._rescore_rows(rows[regime_changed], ["beta"])
+        self._prediction_rows_changed(rows[~regime_changed])
+    
+    def _sync_correlations(self):
+        """
+        Invalidate cached predictions once the correlation engine has closed
+        new bars
+        """
+        engine = self.correlations
+        if engine is None or engine.bars == self.correlation_bars:
+            return
+        
+        self.correlation_bars = engine.bars
+        self.prediction_cache.invalidate(DEPENDENCY_CORRELATIONS)
+        self.data_version += 1
+    
+    def _register_with_feature_store(self):
+        """
+        Register the universe's stocks with the feature store and add the
+        streamed feature columns
+        """
+        self.features.register_stocks(
+            list(self.stocks["symbol"]),
+            list(self.stocks["name"]),
+            self.stocks["us_revenue_pct"],
+            self.stocks["china_revenue_pct"]
+        )
+        for column in LIVE_FACTORS.values():
+            if column not in self.stocks.columns:
+                self.stocks.add_column(column, np.full(len(self.stocks), np.nan))
+        self.feature_version = 0
+    
+    def _sync_features(self):
+        """
+        Apply features that changed since the last sync to the stock
+        columns, rescoring and invalidating only the affected stocks
+        """
+        store = self.features
+        if store is None or store.version == self.feature_version:
+            return
+        
+        symbols, self.feature_version = store.changed_since(self.feature_version)
+        rows = [self.stocks.lookup(symbol) for symbol in symbols]
+        symbols = [symbol for symbol, row in zip(symbols, rows) if row is not None]
+        rows = np.array([row for row in rows if row is not None], dtype=np.int64)
+        if len(rows) == 0:
+            return
+        
+        features = store.features(symbols)
+        old_changes = self.stocks["price_change_pct"][rows]
+        for feature, column in FEATURE_COLUMNS.items():
+            # Bar-based volatility estimates take precedence over tick-based
+            if column == "annualized_volatility" and self.risk_estimator is not None:
+                continue
+            values = features[feature]
+            known = ~np.isnan(values)
+            if known.any():
+                self.stocks.set_values(rows[known], column, values[known])
+        
+        for symbol in symbols:
+            self.prediction_cache.invalidate(DEPENDENCY_PRICE, symbol)
+            self.prediction_cache.invalidate(DEPENDENCY_INDICATORS, symbol)
+        self.data_version += 1
+        
+        self._apply_price_changes(rows, old_changes)
+        self._rescore_live_factors(rows)
+    
+    def _rescore_live_factors(self, rows):
+        """
+        Rescore the feature-driven factors of rows whose features are known,
+        leaving drawn factor scores as they are
+        
+        Args:
+            rows (numpy.ndarray): Stock rows
+        """
+        if self.factor_matrix is None:
+            return
+        
+        subset = {name: self.stocks[name][rows] for name in self.stocks.columns}
+        scores = compute_factor_matrix(subset, self.sector_mappings, None)
+        for factor, feature in LIVE_FACTORS.items():
+            column = FACTOR_NAMES.index(factor)
+            live = ~np.isnan(subset[feature])
+            self.factor_matrix[rows[live], column] = scores[live, column]
+        
+        self._prediction_rows_changed(rows)
+    
+    @property
+    def stocks_data(self):
+        """
+        Stock rows as a list of dicts, materialized from the columnar table
+        """
+        return self.stocks.records()
+    
+    def _get_factor_matrix(self):
+        """
+        Get the factor score matrix, recomputing it when it has expired
+        
+        Recomputing invalidates cached predictions so that single-symbol and
+        batch results never mix scores from different draws.
+        """
+        self._sync_features()
+        self._sync_risk_estimates()
+        self._sync_correlations()
+        
+        now = time.monotonic()
+        if self.factor_matrix is None or now - self.factor_matrix_time >= self.factor_matrix_ttl:
+            self.factor_matrix = compute_factor_matrix(self.stocks, self.sector_mappings, self.rng)
+            self.factor_matrix_time = now
+            self.prediction_cache.clear()
+            self.prediction_indexes_current = False
+            self.data_version += 1
+            
+        return self.factor_matrix
+    
+    @traced("update_prediction_indexes")
+    def _update_prediction_indexes(self):
+        """
+        Rebuild the ranking index and sector aggregates if the whole universe
+        changed
+        """
+        self._get_factor_matrix()
+        
+        if not self.prediction_indexes_current:
+            batch = self.get_batch_predictions()
+            sector_codes = self.stocks.columns["sector"]
+            risk_codes = self.stocks.columns["risk_profile"]
+            for timeframe_index, timeframe in enumerate(batch["timeframes"]):
+                self.rankings.rebuild(timeframe, batch["movement_pct"][timeframe_index], sector_codes, risk_codes)
+                self.sector_aggregates.rebuild(
+                    timeframe,
+                    sector_codes,
+                    batch["movement_pct"][timeframe_index],
+                    batch["confidence_score"][timeframe_index],
+                    batch["bullish"][timeframe_index]
+                )
+            self.indexed_predictions = {
+                "movement_pct": batch["movement_pct"].copy(),
+                "confidence_score": batch["confidence_score"].copy(),
+                "bullish": np.array(batch["bullish"])
+            }
+            self.prediction_indexes_current = True
+    
+    def _predict_rows(self, rows, timeframes=None):
+        """
+        Compute batch predictions for a subset of rows
+        
+        Args:
+            rows (numpy.ndarray): Stock rows
+            timeframes (list, optional): Timeframes to compute, all if None
+            
+        Returns:
+            dict: As get_batch_predictions, with columns in the order of rows
+        """
+        return compute_predictions(
+            self._get_factor_matrix()[rows],
+            self.factor_weights,
+            self.stocks["annualized_volatility"][rows],
+            self.stocks["current_price"][rows],
+            self.confidence_levels,
+            timeframes
+        )
+    
+    def _prediction_rows_changed(self, rows):
+        """
+        Push new predictions of changed rows into the ranking index and
+        sector aggregates, skipping rows whose movement, confidence and
+        direction are unchanged
+        
+        Args:
+            rows (numpy.ndarray): Stock rows whose inputs changed
+            
+        Returns:
+            int: (timeframe, row) updates pushed
+        """
+        if not self.prediction_indexes_current or len(rows) == 0:
+            return 0
+        
+        batch = self._predict_rows(rows)
+        indexed = self.indexed_predictions
+        sector_codes = self.stocks.columns["sector"]
+        risk_codes = self.stocks.columns["risk_profile"]
+        pushed = 0
+        
+        for timeframe_index, timeframe in enumerate(batch["timeframes"]):
+            movement = batch["movement_pct"][timeframe_index]
+            confidence = batch["confidence_score"][timeframe_index]
+            bullish = batch["bullish"][timeframe_index]
+            indexed_movement = indexed["movement_pct"][timeframe_index]
+            indexed_confidence = indexed["confidence_score"][timeframe_index]
+            indexed_bullish = indexed["bullish"][timeframe_index]
+            
+            changed = np.flatnonzero(
+                (movement != indexed_movement[rows]) |
+                (confidence != indexed_confidence[rows]) |
+                (bullish != indexed_bullish[rows])
+            )
+            for column in changed.tolist():
+                row = int(rows[column])
+                self.rankings.update(timeframe, row, movement[column], sector_codes[row], risk_codes[row])
+                self.sector_aggregates.update(timeframe, row, sector_codes[row], movement[column],
+                                              confidence[column], bullish[column])
+                indexed_movement[row] = movement[column]
+                indexed_confidence[row] = confidence[column]
+                indexed_bullish[row] = bullish[column]
+            pushed += len(changed)
+            
+        return pushed
+    
+    def get_batch_predictions(self, timeframes=None):
+        """
+        Compute predictions for every stock and timeframe in one vectorized pass
+        
+        Args:
+            timeframes (list, optional): Timeframes to compute, all if None
+            
+        Returns:
+            dict: Arrays of shape (timeframes, stocks) for bullish,
+                confidence_score, confidence_level, movement_pct and
+                price_target, plus weighted_score of shape (stocks,)
+        """
+        return compute_predictions(
+            self._get_factor_matrix(),
+            self.factor_weights,
+            self.stocks["annualized_volatility"],
+            self.stocks["current_price"],
+            self.confidence_levels,
+            timeframes
+        )
     
     def _load_sector_mappings(self):
         """
@@ -177,6 +664,7 @@ class StockPredictionModel:
             }
         }
     
+    @traced("get_prediction")
     def get_prediction(self, symbol, timeframe="medium_term"):
         """
         Get prediction for a specific stock with detailed rationale
@@ -188,371 +676,555 @@ class StockPredictionModel:
         Returns:
             dict: Prediction data with rationale
         """
+        # Refresh the factor matrix first so an expired one clears the cache
+        self._get_factor_matrix()
+        
         # Check cache first
-        cache_key = f"{symbol}_{timeframe}"
-        if cache_key in self.prediction_cache:
-            # Check if cache is still valid (less than 1 hour old)
-            cached_data = self.prediction_cache[cache_key]
-            cache_time = datetime.fromisoformat(cached_data["timestamp"])
-            if datetime.now() - cache_time < timedelta(hours=1):
-                return cached_data
+        cached_data = self.prediction_cache.get((symbol, timeframe))
+        if cached_data is not None:
+            self.tracer.count("prediction_cache.hit")
+            return cached_data
+        self.tracer.count("prediction_cache.miss")
         
         # Find stock data
-        stock_data = None
-        for stock in self.stocks_data:
-            if stock["symbol"] == symbol:
-                stock_data = stock
-                break
+        stock_index = self.stocks.lookup(symbol)
                 
-        if not stock_data:
+        if stock_index is None:
             return {"error": f"Stock {symbol} not found"}
         
-        # Get sector data
-        sector_data = self.sector_mappings.get(stock_data["sector"], {})
+        # Score the single row with the batch engine so per-stock and batch
+        # predictions always agree
+        batch = self._predict_rows(np.array([stock_index]), [timeframe])
+        return self._materialize_prediction(stock_index, timeframe, batch, 0, 0)
+    
+    @traced("get_multi_horizon_prediction")
+    def get_multi_horizon_prediction(self, symbol, timeframes=None):
+        """
+        Get predictions for several timeframes of one stock, derived from
+        factors computed once
+        
+        Args:
+            symbol (str): Stock symbol (e.g., "BHP.AX")
+            timeframes (list, optional): Timeframes to predict, all if None
+            
+        Returns:
+            dict: Stock fields and the shared factors, plus horizons mapping
+                each timeframe to its price target, movement, direction,
+                confidence and rationale
+        """
+        self._get_factor_matrix()
         
-        # Calculate prediction factors
-        prediction_factors = self._calculate_prediction_factors(stock_data, sector_data)
+        timeframes = list(self.prediction_horizon) if timeframes is None else list(timeframes)
+        unknown = [timeframe for timeframe in timeframes if timeframe not in self.prediction_horizon]
+        if unknown:
+            return {"error": f"Unknown timeframes {unknown}"}
         
-        # Calculate overall prediction
-        prediction = self._calculate_overall_prediction(prediction_factors, timeframe)
+        stock_index = self.stocks.lookup(symbol)
+        if stock_index is None:
+            return {"error": f"Stock {symbol} not found"}
         
-        # Generate rationale
-        rationale = self._generate_prediction_rationale(stock_data, prediction_factors, prediction)
+        stock_data, prediction_factors = self._shared_factors(stock_index)
+        batch = self._predict_rows(np.array([stock_index]), timeframes)
         
-        # Create full prediction object
-        prediction_data = {
+        horizons = {}
+        for timeframe_index, timeframe in enumerate(batch["timeframes"]):
+            prediction = self._batch_prediction(batch, timeframe_index, 0)
+            horizons[timeframe] = PredictionResult({
+                "prediction_horizon": self.prediction_horizon[timeframe],
+                "price_target": prediction["price_target"],
+                "movement_pct": prediction["movement_pct"],
+                "direction": prediction["direction"],
+                "confidence_score": prediction["confidence_score"],
+                "confidence_level": prediction["confidence_level"],
+                "rationale": None
+            }, functools.partial(self._generate_prediction_rationale, stock_data, prediction_factors, prediction,
+                               dict(self.factor_weights), self.historical_accuracy["overall"]))
+            
+        return {
             "symbol": symbol,
             "name": stock_data["name"],
             "sector": stock_data["sector"],
             "current_price": stock_data["current_price"],
-            "timeframe": timeframe,
-            "prediction_horizon": self.prediction_horizon[timeframe],
-            "price_target": prediction["price_target"],
-            "movement_pct": prediction["movement_pct"],
-            "direction": prediction["direction"],
-            "confidence_score": prediction["confidence_score"],
-            "confidence_level": prediction["confidence_level"],
             "factors": prediction_factors,
-            "rationale": rationale,
+            "horizons": horizons,
             "timestamp": datetime.now().isoformat(),
             "model_version": self.model_version
         }
+    
+    def _shared_factors(self, row):
+        """
+        Get a stock's prediction factors, computed once and shared by the
+        predictions of every timeframe
         
-        # Cache the prediction
-        self.prediction_cache[cache_key] = prediction_data
+        The factors are cached under their own key with the same
+        dependencies as the predictions, so each timeframe's cached
+        prediction refers to one stored copy.
         
-        return prediction_data
+        Args:
+            row (int): Stock row
+            
+        Returns:
+            tuple: (stock_data, factors)
+        """
+        cache_key = (self.stocks["symbol"][row], FACTORS_CACHE_KEY)
+        cached = self.prediction_cache.get(cache_key)
+        if cached is not None:
+            return cached
+        
+        stock_data = self.stocks.row(row)
+        sector_data = self.sector_mappings.get(stock_data["sector"], {})
+        factor_scores = dict(zip(FACTOR_NAMES, self.factor_matrix[row]))
+        shared = (stock_data, self._calculate_prediction_factors(stock_data, sector_data, factor_scores))
+        
+        self.prediction_cache.set(cache_key, shared, self._prediction_dependencies(stock_data))
+        return shared
     
-    def _calculate_prediction_factors(self, stock_data, sector_data):
+    @traced("get_predictions")
+    def get_predictions(self, symbols, timeframe="medium_term"):
         """
-        Calculate individual prediction factors
+        Get predictions for several stocks, computing the uncached ones in
+        one vectorized pass
+        
+        Args:
+            symbols (list): Stock symbols
+            timeframe (str): Prediction timeframe ("short_term", "medium_term", "long_term")
+            
+        Returns:
+            list: Prediction data in the order of symbols, as get_prediction
+                returns it
         """
-        # In a real implementation, this would use actual algorithms and models
-        # For demonstration, we'll create realistic but simulated factors
+        self._get_factor_matrix()
         
-        # Tariff sensitivity factor
-        tariff_sensitivity = {
-            "score": stock_data["tariff_sensitivity"],
-            "us_revenue_exposure": stock_data["us_revenue_pct"],
-            "china_revenue_exposure": stock_data["china_revenue_pct"],
-            "impact": "high" if stock_data["tariff_sensitivity"] > 70 else "medium" if stock_data["tariff_sensitivity"] > 40 else "low"
-        }
+        predictions = {}
+        missing = []
+        for symbol in symbols:
+            if symbol in predictions:
+                continue
+            cached = self.prediction_cache.get((symbol, timeframe))
+            if cached is not None:
+                self.tracer.count("prediction_cache.hit")
+                predictions[symbol] = cached
+                continue
+            self.tracer.count("prediction_cache.miss")
+            
+            row = self.stocks.lookup(symbol)
+            if row is None:
+                predictions[symbol] = {"error": f"Stock {symbol} not found"}
+            else:
+                predictions[symbol] = None
+                missing.append(row)
+                
+        if missing:
+            batch = self._predict_rows(np.array(missing), [timeframe])
+            for column, row in enumerate(missing):
+                predictions[self.stocks["symbol"][row]] = self._materialize_prediction(row, timeframe, batch, 0, column)
+                
+        return [predictions[symbol] for symbol in symbols]
+    
+    def _prediction_dependencies(self, stock_data):
+        """
+        Get the inputs a stock's prediction is computed from
         
-        # Technical indicators factor
-        technical_score = (
-            (70 - abs(stock_data["rsi"] - 50)) / 20 * 30 +  # RSI component (closer to 50 is neutral)
-            (stock_data["macd"] * 15 if stock_data["macd"] > 0 else stock_data["macd"] * 10) +  # MACD component
-            (stock_data["bollinger_position"] * 20)  # Bollinger position component
-        )
-        technical_score = max(0, min(100, technical_score + 50))  # Normalize to 0-100
-        
-        technical_indicators = {
-            "score": round(technical_score),
-            "rsi": stock_data["rsi"],
-            "macd": round(stock_data["macd"], 2),
-            "bollinger_position": round(stock_data["bollinger_position"], 2),
-            "signal": "bullish" if technical_score > 60 else "bearish" if technical_score < 40 else "neutral"
-        }
+        Args:
+            stock_data (dict): Stock data
+            
+        Returns:
+            list: (kind, key) dependencies for the prediction cache
+        """
+        return [
+            (DEPENDENCY_PRICE, stock_data["symbol"]),
+            (DEPENDENCY_INDICATORS, stock_data["symbol"]),
+            (DEPENDENCY_SECTOR_MOMENTUM, stock_data["sector"]),
+            (DEPENDENCY_FACTOR_WEIGHTS, None),
+            (DEPENDENCY_CORRELATIONS, None),
+            (DEPENDENCY_ACCURACY, None)
+        ]
+    
+    def update_price(self, symbol, current_price, price_change_pct=None):
+        """
+        Update a stock's price, invalidating predictions that used it
         
-        # Market sentiment factor
-        # In a real implementation, this would use news sentiment analysis
-        sentiment_mapping = {
-            "Materials": random.randint(60, 85) if sector_data.get("current_momentum") == "positive" else random.randint(30, 59),
-            "Consumer Staples": random.randint(45, 65),
-            "Healthcare": random.randint(50, 75),
-            "Financials": random.randint(40, 60),
-            "Information Technology": random.randint(30, 70),
-            "Industrials": random.randint(40, 60),
-            "Utilities": random.randint(45, 55),
-            "Energy": random.randint(50, 80) if sector_data.get("current_momentum") == "positive" else random.randint(30, 60)
-        }
+        Args:
+            symbol (str): Stock symbol
+            current_price (float): New price
+            price_change_pct (float, optional): New daily change percentage
+            
+        Returns:
+            bool: True if the stock exists
+        """
+        return self.update_prices({symbol: (current_price, price_change_pct)}) == 1
+    
+    @traced("update_prices")
+    def update_prices(self, updates):
+        """
+        Update the prices of several stocks, recomputing only their rows
         
-        sentiment_score = sentiment_mapping.get(stock_data["sector"], 50)
-        # Adjust based on stock-specific factors
-        if stock_data["price_change_pct"] > 3:
-            sentiment_score += 10
-        elif stock_data["price_change_pct"] < -3:
-            sentiment_score -= 10
+        Price targets follow the new prices when predictions are next read.
+        A daily change crossing the sentiment threshold moves the stock's
+        market sentiment score, and only stocks whose movement, confidence
+        or direction changed as a result are pushed to the rankings and
+        sector aggregates.
+        
+        Args:
+            updates (dict): Symbol -> current_price, or (current_price,
+                price_change_pct) where price_change_pct may be None
+                
+        Returns:
+            int: Stocks updated; unknown symbols are skipped
+        """
+        symbols = []
+        rows = []
+        prices = []
+        changes = []
+        for symbol, update in updates.items():
+            row = self.stocks.lookup(symbol)
+            if row is None:
+                continue
+            current_price, price_change_pct = update if isinstance(update, (tuple, list)) else (update, None)
+            symbols.append(symbol)
+            rows.append(row)
+            prices.append(current_price)
+            changes.append(price_change_pct)
             
-        sentiment_score = max(0, min(100, sentiment_score))
+        if not rows:
+            return 0
         
-        market_sentiment = {
-            "score": sentiment_score,
-            "news_sentiment": "positive" if sentiment_score > 60 else "negative" if sentiment_score < 40 else "neutral",
-            "social_media_sentiment": "positive" if sentiment_score > 65 else "negative" if sentiment_score < 35 else "neutral",
-            "recent_price_action": "positive" if stock_data["price_change_pct"] > 0 else "negative"
-        }
+        rows = np.array(rows, dtype=np.int64)
+        changes = np.array(changes, dtype=np.float64)
+        old_changes = self.stocks["price_change_pct"][rows]
         
-        # Sector momentum factor
-        momentum_mapping = {
-            "positive": random.randint(65, 90),
-            "neutral": random.randint(40, 65),
-            "negative": random.randint(10, 40)
-        }
+        self.stocks.set_values(rows, "current_price", prices)
+        known = ~np.isnan(changes)
+        if known.any():
+            self.stocks.set_values(rows[known], "price_change_pct", changes[known])
+            
+        self._prediction_rows_changed(self._apply_price_changes(rows, old_changes))
         
-        sector_momentum_score = momentum_mapping.get(sector_data.get("current_momentum", "neutral"), 50)
+        for symbol in symbols:
+            self.prediction_cache.invalidate(DEPENDENCY_PRICE, symbol)
+        self.data_version += 1
+        return len(rows)
+    
+    def _apply_price_changes(self, rows, old_changes):
+        """
+        Move market sentiment scores by the change in their daily price move
+        adjustment
         
-        sector_momentum = {
-            "score": sector_momentum_score,
-            "sector_trend": sector_data.get("current_momentum", "neutral"),
-            "relative_strength": "strong" if sector_momentum_score > 70 else "weak" if sector_momentum_score < 30 else "average",
-            "sector_rotation_phase": "early" if sector_momentum_score > 75 else "late" if sector_momentum_score < 25 else "middle"
-        }
+        Args:
+            rows (numpy.ndarray): Stock rows
+            old_changes (numpy.ndarray): Daily change percentages before the
+                update, one per row
+                
+        Returns:
+            numpy.ndarray: Rows whose factor scores changed
+        """
+        if self.factor_matrix is None:
+            return rows[:0]
         
-        # Currency impact factor
-        # In a real implementation, this would use actual currency data and correlations
-        currency_impact_score = 50
-        if stock_data["us_revenue_pct"] > 20:
-            # Higher score means AUD/USD movement is favorable for the stock
-            currency_impact_score += random.randint(10, 25)
-        elif stock_data["china_revenue_pct"] > 40:
-            currency_impact_score += random.randint(5, 15)
-            
-        currency_impact_score = max(0, min(100, currency_impact_score))
-        
-        currency_impact = {
-            "score": currency_impact_score,
-            "aud_usd_correlation": "positive" if currency_impact_score > 60 else "negative" if currency_impact_score < 40 else "neutral",
-            "fx_amplification": "high" if abs(currency_impact_score - 50) > 25 else "medium" if abs(currency_impact_score - 50) > 10 else "low",
-            "currency_trend_alignment": "aligned" if currency_impact_score > 60 else "contrary" if currency_impact_score < 40 else "neutral"
-        }
+        adjustment = (price_change_adjustment(self.stocks["price_change_pct"][rows]) -
+                      price_change_adjustment(old_changes))
+        moved = adjustment != 0
+        self.factor_matrix[rows[moved], FACTOR_NAMES.index("market_sentiment")] += adjustment[moved]
+        return rows[moved]
+    
+    def start_repricing(self, source=None, window=0.05, max_delay=0.5, executor=None):
+        """
+        Reprice stocks from live ticks, applying each burst as one batch
         
-        # Historical patterns factor
-        # In a real implementation, this would analyze actual historical data
-        historical_score = 50
+        Args:
+            source (RealTimeDataIntegration, optional): Quote stream to
+                subscribe to; ticks can also be submitted to the repricer
+            window (float, optional): Seconds without ticks before a burst
+                is applied
+            max_delay (float, optional): Longest a tick waits under a
+                continuous stream, in seconds
+            executor (concurrent.futures.Executor, optional): Executor that
+                owns this model, e.g. PredictionServer's
+                
+        Returns:
+            DebouncedRepricer: The running repricer
+        """
+        if self.repricer is None:
+            self.repricer = DebouncedRepricer(self, window, max_delay, executor)
+            self.repricer.start()
+        if source is not None:
+            self.repricer.attach(source)
+        return self.repricer
+    
+    def stop_repricing(self):
+        """
+        Stop repricing from live ticks, applying ticks still pending
+        """
+        if self.repricer is not None:
+            self.repricer.stop()
+            self.repricer = None
+    
+    def update_indicators(self, symbol, **indicators):
+        """
+        Update a stock's technical or volatility indicators, rescoring its
+        factors and invalidating predictions that used them
         
-        # Adjust based on stock characteristics
-        if stock_data["risk_profile"] in ["high", "very_high"]:
-            historical_score += random.randint(5, 15)
+        Args:
+            symbol (str): Stock symbol
+            **indicators: Column values, e.g. rsi, macd, bollinger_position,
+                beta, annualized_volatility
+                
+        Returns:
+            bool: True if the stock exists
+        """
+        row = self.stocks.lookup(symbol)
+        if row is None:
+            return False
         
-        if stock_data["beta"] > 1.5:
-            historical_score += random.randint(5, 15)
-        elif stock_data["beta"] < 0.8:
-            historical_score -= random.randint(5, 15)
+        for name, value in indicators.items():
+            self.stocks.set_value(row, name, value)
             
-        historical_score = max(0, min(100, historical_score))
+        self._rescore_rows(np.array([row]), indicators)
+        self.prediction_cache.invalidate(DEPENDENCY_INDICATORS, symbol)
+        self.data_version += 1
+        return True
+    
+    def set_sector_momentum(self, sector, momentum):
+        """
+        Change a sector's momentum, rescoring its stocks and invalidating
+        their predictions
         
-        historical_patterns = {
-            "score": historical_score,
-            "similar_tariff_events": "positive" if historical_score > 60 else "negative" if historical_score < 40 else "neutral",
-            "seasonal_patterns": "favorable" if historical_score > 65 else "unfavorable" if historical_score < 35 else "neutral",
-            "volatility_regime": "increasing" if stock_data["annualized_volatility"] > 30 else "decreasing" if stock_data["annualized_volatility"] < 20 else "stable"
-        }
+        Args:
+            sector (str): Sector name
+            momentum (str): "positive", "neutral" or "negative"
+        """
+        self.sector_mappings.setdefault(sector, {})["current_momentum"] = momentum
         
-        return {
-            "tariff_sensitivity": tariff_sensitivity,
-            "technical_indicators": technical_indicators,
-            "market_sentiment": market_sentiment,
-            "sector_momentum": sector_momentum,
-            "currency_impact": currency_impact,
-            "historical_patterns": historical_patterns
-        }
+        self._rescore_rows(np.flatnonzero(self.stocks.mask("sector", sector)), ["sector_momentum"])
+        self.prediction_cache.invalidate(DEPENDENCY_SECTOR_MOMENTUM, sector)
+        self.data_version += 1
     
-    def _calculate_overall_prediction(self, factors, timeframe):
+    def set_factor_weights(self, weights):
         """
-        Calculate overall prediction based on individual factors
+        Change factor weights, invalidating every cached prediction
+        
+        Args:
+            weights (dict): Factor name -> weight; unspecified factors keep
+                their current weight
         """
-        # Calculate weighted score
-        weighted_score = 0
-        for factor_name, factor_data in factors.items():
-            weighted_score += factor_data["score"] * self.factor_weights[factor_name]
-        
-        # Determine direction and confidence
-        direction = "bullish" if weighted_score > 50 else "bearish"
-        confidence_raw = abs(weighted_score - 50) * 2  # Convert to 0-100 scale
-        
-        # Adjust confidence based on timeframe
-        if timeframe == "short_term":
-            confidence_raw *= 0.9  # Less confident in short-term predictions
-        elif timeframe == "long_term":
-            confidence_raw *= 0.85  # Even less confident in long-term predictions
-            
-        confidence_score = round(confidence_raw)
-        
-        # Determine confidence level
-        confidence_level = "moderate"
-        for level, (min_val, max_val) in self.confidence_levels.items():
-            if min_val <= confidence_score <= max_val:
-                confidence_level = level
-                break
-        
-        # Calculate price target and movement percentage
-        base_movement_pct = (weighted_score - 50) / 10  # -5% to +5% for scores 0-100
-        
-        # Adjust movement based on stock volatility and timeframe
-        timeframe_multiplier = 1.0
-        if timeframe == "short_term":
-            timeframe_multiplier = 0.5
-        elif timeframe == "long_term":
-            timeframe_multiplier = 2.5
-            
-        # Find stock data to get current price and volatility
-        stock_data = None
-        for stock in self.stocks_data:
-            if "symbol" in factors.get("tariff_sensitivity", {}) and stock["symbol"] == factors["tariff_sensitivity"]["symbol"]:
-                stock_data = stock
-                break
-                
-        if not stock_data:
-            # Use first stock as fallback (this shouldn't happen in practice)
-            stock_data = self.stocks_data[0]
-            
-        volatility_factor = stock_data["annualized_volatility"] / 20  # Normalize volatility
+        self.factor_weights.update(weights)
+        self.prediction_cache.invalidate(DEPENDENCY_FACTOR_WEIGHTS)
+        self.prediction_indexes_current = False
+        self.data_version += 1
+    
+    def _rescore_rows(self, rows, inputs):
+        """
+        Recompute the factor scores of rows that depend on changed inputs and
+        update the rankings
         
-        # Calculate final movement percentage
-        movement_pct = base_movement_pct * volatility_factor * timeframe_multiplier
+        Only factors computed from the inputs are replaced, by their
+        deterministic (midpoint) scores; the other factors keep their draws.
         
-        # Ensure movement is significant enough for high-risk trading
-        if abs(movement_pct) < 5:
-            movement_pct *= (5 / abs(movement_pct)) if movement_pct != 0 else 5
-            
-        # Cap extreme movements
-        movement_pct = max(-30, min(30, movement_pct))
+        Args:
+            rows (numpy.ndarray): Stock rows
+            inputs (iterable): Changed inputs, as in FACTOR_INPUTS
+        """
+        if self.factor_matrix is None or len(rows) == 0:
+            return
         
-        # Calculate price target
-        current_price = stock_data["current_price"]
-        price_target = round(current_price * (1 + movement_pct / 100), 2)
+        inputs = set(inputs)
+        columns = [index for index, factor in enumerate(FACTOR_NAMES) if FACTOR_INPUTS[factor] & inputs]
+        if columns:
+            subset = {name: self.stocks[name][rows] for name in self.stocks.columns}
+            scores = compute_factor_matrix(subset, self.sector_mappings, None)
+            self.factor_matrix[np.ix_(rows, columns)] = scores[:, columns]
+        self._prediction_rows_changed(rows)
+    
+    def get_cache_stats(self):
+        """
+        Get prediction cache counters
         
-        return {
-            "direction": direction,
-            "confidence_score": confidence_score,
-            "confidence_level": confidence_level,
-            "price_target": price_target,
-            "movement_pct": round(movement_pct, 1),
-            "weighted_score": round(weighted_score, 1)
-        }
+        Returns:
+            dict: Cache size and hit/miss/eviction counts
+        """
+        return self.prediction_cache.stats()
     
-    def _generate_prediction_rationale(self, stock_data, factors, prediction):
+    def enable_tracing(self, enabled=True, reset=True):
         """
-        Generate detailed rationale for the prediction
+        Turn tracing spans and cache hit/miss counters on or off
+        
+        Args:
+            enabled (bool, optional): Trace subsequent calls
+            reset (bool, optional): Drop previously recorded spans
+        """
+        if reset:
+            self.tracer.reset()
+        self.tracer.enabled = enabled
+    
+    def get_trace_stats(self):
         """
-        direction = prediction["direction"]
-        confidence = prediction["confidence_level"]
-        movement_pct = prediction["movement_pct"]
+        Get traced stage and factor timings
         
-        # Create primary rationale based on most significant factors
-        # Sort factors by their weighted contribution
-        weighted_factors = []
-        for factor_name, factor_data in factors.items():
-            weighted_contribution = factor_data["score"] * self.factor_weights[factor_name]
-            weighted_factors.append((factor_name, factor_data, weighted_contribution))
-            
-        weighted_factors.sort(key=lambda x: x[2], reverse=True)
+        Returns:
+            dict: "spans" maps call paths (e.g.
+                "get_prediction/factors/technical_indicators") to count,
+                total, mean and max milliseconds; "counters" holds traced
+                prediction cache hits and misses; "cache" holds the
+                prediction cache's own counters
+        """
+        stats = self.tracer.stats()
+        stats["cache"] = self.get_cache_stats()
+        return stats
+    
+    def start_profiling(self, interval=None):
+        """
+        Start sampling the process's stacks
         
-        # Generate primary rationale from top 3 factors
-        primary_factors = weighted_factors[:3]
-        primary_rationale = []
+        Args:
+            interval (float, optional): Seconds between samples
+        """
+        self.profiler.start(interval)
+    
+    def stop_profiling(self, output_path=None):
+        """
+        Stop sampling and return the profile as collapsed stacks
         
-        for factor_name, factor_data, _ in primary_factors:
-            if factor_name == "tariff_sensitivity":
-                if factor_data["score"] > 70:
-                    primary_rationale.append(f"High tariff sensitivity ({factor_data['score']}%) with significant exposure to US ({factor_data['us_revenue_exposure']}% of revenue) and China ({factor_data['china_revenue_exposure']}% of revenue) markets")
-                elif factor_data["score"] > 40:
-                    primary_rationale.append(f"Moderate tariff sensitivity ({factor_data['score']}%) with exposure to US ({factor_data['us_revenue_exposure']}% of revenue) and China ({factor_data['china_revenue_exposure']}% of revenue) markets")
-                else:
-                    primary_rationale.append(f"Low tariff sensitivity ({factor_data['score']}%) with limited exposure to US ({factor_data['us_revenue_exposure']}% of revenue) and China ({factor_data['china_revenue_exposure']}% of revenue) markets")
+        Args:
+            output_path (str, optional): File to also write the profile to,
+                e.g. for flamegraph.pl or speedscope
+                
+        Returns:
+            str: Collapsed stacks, one "thread;frame;frame count" line each
+        """
+        return self.profiler.stop(output_path)
+    
+    def install_profiling_signal(self, signum=None, output_dir=None):
+        """
+        Toggle the sampling profiler with a signal: the first delivery starts
+        sampling, the next writes a timestamped .collapsed file and stops
+        
+        Must be called from the main thread.
+        
+        Args:
+            signum (int, optional): Signal number, SIGUSR2 by default
+            output_dir (str, optional): Directory for profiles, the working
+                directory if None
+        """
+        if output_dir is not None:
+            self.profiler.output_dir = output_dir
+        self.profiler.install_signal(signum)
+    
+    @traced("factors")
+    def _calculate_prediction_factors(self, stock_data, sector_data, factor_scores):
+        """
+        Calculate individual prediction factors
+        
+        Args:
+            stock_data (dict): Stock data
+            sector_data (dict): Sector characteristics
+            factor_scores (dict): Factor name -> score from the factor matrix
+        """
+        # Tariff sensitivity factor
+        with self.tracer.span("tariff_sensitivity"):
+            tariff_sensitivity = {
+                "score": stock_data["tariff_sensitivity"],
+                "us_revenue_exposure": stock_data["us_revenue_pct"],
+                "china_revenue_exposure": stock_data["china_revenue_pct"],
+                "impact": "high" if stock_data["tariff_sensitivity"] > 70 else "medium" if stock_data["tariff_sensitivity"] > 40 else "low"
+            }
+        
+        # Technical indicators factor
+        with self.tracer.span("technical_indicators"):
+            technical_score = int(factor_scores["technical_indicators"])
             
-            elif factor_name == "technical_indicators":
-                if factor_data["signal"] == "bullish":
-                    primary_rationale.append(f"Bullish technical indicators with RSI at {factor_data['rsi']}, positive MACD ({factor_data['macd']}), and favorable Bollinger Band position ({factor_data['bollinger_position']})")
-                elif factor_data["signal"] == "bearish":
-                    primary_rationale.append(f"Bearish technical indicators with RSI at {factor_data['rsi']}, negative MACD ({factor_data['macd']}), and unfavorable Bollinger Band position ({factor_data['bollinger_position']})")
-                else:
-                    primary_rationale.append(f"Neutral technical indicators with RSI at {factor_data['rsi']}, MACD at {factor_data['macd']}, and Bollinger Band position at {factor_data['bollinger_position']}")
+            technical_indicators = {
+                "score": technical_score,
+                "rsi": round(stock_data["rsi"], 1),
+                "macd": round(stock_data["macd"], 2),
+                "bollinger_position": round(stock_data["bollinger_position"], 2),
+                "signal": "bullish" if technical_score > 60 else "bearish" if technical_score < 40 else "neutral"
+            }
+        
+        # Market sentiment factor
+        # In a real implementation, this would use news sentiment analysis
+        with self.tracer.span("market_sentiment"):
+            sentiment_score = int(factor_scores["market_sentiment"])
             
-            elif factor_name == "market_sentiment":
-                if factor_data["news_sentiment"] == "positive" and factor_data["social_media_sentiment"] == "positive":
-                    primary_rationale.append(f"Strong positive market sentiment from both news and social media sources")
-                elif factor_data["news_sentiment"] == "negative" and factor_data["social_media_sentiment"] == "negative":
-                    primary_rationale.append(f"Strong negative market sentiment from both news and social media sources")
-                else:
-                    primary_rationale.append(f"Mixed market sentiment with {factor_data['news_sentiment']} news coverage and {factor_data['social_media_sentiment']} social media sentiment")
+            market_sentiment = {
+                "score": sentiment_score,
+                "news_sentiment": "positive" if sentiment_score > 60 else "negative" if sentiment_score < 40 else "neutral",
+                "social_media_sentiment": "positive" if sentiment_score > 65 else "negative" if sentiment_score < 35 else "neutral",
+                "recent_price_action": "positive" if stock_data["price_change_pct"] > 0 else "negative"
+            }
+        
+        # Sector momentum factor
+        with self.tracer.span("sector_momentum"):
+            sector_momentum_score = int(factor_scores["sector_momentum"])
             
-            elif factor_name == "sector_momentum":
-                if factor_data["sector_trend"] == "positive":
-                    primary_rationale.append(f"Strong positive momentum in the {stock_data['sector']} sector with {factor_data['relative_strength']} relative strength")
-                elif factor_data["sector_trend"] == "negative":
-                    primary_rationale.append(f"Negative momentum in the {stock_data['sector']} sector with {factor_data['relative_strength']} relative strength")
-                else:
-                    primary_rationale.append(f"Neutral momentum in the {stock_data['sector']} sector with {factor_data['relative_strength']} relative strength")
+            sector_momentum = {
+                "score": sector_momentum_score,
+                "sector_trend": sector_data.get("current_momentum", "neutral"),
+                "relative_strength": "strong" if sector_momentum_score > 70 else "weak" if sector_momentum_score < 30 else "average",
+                "sector_rotation_phase": "early" if sector_momentum_score > 75 else "late" if sector_momentum_score < 25 else "middle"
+            }
+        
+        # Currency impact factor
+        # Correlations are measured when a correlation engine is attached and
+        # inferred from the score otherwise
+        with self.tracer.span("currency_impact"):
+            currency_impact_score = int(factor_scores["currency_impact"])
             
-            elif factor_name == "currency_impact":
-                if factor_data["aud_usd_correlation"] == "positive" and factor_data["score"] > 60:
-                    primary_rationale.append(f"Favorable currency impact with positive AUD/USD correlation and {factor_data['fx_amplification']} FX amplification")
-                elif factor_data["aud_usd_correlation"] == "negative" and factor_data["score"] < 40:
-                    primary_rationale.append(f"Unfavorable currency impact with negative AUD/USD correlation and {factor_data['fx_amplification']} FX amplification")
-                else:
-                    primary_rationale.append(f"Neutral currency impact with {factor_data['aud_usd_correlation']} AUD/USD correlation")
+            currency_impact = {
+                "score": currency_impact_score,
+                "aud_usd_correlation": "positive" if currency_impact_score > 60 else "negative" if currency_impact_score < 40 else "neutral",
+                "fx_amplification": "high" if abs(currency_impact_score - 50) > 25 else "medium" if abs(currency_impact_score - 50) > 10 else "low",
+                "currency_trend_alignment": "aligned" if currency_impact_score > 60 else "contrary" if currency_impact_score < 40 else "neutral"
+            }
             
-            elif factor_name == "historical_patterns":
-                if factor_data["similar_tariff_events"] == "positive":
-                    primary_rationale.append(f"Historical patterns show positive performance during similar tariff events with {factor_data['seasonal_patterns']} seasonal patterns")
-                elif factor_data["similar_tariff_events"] == "negative":
-                    primary_rationale.append(f"Historical patterns show negative performance during similar tariff events with {factor_data['seasonal_patterns']} seasonal patterns")
-                else:
-                    primary_rationale.append(f"Historical patterns show mixed performance during similar tariff events with {factor_data['seasonal_patterns']} seasonal patterns")
+            if self.correlations is not None:
+                for name, pair in CURRENCY_CORRELATION_PAIRS.items():
+                    correlation = self.correlations.get(stock_data["symbol"], pair)
+                    if correlation is None:
+                        continue
+                    currency_impact[f"{name}_correlation"] = (
+                        "positive" if correlation > CORRELATION_LABEL_THRESHOLD
+                        else "negative" if correlation < -CORRELATION_LABEL_THRESHOLD else "neutral"
+                    )
+                    currency_impact[f"{name}_correlation_value"] = round(correlation, 3)
         
-        # Generate summary rationale
-        if direction == "bullish":
-            if confidence in ["high", "very_high"]:
-                summary = f"Strong bullish outlook for {stock_data['name']} with projected {movement_pct}% upside potential. "
-            else:
-                summary = f"Moderately bullish outlook for {stock_data['name']} with projected {movement_pct}% upside potential. "
-        else:
-            if confidence in ["high", "very_high"]:
-                summary = f"Strong bearish outlook for {stock_data['name']} with projected {abs(movement_pct)}% downside risk. "
-            else:
-                summary = f"Moderately bearish outlook for {stock_data['name']} with projected {abs(movement_pct)}% downside risk. "
-                
-        # Add risk profile
-        risk_profile_text = f"As a {stock_data['risk_profile']} risk profile stock with {stock_data['annualized_volatility']}% annualized volatility and beta of {stock_data['beta']}, "
+        # Historical patterns factor
+        # In a real implementation, this would analyze actual historical data
+        with self.tracer.span("historical_patterns"):
+            historical_score = int(factor_scores["historical_patterns"])
+            
+            historical_patterns = {
+                "score": historical_score,
+                "similar_tariff_events": "positive" if historical_score > 60 else "negative" if historical_score < 40 else "neutral",
+                "seasonal_patterns": "favorable" if historical_score > 65 else "unfavorable" if historical_score < 35 else "neutral",
+                "volatility_regime": "increasing" if stock_data["annualized_volatility"] > 30 else "decreasing" if stock_data["annualized_volatility"] < 20 else "stable"
+            }
+            
+            if stock_data.get("risk_updated_ms"):
+                historical_patterns["beta"] = round(stock_data["beta"], 2)
+                historical_patterns["annualized_volatility"] = round(stock_data["annualized_volatility"], 1)
+                historical_patterns["risk_estimates_updated"] = datetime.fromtimestamp(
+                    stock_data["risk_updated_ms"] / 1000).isoformat()
         
-        if stock_data['risk_profile'] in ["high", "very_high"]:
-            if direction == "bullish":
-                risk_profile_text += f"it offers significant upside potential but requires careful risk management."
-            else:
-                risk_profile_text += f"it faces substantial downside risk in the current environment."
-        else:
-            if direction == "bullish":
-                risk_profile_text += f"it offers more moderate but potentially more reliable returns."
-            else:
-                risk_profile_text += f"it may experience less severe downside compared to higher-risk alternatives."
-        
-        # Combine all rationale components
-        full_rationale = {
-            "summary": summary + risk_profile_text,
-            "primary_factors": primary_rationale,
-            "additional_considerations": [
-                f"The stock has a {stock_data['market_cap']} market capitalization within the {stock_data['sector']} sector",
-                f"Current technical signals are {factors['technical_indicators']['signal']} with RSI at {factors['technical_indicators']['rsi']}",
-                f"The {stock_data['sector']} sector currently shows {factors['sector_momentum']['sector_trend']} momentum",
-                f"Currency effects are expected to have a {factors['currency_impact']['aud_usd_correlation']} impact on performance"
-            ],
-            "confidence_explanation": f"This prediction has {confidence} confidence ({prediction['confidence_score']}%) based on the consistency of signals across multiple factors and historical model accuracy of {self.historical_accuracy['overall'] * 100}% for similar predictions."
+        return {
+            "tariff_sensitivity": tariff_sensitivity,
+            "technical_indicators": technical_indicators,
+            "market_sentiment": market_sentiment,
+            "sector_momentum": sector_momentum,
+            "currency_impact": currency_impact,
+            "historical_patterns": historical_patterns
         }
+    
+    @traced("rationale")
+    def _generate_prediction_rationale(self, stock_data, factors, prediction, factor_weights, overall_accuracy):
+        """
+        Generate detailed rationale for the prediction
         
-        return full_rationale
+        The factor weights and accuracy quoted are the ones current when the
+        prediction was made, however late the rationale is rendered.
+        """
+        return render_rationale(stock_data, factors, prediction, factor_weights, overall_accuracy)
     
+    @traced("get_all_predictions")
     def get_all_predictions(self, timeframe="medium_term", sector=None, min_movement=10, risk_profile=None, limit=10):
         """
         Get predictions for multiple stocks with filtering options
@@ -567,34 +1239,123 @@ class StockPredictionModel:
         Returns:
             list: List of prediction data with rationale
         """
-        predictions = []
-        
-        # Filter stocks by sector and risk profile if specified
-        filtered_stocks = self.stocks_data
+        sector_code = risk_code = None
         
         if sector:
-            filtered_stocks = [s for s in filtered_stocks if s["sector"] == sector]
+            sector_code = self.stocks.code("sector", sector)
+            if sector_code is None:
+                return []
             
         if risk_profile:
-            filtered_stocks = [s for s in filtered_stocks if s["risk_profile"] == risk_profile]
+            risk_code = self.stocks.code("risk_profile", risk_profile)
+            if risk_code is None:
+                return []
+        
+        # Top rows by absolute movement (descending, ties in universe order)
+        # from the maintained ranking index
+        self._update_prediction_indexes()
+        rows = self.rankings.top(timeframe, limit, min_movement, sector_code, risk_code)
         
-        # Get predictions for filtered stocks
-        for stock in filtered_stocks:
-            prediction = self.get_prediction(stock["symbol"], timeframe)
+        # Only the returned rows are materialized into full predictions,
+        # reusing cached ones
+        predictions = {}
+        missing = []
+        for row in rows:
+            cached = self.prediction_cache.get((self.stocks["symbol"][row], timeframe))
+            if cached is not None:
+                self.tracer.count("prediction_cache.hit")
+                predictions[row] = cached
+            else:
+                self.tracer.count("prediction_cache.miss")
+                missing.append(row)
+                
+        if missing:
+            batch = self._predict_rows(np.array(missing), [timeframe])
+            for column, row in enumerate(missing):
+                predictions[row] = self._materialize_prediction(row, timeframe, batch, 0, column)
+                
+        return [predictions[row] for row in rows]
+    
+    @traced("materialize_prediction")
+    def _materialize_prediction(self, row, timeframe, batch, timeframe_index, column):
+        """
+        Build a full prediction dict for one row of a batch result
+        
+        Args:
+            row (int): Stock row
+            timeframe (str): Prediction timeframe
+            batch (dict): Result of get_batch_predictions or _predict_rows
+            timeframe_index (int): Index of timeframe in the batch
+            column (int): Index of the row in the batch
             
-            # Filter by minimum movement
-            if abs(prediction["movement_pct"]) >= min_movement:
-                predictions.append(prediction)
+        Returns:
+            dict: Prediction data with rationale
+        """
+        stock_data, prediction_factors = self._shared_factors(row)
+        prediction = self._batch_prediction(batch, timeframe_index, column)
         
-        # Sort by absolute movement percentage (descending)
-        predictions.sort(key=lambda x: abs(x["movement_pct"]), reverse=True)
+        prediction_data = PredictionResult({
+            "symbol": stock_data["symbol"],
+            "name": stock_data["name"],
+            "sector": stock_data["sector"],
+            "current_price": stock_data["current_price"],
+            "timeframe": timeframe,
+            "prediction_horizon": self.prediction_horizon[timeframe],
+            "price_target": prediction["price_target"],
+            "movement_pct": prediction["movement_pct"],
+            "direction": prediction["direction"],
+            "confidence_score": prediction["confidence_score"],
+            "confidence_level": prediction["confidence_level"],
+            "factors": prediction_factors,
+            "rationale": None,
+            "timestamp": datetime.now().isoformat(),
+            "model_version": self.model_version
+        }, functools.partial(self._generate_prediction_rationale, stock_data, prediction_factors, prediction,
+                             dict(self.factor_weights), self.historical_accuracy["overall"]))
+        
+        self.prediction_cache.set((stock_data["symbol"], timeframe), prediction_data,
+                                  self._prediction_dependencies(stock_data))
         
-        # Apply limit
-        if limit and len(predictions) > limit:
-            predictions = predictions[:limit]
+        return prediction_data
+    
+    @staticmethod
+    def _batch_prediction(batch, timeframe_index, column):
+        """
+        Extract one stock's prediction for one timeframe from a batch result
+        
+        Args:
+            batch (dict): Result of get_batch_predictions or _predict_rows
+            timeframe_index (int): Index of the timeframe in the batch
+            column (int): Index of the stock in the batch
             
-        return predictions
+        Returns:
+            dict: direction, confidence_score, confidence_level,
+                price_target, movement_pct and weighted_score
+        """
+        return {
+            "direction": "bullish" if batch["bullish"][timeframe_index, column] else "bearish",
+            "confidence_score": int(batch["confidence_score"][timeframe_index, column]),
+            "confidence_level": batch["confidence_level_names"][batch["confidence_level"][timeframe_index, column]],
+            "price_target": float(batch["price_target"][timeframe_index, column]),
+            "movement_pct": float(batch["movement_pct"][timeframe_index, column]),
+            "weighted_score": round(float(batch["weighted_score"][column]), 1)
+        }
     
+    @traced("analyze_portfolios")
+    def analyze_portfolios(self, portfolios):
+        """
+        Aggregate expected moves, tariff and revenue exposure, sector
+        concentration and FX sensitivity over portfolios of holdings
+        
+        Args:
+            portfolios (dict): Portfolio name -> {symbol: quantity}
+            
+        Returns:
+            dict: Portfolio name -> aggregates, see PortfolioAnalyzer.analyze
+        """
+        return self.portfolios.analyze(portfolios)
+    
+    @traced("get_sector_predictions")
     def get_sector_predictions(self, timeframe="medium_term"):
         """
         Get aggregated predictions by sector
@@ -607,25 +1368,23 @@ class StockPredictionModel:
         """
         sector_predictions = {}
         
-        # Get unique sectors
-        sectors = set(stock["sector"] for stock in self.stocks_data)
+        # Aggregates are maintained incrementally, so this costs O(sectors)
+        self._update_prediction_indexes()
+        aggregates = self.sector_aggregates.snapshot(timeframe)
+        symbols = self.stocks["symbol"]
+        names = self.stocks["name"]
         
-        for sector in sectors:
-            # Get predictions for all stocks in this sector
-            sector_stocks = [s for s in self.stocks_data if s["sector"] == sector]
-            stock_predictions = []
-            
-            for stock in sector_stocks:
-                prediction = self.get_prediction(stock["symbol"], timeframe)
-                stock_predictions.append(prediction)
+        for sector_code, aggregate in sorted(aggregates.items()):
+            sector = self.stocks.categories["sector"][sector_code]
+            stock_count = aggregate["count"]
             
             # Calculate sector averages
-            avg_movement = sum(p["movement_pct"] for p in stock_predictions) / len(stock_predictions)
-            avg_confidence = sum(p["confidence_score"] for p in stock_predictions) / len(stock_predictions)
+            avg_movement = aggregate["movement_sum"] / stock_count
+            avg_confidence = aggregate["confidence_sum"] / stock_count
             
             # Determine overall sector direction
-            bullish_count = sum(1 for p in stock_predictions if p["direction"] == "bullish")
-            bearish_count = len(stock_predictions) - bullish_count
+            bullish_count = aggregate["bullish_count"]
+            bearish_count = stock_count - bullish_count
             sector_direction = "bullish" if bullish_count > bearish_count else "bearish" if bearish_count > bullish_count else "neutral"
             
             # Generate sector rationale
@@ -646,15 +1405,9 @@ class StockPredictionModel:
                 rationale += f"This mixed outlook reflects offsetting positive and negative factors across stocks in the sector."
             
             # Add top stock picks
-            top_bullish = [p for p in stock_predictions if p["direction"] == "bullish"]
-            top_bullish.sort(key=lambda x: x["movement_pct"], reverse=True)
-            
-            top_bearish = [p for p in stock_predictions if p["direction"] == "bearish"]
-            top_bearish.sort(key=lambda x: x["movement_pct"])
-            
             top_picks = {
-                "bullish": [{"symbol": p["symbol"], "name": p["name"], "movement_pct": p["movement_pct"]} for p in top_bullish[:3]],
-                "bearish": [{"symbol": p["symbol"], "name": p["name"], "movement_pct": p["movement_pct"]} for p in top_bearish[:3]]
+                "bullish": [{"symbol": symbols[row], "name": names[row], "movement_pct": movement} for movement, row in aggregate["top_bullish"]],
+                "bearish": [{"symbol": symbols[row], "name": names[row], "movement_pct": movement} for movement, row in aggregate["top_bearish"]]
             }
             
             sector_predictions[sector] = {
@@ -662,7 +1415,7 @@ class StockPredictionModel:
                 "direction": sector_direction,
                 "avg_movement_pct": round(avg_movement, 1),
                 "avg_confidence": round(avg_confidence),
-                "stock_count": len(stock_predictions),
+                "stock_count": stock_count,
                 "bullish_count": bullish_count,
                 "bearish_count": bearish_count,
                 "rationale": rationale,
@@ -674,6 +1427,7 @@ class StockPredictionModel:
             
         return sector_predictions
     
+    @traced("get_prediction_factors_importance")
     def get_prediction_factors_importance(self, symbol, timeframe="medium_term"):
         """
         Get detailed breakdown of prediction factors importance
@@ -735,52 +1489,156 @@ class StockPredictionModel:
             "timestamp": datetime.now().isoformat()
         }
     
+    def simulate_tariff_scenarios(self, n_scenarios=5000, horizon_days=21, confidence=0.95,
+                                  drawdown_thresholds=(5, 10, 20), macro_shocks=None, seed=None, workers=None):
+        """
+        Simulate correlated tariff, currency and sector momentum shocks across
+        the universe
+        
+        Args:
+            n_scenarios (int, optional): Number of Monte Carlo scenarios
+            horizon_days (int, optional): Horizon in trading days
+            confidence (float, optional): Value at risk confidence level
+            drawdown_thresholds (tuple, optional): Drawdown sizes in percent
+            macro_shocks (dict, optional): Shock overrides, e.g.
+                {"tariff_rate_change": {"mean": 10, "std": 5}}
+            seed (int, optional): Random seed for reproducible runs
+            workers (int, optional): Worker processes, one per CPU if None
+            
+        Returns:
+            dict: Distributional outcomes per stock and per sector
+        """
+        result = tariff_scenarios.simulate(
+            self.stocks,
+            self.stocks.columns["sector"],
+            self.stocks.categories["sector"],
+            self.sector_mappings,
+            n_scenarios=n_scenarios,
+            horizon_days=horizon_days,
+            confidence=confidence,
+            drawdown_thresholds=drawdown_thresholds,
+            macro_shocks=macro_shocks,
+            seed=seed,
+            workers=workers
+        )
+        
+        def summarize(stats, index):
+            return {
+                "expected_move_pct": round(float(stats["expected_move_pct"][index]), 2),
+                "volatility_pct": round(float(stats["volatility_pct"][index]), 2),
+                "var_pct": round(float(stats["var_pct"][index]), 2),
+                "expected_shortfall_pct": round(float(stats["expected_shortfall_pct"][index]), 2),
+                "drawdown_probability": {
+                    f"{threshold}%": round(float(stats["drawdown_probability"][i, index]), 4)
+                    for i, threshold in enumerate(drawdown_thresholds)
+                }
+            }
+        
+        return {
+            "scenarios": result["scenarios"],
+            "horizon_days": result["horizon_days"],
+            "confidence": result["confidence"],
+            "stocks": {symbol: summarize(result["stocks"], row) for row, symbol in enumerate(self.stocks["symbol"])},
+            "sectors": {sector: summarize(result["sectors"], code) for code, sector in enumerate(self.stocks.categories["sector"])},
+            "timestamp": datetime.now().isoformat(),
+            "model_version": self.model_version
+        }
+    
     def get_historical_accuracy_stats(self):
         """
         Get historical accuracy statistics for the prediction model
         
+        Accuracy is backtested against the recorded price history; the
+        pre-defined figures are returned when there is not enough history.
+        Backtests are cached against the history files and factor weights,
+        so repeated calls only rescore after either changed.
+        
         Returns:
             dict: Accuracy statistics
         """
-        # In a real implementation, this would calculate actual historical accuracy
-        # For demonstration, we'll return the pre-defined accuracy data
+        try:
+            backtest = self.backtester.run(self.stocks, self.sector_mappings, self.factor_weights, self.confidence_levels)
+        except Exception as e:
+            logger.error(f"Error backtesting predictions: {e}")
+            backtest = None
+            
+        if backtest is not None and backtest["overall_accuracy"] is not None:
+            stats, source = backtest, "backtest"
+        else:
+            # Not enough history to backtest; use the pre-defined accuracy data
+            stats, source = DEFAULT_ACCURACY_STATS, "default"
         
+        self._set_historical_accuracy(stats)
+        
+        return dict(copy.deepcopy(stats), source=source, timestamp=datetime.now().isoformat(),
+                    model_version=self.model_version)
+    
+    @staticmethod
+    def _accuracy_from_stats(stats):
+        """
+        Get the accuracy figures quoted in rationale text from accuracy stats
+        
+        Args:
+            stats (dict): Backtest result or DEFAULT_ACCURACY_STATS
+            
+        Returns:
+            dict: overall, by_confidence and by_sector accuracy
+        """
         return {
-            "overall_accuracy": self.historical_accuracy["overall"],
-            "by_confidence_level": self.historical_accuracy["by_confidence"],
-            "by_sector": {
-                "Materials": 0.75,
-                "Consumer Staples": 0.71,
-                "Healthcare": 0.68,
-                "Financials": 0.70,
-                "Information Technology": 0.65,
-                "Industrials": 0.72,
-                "Utilities": 0.76,
-                "Energy": 0.69
-            },
-            "by_timeframe": {
-                "short_term": 0.68,
-                "medium_term": 0.72,
-                "long_term": 0.64
-            },
-            "by_direction": {
-                "bullish": 0.74,
-                "bearish": 0.70
-            },
-            "by_movement_magnitude": {
-                "small (0-10%)": 0.75,
-                "medium (10-20%)": 0.72,
-                "large (20%+)": 0.65
-            },
-            "timestamp": datetime.now().isoformat(),
-            "model_version": self.model_version
+            "overall": stats["overall_accuracy"],
+            "by_confidence": dict(stats["by_confidence_level"]),
+            "by_sector": dict(stats["by_sector"])
         }
+    
+    def _set_historical_accuracy(self, stats):
+        """
+        Quote new accuracy figures, invalidating the predictions whose
+        rationale quoted the old ones
+        
+        Args:
+            stats (dict): Backtest result or DEFAULT_ACCURACY_STATS
+        """
+        accuracy = self._accuracy_from_stats(stats)
+        if accuracy == self.historical_accuracy:
+            return
+        
+        self.historical_accuracy = accuracy
+        self.prediction_cache.invalidate(DEPENDENCY_ACCURACY)
+        self.data_version += 1
+
+_prediction_model = None
+_prediction_model_lock = threading.Lock()
+
+
+def get_prediction_model():
+    """
+    Get the shared model instance, creating it on first use
+
+    Returns:
+        StockPredictionModel: Shared instance
+    """
+    global _prediction_model
+
+    if _prediction_model is None:
+        with _prediction_model_lock:
+            if _prediction_model is None:
+                _prediction_model = StockPredictionModel()
+
+    return _prediction_model
+
+
+def __getattr__(name):
+    # Keep "from stock_prediction_model import prediction_model" working
+    # without building the instance at import time
+    if name == 'prediction_model':
+        return get_prediction_model()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
-# Create a singleton instance
-prediction_model = StockPredictionModel()
 
 # Example usage
 if __name__ == "__main__":
+    prediction_model = get_prediction_model()
+
     # Get prediction for a specific stock
     bhp_prediction = prediction_model.get_prediction("BHP.AX", "medium_term")
     print(f"BHP.AX Prediction: {bhp_prediction['direction']} with {bhp_prediction['movement_pct']}% movement")
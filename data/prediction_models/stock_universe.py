@@ -0,0 +1,212 @@
+"""
+Stock Universe Table for Trump Tariff Analysis Website
+
+This module implements the columnar store behind StockPredictionModel's
+universe: numeric columns are NumPy arrays, sector / market_cap /
+risk_profile are categorical codes, and a hash index maps symbols to rows so
+lookups are O(1) and filters are boolean masks.
+"""
+
+try:
+    from ..lazy_imports import lazy_import
+except ImportError:
+    from lazy_imports import lazy_import
+
+# Heavy dependencies load on first use, keeping module import cheap
+np = lazy_import('numpy')
+
+CATEGORICAL_COLUMNS = ("sector", "market_cap", "risk_profile")
+STRING_COLUMNS = ("symbol", "name")
+# Integer columns; written values are rounded to the nearest integer rather
+# than truncated. RSI stays float so live readings keep their precision
+INTEGER_COLUMNS = ("tariff_sensitivity", "us_revenue_pct", "china_revenue_pct", "volume")
+
+
+class StockUniverseTable:
+    """
+    Columnar table of stock attributes with a symbol hash index
+    """
+
+    def __init__(self, columns):
+        """
+        Args:
+            columns (dict): Column name -> sequence of values, all equal length
+        """
+        self.columns = {}
+        self.categories = {}
+        self._category_codes = {}
+        self._decoded = {}
+
+        for name, values in columns.items():
+            if name in CATEGORICAL_COLUMNS:
+                categories, codes = np.unique(np.asarray(values, dtype=object).astype(str), return_inverse=True)
+                self.categories[name] = [str(value) for value in categories]
+                self._category_codes[name] = {value: code for code, value in enumerate(self.categories[name])}
+                self.columns[name] = codes.astype(np.int16)
+            elif name in STRING_COLUMNS:
+                self.columns[name] = np.asarray(values, dtype=object)
+            elif name in INTEGER_COLUMNS:
+                self.columns[name] = np.asarray(values, dtype=np.int64)
+            else:
+                self.columns[name] = np.asarray(values, dtype=np.float64)
+
+        self.index = {symbol: row for row, symbol in enumerate(self.columns["symbol"])}
+
+    @classmethod
+    def from_records(cls, records):
+        """
+        Build a table from row dicts
+
+        Args:
+            records (list): Dicts sharing the same keys
+
+        Returns:
+            StockUniverseTable: New table
+        """
+        if not records:
+            return cls({name: [] for name in STRING_COLUMNS + CATEGORICAL_COLUMNS})
+
+        return cls({name: [record[name] for record in records] for name in records[0]})
+
+    def __len__(self):
+        return len(self.columns["symbol"])
+
+    def __contains__(self, symbol):
+        return symbol in self.index
+
+    def __getitem__(self, name):
+        return self.column(name)
+
+    def lookup(self, symbol):
+        """
+        Get the row of a symbol
+
+        Args:
+            symbol (str): Stock symbol
+
+        Returns:
+            int: Row index or None if not in the table
+        """
+        return self.index.get(symbol)
+
+    def column(self, name):
+        """
+        Get a column, decoding categorical codes to values
+
+        Args:
+            name (str): Column name
+
+        Returns:
+            numpy.ndarray: Column values
+        """
+        if name not in CATEGORICAL_COLUMNS:
+            return self.columns[name]
+
+        decoded = self._decoded.get(name)
+        if decoded is None:
+            decoded = np.asarray(self.categories[name], dtype=object)[self.columns[name]]
+            self._decoded[name] = decoded
+        return decoded
+
+    def code(self, name, value):
+        """
+        Get the code of a category value
+
+        Args:
+            name (str): Categorical column
+            value (str): Category value
+
+        Returns:
+            int: Code or None if the value does not occur
+        """
+        return self._category_codes[name].get(value)
+
+    def mask(self, name, value):
+        """
+        Get a boolean mask of rows whose categorical column equals a value
+
+        Args:
+            name (str): Categorical column
+            value (str): Category value
+
+        Returns:
+            numpy.ndarray: Boolean mask
+        """
+        code = self.code(name, value)
+        if code is None:
+            return np.zeros(len(self), dtype=bool)
+        return self.columns[name] == code
+
+    def set_value(self, row, name, value):
+        """
+        Overwrite one cell of a numeric column
+
+        Args:
+            row (int): Row index
+            name (str): Numeric column
+            value (float): New value
+        """
+        if name in CATEGORICAL_COLUMNS or name in STRING_COLUMNS:
+            raise ValueError(f"Column {name} is not numeric")
+        if name in INTEGER_COLUMNS:
+            value = np.rint(value)
+        self.columns[name][row] = value
+
+    def set_values(self, rows, name, values):
+        """
+        Overwrite cells of a numeric column
+
+        Args:
+            rows (numpy.ndarray): Row indexes
+            name (str): Numeric column
+            values (numpy.ndarray): New values, one per row
+        """
+        if name in CATEGORICAL_COLUMNS or name in STRING_COLUMNS:
+            raise ValueError(f"Column {name} is not numeric")
+        if name in INTEGER_COLUMNS:
+            values = np.rint(values)
+        self.columns[name][rows] = values
+
+    def add_column(self, name, values):
+        """
+        Add or replace a numeric column
+
+        Args:
+            name (str): Column name
+            values (numpy.ndarray): One value per row
+        """
+        if name in CATEGORICAL_COLUMNS or name in STRING_COLUMNS:
+            raise ValueError(f"Column {name} is not numeric")
+        if name in INTEGER_COLUMNS:
+            self.columns[name] = np.rint(np.asarray(values, dtype=np.float64)).astype(np.int64)
+        else:
+            self.columns[name] = np.asarray(values, dtype=np.float64)
+
+    def row(self, row):
+        """
+        Get a row as a dict of Python values
+
+        Args:
+            row (int): Row index
+
+        Returns:
+            dict: Column name -> value
+        """
+        record = {}
+        for name, values in self.columns.items():
+            if name in CATEGORICAL_COLUMNS:
+                record[name] = self.categories[name][values[row]]
+            elif name in STRING_COLUMNS:
+                record[name] = values[row]
+            else:
+                record[name] = values[row].item()
+        return record
+
+    def records(self):
+        """
+        Get every row as a dict
+
+        Returns:
+            list: Row dicts in table order
+        """
+        return [self.row(row) for row in range(len(self))]
@@ -0,0 +1,412 @@
+"""
+Tariff Scenario Simulation for Trump Tariff Analysis Website
+
+This module implements a Monte Carlo engine for tariff shocks. Each scenario
+is a path of correlated shocks (US tariff rate changes, AUD/USD and AUD/CNY
+moves, and sector momentum shifts) that is propagated across the whole stock
+universe with NumPy array operations. Scenarios are split into fixed-size
+shards run on a process pool. Per-stock and per-sector outputs are
+distributional: expected move, volatility, value at risk, expected shortfall
+and the probability of drawdowns beyond given thresholds.
+
+Shard results are merged exactly: sums for moments, counts for drawdown
+probabilities, and each shard's lowest terminal returns for the tail (the
+global tail is always contained in the union of the shard tails).
+"""
+
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+
+# Macro shock order in the correlation matrix
+MACRO_SHOCKS = ["tariff_rate_change", "aud_usd", "aud_cny"]
+
+# Mean and standard deviation of each macro shock over REFERENCE_HORIZON_DAYS
+# trading days: tariff rate change in percentage points, FX moves in percent
+DEFAULT_MACRO_SHOCKS = {
+    "tariff_rate_change": {"mean": 2.0, "std": 5.0},
+    "aud_usd": {"mean": -0.5, "std": 3.0},
+    "aud_cny": {"mean": -0.3, "std": 2.5}
+}
+
+DEFAULT_MACRO_CORRELATION = np.array([
+    [1.0, -0.4, -0.5],
+    [-0.4, 1.0, 0.7],
+    [-0.5, 0.7, 1.0]
+])
+
+REFERENCE_HORIZON_DAYS = 21
+TRADING_DAYS_PER_YEAR = 252
+
+# Percent return per percentage point of tariff increase for a fully
+# tariff-sensitive stock with no trade exposure
+TARIFF_IMPACT_PER_POINT = 0.8
+
+# Sector momentum shift (percent over the reference horizon) by current
+# momentum and sector volatility label, and its correlation with the
+# tariff shock by sector tariff sensitivity
+SECTOR_SHIFT_MEAN = {"positive": 1.0, "neutral": 0.0, "negative": -1.0}
+SECTOR_SHIFT_STD = {"low": 2.0, "medium": 3.0, "high": 4.0, "very_high": 5.0}
+SECTOR_TARIFF_CORRELATION = {"low": -0.1, "medium": -0.3, "high": -0.5}
+
+# Share of sector shift variance common to all sectors
+SECTOR_COMMON_VARIANCE = 0.3
+
+DEFAULT_DRAWDOWN_THRESHOLDS = (5.0, 10.0, 20.0)
+
+# Scenarios per shard; fixed so results for a seed do not depend on the
+# number of workers
+DEFAULT_SHARD_SIZE = 1000
+
+# Upper bound on elements of the (scenarios, steps, stocks) block processed
+# at once inside a shard
+BLOCK_ELEMENTS = 4_000_000
+
+
+def stock_loadings(universe):
+    """
+    Get each stock's sensitivity to the macro shocks
+
+    Args:
+        universe (dict): Column arrays with tariff_sensitivity,
+            us_revenue_pct and china_revenue_pct
+
+    Returns:
+        numpy.ndarray: (3, stocks) percent return per unit of each macro shock
+    """
+    us_revenue = np.asarray(universe["us_revenue_pct"], dtype=np.float64) / 100
+    china_revenue = np.asarray(universe["china_revenue_pct"], dtype=np.float64) / 100
+    sensitivity = np.asarray(universe["tariff_sensitivity"], dtype=np.float64) / 100
+
+    return np.vstack([
+        -TARIFF_IMPACT_PER_POINT * sensitivity * (0.5 + us_revenue + china_revenue),
+        # A stronger AUD shrinks the AUD value of foreign revenue
+        -us_revenue,
+        -china_revenue
+    ])
+
+
+def sector_shift_parameters(sectors, sector_mappings):
+    """
+    Get sector momentum shift distributions
+
+    Args:
+        sectors (list): Sector names, in sector code order
+        sector_mappings (dict): Sector characteristics
+
+    Returns:
+        tuple: (mean, std, tariff_correlation) arrays over sectors
+    """
+    mean = np.zeros(len(sectors))
+    std = np.full(len(sectors), SECTOR_SHIFT_STD["medium"])
+    correlation = np.full(len(sectors), SECTOR_TARIFF_CORRELATION["medium"])
+
+    for code, sector in enumerate(sectors):
+        mapping = sector_mappings.get(sector, {})
+        mean[code] = SECTOR_SHIFT_MEAN.get(mapping.get("current_momentum"), 0.0)
+        std[code] = SECTOR_SHIFT_STD.get(mapping.get("volatility"), std[code])
+        correlation[code] = SECTOR_TARIFF_CORRELATION.get(mapping.get("tariff_sensitivity"), correlation[code])
+
+    return mean, std, correlation
+
+
+def simulate(universe, sector_codes, sectors, sector_mappings, n_scenarios=5000, horizon_days=21, steps=5,
+             confidence=0.95, drawdown_thresholds=DEFAULT_DRAWDOWN_THRESHOLDS, macro_shocks=None,
+             macro_correlation=None, seed=None, workers=None, shard_size=DEFAULT_SHARD_SIZE):
+    """
+    Run a tariff shock Monte Carlo simulation over a universe
+
+    Args:
+        universe (dict): Column arrays with tariff_sensitivity, us_revenue_pct,
+            china_revenue_pct, beta and annualized_volatility
+        sector_codes (numpy.ndarray): Sector code per stock
+        sectors (list): Sector names, in sector code order
+        sector_mappings (dict): Sector characteristics
+        n_scenarios (int, optional): Number of scenario paths
+        horizon_days (int, optional): Horizon in trading days
+        steps (int, optional): Path steps over the horizon, for drawdowns
+        confidence (float, optional): Value at risk confidence level
+        drawdown_thresholds (tuple, optional): Drawdown sizes in percent
+        macro_shocks (dict, optional): Overrides of DEFAULT_MACRO_SHOCKS
+        macro_correlation (numpy.ndarray, optional): 3x3 correlation of
+            MACRO_SHOCKS
+        seed (int, optional): Random seed; None for fresh entropy
+        workers (int, optional): Worker processes; None for one per CPU,
+            1 to run in this process
+        shard_size (int, optional): Scenarios per shard
+
+    Returns:
+        dict: "stocks" and "sectors" dicts of arrays (expected_move_pct,
+            volatility_pct, var_pct, expected_shortfall_pct and
+            drawdown_probability of shape (thresholds, n)), plus the
+            simulation parameters
+    """
+    shocks = {name: dict(params) for name, params in DEFAULT_MACRO_SHOCKS.items()}
+    for name, params in (macro_shocks or {}).items():
+        shocks[name].update(params)
+
+    correlation = DEFAULT_MACRO_CORRELATION if macro_correlation is None else np.asarray(macro_correlation)
+
+    # Scale reference-horizon shocks to the horizon, then to one step
+    horizon_scale = horizon_days / REFERENCE_HORIZON_DAYS
+    macro_mean = np.array([shocks[name]["mean"] for name in MACRO_SHOCKS]) * horizon_scale / steps
+    macro_std = np.array([shocks[name]["std"] for name in MACRO_SHOCKS]) * math.sqrt(horizon_scale / steps)
+
+    sector_mean, sector_std, sector_correlation = sector_shift_parameters(sectors, sector_mappings)
+
+    volatility = np.asarray(universe["annualized_volatility"], dtype=np.float64)
+
+    model = {
+        "macro_mean": macro_mean,
+        "macro_std": macro_std,
+        "macro_cholesky": np.linalg.cholesky(correlation),
+        "sector_mean": sector_mean * horizon_scale / steps,
+        "sector_std": sector_std * math.sqrt(horizon_scale / steps),
+        "sector_correlation": sector_correlation,
+        "loadings": stock_loadings(universe),
+        "beta": np.asarray(universe["beta"], dtype=np.float64),
+        "idiosyncratic_std": volatility * math.sqrt(horizon_days / TRADING_DAYS_PER_YEAR / steps),
+        "sector_codes": np.asarray(sector_codes),
+        "sector_count": len(sectors),
+        "steps": steps,
+        "thresholds": np.asarray(drawdown_thresholds, dtype=np.float64),
+        "tail_size": max(1, math.ceil(round((1 - confidence) * n_scenarios, 9)))
+    }
+
+    shard_counts = [shard_size] * (n_scenarios // shard_size)
+    if n_scenarios % shard_size:
+        shard_counts.append(n_scenarios % shard_size)
+
+    seeds = np.random.SeedSequence(seed).spawn(len(shard_counts))
+    tasks = [(model, count, shard_seed) for count, shard_seed in zip(shard_counts, seeds)]
+
+    workers = os.cpu_count() if workers is None else workers
+    if workers <= 1 or len(tasks) == 1:
+        results = [simulate_shard(task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers, len(tasks))) as executor:
+            results = list(executor.map(simulate_shard, tasks))
+
+    return {
+        "scenarios": n_scenarios,
+        "horizon_days": horizon_days,
+        "steps": steps,
+        "confidence": confidence,
+        "drawdown_thresholds": list(drawdown_thresholds),
+        "stocks": _merge_stock_results(results, n_scenarios, model["tail_size"]),
+        "sectors": _summarize_paths(
+            np.concatenate([result["sector_returns"] for result in results]),
+            np.concatenate([result["sector_drawdowns"] for result in results]),
+            confidence,
+            model["thresholds"]
+        )
+    }
+
+
+def simulate_shard(task):
+    """
+    Simulate one shard of scenarios
+
+    Args:
+        task (tuple): (model, scenario count, numpy.random.SeedSequence)
+
+    Returns:
+        dict: Per-stock return sums, squared sums, drawdown counts and
+            lowest terminal returns, plus per-scenario sector returns and
+            drawdowns
+    """
+    model, count, seed = task
+    rng = np.random.default_rng(seed)
+
+    stock_count = model["loadings"].shape[1]
+    steps = model["steps"]
+    codes = model["sector_codes"]
+    sector_count = model["sector_count"]
+    thresholds = model["thresholds"]
+    tail_size = model["tail_size"]
+
+    # Stock paths are float32; percent-level returns need nothing finer
+    loadings = model["loadings"].astype(np.float32)
+    beta = model["beta"].astype(np.float32)
+    idiosyncratic_std = model["idiosyncratic_std"].astype(np.float32)
+    # A drawdown of at least t% means value / peak <= 1 - t / 100
+    ratio_limits = (1 - thresholds / 100).astype(np.float32)
+
+    members = np.zeros((stock_count, sector_count), dtype=np.float32)
+    members[np.arange(stock_count), codes] = 1
+    sizes = members.sum(axis=0)
+    members /= np.where(sizes > 0, sizes, 1)
+
+    block = max(1, BLOCK_ELEMENTS // max(1, steps * stock_count))
+
+    return_sum = np.zeros(stock_count)
+    return_squares = np.zeros(stock_count)
+    drawdown_counts = np.zeros((len(thresholds), stock_count), dtype=np.int64)
+    tail = np.empty((0, stock_count), dtype=np.float32)
+    pending = []
+    pending_rows = 0
+    sector_returns = []
+    sector_drawdowns = []
+
+    for start in range(0, count, block):
+        size = min(block, count - start)
+
+        # Correlated macro shocks per step: (size, steps, 3)
+        macro = rng.standard_normal((size, steps, len(MACRO_SHOCKS))) @ model["macro_cholesky"].T
+        macro = model["macro_mean"] + macro * model["macro_std"]
+
+        # Sector shifts load on the tariff shock, a factor common to all
+        # sectors and their own noise: (size, steps, sectors)
+        tariff_z = (macro[..., :1] - model["macro_mean"][0]) / model["macro_std"][0]
+        common = rng.standard_normal((size, steps, 1))
+        own = rng.standard_normal((size, steps, sector_count))
+        rho = model["sector_correlation"]
+        residual = np.sqrt(1 - rho ** 2)
+        sector_z = rho * tariff_z + residual * (
+            math.sqrt(SECTOR_COMMON_VARIANCE) * common + math.sqrt(1 - SECTOR_COMMON_VARIANCE) * own
+        )
+        sector_shift = (model["sector_mean"] + sector_z * model["sector_std"]).astype(np.float32)
+
+        # Stock step returns in percent: (size, steps, stocks)
+        values = rng.standard_normal((size, steps, stock_count), dtype=np.float32)
+        values *= idiosyncratic_std
+        values += macro.astype(np.float32) @ loadings
+        values += beta * sector_shift[..., codes]
+
+        # Value paths, in place
+        np.maximum(values, -99.0, out=values)
+        values /= 100
+        values += 1
+        np.cumprod(values, axis=1, out=values)
+
+        terminal = (values[:, -1] - 1) * 100
+        return_sum += terminal.sum(axis=0, dtype=np.float64)
+        return_squares += np.square(terminal, dtype=np.float64).sum(axis=0)
+
+        pending.append(terminal)
+        pending_rows += size
+        if pending_rows >= max(tail_size, 256):
+            tail = _lowest(np.concatenate([tail] + pending), tail_size)
+            pending = []
+            pending_rows = 0
+
+        # Equal-weight sector portfolios, before the paths are overwritten
+        sector_values = values @ members
+        sector_returns.append((sector_values[:, -1] - 1) * 100)
+        sector_drawdowns.append(_max_drawdown(sector_values))
+
+        drawdown_counts += (_min_peak_ratio(values)[None] <= ratio_limits[:, None, None]).sum(axis=1)
+
+    if pending:
+        tail = _lowest(np.concatenate([tail] + pending), tail_size)
+
+    return {
+        "return_sum": return_sum,
+        "return_squares": return_squares,
+        "drawdown_counts": drawdown_counts,
+        "tail": tail,
+        "sector_returns": np.concatenate(sector_returns).astype(np.float64),
+        "sector_drawdowns": np.concatenate(sector_drawdowns).astype(np.float64)
+    }
+
+
+def _min_peak_ratio(values):
+    """
+    Get the lowest value-to-running-peak ratio of paths, overwriting values
+
+    Args:
+        values (numpy.ndarray): (scenarios, steps, n) values relative to a
+            start of 1; used as scratch space
+
+    Returns:
+        numpy.ndarray: (scenarios, n) lowest ratio
+    """
+    peaks = np.maximum.accumulate(values, axis=1)
+    np.maximum(peaks, 1.0, out=peaks)
+    np.divide(values, peaks, out=values)
+    return values.min(axis=1)
+
+
+def _max_drawdown(values):
+    """
+    Get the largest peak-to-trough fall of value paths
+
+    Args:
+        values (numpy.ndarray): (scenarios, steps, n) values relative to a
+            start of 1
+
+    Returns:
+        numpy.ndarray: (scenarios, n) drawdown in percent
+    """
+    return (1 - _min_peak_ratio(values.copy())) * 100
+
+
+def _lowest(returns, k):
+    """
+    Keep the k lowest values of each column
+
+    Args:
+        returns (numpy.ndarray): (scenarios, n) returns
+        k (int): Values to keep
+
+    Returns:
+        numpy.ndarray: (min(k, scenarios), n) unordered lowest values
+    """
+    if len(returns) <= k:
+        return returns
+    return np.partition(returns, k - 1, axis=0)[:k]
+
+
+def _merge_stock_results(results, n_scenarios, tail_size):
+    """
+    Combine shard results into per-stock statistics
+
+    Args:
+        results (list): simulate_shard results
+        n_scenarios (int): Total scenarios
+        tail_size (int): Scenarios in the value at risk tail
+
+    Returns:
+        dict: Arrays over stocks
+    """
+    return_sum = sum(result["return_sum"] for result in results)
+    return_squares = sum(result["return_squares"] for result in results)
+    drawdown_counts = sum(result["drawdown_counts"] for result in results)
+    tail = np.sort(_lowest(np.concatenate([result["tail"] for result in results]), tail_size), axis=0)
+
+    mean = return_sum / n_scenarios
+    variance = np.maximum(return_squares / n_scenarios - mean ** 2, 0)
+
+    return {
+        "expected_move_pct": mean,
+        "volatility_pct": np.sqrt(variance),
+        "var_pct": -tail[-1].astype(np.float64),
+        "expected_shortfall_pct": -tail.mean(axis=0, dtype=np.float64),
+        "drawdown_probability": drawdown_counts / n_scenarios
+    }
+
+
+def _summarize_paths(terminal, drawdown, confidence, thresholds):
+    """
+    Summarize complete per-scenario results
+
+    Args:
+        terminal (numpy.ndarray): (scenarios, n) terminal returns in percent
+        drawdown (numpy.ndarray): (scenarios, n) drawdowns in percent
+        confidence (float): Value at risk confidence level
+        thresholds (numpy.ndarray): Drawdown sizes in percent
+
+    Returns:
+        dict: Arrays over columns
+    """
+    tail_size = max(1, math.ceil(round((1 - confidence) * len(terminal), 9)))
+    tail = np.sort(_lowest(terminal, tail_size), axis=0)
+
+    return {
+        "expected_move_pct": terminal.mean(axis=0),
+        "volatility_pct": terminal.std(axis=0),
+        "var_pct": -tail[-1],
+        "expected_shortfall_pct": -tail.mean(axis=0),
+        "drawdown_probability": (drawdown[None] >= thresholds[:, None, None]).mean(axis=1)
+    }
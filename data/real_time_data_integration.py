@@ -5,16 +5,37 @@ This module implements real-time data integration with market APIs,
 websocket connections for streaming data, and automated refresh mechanisms.
 """
 
-import requests
-import websocket
 import json
 import time
 import threading
 import logging
 from datetime import datetime, timedelta
 import os
-import pandas as pd
-import numpy as np
+
+try:
+    from .lazy_imports import lazy_import
+    from .cache_persistence import CachePersistence, apply_record
+    from .history_retention import HistoryRetentionEngine
+    from .feature_store import FeatureStore
+    from .correlation_engine import CorrelationEngine
+    from .risk_estimators import RiskEstimator
+    from .service_metrics import MetricsRegistry, MetricsServer
+    from .symbol_registry import default_registry, KIND_STOCK, KIND_INDEX, KIND_FOREX
+    shared_quote_book = lazy_import('.shared_quote_book', __package__)
+except ImportError:
+    from lazy_imports import lazy_import
+    from cache_persistence import CachePersistence, apply_record
+    from history_retention import HistoryRetentionEngine
+    from feature_store import FeatureStore
+    from correlation_engine import CorrelationEngine
+    from risk_estimators import RiskEstimator
+    from service_metrics import MetricsRegistry, MetricsServer
+    from symbol_registry import default_registry, KIND_STOCK, KIND_INDEX, KIND_FOREX
+    shared_quote_book = lazy_import('shared_quote_book')
+
+# Heavy dependencies load on first use, keeping module import cheap
+np = lazy_import('numpy')
+pd = lazy_import('pandas')
 
 # Configure logging
 logging.basicConfig(
@@ -24,7 +45,12 @@ logging.basicConfig(
 logger = logging.getLogger('real_time_data')
 
 class RealTimeDataIntegration:
-    def __init__(self):
+    def __init__(self, data_dir=None):
+        """
+        Args:
+            data_dir (str, optional): Directory for the cache, snapshots and
+                historical files; defaults to data/real_time
+        """
         self.api_keys = self._load_api_keys()
         self.data_cache = {}
         self.cache_timestamps = {}
@@ -32,11 +58,46 @@ class RealTimeDataIntegration:
         self.refresh_threads = {}
         self.subscribers = {}
         self.is_running = False
-        self.data_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), '../data/real_time')
+        self.data_dir = data_dir or os.path.join(os.path.dirname(os.path.abspath(__file__)), '../data/real_time')
         
         # Create data directory if it doesn't exist
         os.makedirs(self.data_dir, exist_ok=True)
         
+        # Snapshot + WAL persistence for warm restarts; cache_lock keeps
+        # cache mutations and their WAL records in the same order
+        self.cache_lock = threading.RLock()
+        self.persistence = CachePersistence(
+            self.data_dir,
+            fsync_policy='interval',  # 'always', 'interval' or 'never'
+            fsync_interval=1.0,
+            snapshot_interval=300     # 5 minutes
+        )
+        self.cache_restored = False
+        
+        # Tiered retention of historical ticks: raw -> 1-minute -> daily bars
+        self.retention = HistoryRetentionEngine(
+            os.path.join(self.data_dir, 'historical'),
+            raw_retention_days=2,
+            minute_retention_days=30,
+            compaction_interval=3600,                 # 1 hour
+            io_budget_bytes_per_sec=5 * 1024 * 1024,  # 5 MB/s
+            storage_format='csv',                     # 'csv' or compressed 'tsc'
+            tick_block_size=256
+        )
+        
+        # Shared memory quote book, set when this process is the ingest publisher
+        self.quote_book = None
+        self._quote_book_callbacks = {}
+        
+        # Per-stock prediction features maintained from the streams, created
+        # on demand and snapshotted next to the cache
+        self.feature_store = None
+        
+        # Streaming stock/FX and stock/index correlations, and beta and
+        # volatility estimates from the same bars, created on demand
+        self.correlation_engine = None
+        self.risk_estimator = None
+        
         # Define API endpoints
         self.api_endpoints = {
             'market_indices': 'https://api.marketdata.app/v1/stocks/quotes/',
@@ -61,34 +122,12 @@ class RealTimeDataIntegration:
             'economic_indicators': 3600  # 1 hour
         }
         
-        # Define ASX stocks to track
-        self.asx_stocks = [
-            'BHP.AX', 'RIO.AX', 'FMG.AX', 'MIN.AX', 'S32.AX',  # Materials
-            'TWE.AX', 'A2M.AX', 'WES.AX', 'WOW.AX', 'COL.AX',  # Consumer Staples
-            'CSL.AX', 'RMD.AX', 'COH.AX',                      # Healthcare
-            'CBA.AX', 'NAB.AX', 'WBC.AX', 'ANZ.AX', 'MQG.AX',  # Financials
-            'WTC.AX', 'XRO.AX', 'APX.AX', 'ALU.AX',            # Information Technology
-            'TCL.AX', 'SYD.AX', 'QAN.AX',                      # Industrials
-            'AGL.AX', 'ORG.AX',                                # Utilities
-            'WPL.AX', 'STO.AX'                                 # Energy
-        ]
-        
-        # Define market indices to track
-        self.market_indices = [
-            '^AXJO',  # ASX 200
-            '^AORD',  # All Ordinaries
-            '^GSPC',  # S&P 500
-            '^DJI',   # Dow Jones
-            '^IXIC',  # NASDAQ
-            '^HSI',   # Hang Seng
-            '^N225',  # Nikkei 225
-            '^FTSE'   # FTSE 100
-        ]
-        
-        # Define forex pairs to track
-        self.forex_pairs = [
-            'AUD/USD', 'AUD/CNY', 'USD/CNY', 'AUD/JPY', 'AUD/EUR'
-        ]
+        # Tracked universe (ASX stocks, market indices, forex pairs) comes
+        # from the shared symbol registry
+        self.symbols = default_registry()
+        self.asx_stocks = self.symbols.symbols_of_kind(KIND_STOCK)
+        self.market_indices = self.symbols.symbols_of_kind(KIND_INDEX)
+        self.forex_pairs = self.symbols.symbols_of_kind(KIND_FOREX)
         
         # Define tariff news keywords
         self.tariff_keywords = [
@@ -96,6 +135,12 @@ class RealTimeDataIntegration:
             'Australia tariff', 'China tariff', 'trade tension', 'trade policy'
         ]
         
+        # Per-stage latency histograms, counters and gauges, exposed through
+        # stats() and optionally a local Prometheus endpoint
+        self.metrics = MetricsRegistry('rtd')
+        self.metrics_server = None
+        self._register_metrics()
+        
     def _load_api_keys(self):
         """
         Load API keys from environment variables or config file
@@ -119,11 +164,25 @@ class RealTimeDataIntegration:
             return
             
         logger.info("Starting real-time data integration")
+        
+        # Restore the last cached state before any network I/O
+        self._restore_cache()
+        
         self.is_running = True
         
         # Start data refresh threads
         self._start_refresh_threads()
         
+        # Start periodic cache snapshots
+        self.refresh_threads['cache_snapshot'] = threading.Thread(
+            target=self._snapshot_loop,
+            daemon=True
+        )
+        self.refresh_threads['cache_snapshot'].start()
+        
+        # Start background compaction of historical data
+        self.retention.start()
+        
         # Connect to websockets
         self._connect_to_websockets()
         
@@ -150,9 +209,360 @@ class RealTimeDataIntegration:
         for ws_name, ws in self.websocket_connections.items():
             logger.info(f"Closing {ws_name} websocket connection")
             ws.close()
+        
+        # Stop background compaction and write any buffered ticks
+        self.retention.stop()
+        self.retention.flush()
+        
+        # Detach the shared quote book; readers see it disappear on restart
+        self.stop_publishing_to_shared_memory()
+        
+        # Unsubscribe the feature store, writing its final snapshot, and the
+        # correlation engine
+        if self.feature_store is not None:
+            self.feature_store.detach()
+        if self.correlation_engine is not None:
+            self.correlation_engine.detach()
+        
+        self.stop_metrics_server()
+        
+        # Write a final snapshot so the next start is warm
+        self.snapshot_cache()
+        self.persistence.close()
+        
+        # The next start restores again, which reopens the WAL; the cache
+        # in memory still wins over the snapshot just written
+        self.cache_restored = False
             
         logger.info("Real-time data integration stopped successfully")
         
+    def _register_metrics(self):
+        """
+        Register the service's metric families
+        """
+        self.fetch_latency = self.metrics.histogram(
+            'fetch_latency', 'Time to fetch one batch of a data type', ('data_type',))
+        self.cache_update_latency = self.metrics.histogram(
+            'cache_update_latency', 'Time to apply an update to the data cache', ('data_type',))
+        self.dispatch_latency = self.metrics.histogram(
+            'dispatch_latency', 'Time to notify every subscriber of an update', ('data_type',))
+        self.persistence_latency = self.metrics.histogram(
+            'persistence_latency', 'Time to persist an update', ('target',))
+        
+        self.message_count = self.metrics.counter('messages', 'Websocket messages received', ('stream',))
+        self.error_count = self.metrics.counter('errors', 'Errors by pipeline stage', ('stage',))
+        self.drop_count = self.metrics.counter('drops', 'Messages or records dropped', ('reason',))
+        
+        self.metrics.gauge(
+            'pending_history_ticks', 'Ticks buffered and not yet written to history files',
+            lambda: self.retention.pending_tick_count())
+        self.metrics.gauge(
+            'wal_sequence', 'Sequence number of the last write-ahead log record',
+            lambda: self.persistence.wal.sequence)
+        self.metrics.gauge(
+            'subscribers', 'Subscriber callbacks per data type',
+            lambda: {data_type: len(callbacks) for data_type, callbacks in list(self.subscribers.items())},
+            ('data_type',))
+        self.metrics.gauge(
+            'data_age_seconds', 'Seconds since each data type was last cached',
+            lambda: {data_type: self.get_data_age(data_type) for data_type in list(self.cache_timestamps)},
+            ('data_type',))
+        
+    def start_metrics_server(self, host='127.0.0.1', port=9464):
+        """
+        Serve metrics over HTTP: /metrics in the Prometheus text format and
+        /stats as JSON
+        
+        Args:
+            host (str, optional): Interface to bind; local only by default
+            port (int, optional): Port, 0 to pick a free one
+            
+        Returns:
+            int: Bound port
+        """
+        if self.metrics_server is None:
+            self.metrics_server = MetricsServer(self.metrics, host=host, port=port)
+            
+        return self.metrics_server.start()
+        
+    def stop_metrics_server(self):
+        """
+        Stop the metrics HTTP endpoint
+        """
+        if self.metrics_server is None:
+            return
+            
+        self.metrics_server.stop()
+        self.metrics_server = None
+        
+    def stats(self):
+        """
+        Get latency summaries, counters and gauges
+        
+        Returns:
+            dict: counters, gauges and histograms keyed by metric name, then
+                by label string (e.g. "data_type=stock_quotes"); latency
+                summaries hold count, mean, p50/p90/p99/p99.9 and max in
+                seconds
+        """
+        return self.metrics.stats()
+        
+    def publish_to_shared_memory(self, name=None):
+        """
+        Publish stock quotes, forex rates and market indices to a shared
+        memory quote book
+        
+        Run this in the single ingest process; other processes read the book
+        with SharedQuoteBookReader instead of starting their own fetch threads.
+        
+        Args:
+            name (str, optional): Shared memory segment name,
+                DEFAULT_BOOK_NAME if None
+            
+        Returns:
+            SharedQuoteBookPublisher: The publisher
+            
+        Raises:
+            FileExistsError: If another running process publishes the book
+        """
+        if self.quote_book is not None:
+            return self.quote_book
+            
+        self.quote_book = shared_quote_book.SharedQuoteBookPublisher(
+            name=name or shared_quote_book.DEFAULT_BOOK_NAME,
+            stock_capacity=max(4096, len(self.asx_stocks) * 2),
+            forex_capacity=max(64, len(self.forex_pairs) * 2),
+            index_capacity=max(64, len(self.market_indices) * 2)
+        )
+        
+        for data_type, value_field in [('stock_quotes', 'price'), ('forex_rates', 'rate'), ('market_indices', 'value')]:
+            callback = self._make_quote_book_callback(data_type, value_field)
+            self._quote_book_callbacks[data_type] = callback
+            self.subscribe(data_type, callback)
+            
+        logger.info(f"Publishing quotes to shared memory quote book {name}")
+        
+        return self.quote_book
+        
+    def stop_publishing_to_shared_memory(self):
+        """
+        Stop publishing to the shared memory quote book and unlink it
+        """
+        if self.quote_book is None:
+            return
+            
+        for data_type, callback in self._quote_book_callbacks.items():
+            self.unsubscribe(data_type, callback)
+        self._quote_book_callbacks = {}
+        
+        self.quote_book.close()
+        self.quote_book = None
+        
+    def get_feature_store(self, snapshot_interval=60):
+        """
+        Get the feature store fed by this integration's streams, creating,
+        restoring and subscribing it on first use
+        
+        Args:
+            snapshot_interval (float, optional): Seconds between feature
+                snapshots
+            
+        Returns:
+            FeatureStore: The attached feature store
+        """
+        if self.feature_store is None:
+            self.feature_store = FeatureStore(
+                snapshot_path=os.path.join(self.data_dir, 'features.npz'),
+                snapshot_interval=snapshot_interval
+            )
+            
+        self.feature_store.attach(self)
+        return self.feature_store
+        
+    def get_correlation_engine(self, bar_seconds=60, window=390, halflife=30):
+        """
+        Get the correlation engine fed by this integration's streams,
+        creating and subscribing it on first use
+        
+        Args:
+            bar_seconds (float, optional): Bar length returns are taken over
+            window (int, optional): Bars in the rolling window
+            halflife (float, optional): EWMA half-life in bars
+            
+        Returns:
+            CorrelationEngine: The attached engine
+        """
+        if self.correlation_engine is None:
+            self.correlation_engine = CorrelationEngine(
+                self.asx_stocks,
+                self.forex_pairs + self.market_indices,
+                bar_seconds=bar_seconds,
+                window=window,
+                halflife=halflife
+            )
+            
+        self.correlation_engine.attach(self)
+        return self.correlation_engine
+        
+    def get_risk_estimator(self, benchmark='^AXJO'):
+        """
+        Get the beta and volatility estimator fed by the correlation
+        engine's bars, creating both on first use
+        
+        Args:
+            benchmark (str, optional): Index betas are measured against
+            
+        Returns:
+            RiskEstimator: The estimator
+        """
+        if self.risk_estimator is None:
+            self.risk_estimator = RiskEstimator(self.get_correlation_engine(), benchmark)
+        return self.risk_estimator
+        
+    def _make_quote_book_callback(self, data_type, value_field):
+        """
+        Build a subscriber that forwards updates to the quote book
+        
+        Args:
+            data_type (str): Type of data
+            value_field (str): Field present only in single-entry updates
+            
+        Returns:
+            callable: Subscriber callback
+        """
+        def callback(data):
+            # Stream messages carry a single entry; refreshes carry a dict of entries
+            if value_field in data:
+                entries = [data]
+            else:
+                entries = list(data.values())
+                
+            self.quote_book.publish(data_type, entries)
+            
+        return callback
+        
+    def _restore_cache(self):
+        """
+        Restore data cache from the latest snapshot and write-ahead log
+        """
+        if self.cache_restored:
+            return
+            
+        start_time = time.perf_counter()
+        
+        try:
+            started = time.perf_counter_ns()
+            data_cache, cache_timestamps = self.persistence.restore()
+            self.persistence_latency.labels('restore').record(time.perf_counter_ns() - started)
+            
+            with self.cache_lock:
+                # Anything fetched before restore wins over persisted state
+                for data_type, value in data_cache.items():
+                    self.data_cache.setdefault(data_type, value)
+                for data_type, cache_time in cache_timestamps.items():
+                    self.cache_timestamps.setdefault(data_type, cache_time)
+                    
+            self.cache_restored = True
+            
+            elapsed_ms = (time.perf_counter() - start_time) * 1000
+            logger.info(f"Restored {len(data_cache)} cached data types in {elapsed_ms:.1f} ms")
+            
+        except Exception as e:
+            self.error_count.labels('restore').inc()
+            logger.error(f"Error restoring data cache: {e}")
+            
+    def snapshot_cache(self):
+        """
+        Write a snapshot of the data cache and truncate the write-ahead log
+        """
+        if not self.cache_restored:
+            return
+            
+        try:
+            started = time.perf_counter_ns()
+            
+            with self.cache_lock:
+                captured = self.persistence.capture(self.data_cache, self.cache_timestamps)
+                
+            self.persistence.write_snapshot(captured)
+            
+            self.persistence_latency.labels('snapshot').record(time.perf_counter_ns() - started)
+            
+        except Exception as e:
+            self.error_count.labels('snapshot').inc()
+            logger.error(f"Error taking cache snapshot: {e}")
+            
+    def _snapshot_loop(self):
+        """
+        Continuous loop for writing cache snapshots at the snapshot interval
+        """
+        while self.is_running:
+            time.sleep(self.persistence.snapshot_interval)
+            
+            if not self.is_running:
+                break
+                
+            self.snapshot_cache()
+            
+    def _set_cache(self, data_type, value):
+        """
+        Replace a data type in the cache and log it to the WAL
+        
+        Args:
+            data_type (str): Type of data
+            value: New cached value
+        """
+        cache_time = time.time()
+        
+        with self.cache_lock:
+            started = time.perf_counter_ns()
+            self.data_cache[data_type] = value
+            self.cache_timestamps[data_type] = cache_time
+            updated = time.perf_counter_ns()
+            sequence = self.persistence.log(('set', data_type, value, cache_time))
+            logged = time.perf_counter_ns()
+            
+        self._record_cache_update(data_type, started, updated, logged, sequence)
+            
+    def _update_cache_item(self, data_type, key, fields):
+        """
+        Update a single keyed entry in the cache and log it to the WAL
+        
+        Args:
+            data_type (str): Type of data
+            key (str): Entry key (symbol or pair)
+            fields (dict): Fields to set on the entry
+        """
+        record = ('update', data_type, key, fields, time.time())
+        
+        with self.cache_lock:
+            started = time.perf_counter_ns()
+            apply_record(self.data_cache, self.cache_timestamps, record)
+            updated = time.perf_counter_ns()
+            sequence = self.persistence.log(record)
+            logged = time.perf_counter_ns()
+            
+        self._record_cache_update(data_type, started, updated, logged, sequence)
+        
+    def _record_cache_update(self, data_type, started, updated, logged, sequence):
+        """
+        Record the cache and WAL timings of an update
+        
+        Args:
+            data_type (str): Type of data
+            started (int): perf_counter_ns before the cache was updated
+            updated (int): perf_counter_ns after the cache was updated
+            logged (int): perf_counter_ns after the WAL write
+            sequence (int): WAL sequence of the record, None if not written
+        """
+        self.cache_update_latency.labels(data_type).record(updated - started)
+        
+        if sequence is None:
+            # Not restored yet or the log is closed; the update is lost on restart
+            self.drop_count.labels('wal_unavailable').inc()
+        else:
+            self.persistence_latency.labels('wal').record(logged - updated)
+        
     def _start_refresh_threads(self):
         """
         Start threads for periodic data refresh
@@ -211,6 +621,7 @@ class RealTimeDataIntegration:
         try:
             fetch_function()
         except Exception as e:
+            self.error_count.labels('refresh').inc()
             logger.error(f"Error in initial {data_type} fetch: {e}")
         
         # Continuous refresh loop
@@ -227,6 +638,7 @@ class RealTimeDataIntegration:
                 fetch_function()
                 
             except Exception as e:
+                self.error_count.labels('refresh').inc()
                 logger.error(f"Error in {data_type} refresh loop: {e}")
                 # Continue the loop despite errors
                 
@@ -306,6 +718,7 @@ class RealTimeDataIntegration:
                 self._handle_market_data_message(message)
                 
             except Exception as e:
+                self.error_count.labels('websocket').inc()
                 logger.error(f"Error in market data websocket simulator: {e}")
                 
         logger.info("Market data websocket simulator stopped")
@@ -359,6 +772,7 @@ class RealTimeDataIntegration:
                 self._handle_forex_stream_message(message)
                 
             except Exception as e:
+                self.error_count.labels('websocket').inc()
                 logger.error(f"Error in forex stream websocket simulator: {e}")
                 
         logger.info("Forex stream websocket simulator stopped")
@@ -370,30 +784,21 @@ class RealTimeDataIntegration:
         Args:
             message (dict): Websocket message
         """
+        self.message_count.labels('market_data').inc()
+        
         if message['type'] == 'trade':
             symbol = message['symbol']
             price = message['price']
             volume = message['volume']
             timestamp = message['timestamp']
             
-            # Update cache
-            if 'stock_quotes' not in self.data_cache:
-                self.data_cache['stock_quotes'] = {}
-                
-            if symbol not in self.data_cache['stock_quotes']:
-                self.data_cache['stock_quotes'][symbol] = {
-                    'symbol': symbol,
-                    'price': price,
-                    'volume': volume,
-                    'timestamp': timestamp
-                }
-            else:
-                self.data_cache['stock_quotes'][symbol]['price'] = price
-                self.data_cache['stock_quotes'][symbol]['volume'] = volume
-                self.data_cache['stock_quotes'][symbol]['timestamp'] = timestamp
-                
-            # Update cache timestamp
-            self.cache_timestamps['stock_quotes'] = time.time()
+            # Update cache and cache timestamp
+            self._update_cache_item('stock_quotes', symbol, {
+                'symbol': symbol,
+                'price': price,
+                'volume': volume,
+                'timestamp': timestamp
+            })
             
             # Notify subscribers
             self._notify_subscribers('stock_quotes', {
@@ -406,6 +811,9 @@ class RealTimeDataIntegration:
             # Save to file
             self._save_stock_update_to_file(symbol, price, volume, timestamp)
             
+        else:
+            self.drop_count.labels('unhandled_message').inc()
+            
     def _handle_forex_stream_message(self, message):
         """
         Handle forex stream websocket message
@@ -413,27 +821,19 @@ class RealTimeDataIntegration:
         Args:
             message (dict): Websocket message
         """
+        self.message_count.labels('forex_stream').inc()
+        
         if message['type'] == 'rate':
             pair = message['pair']
             rate = message['rate']
             timestamp = message['timestamp']
             
-            # Update cache
-            if 'forex_rates' not in self.data_cache:
-                self.data_cache['forex_rates'] = {}
-                
-            if pair not in self.data_cache['forex_rates']:
-                self.data_cache['forex_rates'][pair] = {
-                    'pair': pair,
-                    'rate': rate,
-                    'timestamp': timestamp
-                }
-            else:
-                self.data_cache['forex_rates'][pair]['rate'] = rate
-                self.data_cache['forex_rates'][pair]['timestamp'] = timestamp
-                
-            # Update cache timestamp
-            self.cache_timestamps['forex_rates'] = time.time()
+            # Update cache and cache timestamp
+            self._update_cache_item('forex_rates', pair, {
+                'pair': pair,
+                'rate': rate,
+                'timestamp': timestamp
+            })
             
             # Notify subscribers
             self._notify_subscribers('forex_rates', {
@@ -445,6 +845,9 @@ class RealTimeDataIntegration:
             # Save to file
             self._save_forex_update_to_file(pair, rate, timestamp)
             
+        else:
+            self.drop_count.labels('unhandled_message').inc()
+            
     def _fetch_market_indices(self):
         """
         Fetch market indices data from API
@@ -452,6 +855,8 @@ class RealTimeDataIntegration:
         logger.info("Fetching market indices data")
         
         try:
+            started = time.perf_counter_ns()
+            
             # In a real implementation, this would make an API call
             # For demonstration, we'll generate simulated data
             
@@ -489,9 +894,10 @@ class RealTimeDataIntegration:
                     'timestamp': int(time.time() * 1000)
                 }
                 
+            self.fetch_latency.labels('market_indices').record(time.perf_counter_ns() - started)
+            
             # Update cache
-            self.data_cache['market_indices'] = indices_data
-            self.cache_timestamps['market_indices'] = time.time()
+            self._set_cache('market_indices', indices_data)
             
             # Notify subscribers
             self._notify_subscribers('market_indices', indices_data)
@@ -502,6 +908,7 @@ class RealTimeDataIntegration:
             logger.info("Market indices data fetched successfully")
             
         except Exception as e:
+            self.error_count.labels('fetch').inc()
             logger.error(f"Error fetching market indices data: {e}")
             
     def _fetch_forex_rates(self):
@@ -511,6 +918,8 @@ class RealTimeDataIntegration:
         logger.info("Fetching forex rates data")
         
         try:
+            started = time.perf_counter_ns()
+            
             # In a real implementation, this would make an API call
             # For demonstration, we'll generate simulated data
             
@@ -541,9 +950,10 @@ class RealTimeDataIntegration:
                     'timestamp': int(time.time() * 1000)
                 }
                 
+            self.fetch_latency.labels('forex_rates').record(time.perf_counter_ns() - started)
+            
             # Update cache
-            self.data_cache['forex_rates'] = forex_data
-            self.cache_timestamps['forex_rates'] = time.time()
+            self._set_cache('forex_rates', forex_data)
             
             # Notify subscribers
             self._notify_subscribers('forex_rates', forex_data)
@@ -554,6 +964,7 @@ class RealTimeDataIntegration:
             logger.info("Forex rates data fetched successfully")
             
         except Exception as e:
+            self.error_count.labels('fetch').inc()
             logger.error(f"Error fetching forex rates data: {e}")
             
     def _fetch_stock_quotes(self):
@@ -563,6 +974,8 @@ class RealTimeDataIntegration:
         logger.info("Fetching stock quotes data")
         
         try:
+            started = time.perf_counter_ns()
+            
             # In a real implementation, this would make an API call
             # For demonstration, we'll generate simulated data
             
@@ -601,9 +1014,10 @@ class RealTimeDataIntegration:
                     'timestamp': int(time.time() * 1000)
                 }
                 
+            self.fetch_latency.labels('stock_quotes').record(time.perf_counter_ns() - started)
+            
             # Update cache
-            self.data_cache['stock_quotes'] = stock_data
-            self.cache_timestamps['stock_quotes'] = time.time()
+            self._set_cache('stock_quotes', stock_data)
             
             # Notify subscribers
             self._notify_subscribers('stock_quotes', stock_data)
@@ -614,6 +1028,7 @@ class RealTimeDataIntegration:
             logger.info("Stock quotes data fetched successfully")
             
         except Exception as e:
+            self.error_count.labels('fetch').inc()
             logger.error(f"Error fetching stock quotes data: {e}")
             
     def _fetch_tariff_news(self):
@@ -623,6 +1038,8 @@ class RealTimeDataIntegration:
         logger.info("Fetching tariff news data")
         
         try:
+            started = time.perf_counter_ns()
+            
             # In a real implementation, this would make an API call
             # For demonstration, we'll generate simulated data
             
@@ -669,19 +1086,20 @@ class RealTimeDataIntegration:
             # Sort by timestamp (newest first)
             news_data.sort(key=lambda x: x['timestamp'], reverse=True)
             
+            self.fetch_latency.labels('tariff_news').record(time.perf_counter_ns() - started)
+            
             # Update cache
             if 'tariff_news' not in self.data_cache:
-                self.data_cache['tariff_news'] = news_data
+                merged_news = news_data
             else:
                 # Merge with existing news, avoiding duplicates
                 existing_ids = {item['id'] for item in self.data_cache['tariff_news']}
                 new_items = [item for item in news_data if item['id'] not in existing_ids]
-                self.data_cache['tariff_news'] = new_items + self.data_cache['tariff_news']
                 
                 # Keep only the 20 most recent news items
-                self.data_cache['tariff_news'] = self.data_cache['tariff_news'][:20]
+                merged_news = (new_items + self.data_cache['tariff_news'])[:20]
                 
-            self.cache_timestamps['tariff_news'] = time.time()
+            self._set_cache('tariff_news', merged_news)
             
             # Notify subscribers
             self._notify_subscribers('tariff_news', news_data)
@@ -692,6 +1110,7 @@ class RealTimeDataIntegration:
             logger.info("Tariff news data fetched successfully")
             
         except Exception as e:
+            self.error_count.labels('fetch').inc()
             logger.error(f"Error fetching tariff news data: {e}")
             
     def _fetch_economic_indicators(self):
@@ -701,6 +1120,8 @@ class RealTimeDataIntegration:
         logger.info("Fetching economic indicators data")
         
         try:
+            started = time.perf_counter_ns()
+            
             # In a real implementation, this would make an API call
             # For demonstration, we'll generate simulated data
             
@@ -773,9 +1194,10 @@ class RealTimeDataIntegration:
                 }
             }
             
+            self.fetch_latency.labels('economic_indicators').record(time.perf_counter_ns() - started)
+            
             # Update cache
-            self.data_cache['economic_indicators'] = indicators_data
-            self.cache_timestamps['economic_indicators'] = time.time()
+            self._set_cache('economic_indicators', indicators_data)
             
             # Notify subscribers
             self._notify_subscribers('economic_indicators', indicators_data)
@@ -786,6 +1208,7 @@ class RealTimeDataIntegration:
             logger.info("Economic indicators data fetched successfully")
             
         except Exception as e:
+            self.error_count.labels('fetch').inc()
             logger.error(f"Error fetching economic indicators data: {e}")
             
     def _get_cached_stock_price(self, symbol):
@@ -834,18 +1257,7 @@ class RealTimeDataIntegration:
         Returns:
             str: Index name
         """
-        index_names = {
-            '^AXJO': 'ASX 200',
-            '^AORD': 'All Ordinaries',
-            '^GSPC': 'S&P 500',
-            '^DJI': 'Dow Jones',
-            '^IXIC': 'NASDAQ',
-            '^HSI': 'Hang Seng',
-            '^N225': 'Nikkei 225',
-            '^FTSE': 'FTSE 100'
-        }
-        
-        return index_names.get(symbol, symbol)
+        return self.symbols.name(symbol)
         
     def _get_stock_name(self, symbol):
         """
@@ -857,39 +1269,7 @@ class RealTimeDataIntegration:
         Returns:
             str: Stock name
         """
-        stock_names = {
-            'BHP.AX': 'BHP Group',
-            'RIO.AX': 'Rio Tinto',
-            'FMG.AX': 'Fortescue Metals',
-            'MIN.AX': 'Mineral Resources',
-            'S32.AX': 'South32',
-            'TWE.AX': 'Treasury Wine Estates',
-            'A2M.AX': 'A2 Milk',
-            'WES.AX': 'Wesfarmers',
-            'WOW.AX': 'Woolworths Group',
-            'COL.AX': 'Coles Group',
-            'CSL.AX': 'CSL Limited',
-            'RMD.AX': 'ResMed',
-            'COH.AX': 'Cochlear',
-            'CBA.AX': 'Commonwealth Bank',
-            'NAB.AX': 'National Australia Bank',
-            'WBC.AX': 'Westpac Banking',
-            'ANZ.AX': 'ANZ Group',
-            'MQG.AX': 'Macquarie Group',
-            'WTC.AX': 'WiseTech Global',
-            'XRO.AX': 'Xero',
-            'APX.AX': 'Appen',
-            'ALU.AX': 'Altium',
-            'TCL.AX': 'Transurban Group',
-            'SYD.AX': 'Sydney Airport',
-            'QAN.AX': 'Qantas Airways',
-            'AGL.AX': 'AGL Energy',
-            'ORG.AX': 'Origin Energy',
-            'WPL.AX': 'Woodside Energy',
-            'STO.AX': 'Santos'
-        }
-        
-        return stock_names.get(symbol, symbol)
+        return self.symbols.name(symbol)
         
     def _notify_subscribers(self, data_type, data):
         """
@@ -902,12 +1282,17 @@ class RealTimeDataIntegration:
         if data_type not in self.subscribers:
             return
             
+        started = time.perf_counter_ns()
+        
         for callback in self.subscribers[data_type]:
             try:
                 callback(data)
             except Exception as e:
+                self.error_count.labels('dispatch').inc()
                 logger.error(f"Error notifying subscriber for {data_type}: {e}")
                 
+        self.dispatch_latency.labels(data_type).record(time.perf_counter_ns() - started)
+                
     def subscribe(self, data_type, callback):
         """
         Subscribe to data updates
@@ -934,6 +1319,7 @@ class RealTimeDataIntegration:
             try:
                 callback(self.data_cache[data_type])
             except Exception as e:
+                self.error_count.labels('dispatch').inc()
                 logger.error(f"Error sending initial data to subscriber for {data_type}: {e}")
                 
         return True
@@ -1001,6 +1387,8 @@ class RealTimeDataIntegration:
             indices_data (dict): Market indices data
         """
         try:
+            started = time.perf_counter_ns()
+            
             # Convert to DataFrame
             data_list = []
             for symbol, data in indices_data.items():
@@ -1018,7 +1406,10 @@ class RealTimeDataIntegration:
             file_path = os.path.join(self.data_dir, 'market_indices.csv')
             df.to_csv(file_path, index=False)
             
+            self.persistence_latency.labels('csv').record(time.perf_counter_ns() - started)
+            
         except Exception as e:
+            self.error_count.labels('persistence').inc()
             logger.error(f"Error saving market indices to file: {e}")
             
     def _save_forex_rates_to_file(self, forex_data):
@@ -1029,6 +1420,8 @@ class RealTimeDataIntegration:
             forex_data (dict): Forex rates data
         """
         try:
+            started = time.perf_counter_ns()
+            
             # Convert to DataFrame
             data_list = []
             for pair, data in forex_data.items():
@@ -1045,7 +1438,10 @@ class RealTimeDataIntegration:
             file_path = os.path.join(self.data_dir, 'forex_rates.csv')
             df.to_csv(file_path, index=False)
             
+            self.persistence_latency.labels('csv').record(time.perf_counter_ns() - started)
+            
         except Exception as e:
+            self.error_count.labels('persistence').inc()
             logger.error(f"Error saving forex rates to file: {e}")
             
     def _save_stock_quotes_to_file(self, stock_data):
@@ -1056,6 +1452,8 @@ class RealTimeDataIntegration:
             stock_data (dict): Stock quotes data
         """
         try:
+            started = time.perf_counter_ns()
+            
             # Convert to DataFrame
             data_list = []
             for symbol, data in stock_data.items():
@@ -1074,7 +1472,10 @@ class RealTimeDataIntegration:
             file_path = os.path.join(self.data_dir, 'stock_quotes.csv')
             df.to_csv(file_path, index=False)
             
+            self.persistence_latency.labels('csv').record(time.perf_counter_ns() - started)
+            
         except Exception as e:
+            self.error_count.labels('persistence').inc()
             logger.error(f"Error saving stock quotes to file: {e}")
             
     def _save_stock_update_to_file(self, symbol, price, volume, timestamp):
@@ -1088,33 +1489,25 @@ class RealTimeDataIntegration:
             timestamp (int): Timestamp in milliseconds
         """
         try:
+            started = time.perf_counter_ns()
+            
             # Create directory for historical data if it doesn't exist
             historical_dir = os.path.join(self.data_dir, 'historical')
             os.makedirs(historical_dir, exist_ok=True)
             
-            # Create file path
-            file_path = os.path.join(historical_dir, f"{symbol}_historical.csv")
-            
-            # Check if file exists
-            file_exists = os.path.isfile(file_path)
-            
-            # Create DataFrame for new data
-            new_data = pd.DataFrame([{
+            # Append to the raw tier (CSV row or compressed block buffer)
+            self.retention.append_tick(symbol, {
                 'symbol': symbol,
                 'price': price,
                 'volume': volume,
                 'timestamp': timestamp,
                 'datetime': datetime.fromtimestamp(timestamp / 1000).strftime('%Y-%m-%d %H:%M:%S')
-            }])
-            
-            if file_exists:
-                # Append to existing file
-                new_data.to_csv(file_path, mode='a', header=False, index=False)
-            else:
-                # Create new file
-                new_data.to_csv(file_path, index=False)
+            })
                 
+            self.persistence_latency.labels('history').record(time.perf_counter_ns() - started)
+            
         except Exception as e:
+            self.error_count.labels('persistence').inc()
             logger.error(f"Error saving stock update to file: {e}")
             
     def _save_forex_update_to_file(self, pair, rate, timestamp):
@@ -1127,32 +1520,24 @@ class RealTimeDataIntegration:
             timestamp (int): Timestamp in milliseconds
         """
         try:
+            started = time.perf_counter_ns()
+            
             # Create directory for historical data if it doesn't exist
             historical_dir = os.path.join(self.data_dir, 'historical')
             os.makedirs(historical_dir, exist_ok=True)
             
-            # Create file path
-            file_path = os.path.join(historical_dir, f"{pair.replace('/', '_')}_historical.csv")
-            
-            # Check if file exists
-            file_exists = os.path.isfile(file_path)
-            
-            # Create DataFrame for new data
-            new_data = pd.DataFrame([{
+            # Append to the raw tier (CSV row or compressed block buffer)
+            self.retention.append_tick(pair.replace('/', '_'), {
                 'pair': pair,
                 'rate': rate,
                 'timestamp': timestamp,
                 'datetime': datetime.fromtimestamp(timestamp / 1000).strftime('%Y-%m-%d %H:%M:%S')
-            }])
-            
-            if file_exists:
-                # Append to existing file
-                new_data.to_csv(file_path, mode='a', header=False, index=False)
-            else:
-                # Create new file
-                new_data.to_csv(file_path, index=False)
+            })
                 
+            self.persistence_latency.labels('history').record(time.perf_counter_ns() - started)
+            
         except Exception as e:
+            self.error_count.labels('persistence').inc()
             logger.error(f"Error saving forex update to file: {e}")
             
     def _save_tariff_news_to_file(self, news_data):
@@ -1163,6 +1548,8 @@ class RealTimeDataIntegration:
             news_data (list): Tariff news data
         """
         try:
+            started = time.perf_counter_ns()
+            
             # Convert to DataFrame
             df = pd.DataFrame(news_data)
             
@@ -1170,7 +1557,10 @@ class RealTimeDataIntegration:
             file_path = os.path.join(self.data_dir, 'tariff_news.csv')
             df.to_csv(file_path, index=False)
             
+            self.persistence_latency.labels('csv').record(time.perf_counter_ns() - started)
+            
         except Exception as e:
+            self.error_count.labels('persistence').inc()
             logger.error(f"Error saving tariff news to file: {e}")
             
     def _save_economic_indicators_to_file(self, indicators_data):
@@ -1181,6 +1571,8 @@ class RealTimeDataIntegration:
             indicators_data (dict): Economic indicators data
         """
         try:
+            started = time.perf_counter_ns()
+            
             # Convert to DataFrame
             data_list = []
             for country, indicators in indicators_data.items():
@@ -1199,10 +1591,13 @@ class RealTimeDataIntegration:
             file_path = os.path.join(self.data_dir, 'economic_indicators.csv')
             df.to_csv(file_path, index=False)
             
+            self.persistence_latency.labels('csv').record(time.perf_counter_ns() - started)
+            
         except Exception as e:
+            self.error_count.labels('persistence').inc()
             logger.error(f"Error saving economic indicators to file: {e}")
             
-    def get_historical_data(self, symbol, start_date=None, end_date=None):
+    def get_historical_data(self, symbol, start_date=None, end_date=None, resolution='auto'):
         """
         Get historical data for a stock or forex pair
         
@@ -1210,6 +1605,9 @@ class RealTimeDataIntegration:
             symbol (str): Stock symbol or forex pair
             start_date (str, optional): Start date in 'YYYY-MM-DD' format
             end_date (str, optional): End date in 'YYYY-MM-DD' format
+            resolution (str, optional): 'raw', '1min', '1d' or 'auto' to pick
+                the finest resolution that suits the requested span (raw
+                ticks when no start date is given)
             
         Returns:
             pandas.DataFrame: Historical data or None if not available
@@ -1221,29 +1619,19 @@ class RealTimeDataIntegration:
             else:  # Stock
                 file_symbol = symbol
                 
-            # Create file path
-            file_path = os.path.join(self.data_dir, 'historical', f"{file_symbol}_historical.csv")
+            start_date = pd.to_datetime(start_date) if start_date else None
+            end_date = pd.to_datetime(end_date) if end_date else None
+                
+            if resolution == 'auto':
+                resolution = self.retention.pick_resolution(start_date, end_date)
+                
+            # Read the requested tier, merging in any finer tiers
+            df = self.retention.load(file_symbol, resolution, start_date, end_date)
             
-            # Check if file exists
-            if not os.path.isfile(file_path):
+            if df is None:
                 logger.warning(f"No historical data file for {symbol}")
                 return None
                 
-            # Read CSV file
-            df = pd.read_csv(file_path)
-            
-            # Convert timestamp to datetime
-            df['datetime'] = pd.to_datetime(df['datetime'])
-            
-            # Filter by date range if specified
-            if start_date:
-                start_date = pd.to_datetime(start_date)
-                df = df[df['datetime'] >= start_date]
-                
-            if end_date:
-                end_date = pd.to_datetime(end_date)
-                df = df[df['datetime'] <= end_date]
-                
             return df
             
         except Exception as e:
@@ -1333,11 +1721,39 @@ class RealTimeDataIntegration:
         # Filter by specified countries
         return {country: data for country, data in self.data_cache['economic_indicators'].items() if country in countries}
 
-# Create a singleton instance
-real_time_data = RealTimeDataIntegration()
+_real_time_data = None
+_real_time_data_lock = threading.Lock()
+
+
+def get_real_time_data():
+    """
+    Get the shared integration instance, creating it on first use
+
+    Returns:
+        RealTimeDataIntegration: Shared instance
+    """
+    global _real_time_data
+
+    if _real_time_data is None:
+        with _real_time_data_lock:
+            if _real_time_data is None:
+                _real_time_data = RealTimeDataIntegration()
+
+    return _real_time_data
+
+
+def __getattr__(name):
+    # Keep "from real_time_data_integration import real_time_data" working
+    # without building the instance at import time
+    if name == 'real_time_data':
+        return get_real_time_data()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
 # Example usage
 if __name__ == "__main__":
+    real_time_data = get_real_time_data()
+    
     # Start real-time data integration
     real_time_data.start()
     
@@ -0,0 +1,148 @@
+"""
+Risk Estimators for Trump Tariff Analysis Website
+
+This module estimates every stock's beta against the ASX 200 and its
+realized and EWMA volatility from the bars CorrelationEngine closes:
+
+- beta: rolling covariance with the benchmark over its variance, read from
+  the engine's pair accumulators over its rolling window
+- realized volatility: root mean square of bar log returns over the same
+  window, kept as a running sum with the leaving bar subtracted
+- EWMA volatility: exponentially weighted mean square of bar log returns
+  with the engine's half-life
+
+Both volatilities are annualized over the trading year, in percent. Every
+bar updates the whole universe with a few array operations, and each stock
+records when its estimates last changed.
+"""
+
+import math
+import threading
+
+try:
+    from .lazy_imports import lazy_import
+    from .feature_store import TRADING_SECONDS_PER_YEAR
+except ImportError:
+    from lazy_imports import lazy_import
+    from feature_store import TRADING_SECONDS_PER_YEAR
+
+# Heavy dependencies load on first use, keeping module import cheap
+np = lazy_import('numpy')
+
+BENCHMARK = "^AXJO"
+
+
+class RiskEstimator:
+    """
+    Per-stock beta and volatility estimates maintained from closed bars
+    """
+
+    def __init__(self, engine, benchmark=BENCHMARK):
+        """
+        Args:
+            engine (CorrelationEngine): Engine the bars come from; the
+                benchmark must be one of its factors
+            benchmark (str, optional): Index betas are measured against
+        """
+        if benchmark not in engine.factors:
+            raise ValueError(f"Benchmark {benchmark} is not tracked by the correlation engine")
+
+        self.engine = engine
+        self.benchmark = benchmark
+        self.symbols = list(engine.stocks)
+        self._slots = {symbol: slot for slot, symbol in enumerate(self.symbols)}
+        self.bars_per_year = TRADING_SECONDS_PER_YEAR * 1000 / engine.bar_ms
+
+        count = len(self.symbols)
+        self._square_sum = np.zeros(count)
+        self._count = np.zeros(count, dtype=np.int64)
+        self._ewma_variance = np.zeros(count)
+        self._ewma_count = np.zeros(count, dtype=np.int64)
+        self.updated_ms = np.zeros(count, dtype=np.int64)
+
+        # Increases with every bar, so consumers can tell estimates changed
+        self.version = 0
+        self._lock = threading.Lock()
+
+        engine.add_bar_listener(self._on_bar)
+
+    def close(self):
+        """
+        Stop receiving bars from the engine
+        """
+        self.engine.remove_bar_listener(self._on_bar)
+
+    def _on_bar(self, returns, removed, bar_ms):
+        count = len(self.symbols)
+        returns = returns[:count]
+        valid = ~np.isnan(returns)
+        squares = np.where(valid, returns, 0.0) ** 2
+        alpha = self.engine.alpha
+
+        with self._lock:
+            self._square_sum += squares
+            self._count += valid
+            if removed is not None:
+                removed = removed[:count]
+                removed_valid = ~np.isnan(removed)
+                self._square_sum -= np.where(removed_valid, removed, 0.0) ** 2
+                self._count -= removed_valid
+                # Guard the running sum against rounding below zero
+                np.maximum(self._square_sum, 0.0, out=self._square_sum)
+
+            first = valid & (self._ewma_count == 0)
+            self._ewma_variance = np.where(
+                first, squares,
+                np.where(valid, (1 - alpha) * self._ewma_variance + alpha * squares, self._ewma_variance)
+            )
+            self._ewma_count += valid
+            self.updated_ms[valid] = bar_ms
+            self.version += 1
+
+    def estimates(self):
+        """
+        Get the current estimates of every stock
+
+        Returns:
+            dict: symbols plus arrays beta, realized_volatility and
+                ewma_volatility (NaN until min_bars bars are seen),
+                updated_ms (0 until a stock's first bar) and the version
+        """
+        min_bars = self.engine.min_bars
+        column = self.engine.factors.index(self.benchmark)
+        beta = self.engine.matrix("beta")["values"][:, column]
+
+        with self._lock:
+            realized = np.sqrt(self._square_sum / np.maximum(self._count, 1) * self.bars_per_year) * 100
+            ewma = np.sqrt(self._ewma_variance * self.bars_per_year) * 100
+            return {
+                "symbols": list(self.symbols),
+                "beta": beta,
+                "realized_volatility": np.where(self._count >= min_bars, realized, np.nan),
+                "ewma_volatility": np.where(self._ewma_count >= min_bars, ewma, np.nan),
+                "updated_ms": self.updated_ms.copy(),
+                "version": self.version
+            }
+
+    def get(self, symbol):
+        """
+        Get one stock's estimates
+
+        Args:
+            symbol (str): Stock symbol
+
+        Returns:
+            dict: beta, realized_volatility and ewma_volatility (None until
+                measurable) and updated_ms, or None for an unknown symbol
+        """
+        row = self._slots.get(symbol)
+        if row is None:
+            return None
+
+        estimates = self.estimates()
+        result = {}
+        for name in ["beta", "realized_volatility", "ewma_volatility"]:
+            value = float(estimates[name][row])
+            result[name] = None if math.isnan(value) else value
+        result["updated_ms"] = int(estimates["updated_ms"][row])
+        return result
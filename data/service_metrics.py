@@ -0,0 +1,501 @@
+"""
+Service Metrics Module for Trump Tariff Analysis Website
+
+This module implements in-process instrumentation for the real-time data
+service: log-linear (HDR-style) latency histograms, counters and gauges,
+grouped into labelled metric families. Recording a latency is a bit_length,
+a shift and an increment, with relative error below 1% across nanoseconds to
+minutes. Metrics are read programmatically through stats() or scraped in the
+Prometheus text format from a local HTTP endpoint.
+"""
+
+import json
+import math
+import threading
+import logging
+from array import array
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+logger = logging.getLogger('real_time_data')
+
+# Sub-buckets per power of two: 2 ** SUB_BUCKET_BITS, so every recorded value
+# lands in a bucket at most 1 / 128 of its magnitude wide
+SUB_BUCKET_BITS = 7
+SUB_BUCKET_COUNT = 1 << SUB_BUCKET_BITS
+
+# Largest tracked latency, 2 ** 40 ns (about 18 minutes); larger values are
+# clamped into the top bucket
+MAX_VALUE_BITS = 40
+
+# Cumulative bucket boundaries (seconds) exposed to Prometheus
+PROMETHEUS_BUCKETS = [
+    0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005,
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+    0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0
+]
+
+# Quantiles reported by stats()
+STATS_QUANTILES = [0.5, 0.9, 0.99, 0.999]
+
+KIND_COUNTER = 'counter'
+KIND_GAUGE = 'gauge'
+KIND_HISTOGRAM = 'histogram'
+
+
+def bucket_index(value):
+    """
+    Get the histogram bucket of a value
+
+    Values below 2 * SUB_BUCKET_COUNT have exact buckets; above that each
+    power of two is split into SUB_BUCKET_COUNT equal buckets.
+
+    Args:
+        value (int): Non-negative integer value
+
+    Returns:
+        int: Bucket index
+    """
+    if value < 2 * SUB_BUCKET_COUNT:
+        return value
+
+    shift = value.bit_length() - SUB_BUCKET_BITS - 1
+    return SUB_BUCKET_COUNT * shift + (value >> shift)
+
+
+def bucket_bounds(index):
+    """
+    Get the range of values counted in a bucket
+
+    Args:
+        index (int): Bucket index
+
+    Returns:
+        tuple: (lowest, highest) value of the bucket, inclusive
+    """
+    if index < 2 * SUB_BUCKET_COUNT:
+        return index, index
+
+    shift = index // SUB_BUCKET_COUNT - 1
+    sub_bucket = index - SUB_BUCKET_COUNT * shift
+    return sub_bucket << shift, ((sub_bucket + 1) << shift) - 1
+
+
+BUCKET_COUNT = bucket_index((1 << MAX_VALUE_BITS) - 1) + 1
+
+
+class LatencyHistogram:
+    """
+    Log-linear histogram of latencies in nanoseconds
+    """
+
+    def __init__(self):
+        self.counts = array('Q', bytes(8 * BUCKET_COUNT))
+        self.count = 0
+        self.total = 0
+        self.max = 0
+        self._lock = threading.Lock()
+
+    def record(self, nanoseconds):
+        """
+        Record one latency
+
+        Args:
+            nanoseconds (int): Latency in nanoseconds
+        """
+        if nanoseconds < 0:
+            nanoseconds = 0
+        index = bucket_index(nanoseconds)
+        if index >= BUCKET_COUNT:
+            index = BUCKET_COUNT - 1
+
+        with self._lock:
+            self.counts[index] += 1
+            self.count += 1
+            self.total += nanoseconds
+            if nanoseconds > self.max:
+                self.max = nanoseconds
+
+    def quantiles(self, quantiles):
+        """
+        Get latencies at quantiles
+
+        Each is the highest value of the bucket holding that rank, capped at
+        the largest recorded value.
+
+        Args:
+            quantiles (list): Quantiles in ascending order, 0..1
+
+        Returns:
+            list: Latencies in nanoseconds, 0 if nothing was recorded
+        """
+        with self._lock:
+            counts = self.counts.tolist()
+            count, largest = self.count, self.max
+
+        if count == 0:
+            return [0 for _ in quantiles]
+
+        results = []
+        targets = iter([max(1, math.ceil(round(quantile * count, 9))) for quantile in quantiles])
+        target = next(targets)
+        seen = 0
+        for index, bucket_count in enumerate(counts):
+            if not bucket_count:
+                continue
+            seen += bucket_count
+            while target is not None and seen >= target:
+                results.append(min(bucket_bounds(index)[1], largest))
+                target = next(targets, None)
+            if target is None:
+                break
+
+        return results
+
+    def cumulative_counts(self, boundaries):
+        """
+        Count latencies at or below each boundary, bucket-accurate
+
+        Args:
+            boundaries (list): Upper bounds in nanoseconds, ascending
+
+        Returns:
+            list: Cumulative counts per boundary
+        """
+        with self._lock:
+            counts = self.counts.tolist()
+
+        results = []
+        seen = 0
+        position = 0
+        for boundary in boundaries:
+            last = min(bucket_index(int(boundary)), BUCKET_COUNT - 1)
+            seen += sum(counts[position:last + 1])
+            position = max(position, last + 1)
+            results.append(seen)
+
+        return results
+
+    def snapshot(self):
+        """
+        Summarize the histogram
+
+        Returns:
+            dict: count, mean, quantiles and max in seconds
+        """
+        with self._lock:
+            count, total, largest = self.count, self.total, self.max
+
+        summary = {
+            "count": count,
+            "mean_seconds": total / count / 1e9 if count else 0.0,
+            "max_seconds": largest / 1e9
+        }
+        for quantile, value in zip(STATS_QUANTILES, self.quantiles(STATS_QUANTILES)):
+            summary[f"p{quantile * 100:g}_seconds"] = value / 1e9
+
+        return summary
+
+
+class Counter:
+    """
+    Monotonically increasing count
+    """
+
+    def __init__(self):
+        self.value = 0
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1):
+        """
+        Increase the count
+
+        Args:
+            amount (int, optional): Amount to add
+        """
+        with self._lock:
+            self.value += amount
+
+
+class MetricFamily:
+    """
+    Metrics of one name, one per combination of label values
+    """
+
+    def __init__(self, name, kind, help_text, label_names=(), function=None):
+        """
+        Args:
+            name (str): Metric name
+            kind (str): KIND_COUNTER, KIND_GAUGE or KIND_HISTOGRAM
+            help_text (str): Description shown in the exposition
+            label_names (tuple, optional): Label names
+            function (callable, optional): For gauges, returns the current
+                value, or a dict of label value tuple -> value
+        """
+        self.name = name
+        self.kind = kind
+        self.help_text = help_text
+        self.label_names = tuple(label_names)
+        self.function = function
+        self.children = {}
+        self._lock = threading.Lock()
+
+    def labels(self, *values):
+        """
+        Get the metric for a combination of label values
+
+        Args:
+            *values: Label values, in label_names order
+
+        Returns:
+            LatencyHistogram or Counter: Metric, created on first use
+        """
+        child = self.children.get(values)
+        if child is None:
+            with self._lock:
+                child = self.children.get(values)
+                if child is None:
+                    child = LatencyHistogram() if self.kind == KIND_HISTOGRAM else Counter()
+                    self.children[values] = child
+        return child
+
+    def values(self):
+        """
+        Get the current values of a counter or gauge family
+
+        Returns:
+            dict: Label value tuple -> value
+        """
+        if self.kind == KIND_COUNTER:
+            return {values: child.value for values, child in list(self.children.items())}
+
+        try:
+            value = self.function()
+        except Exception as e:
+            logger.error(f"Error reading gauge {self.name}: {e}")
+            return {}
+
+        if isinstance(value, dict):
+            return {key if isinstance(key, tuple) else (key,): item for key, item in value.items() if item is not None}
+        return {} if value is None else {(): value}
+
+
+class MetricsRegistry:
+    """
+    Named metric families with Prometheus text and dict exports
+    """
+
+    def __init__(self, namespace):
+        """
+        Args:
+            namespace (str): Prefix of every exposed metric name
+        """
+        self.namespace = namespace
+        self.families = {}
+
+    def _register(self, family):
+        self.families[family.name] = family
+        return family
+
+    def histogram(self, name, help_text, label_names=()):
+        """
+        Register a latency histogram family
+
+        Args:
+            name (str): Metric name without namespace, e.g. "fetch_latency"
+            help_text (str): Description
+            label_names (tuple, optional): Label names
+
+        Returns:
+            MetricFamily: Family whose children record nanoseconds
+        """
+        return self._register(MetricFamily(name, KIND_HISTOGRAM, help_text, label_names))
+
+    def counter(self, name, help_text, label_names=()):
+        """
+        Register a counter family
+
+        Args:
+            name (str): Metric name without namespace, e.g. "errors"
+            help_text (str): Description
+            label_names (tuple, optional): Label names
+
+        Returns:
+            MetricFamily: Family of counters
+        """
+        return self._register(MetricFamily(name, KIND_COUNTER, help_text, label_names))
+
+    def gauge(self, name, help_text, function, label_names=()):
+        """
+        Register a gauge read from a callable at export time
+
+        Args:
+            name (str): Metric name without namespace
+            help_text (str): Description
+            function (callable): Returns the value, or a dict of label
+                values -> value; None values are skipped
+            label_names (tuple, optional): Label names
+
+        Returns:
+            MetricFamily: Gauge family
+        """
+        return self._register(MetricFamily(name, KIND_GAUGE, help_text, label_names, function))
+
+    def stats(self):
+        """
+        Get every metric as nested dicts
+
+        Returns:
+            dict: counters, gauges and histograms; each maps metric name ->
+                label string ("" without labels) -> value or summary
+        """
+        result = {"counters": {}, "gauges": {}, "histograms": {}}
+
+        for name, family in self.families.items():
+            if family.kind == KIND_HISTOGRAM:
+                values = {key: child.snapshot() for key, child in list(family.children.items())}
+                section = "histograms"
+            else:
+                values = family.values()
+                section = "counters" if family.kind == KIND_COUNTER else "gauges"
+
+            result[section][name] = {
+                ",".join(f"{label}={value}" for label, value in zip(family.label_names, key)): item
+                for key, item in values.items()
+            }
+
+        return result
+
+    def render_prometheus(self):
+        """
+        Render every metric in the Prometheus text exposition format
+
+        Returns:
+            str: Exposition text
+        """
+        boundaries_ns = [boundary * 1e9 for boundary in PROMETHEUS_BUCKETS]
+        lines = []
+
+        for name, family in self.families.items():
+            metric = f"{self.namespace}_{name}"
+            if family.kind == KIND_HISTOGRAM:
+                metric += "_seconds"
+            elif family.kind == KIND_COUNTER:
+                metric += "_total"
+
+            lines.append(f"# HELP {metric} {family.help_text}")
+            lines.append(f"# TYPE {metric} {family.kind}")
+
+            if family.kind != KIND_HISTOGRAM:
+                for key, value in family.values().items():
+                    lines.append(f"{metric}{format_labels(family.label_names, key)} {value}")
+                continue
+
+            for key, child in list(family.children.items()):
+                with child._lock:
+                    count, total = child.count, child.total
+                for boundary, cumulative in zip(PROMETHEUS_BUCKETS, child.cumulative_counts(boundaries_ns)):
+                    labels = format_labels(family.label_names + ('le',), key + (f"{boundary:g}",))
+                    lines.append(f"{metric}_bucket{labels} {cumulative}")
+                labels = format_labels(family.label_names + ('le',), key + ("+Inf",))
+                lines.append(f"{metric}_bucket{labels} {count}")
+                lines.append(f"{metric}_sum{format_labels(family.label_names, key)} {total / 1e9}")
+                lines.append(f"{metric}_count{format_labels(family.label_names, key)} {count}")
+
+        return "\n".join(lines) + "\n"
+
+
+def format_labels(names, values):
+    """
+    Format a Prometheus label set
+
+    Args:
+        names (tuple): Label names
+        values (tuple): Label values
+
+    Returns:
+        str: '{name="value",...}' or "" without labels
+    """
+    if not names:
+        return ""
+
+    pairs = []
+    for name, value in zip(names, values):
+        escaped = str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+        pairs.append(f'{name}="{escaped}"')
+    return "{" + ",".join(pairs) + "}"
+
+
+class MetricsServer:
+    """
+    Local HTTP endpoint serving /metrics (Prometheus text) and /stats (JSON)
+    """
+
+    def __init__(self, registry, host='127.0.0.1', port=9464):
+        """
+        Args:
+            registry (MetricsRegistry): Metrics to serve
+            host (str, optional): Interface to bind; local only by default
+            port (int, optional): Port, 0 to pick a free one
+        """
+        self.registry = registry
+        self.host = host
+        self.port = port
+        self._server = None
+        self._thread = None
+
+    def start(self):
+        """
+        Start serving in a background thread
+
+        Returns:
+            int: Bound port
+        """
+        if self._server is not None:
+            return self.port
+
+        registry = self.registry
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                path = self.path.split('?', 1)[0]
+                if path == '/metrics':
+                    body = registry.render_prometheus().encode('utf-8')
+                    content_type = 'text/plain; version=0.0.4; charset=utf-8'
+                elif path == '/stats':
+                    body = json.dumps(registry.stats()).encode('utf-8')
+                    content_type = 'application/json'
+                else:
+                    self.send_error(404)
+                    return
+
+                self.send_response(200)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                # Scrapes are too frequent for the service log
+                pass
+
+        self._server = ThreadingHTTPServer((self.host, self.port), Handler)
+        self._server.daemon_threads = True
+        self.port = self._server.server_address[1]
+
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+
+        logger.info(f"Serving metrics on http://{self.host}:{self.port}/metrics")
+        return self.port
+
+    def stop(self):
+        """
+        Stop serving
+        """
+        if self._server is None:
+            return
+
+        self._server.shutdown()
+        self._server.server_close()
+        self._server = None
+        self._thread = None
@@ -0,0 +1,556 @@
+"""
+Shared Quote Book Module for Trump Tariff Analysis Website
+
+This module implements a quote book in multiprocessing.shared_memory so a
+single ingest process can publish stock quotes, forex rates and market
+indices to any number of reader processes. Every record is guarded by a
+seqlock: the writer makes the sequence odd while it writes and even when it
+is done, and readers retry any record whose sequence was odd or changed
+while they copied it.
+"""
+
+import os
+import time
+import logging
+import numpy as np
+from multiprocessing import shared_memory
+
+logger = logging.getLogger('real_time_data')
+
+BOOK_MAGIC = 0x51424F4B  # "QBOK"
+BOOK_VERSION = 2
+
+DEFAULT_BOOK_NAME = 'tariff_quote_book'
+
+HEADER_DTYPE = np.dtype([
+    ('magic', '<u4'),
+    ('version', '<u4'),
+    ('stock_capacity', '<u4'),
+    ('forex_capacity', '<u4'),
+    ('index_capacity', '<u4'),
+    ('publisher_pid', '<u4'),
+    ('stock_count', '<u8'),
+    ('forex_count', '<u8'),
+    ('index_count', '<u8'),
+    ('version_counter', '<u8'),
+    ('publisher_heartbeat', '<f8')
+])
+
+# Record layouts per data type; 'seq' is the per-record seqlock
+RECORD_DTYPES = {
+    'stock_quotes': np.dtype([
+        ('seq', '<u8'),
+        ('price', '<f8'),
+        ('change_pct', '<f8'),
+        ('volume', '<i8'),
+        ('timestamp', '<i8'),
+        ('symbol', 'S16'),
+        ('name', 'S48')
+    ]),
+    'forex_rates': np.dtype([
+        ('seq', '<u8'),
+        ('rate', '<f8'),
+        ('change_pct', '<f8'),
+        ('timestamp', '<i8'),
+        ('pair', 'S16')
+    ]),
+    'market_indices': np.dtype([
+        ('seq', '<u8'),
+        ('value', '<f8'),
+        ('change_pct', '<f8'),
+        ('timestamp', '<i8'),
+        ('symbol', 'S16'),
+        ('name', 'S48')
+    ])
+}
+
+# Header fields holding each data type's capacity and used slot count
+CAPACITY_FIELDS = {
+    'stock_quotes': ('stock_capacity', 'stock_count'),
+    'forex_rates': ('forex_capacity', 'forex_count'),
+    'market_indices': ('index_capacity', 'index_count')
+}
+
+# Field naming the record key for each data type
+KEY_FIELDS = {
+    'stock_quotes': 'symbol',
+    'forex_rates': 'pair',
+    'market_indices': 'symbol'
+}
+
+# Fields copied from cache entries into records
+VALUE_FIELDS = {
+    'stock_quotes': ('price', 'change_pct', 'volume', 'timestamp', 'name'),
+    'forex_rates': ('rate', 'change_pct', 'timestamp'),
+    'market_indices': ('value', 'change_pct', 'timestamp', 'name')
+}
+
+DATA_TYPES = ('stock_quotes', 'forex_rates', 'market_indices')
+
+
+def _align(offset, alignment=64):
+    """
+    Round an offset up to a cache-line boundary
+
+    Args:
+        offset (int): Byte offset
+        alignment (int, optional): Alignment in bytes
+
+    Returns:
+        int: Aligned offset
+    """
+    return (offset + alignment - 1) // alignment * alignment
+
+
+def _layout(capacities):
+    """
+    Compute region offsets for the given capacities
+
+    Args:
+        capacities (dict): Data type -> record capacity
+
+    Returns:
+        tuple: (dict of data type -> offset, total size in bytes)
+    """
+    offsets = {}
+    offset = _align(HEADER_DTYPE.itemsize)
+    for data_type in DATA_TYPES:
+        offsets[data_type] = offset
+        offset = _align(offset + RECORD_DTYPES[data_type].itemsize * capacities[data_type])
+    return offsets, offset
+
+
+def _untrack(shm):
+    """
+    Stop the resource tracker from unlinking a segment this process only
+    attached to
+
+    Args:
+        shm (SharedMemory): Attached segment
+    """
+    try:
+        from multiprocessing import resource_tracker
+        resource_tracker.unregister(shm._name, 'shared_memory')
+    except Exception:
+        pass
+
+
+def _process_alive(pid):
+    """
+    Check whether a process exists
+
+    Args:
+        pid (int): Process id
+
+    Returns:
+        bool: True if the process is running (or cannot be probed)
+    """
+    if os.name == 'nt':
+        # Windows frees a segment with its last handle, so an existing one
+        # always has a live owner; os.kill would terminate the process
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _live_publisher(name):
+    """
+    Get the pid of a live publisher of an existing segment
+
+    Args:
+        name (str): Shared memory segment name
+
+    Returns:
+        int: Publisher pid, or None if the segment is not a quote book or
+            its publisher is gone
+    """
+    try:
+        shm = shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        shm = shared_memory.SharedMemory(name=name)
+        _untrack(shm)
+
+    try:
+        if shm.size < HEADER_DTYPE.itemsize:
+            return None
+        header = np.ndarray((1,), dtype=HEADER_DTYPE, buffer=shm.buf)
+        magic = int(header['magic'][0])
+        version = int(header['version'][0])
+        pid = int(header['publisher_pid'][0])
+        del header
+    finally:
+        shm.close()
+
+    if magic != BOOK_MAGIC or version != BOOK_VERSION or pid == 0:
+        return None
+    return pid if _process_alive(pid) else None
+
+
+class _QuoteBookRegion:
+    """
+    Structured NumPy views over a shared memory segment
+    """
+
+    def __init__(self, shm):
+        self.shm = shm
+        self.header = np.ndarray((1,), dtype=HEADER_DTYPE, buffer=shm.buf)
+
+        if int(self.header['magic'][0]) != BOOK_MAGIC or int(self.header['version'][0]) != BOOK_VERSION:
+            raise ValueError(f"Shared memory segment {shm.name} is not a quote book")
+
+        capacities = {
+            data_type: int(self.header[capacity_field][0])
+            for data_type, (capacity_field, _) in CAPACITY_FIELDS.items()
+        }
+        offsets, _ = _layout(capacities)
+
+        self.records = {
+            data_type: np.ndarray(
+                (capacities[data_type],),
+                dtype=RECORD_DTYPES[data_type],
+                buffer=shm.buf,
+                offset=offsets[data_type]
+            )
+            for data_type in DATA_TYPES
+        }
+        self.capacities = capacities
+
+    def count(self, data_type):
+        """
+        Get the number of used slots for a data type
+
+        Args:
+            data_type (str): One of DATA_TYPES
+
+        Returns:
+            int: Used slot count
+        """
+        return int(self.header[CAPACITY_FIELDS[data_type][1]][0])
+
+    def release(self):
+        """
+        Drop the NumPy views so the segment can be closed
+        """
+        self.header = None
+        self.records = {}
+
+
+class SharedQuoteBookPublisher:
+    """
+    Single writer that publishes cache updates into the shared quote book
+    """
+
+    def __init__(self, name=DEFAULT_BOOK_NAME, stock_capacity=4096, forex_capacity=64, index_capacity=64):
+        """
+        Args:
+            name (str, optional): Shared memory segment name
+            stock_capacity (int, optional): Stock quote slots
+            forex_capacity (int, optional): Forex rate slots
+            index_capacity (int, optional): Market index slots
+
+        Raises:
+            FileExistsError: If a running publisher already owns the name
+        """
+        capacities = {
+            'stock_quotes': stock_capacity,
+            'forex_rates': forex_capacity,
+            'market_indices': index_capacity
+        }
+        _, size = _layout(capacities)
+
+        try:
+            self.shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        except FileExistsError:
+            # Only a book whose publisher died without unlinking is taken
+            # over; a live one keeps its readers
+            pid = _live_publisher(name)
+            if pid is not None:
+                raise FileExistsError(f"Shared quote book {name} is published by running process {pid}")
+            stale = shared_memory.SharedMemory(name=name)
+            stale.close()
+            stale.unlink()
+            self.shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+
+        header = np.ndarray((1,), dtype=HEADER_DTYPE, buffer=self.shm.buf)
+        header[0] = 0
+        header['stock_capacity'] = stock_capacity
+        header['forex_capacity'] = forex_capacity
+        header['index_capacity'] = index_capacity
+        header['publisher_pid'] = os.getpid()
+        header['version'] = BOOK_VERSION
+        # Magic is written last so readers never attach to a half-built book
+        header['magic'] = BOOK_MAGIC
+        del header
+
+        self.region = _QuoteBookRegion(self.shm)
+        self.slots = {data_type: {} for data_type in DATA_TYPES}
+
+        logger.info(f"Created shared quote book {name} ({size} bytes)")
+
+    def publish(self, data_type, entries):
+        """
+        Publish cache entries for a data type
+
+        Args:
+            data_type (str): One of DATA_TYPES
+            entries (list): Cache entry dicts (keyed by symbol or pair)
+        """
+        if data_type not in self.slots:
+            return
+
+        records = self.region.records[data_type]
+        key_field = KEY_FIELDS[data_type]
+
+        for entry in entries:
+            key = entry.get(key_field)
+            if key is None:
+                continue
+
+            slot = self._slot_for(data_type, key)
+            if slot is None:
+                continue
+
+            record = records[slot]
+
+            # Odd sequence marks the record as being written
+            record['seq'] += 1
+            for field in VALUE_FIELDS[data_type]:
+                if field in entry:
+                    value = entry[field]
+                    if field == 'name':
+                        value = str(value).encode('utf-8')[:48]
+                    record[field] = value
+            record['seq'] += 1
+
+        self.region.header['version_counter'] += 1
+        self.region.header['publisher_heartbeat'] = time.time()
+
+    def _slot_for(self, data_type, key):
+        """
+        Get or assign the slot for a key
+
+        Args:
+            data_type (str): One of DATA_TYPES
+            key (str): Symbol or pair
+
+        Returns:
+            int: Slot index or None if the book is full
+        """
+        slots = self.slots[data_type]
+        slot = slots.get(key)
+        if slot is not None:
+            return slot
+
+        slot = len(slots)
+        if slot >= self.region.capacities[data_type]:
+            logger.warning(f"Shared quote book full for {data_type}, dropping {key}")
+            return None
+
+        records = self.region.records[data_type]
+        records[slot]['seq'] = 0
+        records[slot][KEY_FIELDS[data_type]] = str(key).encode('utf-8')[:16]
+        slots[key] = slot
+
+        # Publish the new slot only once its key is written
+        self.region.header[CAPACITY_FIELDS[data_type][1]] = slot + 1
+
+        return slot
+
+    def close(self):
+        """
+        Close and unlink the shared memory segment
+        """
+        self.region.header['publisher_pid'] = 0
+        self.region.release()
+        self.shm.close()
+        try:
+            self.shm.unlink()
+        except FileNotFoundError:
+            pass
+
+
+class SharedQuoteBookReader:
+    """
+    Read-only view of a shared quote book for any number of processes
+
+    Mirrors the read API of RealTimeDataIntegration without running any
+    fetch threads of its own.
+    """
+
+    def __init__(self, name=DEFAULT_BOOK_NAME, max_retries=100):
+        try:
+            # Python 3.13+: attach without registering with the resource tracker
+            self.shm = shared_memory.SharedMemory(name=name, track=False)
+        except TypeError:
+            self.shm = shared_memory.SharedMemory(name=name)
+            _untrack(self.shm)
+
+        self.region = _QuoteBookRegion(self.shm)
+        self.max_retries = max_retries
+        self._slot_maps = {data_type: {} for data_type in DATA_TYPES}
+
+    def version(self):
+        """
+        Get the book-wide version counter
+
+        Returns:
+            int: Number of publishes so far
+        """
+        return int(self.region.header['version_counter'][0])
+
+    def get_data_age(self):
+        """
+        Get age of the last publish in seconds
+
+        Returns:
+            float: Age in seconds or None if nothing was published yet
+        """
+        heartbeat = float(self.region.header['publisher_heartbeat'][0])
+        if heartbeat == 0:
+            return None
+        return time.time() - heartbeat
+
+    def records_view(self, data_type):
+        """
+        Get the raw zero-copy record view for a data type
+
+        Callers reading from this view directly must do their own seqlock
+        checks; read_records() does that for them.
+
+        Args:
+            data_type (str): One of DATA_TYPES
+
+        Returns:
+            numpy.ndarray: Structured view of the used slots
+        """
+        return self.region.records[data_type][:self.region.count(data_type)]
+
+    def read_records(self, data_type, slots=None):
+        """
+        Take a consistent copy of records
+
+        Args:
+            data_type (str): One of DATA_TYPES
+            slots (numpy.ndarray, optional): Slot indices to read, all if None
+
+        Returns:
+            numpy.ndarray: Consistent copy of the records
+        """
+        source = self.region.records[data_type]
+        if slots is None:
+            slots = np.arange(self.region.count(data_type))
+
+        result = np.empty(len(slots), dtype=RECORD_DTYPES[data_type])
+        pending = np.arange(len(slots))
+
+        for _ in range(self.max_retries):
+            before = source['seq'][slots[pending]]
+            copied = source[slots[pending]]
+            after = source['seq'][slots[pending]]
+
+            stable = (before == after) & (before % 2 == 0)
+            result[pending[stable]] = copied[stable]
+            pending = pending[~stable]
+
+            if pending.size == 0:
+                return result
+
+            # Let the writer finish before retrying torn records
+            time.sleep(0)
+
+        raise RuntimeError(f"Could not read a consistent {data_type} snapshot")
+
+    def _slot_map(self, data_type):
+        """
+        Get the key -> slot mapping, refreshing it if slots were added
+
+        Args:
+            data_type (str): One of DATA_TYPES
+
+        Returns:
+            dict: Key -> slot index
+        """
+        slot_map = self._slot_maps[data_type]
+        count = self.region.count(data_type)
+
+        if len(slot_map) != count:
+            keys = self.region.records[data_type][KEY_FIELDS[data_type]][:count]
+            slot_map = {key.decode('utf-8'): slot for slot, key in enumerate(keys)}
+            self._slot_maps[data_type] = slot_map
+
+        return slot_map
+
+    def _to_entries(self, data_type, records):
+        """
+        Convert records to cache-style entry dicts
+
+        Args:
+            data_type (str): One of DATA_TYPES
+            records (numpy.ndarray): Consistent record copy
+
+        Returns:
+            dict: Key -> entry dict
+        """
+        key_field = KEY_FIELDS[data_type]
+        entries = {}
+
+        for record in records:
+            if record['seq'] == 0:
+                # Slot assigned but never written
+                continue
+
+            key = record[key_field].decode('utf-8')
+            entry = {key_field: key}
+            for field in VALUE_FIELDS[data_type]:
+                value = record[field]
+                entry[field] = value.decode('utf-8') if field == 'name' else value.item()
+            entries[key] = entry
+
+        return entries
+
+    def get_stock_quotes(self, symbols=None):
+        """
+        Get current stock quotes
+
+        Args:
+            symbols (list, optional): List of stock symbols to get quotes for
+
+        Returns:
+            dict: Stock quotes data or empty dict if not available
+        """
+        if symbols is None:
+            return self._to_entries('stock_quotes', self.read_records('stock_quotes'))
+
+        slot_map = self._slot_map('stock_quotes')
+        slots = np.array([slot_map[symbol] for symbol in symbols if symbol in slot_map], dtype=np.int64)
+        return self._to_entries('stock_quotes', self.read_records('stock_quotes', slots))
+
+    def get_forex_rates(self):
+        """
+        Get current forex rates
+
+        Returns:
+            dict: Forex rates data or empty dict if not available
+        """
+        return self._to_entries('forex_rates', self.read_records('forex_rates'))
+
+    def get_market_indices(self):
+        """
+        Get current market indices
+
+        Returns:
+            dict: Market indices data or empty dict if not available
+        """
+        return self._to_entries('market_indices', self.read_records('market_indices'))
+
+    def close(self):
+        """
+        Detach from the shared memory segment
+        """
+        self.region.release()
+        self.shm.close()
@@ -0,0 +1,266 @@
+"""
+Symbol Registry Module for Trump Tariff Analysis Website
+
+This module implements a single registry of every tracked instrument (ASX
+stocks, market indices and forex crosses). Tickers are interned to dense
+integer ids and their metadata is held in columnar arrays, so both the
+real-time data service and the prediction model get O(1) lookups from one
+bulk-loaded source.
+"""
+
+import csv
+import os
+import threading
+
+try:
+    from .lazy_imports import lazy_import
+except ImportError:
+    from lazy_imports import lazy_import
+
+# Heavy dependencies load on first use, keeping module import cheap
+np = lazy_import('numpy')
+
+DEFAULT_UNIVERSE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'symbol_universe.csv')
+
+# Instrument kinds
+KIND_STOCK = 'stock'
+KIND_INDEX = 'index'
+KIND_FOREX = 'forex'
+
+# Categorical metadata columns, stored as small integer codes
+CATEGORICAL_COLUMNS = ('kind', 'sector', 'market_cap', 'risk_profile')
+
+
+class SymbolRegistry:
+    """
+    Interned symbols with columnar metadata
+    """
+
+    def __init__(self):
+        self.symbols = []
+        self.names = []
+        self._ids = {}
+
+        # Per-column category lists and code arrays; code -1 means missing
+        self.categories = {column: [] for column in CATEGORICAL_COLUMNS}
+        self._category_codes = {column: {} for column in CATEGORICAL_COLUMNS}
+        self.codes = {column: np.zeros(0, dtype=np.int16) for column in CATEGORICAL_COLUMNS}
+
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_file(cls, file_path=DEFAULT_UNIVERSE_FILE):
+        """
+        Bulk-load a registry from a CSV universe file
+
+        Args:
+            file_path (str, optional): CSV with symbol, name, kind, sector,
+                market_cap and risk_profile columns
+
+        Returns:
+            SymbolRegistry: Loaded registry
+        """
+        registry = cls()
+
+        with open(file_path, newline='', encoding='utf-8') as f:
+            rows = list(csv.DictReader(f))
+
+        registry.load_rows(rows)
+        return registry
+
+    def load_rows(self, rows):
+        """
+        Add many symbols at once, growing the columnar arrays a single time
+
+        Rows for symbols already registered update their metadata. A symbol
+        repeated within the batch is registered once, from its last row.
+
+        Args:
+            rows (list): Dicts with symbol, name and categorical columns
+        """
+        rows = list({row['symbol']: row for row in rows}.values())
+
+        with self._lock:
+            new_rows = [row for row in rows if row['symbol'] not in self._ids]
+            start = len(self.symbols)
+
+            for offset, row in enumerate(new_rows):
+                self._ids[row['symbol']] = start + offset
+                self.symbols.append(row['symbol'])
+                self.names.append(row.get('name') or row['symbol'])
+
+            grown = len(self.symbols)
+            for column in CATEGORICAL_COLUMNS:
+                codes = np.full(grown, -1, dtype=np.int16)
+                codes[:start] = self.codes[column]
+                self.codes[column] = codes
+
+            for row in rows:
+                symbol_id = self._ids[row['symbol']]
+                if row.get('name'):
+                    self.names[symbol_id] = row['name']
+                for column in CATEGORICAL_COLUMNS:
+                    value = row.get(column)
+                    if value:
+                        self.codes[column][symbol_id] = self._category_code(column, value)
+
+    def _category_code(self, column, value):
+        """
+        Get or assign the code of a category value; the lock must be held
+
+        Args:
+            column (str): Categorical column
+            value (str): Category value
+
+        Returns:
+            int: Category code
+        """
+        codes = self._category_codes[column]
+        code = codes.get(value)
+        if code is None:
+            code = len(self.categories[column])
+            codes[value] = code
+            self.categories[column].append(value)
+        return code
+
+    def intern(self, symbol, name=None, kind=None):
+        """
+        Get the id of a symbol, registering it if it is new
+
+        Args:
+            symbol (str): Ticker, index symbol or forex pair
+            name (str, optional): Display name for a new symbol
+            kind (str, optional): Instrument kind for a new symbol
+
+        Returns:
+            int: Dense integer id
+        """
+        symbol_id = self._ids.get(symbol)
+        if symbol_id is not None:
+            return symbol_id
+
+        self.load_rows([{'symbol': symbol, 'name': name or symbol, 'kind': kind or ''}])
+        return self._ids[symbol]
+
+    def id_of(self, symbol):
+        """
+        Get the id of a registered symbol
+
+        Args:
+            symbol (str): Symbol
+
+        Returns:
+            int: Dense integer id or None if not registered
+        """
+        return self._ids.get(symbol)
+
+    def __contains__(self, symbol):
+        return symbol in self._ids
+
+    def __len__(self):
+        return len(self.symbols)
+
+    def get(self, symbol, column):
+        """
+        Get a metadata value for a symbol
+
+        Args:
+            symbol (str): Symbol
+            column (str): "name" or a categorical column
+
+        Returns:
+            str: Value or None if missing
+        """
+        symbol_id = self._ids.get(symbol)
+        if symbol_id is None:
+            return None
+
+        if column == 'name':
+            return self.names[symbol_id]
+
+        code = self.codes[column][symbol_id]
+        return self.categories[column][code] if code >= 0 else None
+
+    def name(self, symbol):
+        """
+        Get the display name of a symbol
+
+        Args:
+            symbol (str): Symbol
+
+        Returns:
+            str: Name, or the symbol itself if unknown
+        """
+        symbol_id = self._ids.get(symbol)
+        return self.names[symbol_id] if symbol_id is not None else symbol
+
+    def ids_where(self, column, value):
+        """
+        Get ids of symbols whose categorical column equals a value
+
+        Args:
+            column (str): Categorical column
+            value (str): Category value
+
+        Returns:
+            numpy.ndarray: Matching ids in registration order
+        """
+        code = self._category_codes[column].get(value)
+        if code is None:
+            return np.zeros(0, dtype=np.int64)
+        return np.flatnonzero(self.codes[column] == code)
+
+    def symbols_of_kind(self, kind):
+        """
+        Get all symbols of an instrument kind
+
+        Args:
+            kind (str): KIND_STOCK, KIND_INDEX or KIND_FOREX
+
+        Returns:
+            list: Symbols in registration order
+        """
+        return [self.symbols[symbol_id] for symbol_id in self.ids_where('kind', kind)]
+
+    def records(self, kind=None):
+        """
+        Get metadata rows as dicts
+
+        Args:
+            kind (str, optional): Restrict to one instrument kind
+
+        Returns:
+            list: Dicts with symbol, name and categorical columns
+        """
+        ids = range(len(self.symbols)) if kind is None else self.ids_where('kind', kind)
+
+        rows = []
+        for symbol_id in ids:
+            row = {'symbol': self.symbols[symbol_id], 'name': self.names[symbol_id]}
+            for column in CATEGORICAL_COLUMNS:
+                code = self.codes[column][symbol_id]
+                row[column] = self.categories[column][code] if code >= 0 else None
+            rows.append(row)
+
+        return rows
+
+
+_default_registry = None
+_default_registry_lock = threading.Lock()
+
+
+def default_registry():
+    """
+    Get the registry loaded from the default universe file
+
+    Returns:
+        SymbolRegistry: Shared registry instance
+    """
+    global _default_registry
+
+    if _default_registry is None:
+        with _default_registry_lock:
+            if _default_registry is None:
+                _default_registry = SymbolRegistry.from_file()
+
+    return _default_registry
@@ -0,0 +1,483 @@
+"""
+Time-Series Codec Module for Trump Tariff Analysis Website
+
+This module implements a compressed columnar encoding for historical ticks
+and bars. Timestamps are stored as delta-of-delta varints, prices and rates
+as XOR-of-previous floats (a byte-aligned variant of Gorilla encoding), and
+volumes as varints. Every stage decodes with whole-block NumPy operations.
+"""
+
+import json
+import os
+import struct
+import zlib
+import logging
+
+try:
+    from .lazy_imports import lazy_import
+except ImportError:
+    from lazy_imports import lazy_import
+
+# Heavy dependencies load on first use, keeping module import cheap
+np = lazy_import('numpy')
+
+logger = logging.getLogger('real_time_data')
+
+# Column kinds
+KIND_TIMESTAMP = 'ts'   # int64, delta-of-delta + zigzag + varint
+KIND_FLOAT = 'float'    # float64, XOR with previous value
+KIND_UINT = 'uint'      # non-negative int64, varint
+
+FILE_MAGIC = b'TSC1'
+FILE_HEADER = struct.Struct('<4sI')      # magic, metadata length
+BLOCK_HEADER = struct.Struct('<III')     # row count, payload length, crc32
+COLUMN_HEADER = struct.Struct('<I')      # column payload length
+
+DEFAULT_BLOCK_SIZE = 4096
+
+# End offset of every file this process has validated or appended to, keyed
+# by absolute path. A file that still ends there has no torn tail, so only
+# the first append after opening one (or after another writer changed it)
+# scans its blocks.
+_validated_ends = {}
+
+
+def zigzag_encode(values):
+    """
+    Map signed int64 values to unsigned so small magnitudes stay small
+
+    Args:
+        values (numpy.ndarray): int64 values
+
+    Returns:
+        numpy.ndarray: uint64 values
+    """
+    values = values.astype(np.int64)
+    return ((values << 1) ^ (values >> 63)).astype(np.uint64)
+
+
+def zigzag_decode(values):
+    """
+    Inverse of zigzag_encode
+
+    Args:
+        values (numpy.ndarray): uint64 values
+
+    Returns:
+        numpy.ndarray: int64 values
+    """
+    values = values.astype(np.uint64)
+    return ((values >> np.uint64(1)).astype(np.int64) ^ -(values & np.uint64(1)).astype(np.int64))
+
+
+def varint_encode(values):
+    """
+    LEB128-encode unsigned integers
+
+    Args:
+        values (numpy.ndarray): uint64 values
+
+    Returns:
+        bytes: Encoded values
+    """
+    values = values.astype(np.uint64)
+    if values.size == 0:
+        return b''
+
+    # Number of 7-bit groups per value (at least one)
+    bit_length = np.zeros(values.size, dtype=np.int64)
+    remaining = values.copy()
+    while remaining.any():
+        nonzero = remaining != 0
+        bit_length[nonzero] += 7
+        remaining >>= np.uint64(7)
+    group_count = np.maximum(bit_length // 7, 1)
+
+    max_groups = int(group_count.max())
+    shifts = (np.arange(max_groups, dtype=np.uint64) * np.uint64(7))
+    groups = ((values[:, None] >> shifts[None, :]) & np.uint64(0x7F)).astype(np.uint8)
+
+    position = np.arange(max_groups)[None, :]
+    present = position < group_count[:, None]
+    continued = position < (group_count[:, None] - 1)
+    groups[continued] |= 0x80
+
+    # Row-major masking keeps every value's groups contiguous
+    return groups[present].tobytes()
+
+
+def varint_decode(data, count):
+    """
+    Decode LEB128 unsigned integers
+
+    Args:
+        data (bytes): Encoded values
+        count (int): Expected number of values
+
+    Returns:
+        numpy.ndarray: uint64 values
+    """
+    raw = np.frombuffer(data, dtype=np.uint8)
+    if count == 0:
+        return np.zeros(0, dtype=np.uint64)
+
+    ends = (raw & 0x80) == 0
+    starts = np.flatnonzero(np.concatenate(([True], ends[:-1])))
+
+    if starts.size != count:
+        raise ValueError(f"Expected {count} varints, found {starts.size}")
+
+    # Position of each byte within its value selects the shift
+    value_index = np.repeat(np.arange(count), np.diff(np.append(starts, raw.size)))
+    position = np.arange(raw.size) - starts[value_index]
+    contributions = (raw & 0x7F).astype(np.uint64) << (position.astype(np.uint64) * np.uint64(7))
+
+    return np.bitwise_or.reduceat(contributions, starts)
+
+
+def encode_timestamps(values):
+    """
+    Delta-of-delta encode int64 timestamps
+
+    Args:
+        values (numpy.ndarray): int64 timestamps
+
+    Returns:
+        bytes: Encoded timestamps
+    """
+    values = values.astype(np.int64)
+    deltas = np.diff(values, prepend=np.int64(0))
+    delta_of_deltas = np.diff(deltas, prepend=np.int64(0))
+    return varint_encode(zigzag_encode(delta_of_deltas))
+
+
+def decode_timestamps(data, count):
+    """
+    Decode delta-of-delta timestamps
+
+    Args:
+        data (bytes): Encoded timestamps
+        count (int): Number of values
+
+    Returns:
+        numpy.ndarray: int64 timestamps
+    """
+    delta_of_deltas = zigzag_decode(varint_decode(data, count))
+    return np.cumsum(np.cumsum(delta_of_deltas))
+
+
+def encode_floats(values):
+    """
+    XOR-encode float64 values against their predecessor
+
+    Each value is written as one control byte (leading zero bytes << 4 |
+    trailing zero bytes) followed by the remaining significant XOR bytes.
+
+    Args:
+        values (numpy.ndarray): float64 values
+
+    Returns:
+        bytes: Encoded values
+    """
+    bits = np.ascontiguousarray(values, dtype=np.float64).view(np.uint64)
+    xored = bits ^ np.concatenate(([np.uint64(0)], bits[:-1]))
+
+    xor_bytes = xored.astype('>u8').view(np.uint8).reshape(-1, 8)
+    nonzero = xor_bytes != 0
+    any_nonzero = nonzero.any(axis=1)
+
+    leading = np.where(any_nonzero, nonzero.argmax(axis=1), 8)
+    trailing = np.where(any_nonzero, nonzero[:, ::-1].argmax(axis=1), 0)
+
+    control = ((leading << 4) | trailing).astype(np.uint8)
+
+    position = np.arange(8)[None, :]
+    significant = (position >= leading[:, None]) & (position < (8 - trailing)[:, None])
+
+    return control.tobytes() + xor_bytes[significant].tobytes()
+
+
+def decode_floats(data, count):
+    """
+    Decode XOR-encoded float64 values
+
+    Args:
+        data (bytes): Encoded values
+        count (int): Number of values
+
+    Returns:
+        numpy.ndarray: float64 values
+    """
+    raw = np.frombuffer(data, dtype=np.uint8)
+    control = raw[:count]
+    payload = raw[count:]
+
+    leading = (control >> 4).astype(np.int64)
+    trailing = (control & 0x0F).astype(np.int64)
+    lengths = 8 - leading - trailing
+    lengths[leading == 8] = 0
+
+    offsets = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+
+    # Scatter every significant byte back to its (row, column) slot
+    rows = np.repeat(np.arange(count), lengths)
+    columns = leading[rows] + (np.arange(payload.size) - offsets[rows])
+
+    xor_bytes = np.zeros((count, 8), dtype=np.uint8)
+    xor_bytes[rows, columns] = payload
+
+    xored = xor_bytes.view('>u8').reshape(count).astype(np.uint64)
+    bits = np.bitwise_xor.accumulate(xored)
+
+    return bits.view(np.float64)
+
+
+ENCODERS = {
+    KIND_TIMESTAMP: encode_timestamps,
+    KIND_FLOAT: encode_floats,
+    KIND_UINT: lambda values: varint_encode(np.asarray(values, dtype=np.int64).astype(np.uint64))
+}
+
+DECODERS = {
+    KIND_TIMESTAMP: decode_timestamps,
+    KIND_FLOAT: decode_floats,
+    KIND_UINT: lambda data, count: varint_decode(data, count).astype(np.int64)
+}
+
+
+def encode_block(columns, schema):
+    """
+    Encode one block of rows
+
+    Args:
+        columns (dict): Column name -> array, all of equal length
+        schema (list): (column name, kind) pairs
+
+    Returns:
+        bytes: Encoded block including its header
+    """
+    count = len(columns[schema[0][0]])
+    parts = []
+
+    for name, kind in schema:
+        encoded = ENCODERS[kind](np.asarray(columns[name]))
+        parts.append(COLUMN_HEADER.pack(len(encoded)))
+        parts.append(encoded)
+
+    payload = b''.join(parts)
+    return BLOCK_HEADER.pack(count, len(payload), zlib.crc32(payload)) + payload
+
+
+def decode_block(data, offset, schema):
+    """
+    Decode one block of rows
+
+    Args:
+        data (bytes): Buffer holding the block
+        offset (int): Offset of the block header
+        schema (list): (column name, kind) pairs
+
+    Returns:
+        tuple: (dict of column arrays, offset of the next block)
+    """
+    count, length, crc = BLOCK_HEADER.unpack_from(data, offset)
+    start = offset + BLOCK_HEADER.size
+    payload = data[start:start + length]
+
+    if len(payload) != length or zlib.crc32(payload) != crc:
+        raise ValueError(f"Corrupt block at offset {offset}")
+
+    columns = {}
+    position = 0
+    for name, kind in schema:
+        (column_length,) = COLUMN_HEADER.unpack_from(payload, position)
+        position += COLUMN_HEADER.size
+        columns[name] = DECODERS[kind](payload[position:position + column_length], count)
+        position += column_length
+
+    return columns, start + length
+
+
+class TimeSeriesFile:
+    """
+    Append-only file of encoded blocks for a single symbol
+    """
+
+    def __init__(self, file_path):
+        self.file_path = file_path
+
+    def exists(self):
+        """
+        Check whether the file exists
+
+        Returns:
+            bool: True if the file exists
+        """
+        return os.path.isfile(self.file_path)
+
+    def append(self, columns, schema, metadata=None, block_size=DEFAULT_BLOCK_SIZE):
+        """
+        Append rows, creating the file if needed
+
+        Args:
+            columns (dict): Column name -> array
+            schema (list): (column name, kind) pairs
+            metadata (dict, optional): Constant fields stored once in the header
+            block_size (int, optional): Maximum rows per block
+        """
+        count = len(columns[schema[0][0]])
+
+        # Forget the offset until this append completes, so a failed write
+        # is rescanned next time
+        path = os.path.abspath(self.file_path)
+        if _validated_ends.pop(path, None) != self._size():
+            self._truncate_torn_tail()
+
+        with open(self.file_path, 'ab') as f:
+            if f.tell() == 0:
+                f.write(self._encode_header(schema, metadata or {}))
+
+            for start in range(0, count, block_size):
+                block = {name: np.asarray(columns[name])[start:start + block_size] for name, _ in schema}
+                f.write(encode_block(block, schema))
+
+            _validated_ends[path] = f.tell()
+
+    def write(self, columns, schema, metadata=None, block_size=DEFAULT_BLOCK_SIZE):
+        """
+        Replace the file contents atomically
+
+        Args:
+            columns (dict): Column name -> array
+            schema (list): (column name, kind) pairs
+            metadata (dict, optional): Constant fields stored once in the header
+            block_size (int, optional): Maximum rows per block
+        """
+        tmp_path = self.file_path + '.tmp'
+        if os.path.isfile(tmp_path):
+            os.remove(tmp_path)
+
+        TimeSeriesFile(tmp_path).append(columns, schema, metadata, block_size)
+        end = _validated_ends.pop(os.path.abspath(tmp_path), None)
+        os.replace(tmp_path, self.file_path)
+        if end is None:
+            _validated_ends.pop(os.path.abspath(self.file_path), None)
+        else:
+            _validated_ends[os.path.abspath(self.file_path)] = end
+
+    def read(self):
+        """
+        Decode every block in the file
+
+        A truncated or corrupt trailing block is skipped rather than failing
+        the whole read.
+
+        Returns:
+            tuple: (dict of column arrays, schema, metadata)
+        """
+        with open(self.file_path, 'rb') as f:
+            data = f.read()
+
+        schema, metadata, offset = self._decode_header(data)
+
+        blocks = []
+        while offset + BLOCK_HEADER.size <= len(data):
+            try:
+                columns, offset = decode_block(data, offset, schema)
+            except ValueError:
+                break
+            blocks.append(columns)
+
+        columns = {}
+        for name, kind in schema:
+            dtype = np.float64 if kind == KIND_FLOAT else np.int64
+            parts = [block[name] for block in blocks]
+            columns[name] = np.concatenate(parts) if parts else np.zeros(0, dtype=dtype)
+
+        return columns, schema, metadata
+
+    def _size(self):
+        """
+        Get the file size, None if the file does not exist
+        """
+        try:
+            return os.path.getsize(self.file_path)
+        except OSError:
+            return None
+
+    def _decode_header(self, data):
+        """
+        Decode the file header
+
+        Args:
+            data (bytes): File contents
+
+        Returns:
+            tuple: (schema, metadata, offset of the first block)
+        """
+        if len(data) < FILE_HEADER.size:
+            raise ValueError(f"Truncated time-series file header: {self.file_path}")
+
+        magic, metadata_length = FILE_HEADER.unpack_from(data, 0)
+        if magic != FILE_MAGIC:
+            raise ValueError(f"Not a time-series file: {self.file_path}")
+
+        end = FILE_HEADER.size + metadata_length
+        if len(data) < end:
+            raise ValueError(f"Truncated time-series file header: {self.file_path}")
+
+        header = json.loads(data[FILE_HEADER.size:end])
+        return [tuple(entry) for entry in header['schema']], header['metadata'], end
+
+    def _truncate_torn_tail(self):
+        """
+        Cut a truncated or corrupt tail off the file, so appended blocks
+        follow the last valid one instead of being hidden behind garbage
+
+        Reads the whole file; append() runs it only when the file does not
+        end where this process last left it.
+
+        A file whose header itself is torn holds no rows and is emptied, so
+        the next append writes a fresh header.
+        """
+        if not self.exists():
+            return
+
+        with open(self.file_path, 'rb') as f:
+            data = f.read()
+        if not data:
+            return
+
+        try:
+            _, _, offset = self._decode_header(data)
+        except ValueError:
+            if data[:len(FILE_MAGIC)] != FILE_MAGIC[:len(data)]:
+                raise
+            offset = 0
+        else:
+            while offset + BLOCK_HEADER.size <= len(data):
+                _, length, crc = BLOCK_HEADER.unpack_from(data, offset)
+                start = offset + BLOCK_HEADER.size
+                payload = data[start:start + length]
+                if len(payload) != length or zlib.crc32(payload) != crc:
+                    break
+                offset = start + length
+
+        if offset < len(data):
+            logger.warning(f"Torn tail in {self.file_path} at offset {offset}, discarding {len(data) - offset} bytes")
+            with open(self.file_path, 'r+b') as f:
+                f.truncate(offset)
+
+    def _encode_header(self, schema, metadata):
+        """
+        Encode the file header
+
+        Args:
+            schema (list): (column name, kind) pairs
+            metadata (dict): Constant fields
+
+        Returns:
+            bytes: Encoded header
+        """
+        header = json.dumps({'schema': schema, 'metadata': metadata}).encode('utf-8')
+        return FILE_HEADER.pack(FILE_MAGIC, len(header)) + header
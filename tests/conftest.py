@@ -0,0 +1,101 @@
+"""
+Shared test setup: the data modules import each other by plain module name
+when not loaded as a package, as the benchmarks and scripts run them
+"""
+
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, 'data'))
+sys.path.insert(0, os.path.join(ROOT, 'data', 'prediction_models'))
+sys.path.insert(0, os.path.join(ROOT, 'data', 'benchmarks'))
+
+import numpy as np  # noqa: E402
+import pytest  # noqa: E402
+
+RISK_PROFILES = ["low", "medium", "high", "very_high"]
+MARKET_CAPS = ["small", "mid", "large", "mega"]
+
+
+def synthetic_universe(size, seed, sectors):
+    """
+    Build a seeded synthetic stock universe with the model's columns
+    """
+    from stock_universe import StockUniverseTable
+
+    rng = np.random.default_rng(seed)
+    us_revenue = rng.integers(0, 41, size)
+    china_revenue = rng.integers(5, 71, size)
+    exposed = (us_revenue > 20) | (china_revenue > 40)
+
+    return StockUniverseTable({
+        "symbol": [f"SYN{i:05d}.AX" for i in range(size)],
+        "name": [f"Synthetic {i}" for i in range(size)],
+        "sector": rng.choice(sectors, size),
+        "market_cap": rng.choice(MARKET_CAPS, size),
+        "risk_profile": rng.choice(RISK_PROFILES, size),
+        "us_revenue_pct": us_revenue,
+        "china_revenue_pct": china_revenue,
+        "tariff_sensitivity": np.where(exposed, rng.integers(50, 96, size), rng.integers(20, 50, size)),
+        "rsi": rng.integers(30, 71, size),
+        "macd": rng.uniform(-2.0, 2.0, size),
+        "bollinger_position": rng.uniform(-1.0, 1.0, size),
+        "beta": rng.uniform(0.5, 2.0, size),
+        "annualized_volatility": rng.uniform(15.0, 45.0, size),
+        "current_price": np.round(rng.uniform(5.0, 200.0, size), 2),
+        "price_change_pct": np.round(rng.uniform(-5.0, 5.0, size), 2),
+        "volume": rng.integers(500_000, 5_000_001, size)
+    })
+
+
+# Series of the synthetic streams fed to correlation engines
+STOCKS = ["BHP.AX", "CBA.AX", "LATE.AX"]
+FACTORS = ["AUD/USD", "^AXJO"]
+BAR_MS = 60_000
+LATE_START = 50
+
+
+def price_paths(bars, seed):
+    """
+    Seeded price paths per series; LATE.AX has no ticks before LATE_START
+    """
+    rng = np.random.default_rng(seed)
+    factor_returns = rng.normal(0, 0.002, (bars, len(FACTORS)))
+    stock_returns = factor_returns @ rng.uniform(0.3, 1.5, (len(FACTORS), len(STOCKS))) + \
+        rng.normal(0, 0.003, (bars, len(STOCKS)))
+    prices = 100 * np.exp(np.cumsum(np.hstack([stock_returns, factor_returns]), axis=0))
+    prices[:LATE_START, STOCKS.index("LATE.AX")] = np.nan
+    return prices
+
+
+def feed(engine, prices):
+    """
+    Tick every series once per bar, then close the last bar
+
+    Returns:
+        numpy.ndarray: Log returns of the closed bars (bars x series)
+    """
+    symbols = STOCKS + FACTORS
+    for bar, row in enumerate(prices):
+        for symbol, value in zip(symbols, row):
+            if not np.isnan(value):
+                engine.update(symbol, float(value), bar * BAR_MS + 1)
+    engine.update(symbols[0], float(prices[-1, 0]), len(prices) * BAR_MS + 1)
+
+    with np.errstate(invalid='ignore'):
+        return np.log(prices[1:] / prices[:-1])
+
+
+@pytest.fixture
+def synthetic_model():
+    """
+    Model over a 400-stock synthetic universe with its indexes built
+    """
+    from stock_prediction_model import StockPredictionModel
+
+    model = StockPredictionModel(seed=3)
+    model.set_universe(synthetic_universe(400, 3, sorted(model.sector_mappings)))
+    model.get_all_predictions(min_movement=0, limit=10)
+    model.get_sector_predictions()
+    return model
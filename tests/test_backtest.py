@@ -0,0 +1,86 @@
+"""
+Tests for backtested historical accuracy
+"""
+
+import types
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from history_retention import HistoryRetentionEngine
+from stock_prediction_model import StockPredictionModel, DEFAULT_ACCURACY_STATS
+
+
+def write_history(historical_dir, symbols, days=120, seed=5):
+    retention = HistoryRetentionEngine(historical_dir, storage_format='tsc')
+    rng = np.random.default_rng(seed)
+    start = pd.Timestamp("2025-01-01 10:00:00")
+    for symbol in symbols:
+        prices = 50 * np.exp(np.cumsum(rng.normal(0, 0.02, days)))
+        for day, price in enumerate(prices):
+            timestamp = start + pd.Timedelta(days=day)
+            retention.append_tick(symbol, {
+                'symbol': symbol,
+                'price': float(price),
+                'volume': 1000,
+                'timestamp': int(timestamp.timestamp() * 1000),
+                'datetime': timestamp.strftime('%Y-%m-%d %H:%M:%S')
+            })
+    retention.flush()
+    return retention
+
+
+@pytest.fixture
+def model(tmp_path):
+    model = StockPredictionModel(seed=11)
+    retention = write_history(str(tmp_path), list(model.stocks["symbol"]))
+    model.attach_history(types.SimpleNamespace(retention=retention))
+    model.backtester.workers = 1
+    return model
+
+
+def test_backtest_reads_attached_storage_format(model):
+    stats = model.get_historical_accuracy_stats()
+
+    assert stats["source"] == "backtest"
+    assert stats["evaluated_predictions"] > 0
+    assert model.historical_accuracy["overall"] == stats["overall_accuracy"]
+    assert model.historical_accuracy["by_sector"] == stats["by_sector"]
+
+
+def test_backtest_result_cached_until_weights_change(model):
+    first = model.backtester.run(model.stocks, model.sector_mappings, model.factor_weights, model.confidence_levels)
+    assert model.backtester.run(model.stocks, model.sector_mappings, model.factor_weights,
+                                model.confidence_levels) is first
+
+    model.set_factor_weights({"tariff_sensitivity": 0.5})
+    assert model.backtester.run(model.stocks, model.sector_mappings, model.factor_weights,
+                                model.confidence_levels) is not first
+
+
+def test_accuracy_change_invalidates_cached_predictions(model):
+    symbol = model.stocks["symbol"][0]
+    before = model.get_prediction(symbol)
+    assert model.get_prediction(symbol) is before
+
+    stats = model.get_historical_accuracy_stats()
+
+    after = model.get_prediction(symbol)
+    assert after is not before
+    quoted = f"accuracy of {stats['overall_accuracy'] * 100:.1f}% for"
+    assert quoted in after["rationale"]["confidence_explanation"]
+
+
+def test_insufficient_history_falls_back_to_defaults_only(model, tmp_path):
+    model.get_historical_accuracy_stats()
+    model.attach_history(types.SimpleNamespace(retention=HistoryRetentionEngine(str(tmp_path / "empty"))))
+
+    stats = model.get_historical_accuracy_stats()
+
+    assert stats["source"] == "default"
+    for key, value in DEFAULT_ACCURACY_STATS.items():
+        assert stats[key] == value
+    assert model.historical_accuracy["overall"] == DEFAULT_ACCURACY_STATS["overall_accuracy"]
+    assert model.historical_accuracy["by_confidence"] == DEFAULT_ACCURACY_STATS["by_confidence_level"]
+    assert model.historical_accuracy["by_sector"] == DEFAULT_ACCURACY_STATS["by_sector"]
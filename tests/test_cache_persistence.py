@@ -0,0 +1,114 @@
+"""
+Tests for snapshot + WAL persistence of the real-time data cache
+"""
+
+import os
+import time
+
+import pytest
+
+from cache_persistence import CachePersistence, WriteAheadLog, FSYNC_INTERVAL, FSYNC_NEVER
+from real_time_data_integration import RealTimeDataIntegration
+
+
+def set_record(data_type, value, cache_time=1.0):
+    return ('set', data_type, value, cache_time)
+
+
+def test_wal_replays_records_in_order(tmp_path):
+    wal = WriteAheadLog(str(tmp_path / "cache.wal"), fsync_policy=FSYNC_NEVER)
+    wal.open(0)
+    for index in range(5):
+        assert wal.append(set_record('quotes', index)) == index + 1
+    wal.close()
+
+    records, last_sequence = WriteAheadLog(str(tmp_path / "cache.wal")).replay()
+    assert [sequence for sequence, _ in records] == [1, 2, 3, 4, 5]
+    assert [record[2] for _, record in records] == [0, 1, 2, 3, 4]
+    assert last_sequence == 5
+
+    records, _ = WriteAheadLog(str(tmp_path / "cache.wal")).replay(after_sequence=3)
+    assert [sequence for sequence, _ in records] == [4, 5]
+
+
+def test_wal_truncates_torn_tail(tmp_path):
+    path = str(tmp_path / "cache.wal")
+    wal = WriteAheadLog(path, fsync_policy=FSYNC_NEVER)
+    wal.open(0)
+    for index in range(3):
+        wal.append(set_record('quotes', index))
+    valid_size = os.path.getsize(path)
+    wal.append(set_record('quotes', 3))
+    wal.close()
+
+    with open(path, 'r+b') as f:
+        f.truncate(os.path.getsize(path) - 5)
+
+    wal = WriteAheadLog(path, fsync_policy=FSYNC_NEVER)
+    records, last_sequence = wal.replay()
+    assert [record[2] for _, record in records] == [0, 1, 2]
+    assert last_sequence == 3
+    assert os.path.getsize(path) == valid_size
+
+    # New records follow the last valid one and replay after a restart
+    wal.open(last_sequence)
+    assert wal.append(set_record('quotes', 'after')) == 4
+    wal.close()
+    records, _ = WriteAheadLog(path).replay()
+    assert [record[2] for _, record in records] == [0, 1, 2, 'after']
+
+
+def test_snapshot_and_wal_restore(tmp_path):
+    persistence = CachePersistence(str(tmp_path), fsync_policy=FSYNC_NEVER)
+    persistence.restore()
+    persistence.log(set_record('forex_rates', {'AUD/USD': 0.65}, 10.0))
+    persistence.write_snapshot(persistence.capture({'forex_rates': {'AUD/USD': 0.65}}, {'forex_rates': 10.0}))
+    persistence.log(set_record('market_indices', {'^AXJO': 7800.0}, 11.0))
+    persistence.close()
+
+    data_cache, cache_timestamps = CachePersistence(str(tmp_path)).restore()
+    assert data_cache == {'forex_rates': {'AUD/USD': 0.65}, 'market_indices': {'^AXJO': 7800.0}}
+    assert cache_timestamps == {'forex_rates': 10.0, 'market_indices': 11.0}
+
+
+@pytest.fixture
+def integration(tmp_path):
+    integration = RealTimeDataIntegration(data_dir=str(tmp_path))
+    yield integration
+    if integration.is_running:
+        integration.stop()
+
+
+def test_restart_reopens_wal(integration, tmp_path):
+    integration.start()
+    integration.stop()
+    integration.start()
+
+    integration._set_cache('restart_check', {'value': 1})
+    assert integration.persistence.wal.sequence > 0
+    integration.persistence.close()
+
+    data_cache, _ = CachePersistence(str(tmp_path)).restore()
+    assert data_cache['restart_check'] == {'value': 1}
+
+
+def test_interval_policy_syncs_the_last_records_of_a_burst(tmp_path, monkeypatch):
+    import cache_persistence
+
+    synced = []
+    real_fsync = os.fsync
+    monkeypatch.setattr(cache_persistence.os, 'fsync', lambda fd: (synced.append(fd), real_fsync(fd)))
+
+    wal = WriteAheadLog(str(tmp_path / "cache.wal"), fsync_policy=FSYNC_INTERVAL, fsync_interval=0.1)
+    wal.open(0)
+    for index in range(5):
+        wal.append(set_record('quotes', index))
+    assert len(synced) == 1
+
+    # No further appends: the timer syncs the rest of the burst
+    deadline = time.monotonic() + 2
+    while wal._unsynced and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert not wal._unsynced
+    assert len(synced) == 2
+    wal.close()
@@ -0,0 +1,94 @@
+"""
+Tests for streaming correlations against NumPy and pandas references
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from correlation_engine import CorrelationEngine
+
+from .conftest import BAR_MS, FACTORS, LATE_START, STOCKS, feed, price_paths
+
+
+def reference(returns, kind, min_bars):
+    """
+    Statistic of every stock and factor from the returns with NumPy
+    """
+    values = np.full((len(STOCKS), len(FACTORS)), np.nan)
+    for row in range(len(STOCKS)):
+        for column in range(len(FACTORS)):
+            x = returns[:, row]
+            y = returns[:, len(STOCKS) + column]
+            valid = ~(np.isnan(x) | np.isnan(y))
+            if valid.sum() < min_bars:
+                continue
+            covariance = np.cov(x[valid], y[valid], ddof=1)
+            if kind == "correlation":
+                values[row, column] = np.corrcoef(x[valid], y[valid])[0, 1]
+            elif kind == "covariance":
+                values[row, column] = covariance[0, 1]
+            else:
+                values[row, column] = covariance[0, 1] / covariance[1, 1]
+    return values
+
+
+@pytest.mark.parametrize("kind", ["correlation", "covariance", "beta"])
+def test_rolling_statistics_match_numpy_before_the_window_fills(kind):
+    engine = CorrelationEngine(STOCKS, FACTORS, bar_seconds=BAR_MS / 1000, window=200, min_bars=20)
+    returns = feed(engine, price_paths(120, 1))
+
+    measured = engine.matrix(kind)
+    assert measured["bars"] == len(returns)
+    np.testing.assert_allclose(measured["values"], reference(returns, kind, 20), rtol=1e-9)
+
+
+@pytest.mark.parametrize("kind", ["correlation", "covariance", "beta"])
+def test_rolling_statistics_match_numpy_after_removals(kind):
+    # 300 bars through a 60-bar window: every bar past the 60th removes one,
+    # and the late stock's first returns leave the window too
+    engine = CorrelationEngine(STOCKS, FACTORS, bar_seconds=BAR_MS / 1000, window=60, min_bars=20)
+    returns = feed(engine, price_paths(300, 2))
+
+    np.testing.assert_allclose(engine.matrix(kind)["values"], reference(returns[-60:], kind, 20), rtol=1e-8)
+
+
+def test_pairs_below_min_bars_are_not_reported():
+    engine = CorrelationEngine(STOCKS, FACTORS, bar_seconds=BAR_MS / 1000, window=200, min_bars=30)
+    feed(engine, price_paths(LATE_START + 20, 3))
+
+    late = STOCKS.index("LATE.AX")
+    values = engine.matrix()["values"]
+    assert np.isnan(values[late]).all()
+    assert not np.isnan(np.delete(values, late, axis=0)).any()
+    assert engine.get("LATE.AX", "^AXJO") is None
+    assert engine.correlations("LATE.AX") == {}
+
+
+def test_ewma_statistics_match_pandas():
+    engine = CorrelationEngine(STOCKS, FACTORS, bar_seconds=BAR_MS / 1000, window=60, halflife=15, min_bars=20)
+    returns = pd.DataFrame(feed(engine, price_paths(200, 4)), columns=STOCKS + FACTORS)
+
+    for stock in STOCKS:
+        for factor in FACTORS:
+            pair = returns[[stock, factor]].dropna()
+            ewm = pair.ewm(alpha=engine.alpha, adjust=False)
+            covariance = ewm.cov(bias=True).iloc[-2:].to_numpy()
+
+            assert engine.get(stock, factor, "covariance", "ewma") == pytest.approx(covariance[0, 1], rel=1e-9)
+            assert engine.get(stock, factor, "beta", "ewma") == pytest.approx(
+                covariance[0, 1] / covariance[1, 1], rel=1e-9)
+            assert engine.get(stock, factor, "correlation", "ewma") == pytest.approx(
+                covariance[0, 1] / np.sqrt(covariance[0, 0] * covariance[1, 1]), rel=1e-9)
+
+
+def test_bar_listeners_see_the_returns_leaving_the_window():
+    engine = CorrelationEngine(STOCKS, FACTORS, bar_seconds=BAR_MS / 1000, window=10)
+    seen = []
+    engine.add_bar_listener(lambda returns, removed, bar_ms: seen.append((returns.copy(), removed)))
+    returns = feed(engine, price_paths(30, 5))
+
+    assert len(seen) == len(returns)
+    assert all(removed is None for _, removed in seen[:10])
+    for index in range(10, len(seen)):
+        np.testing.assert_array_equal(seen[index][1], seen[index - 10][0])
@@ -0,0 +1,155 @@
+"""
+Tests for the versioned feature store and its snapshots
+"""
+
+import numpy as np
+
+from feature_store import FEATURE_NAMES, MIN_VOLATILITY_RETURNS, FeatureStore
+
+SYMBOLS = ["BHP.AX", "CBA.AX", "FMG.AX"]
+
+
+def populated_store(snapshot_path=None):
+    """
+    Store fed quotes, forex rates, news and indicators
+    """
+    store = FeatureStore(snapshot_path=snapshot_path)
+    store.register_stocks(SYMBOLS, names=["BHP Group", "Commonwealth Bank", "Fortescue"],
+                          us_revenue_pct=[20, 5, 10], china_revenue_pct=[60, 0, 80])
+
+    rng = np.random.default_rng(4)
+    prices = 50 * np.exp(np.cumsum(rng.normal(0, 0.002, (MIN_VOLATILITY_RETURNS + 5, 2)), axis=0))
+    for tick, row in enumerate(prices):
+        store.update_quote("BHP.AX", row[0], volume=1000, change_pct=0.5, timestamp_ms=tick * 60_000)
+        store.update_quote("FMG.AX", row[1], volume=10, timestamp_ms=tick * 60_000, cumulative_volume=True)
+
+    store.update_fx_rate("AUD/USD", 0.66, 0)
+    store.update_fx_rate("AUD/USD", 0.65, 3_600_000)
+    store.update_fx_rate("AUD/CNY", 4.70, 3_600_000)
+    store.update_news({"id": "n1", "headline": "Tariffs weigh on Fortescue", "sentiment": "negative"})
+    store.update_news({"id": "n2", "headline": "Markets steady", "sentiment": "positive"})
+    store.update_macro({"US": {"cpi": {"value": 3.1, "previous": 3.3, "timestamp": 1}}})
+    return store
+
+
+def assert_same_features(first, second):
+    for symbol in SYMBOLS:
+        assert first.get(symbol) == second.get(symbol)
+
+
+class FakeSource:
+    def __init__(self):
+        self.subscribers = {}
+
+    def subscribe(self, data_type, callback):
+        self.subscribers.setdefault(data_type, []).append(callback)
+
+    def unsubscribe(self, data_type, callback):
+        self.subscribers[data_type].remove(callback)
+
+
+def test_features_follow_the_streams():
+    store = populated_store()
+
+    bhp, cba, fmg = (store.get(symbol) for symbol in SYMBOLS)
+    assert bhp["volume"] == 1000 and bhp["volatility"] > 0
+    assert fmg["volume"] == 10 * (MIN_VOLATILITY_RETURNS + 5)
+    # Trades roll no daily change forward until a quote sets one
+    assert fmg["change_pct"] is None
+    assert cba["price"] is None and cba["volatility"] is None
+    # A weaker AUD helps US revenue; CBA has almost none
+    assert bhp["fx_exposure"] > cba["fx_exposure"] > 0
+    # Fortescue was named in the negative article
+    assert fmg["sentiment"] < bhp["sentiment"]
+    assert store.get("XYZ.AX") is None
+
+
+def test_changed_since_reports_only_newer_stamps():
+    store = populated_store()
+    version = store.version
+
+    assert store.changed_since(version) == ([], version)
+    store.update_quote("CBA.AX", 120.0)
+    assert store.changed_since(version) == (["CBA.AX"], version + 1)
+    assert store.get("CBA.AX")["version"] == version + 1
+
+    # Forex moves restamp every exposed stock
+    changed, latest = store.changed_since(version + 1)
+    store.update_fx_rate("AUD/CNY", 4.6)
+    assert store.changed_since(latest)[0] == ["BHP.AX", "FMG.AX"]
+
+    features = store.features(["FMG.AX", "XYZ.AX"])
+    assert set(features) == set(FEATURE_NAMES) | {"version"}
+    assert features["version"].tolist() == [store.version, 0]
+    assert np.isnan(features["price"][1])
+
+
+def test_snapshot_round_trip(tmp_path):
+    path = str(tmp_path / "features" / "snapshot.npz")
+    store = populated_store(path)
+    store.snapshot()
+
+    restored = FeatureStore(snapshot_path=path)
+    assert restored.restore()
+    assert restored.version == store.version
+    assert restored.market_sentiment == store.market_sentiment
+    assert restored.fx_rates == store.fx_rates
+    assert restored.macro == store.macro
+    assert_same_features(restored, store)
+
+    # Streaming state resumes where it left off
+    for target in (store, restored):
+        target.update_quote("BHP.AX", 51.0, timestamp_ms=(MIN_VOLATILITY_RETURNS + 6) * 60_000)
+        target.update_fx_rate("AUD/USD", 0.64, 7_200_000)
+    assert_same_features(restored, store)
+
+    # Articles already applied are not applied twice
+    assert not restored.update_news({"id": "n1", "headline": "Tariffs weigh on Fortescue", "sentiment": "negative"})
+
+
+def test_restore_keeps_registered_stocks(tmp_path):
+    path = str(tmp_path / "snapshot.npz")
+    populated_store(path).snapshot()
+
+    store = FeatureStore(snapshot_path=path)
+    store.register_stocks(["WES.AX"])
+    store.update_quote("WES.AX", 60.0)
+    assert store.restore()
+
+    assert store.symbols == ["WES.AX"] + SYMBOLS
+    assert store.get("WES.AX")["price"] == 60.0
+    assert store.get("BHP.AX")["volume"] == 1000
+
+
+def test_missing_or_corrupt_snapshots_are_skipped(tmp_path):
+    path = tmp_path / "snapshot.npz"
+    store = FeatureStore(snapshot_path=str(path))
+    assert not store.restore()
+
+    path.write_bytes(b"not a snapshot")
+    assert not store.restore()
+    assert len(store) == 0
+
+
+def test_attach_restores_once_and_detach_snapshots(tmp_path):
+    path = str(tmp_path / "snapshot.npz")
+    populated_store(path).snapshot()
+
+    store = FeatureStore(snapshot_path=path, snapshot_interval=3600)
+    source = FakeSource()
+    store.attach(source)
+    assert store.get("BHP.AX")["volume"] == 1000
+
+    source.subscribers["stock_quotes"][0]({"symbol": "CBA.AX", "price": 121.0, "change_pct": 0.4})
+    store.detach()
+    assert all(callbacks == [] for callbacks in source.subscribers.values())
+
+    # A second attach keeps the live state rather than restoring again
+    store.update_quote("CBA.AX", 122.0)
+    store.attach(source)
+    assert store.get("CBA.AX")["price"] == 122.0
+    store.detach()
+
+    restored = FeatureStore(snapshot_path=path)
+    assert restored.restore()
+    assert restored.get("CBA.AX")["price"] == 122.0
@@ -0,0 +1,67 @@
+"""
+Tests for tiered retention and compaction of tick history
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from history_retention import HistoryRetentionEngine
+
+NOW = pd.Timestamp("2025-03-31 12:00:00")
+
+
+def make_engine(tmp_path, storage_format):
+    return HistoryRetentionEngine(str(tmp_path), io_budget_bytes_per_sec=0,
+                                  storage_format=storage_format, tick_block_size=64)
+
+
+def tick(timestamp, price, volume=100):
+    return {
+        'symbol': 'BHP.AX',
+        'price': price,
+        'volume': volume,
+        'timestamp': int(timestamp.timestamp() * 1000),
+        'datetime': timestamp.strftime('%Y-%m-%d %H:%M:%S')
+    }
+
+
+@pytest.mark.parametrize("start_date, expected", [
+    (None, 'raw'),
+    (NOW - pd.Timedelta(hours=6), 'raw'),
+    (NOW - pd.Timedelta(days=5), '1min'),
+    (NOW - pd.Timedelta(days=20), '1d'),
+    (NOW - pd.Timedelta(days=60), '1d')
+])
+def test_pick_resolution(tmp_path, start_date, expected):
+    assert make_engine(tmp_path, 'csv').pick_resolution(start_date, now=NOW) == expected
+
+
+@pytest.mark.parametrize("storage_format", ['csv', 'tsc'])
+def test_compaction_preserves_bars(tmp_path, storage_format):
+    engine = make_engine(tmp_path, storage_format)
+    rng = np.random.default_rng(3)
+    start = NOW - pd.Timedelta(days=4)
+    times = [start + pd.Timedelta(seconds=int(offset)) for offset in np.sort(rng.integers(0, 4 * 86400, 500))]
+    prices = np.round(50 + rng.normal(0, 1, len(times)), 2)
+    for timestamp, price in zip(times, prices):
+        engine.append_tick('BHP.AX', tick(timestamp, float(price)))
+    engine.flush()
+
+    before = engine.load('BHP.AX', '1min')
+    engine.compact_symbol('BHP.AX', now=NOW)
+    after = engine.load('BHP.AX', '1min')
+
+    assert os.path.isfile(engine.tier_path('BHP.AX', '1min'))
+    assert len(engine.read_tier('BHP.AX', 'raw')) < len(times)
+    pd.testing.assert_frame_equal(
+        after[['datetime', 'open', 'high', 'low', 'close', 'volume']].reset_index(drop=True),
+        before[['datetime', 'open', 'high', 'low', 'close', 'volume']].reset_index(drop=True),
+        check_dtype=False
+    )
+
+    # Undated loads still return the remaining raw ticks
+    raw = engine.load('BHP.AX', engine.pick_resolution())
+    assert len(raw) == len(engine.read_tier('BHP.AX', 'raw'))
@@ -0,0 +1,98 @@
+"""
+Tests for deferred module imports
+"""
+
+import sys
+import threading
+import uuid
+
+import pytest
+
+from lazy_imports import lazy_import
+
+# Logs each run, then sleeps so that threads arriving together find the
+# module mid-load
+SLOW_MODULE = """
+import time
+with open({log!r}, "a") as log:
+    log.write("run\\n")
+time.sleep(0.05)
+VALUE = 42
+"""
+
+
+@pytest.fixture
+def make_module(tmp_path, monkeypatch):
+    monkeypatch.syspath_prepend(str(tmp_path))
+    names = []
+
+    def make(source, package=False):
+        name = f"lazy_{uuid.uuid4().hex[:12]}"
+        if package:
+            (tmp_path / name).mkdir()
+            (tmp_path / name / "__init__.py").write_text(source)
+            (tmp_path / name / "child.py").write_text("VALUE = 'child'\n")
+        else:
+            (tmp_path / f"{name}.py").write_text(source)
+        names.append(name)
+        return name
+
+    yield make
+    for name in names:
+        for module in [module for module in sys.modules if module.split(".")[0] == name]:
+            del sys.modules[module]
+
+
+def test_module_runs_on_first_attribute_access(make_module):
+    name = make_module("VALUE = 1\n")
+
+    module = lazy_import(name)
+    assert sys.modules[name] is module
+    assert lazy_import(name) is module
+    assert "VALUE" not in module.__dict__
+
+    assert module.VALUE == 1
+    assert type(module).__name__ == "module"
+    with pytest.raises(AttributeError):
+        module.missing
+
+
+def test_concurrent_first_access_loads_once(make_module, tmp_path):
+    log_path = tmp_path / "loads.log"
+    module = lazy_import(make_module(SLOW_MODULE.format(log=str(log_path))))
+
+    barrier = threading.Barrier(8)
+    values = []
+    errors = []
+
+    def touch():
+        barrier.wait()
+        try:
+            values.append(module.VALUE)
+        except Exception as exc:
+            errors.append(exc)
+
+    threads = [threading.Thread(target=touch) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert values == [42] * 8
+    assert log_path.read_text() == "run\n"
+
+
+def test_relative_names_and_submodules(make_module):
+    name = make_module("", package=True)
+    package = __import__(name)
+
+    child = lazy_import(".child", name)
+    assert sys.modules[f"{name}.child"] is child
+    assert package.child is child
+    assert child.VALUE == "child"
+
+
+def test_missing_module_raises_import_error():
+    with pytest.raises(ImportError):
+        lazy_import(f"lazy_missing_{uuid.uuid4().hex[:12]}")
@@ -0,0 +1,134 @@
+"""
+Tests for batched portfolio aggregation against a per-symbol reference
+"""
+
+import numpy as np
+import pytest
+
+import portfolio_risk
+
+
+def reference(model, holdings):
+    """
+    Aggregate one portfolio position by position
+    """
+    batch = model.get_batch_predictions()
+    stocks = model.stocks
+    rows = [stocks.lookup(symbol) for symbol in holdings]
+    values = np.array([quantity * stocks["current_price"][row] for quantity, row in zip(holdings.values(), rows)])
+    absolute = np.abs(values)
+    gross = absolute.sum()
+
+    result = {
+        "market_value": values.sum(),
+        "gross_value": gross,
+        "expected_move_pct": {}, "expected_pnl": {}, "confidence_score": {}
+    }
+    for index, timeframe in enumerate(batch["timeframes"]):
+        movement = batch["movement_pct"][index][rows]
+        result["expected_move_pct"][timeframe] = (values * movement).sum() / gross
+        result["expected_pnl"][timeframe] = (values * movement).sum() / 100
+        result["confidence_score"][timeframe] = (absolute * batch["confidence_score"][index][rows]).sum() / gross
+    result["beta"] = (values * stocks["beta"][rows]).sum() / gross
+    result["average_volatility"] = (absolute * stocks["annualized_volatility"][rows]).sum() / gross
+
+    sectors = {}
+    for value, row in zip(absolute, rows):
+        sector = stocks["sector"][row]
+        sectors[sector] = sectors.get(sector, 0.0) + value / gross
+    result["sector_weights"] = sectors
+    return result
+
+
+def assert_matches_reference(result, expected):
+    assert result["market_value"] == pytest.approx(expected["market_value"], abs=0.01)
+    assert result["gross_value"] == pytest.approx(expected["gross_value"], abs=0.01)
+    for key, places in [("expected_move_pct", 0.01), ("expected_pnl", 0.01), ("confidence_score", 0.1)]:
+        assert result[key].keys() == expected[key].keys()
+        for timeframe, value in expected[key].items():
+            assert result[key][timeframe] == pytest.approx(value, abs=places)
+    assert result["beta"] == pytest.approx(expected["beta"], abs=0.01)
+    assert result["average_volatility"] == pytest.approx(expected["average_volatility"], abs=0.01)
+    assert result["sector_weights"] == pytest.approx(expected["sector_weights"], abs=1e-4)
+
+
+@pytest.fixture
+def holdings(synthetic_model):
+    symbols = list(synthetic_model.stocks["symbol"])
+    rng = np.random.default_rng(9)
+    portfolios = {}
+    for index in range(6):
+        chosen = rng.choice(symbols, 15, replace=False).tolist()
+        quantities = rng.integers(1, 500, 15).astype(float)
+        # Every other portfolio holds some positions short
+        if index % 2:
+            quantities[::3] *= -1
+        portfolios[f"portfolio_{index}"] = dict(zip(chosen, quantities.tolist()))
+    return portfolios
+
+
+def test_aggregates_match_a_per_symbol_reference(synthetic_model, holdings):
+    results = synthetic_model.analyze_portfolios(holdings)
+
+    assert list(results) == list(holdings)
+    for name, portfolio in holdings.items():
+        result = results[name]
+        assert result["positions"] == len(portfolio)
+        assert result["unknown_symbols"] == []
+        assert_matches_reference(result, reference(synthetic_model, portfolio))
+
+        weights = result["sector_weights"]
+        assert list(weights.values()) == sorted(weights.values(), reverse=True)
+        assert result["largest_sector"] == next(iter(weights))
+        assert result["sector_concentration"] == pytest.approx(sum(w ** 2 for w in weights.values()), abs=1e-3)
+
+
+def test_short_positions_keep_confidence_and_volatility_positive(synthetic_model):
+    model = synthetic_model
+    symbol = model.stocks["symbol"][11]
+    row = model.stocks.row(model.stocks.lookup(symbol))
+
+    result = model.analyze_portfolios({"short": {symbol: -100}})["short"]
+    prediction = model.get_prediction(symbol, "medium_term")
+
+    assert result["market_value"] == pytest.approx(-100 * row["current_price"], abs=0.01)
+    # Direction-dependent figures flip with the position
+    assert result["expected_move_pct"]["medium_term"] == pytest.approx(-prediction["movement_pct"], abs=0.01)
+    assert result["beta"] == pytest.approx(-row["beta"], abs=0.01)
+    # How confident the model is, and how volatile the stock is, do not
+    assert result["confidence_score"]["medium_term"] == pytest.approx(prediction["confidence_score"], abs=0.1)
+    assert result["confidence_score"]["medium_term"] > 0
+    assert result["average_volatility"] == pytest.approx(row["annualized_volatility"], abs=0.01)
+    assert result["sector_weights"] == {row["sector"]: 1.0}
+
+
+def test_unknown_symbols_and_empty_portfolios(synthetic_model):
+    symbol = synthetic_model.stocks["symbol"][3]
+    result = synthetic_model.analyze_portfolios({"single": {symbol: 50}, "flat": {}})
+
+    single = synthetic_model.analyze_portfolios({"single": {symbol: 50, "UNKNOWN.AX": 10}})["single"]
+    assert single["unknown_symbols"] == ["UNKNOWN.AX"]
+    assert single["gross_value"] == result["single"]["gross_value"]
+
+    flat = result["flat"]
+    assert (flat["market_value"], flat["gross_value"], flat["positions"]) == (0, 0, 0)
+    assert flat["sector_weights"] == {} and flat["largest_sector"] is None
+
+
+def test_blocks_and_price_updates(synthetic_model, holdings, monkeypatch):
+    whole = synthetic_model.analyze_portfolios(holdings)
+
+    # Blocks of one portfolio give the same answers
+    monkeypatch.setattr(portfolio_risk, "MAX_BLOCK_CELLS", 1)
+    assert synthetic_model.analyze_portfolios(holdings) == whole
+
+    # A price change is picked up without rebuilding anything by hand
+    symbol, quantity = next(iter(holdings["portfolio_0"].items()))
+    row = synthetic_model.stocks.lookup(symbol)
+    old_price = synthetic_model.stocks["current_price"][row]
+    synthetic_model.update_price(symbol, old_price * 2)
+
+    updated = synthetic_model.analyze_portfolios(holdings)["portfolio_0"]
+    assert updated["market_value"] == pytest.approx(whole["portfolio_0"]["market_value"] + quantity * old_price,
+                                                    abs=0.02)
+    assert_matches_reference(updated, reference(synthetic_model, holdings["portfolio_0"]))
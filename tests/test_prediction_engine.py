@@ -0,0 +1,40 @@
+"""
+Tests for the vectorized prediction engine
+"""
+
+import numpy as np
+
+from prediction_engine import FACTOR_NAMES, compute_factor_matrix, compute_predictions
+from stock_prediction_model import StockPredictionModel
+
+from .conftest import synthetic_universe
+
+
+def test_rows_score_the_same_alone_and_in_a_batch():
+    model = StockPredictionModel(seed=1)
+    universe = synthetic_universe(2000, 1, sorted(model.sector_mappings))
+    rows = {name: universe[name] for name in universe.columns}
+    factor_matrix = compute_factor_matrix(rows, model.sector_mappings, None)
+    volatility = universe["annualized_volatility"]
+    price = universe["current_price"]
+
+    batch = compute_predictions(factor_matrix, model.factor_weights, volatility, price, model.confidence_levels)
+    for row in range(2000):
+        single = compute_predictions(factor_matrix[[row]], model.factor_weights, volatility[[row]], price[[row]],
+                                     model.confidence_levels)
+        assert single["weighted_score"][0] == batch["weighted_score"][row]
+        for key in ["confidence_score", "movement_pct", "price_target", "bullish"]:
+            np.testing.assert_array_equal(single[key][:, 0], batch[key][:, row])
+
+
+def test_midpoint_factor_matrix_is_deterministic():
+    model = StockPredictionModel(seed=1)
+    universe = synthetic_universe(100, 2, sorted(model.sector_mappings))
+    rows = {name: universe[name] for name in universe.columns}
+
+    first = compute_factor_matrix(rows, model.sector_mappings, None)
+    second = compute_factor_matrix(rows, model.sector_mappings, None)
+
+    np.testing.assert_array_equal(first, second)
+    assert first.shape == (100, len(FACTOR_NAMES))
+    assert ((first >= 0) & (first <= 100)).all()
@@ -0,0 +1,58 @@
+"""
+Tests for the prediction model benchmark and the model hooks it relies on
+"""
+
+import numpy as np
+
+from prediction_model_benchmark import build_model, compare, run_benchmark
+from stock_prediction_model import StockPredictionModel
+
+from .conftest import synthetic_universe
+
+
+def test_seeded_models_predict_identically():
+    sectors = sorted(StockPredictionModel().sector_mappings)
+    first = StockPredictionModel(seed=5)
+    second = StockPredictionModel(seed=5)
+    first.set_universe(synthetic_universe(200, 5, sectors))
+    second.set_universe(synthetic_universe(200, 5, sectors))
+
+    for name in ["weighted_score", "movement_pct", "confidence_score"]:
+        np.testing.assert_array_equal(first.get_batch_predictions()[name], second.get_batch_predictions()[name])
+
+
+def test_set_universe_resets_derived_state():
+    model = StockPredictionModel(seed=5)
+    before = model.get_all_predictions(min_movement=0, limit=5)
+    assert before
+
+    model.set_universe(synthetic_universe(50, 6, sorted(model.sector_mappings)))
+
+    assert len(model.get_batch_predictions()["weighted_score"]) == 50
+    assert all(prediction["symbol"].startswith("SYN") for prediction in model.get_all_predictions(min_movement=0))
+    assert "error" in model.get_prediction(before[0]["symbol"])
+
+
+def test_benchmark_reports_every_measurement():
+    results = run_benchmark([30], seed=1, repeats=1, sample_symbols=5)
+    measurements = results["sizes"]["30"]
+
+    assert len(build_model(30, 1).stocks) == 30
+    assert {"build_model", "first_query", "get_prediction_cold", "get_prediction_warm",
+            "get_sector_predictions", "get_all_predictions_sector_and_risk", "peak_memory_mb"} <= set(measurements)
+    assert all(value["median_ms"] >= 0 for value in measurements.values() if isinstance(value, dict))
+    assert compare(results, results, 1.5) == []
+
+
+def test_compare_flags_only_regressions_beyond_tolerance():
+    baseline = {"sizes": {"30": {"get_sector_predictions": {"median_ms": 1.0}, "peak_memory_mb": 10.0,
+                                 "first_query": {"median_ms": 2.0}}}}
+    results = {"sizes": {"30": {"get_sector_predictions": {"median_ms": 1.4}, "peak_memory_mb": 16.0,
+                                "first_query": {"median_ms": 5.0}, "build_model": {"median_ms": 9.0}},
+                         "1000": {"first_query": {"median_ms": 50.0}}}}
+
+    regressions = compare(results, baseline, 1.5)
+
+    assert len(regressions) == 2
+    assert regressions[0].startswith("30 stocks, peak_memory_mb")
+    assert regressions[1].startswith("30 stocks, first_query")
@@ -0,0 +1,71 @@
+"""
+Tests for the lazily rendered prediction rationale
+"""
+
+import copy
+import json
+import pickle
+
+import pytest
+
+from prediction_rationale import PredictionResult
+
+RATIONALE = {"summary": "Rendered", "primary_factors": []}
+
+
+@pytest.fixture
+def renders():
+    return []
+
+
+@pytest.fixture
+def prediction(renders):
+    def render():
+        renders.append(1)
+        return dict(RATIONALE)
+
+    return PredictionResult({"symbol": "BHP.AX", "movement_pct": 1.5, "rationale": None}, render)
+
+
+def test_rationale_not_rendered_by_other_fields(prediction, renders):
+    assert prediction["movement_pct"] == 1.5
+    assert prediction.get("symbol") == "BHP.AX"
+    assert "rationale" in prediction
+    assert list(prediction) == ["symbol", "movement_pct", "rationale"]
+    assert not prediction.rationale_rendered
+    assert renders == []
+
+
+def test_rationale_rendered_once_on_access(prediction, renders):
+    assert prediction["rationale"] == RATIONALE
+    assert prediction.get("rationale") == RATIONALE
+    assert prediction.rationale_rendered
+    assert renders == [1]
+
+
+@pytest.mark.parametrize("convert", [
+    dict,
+    lambda prediction: {**prediction},
+    lambda prediction: json.loads(json.dumps(prediction)),
+    lambda prediction: dict(prediction.items()),
+    lambda prediction: prediction.copy(),
+    lambda prediction: prediction.to_dict(),
+    copy.copy,
+    copy.deepcopy,
+    lambda prediction: pickle.loads(pickle.dumps(prediction)),
+    lambda prediction: prediction | {},
+], ids=["dict", "unpack", "json", "items", "copy", "to_dict", "copy.copy", "deepcopy", "pickle", "union"])
+def test_copies_and_serialization_include_rationale(prediction, convert):
+    assert convert(prediction)["rationale"] == RATIONALE
+
+
+def test_update_includes_rationale(prediction):
+    target = {}
+    target.update(prediction)
+    assert target["rationale"] == RATIONALE
+
+
+def test_setting_rationale_skips_rendering(prediction, renders):
+    prediction["rationale"] = {"summary": "Replaced"}
+    assert dict(prediction)["rationale"] == {"summary": "Replaced"}
+    assert renders == []
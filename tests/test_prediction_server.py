@@ -0,0 +1,150 @@
+"""
+Tests for the prediction HTTP server: revalidation, compression and batching
+"""
+
+import asyncio
+import gzip
+import http.client
+import json
+import threading
+
+import pytest
+
+from prediction_server import PredictionBatcher, PredictionServer, accepts_gzip
+
+
+@pytest.fixture
+def server(synthetic_model):
+    server = PredictionServer(synthetic_model, port=0, batch_window=0.05)
+    server.start()
+    yield server
+    server.stop()
+    server.executor.shutdown()
+
+
+def request(server, target, headers=None):
+    connection = http.client.HTTPConnection(server.host, server.port, timeout=10)
+    try:
+        connection.request("GET", target, headers=headers or {})
+        response = connection.getresponse()
+        return response.status, dict(response.getheaders()), response.read()
+    finally:
+        connection.close()
+
+
+def count_calls(monkeypatch, model, name):
+    calls = []
+    method = getattr(model, name)
+
+    def counted(*args, **kwargs):
+        calls.append(args)
+        return method(*args, **kwargs)
+
+    monkeypatch.setattr(model, name, counted)
+    return calls
+
+
+def test_revalidation_is_answered_without_model_work(server, monkeypatch):
+    symbol = server.model.stocks["symbol"][0]
+    target = f"/predictions/{symbol}?timeframe=short_term"
+
+    status, headers, body = request(server, target)
+    assert status == 200
+    assert json.loads(body)["symbol"] == symbol
+    etag = headers["ETag"]
+
+    # Even with the cached response gone, a current ETag needs no model call
+    server.responses.clear()
+    calls = count_calls(monkeypatch, server.model, "get_predictions")
+    status, headers, body = request(server, target, {"If-None-Match": f'W/"other", {etag}'})
+    assert (status, headers["ETag"], body) == (304, etag, b"")
+    assert calls == []
+    assert server.stats()["not_modified"] == 1
+
+    # A data change retires the ETag
+    server.model.data_version += 1
+    status, headers, body = request(server, target, {"If-None-Match": etag})
+    assert status == 200 and headers["ETag"] != etag
+    assert json.loads(body)["symbol"] == symbol
+    assert len(calls) == 1
+
+
+def test_unknown_symbols_and_routes(server):
+    status, headers, body = request(server, "/predictions/NOPE.AX")
+    assert status == 404 and "error" in json.loads(body)
+
+    assert request(server, "/nowhere")[0] == 404
+    assert request(server, "/sectors?timeframe=decade")[0] == 400
+
+
+def test_large_bodies_are_gzipped_for_clients_that_accept_it(server):
+    target = "/predictions?timeframe=long_term&min_movement=0&limit=50"
+    plain_status, plain_headers, plain = request(server, target)
+    status, headers, compressed = request(server, target, {"Accept-Encoding": "br, gzip"})
+
+    assert plain_status == status == 200
+    assert "Content-Encoding" not in plain_headers
+    assert headers["Content-Encoding"] == "gzip"
+    assert len(compressed) < len(plain)
+    assert gzip.decompress(compressed) == plain
+    assert headers["ETag"] == plain_headers["ETag"]
+
+    # Small bodies are not worth compressing
+    status, headers, _ = request(server, "/health", {"Accept-Encoding": "gzip"})
+    assert status == 200 and "Content-Encoding" not in headers
+
+
+@pytest.mark.parametrize("header,accepted", [
+    ("gzip", True), ("deflate, gzip;q=0.5", True), ("*", True),
+    ("gzip;q=0", False), ("identity", False), ("", False)
+])
+def test_accepts_gzip(header, accepted):
+    assert accepts_gzip(header) is accepted
+
+
+def test_concurrent_single_symbol_requests_are_batched(server):
+    symbols = list(server.model.stocks["symbol"][:12])
+    results = {}
+
+    def fetch(symbol):
+        results[symbol] = request(server, f"/predictions/{symbol}?timeframe=medium_term")
+
+    threads = [threading.Thread(target=fetch, args=(symbol,)) for symbol in symbols]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    for symbol in symbols:
+        status, _, body = results[symbol]
+        assert status == 200
+        assert json.loads(body) == json.loads(json.dumps(server.model.get_prediction(symbol, "medium_term")))
+
+    batching = server.stats()["batching"]
+    assert batching["batched_requests"] == len(symbols)
+    assert batching["largest_batch"] > 1
+
+
+def test_batcher_splits_full_batches_and_shares_errors():
+    calls = []
+
+    def function(symbols, timeframe):
+        calls.append((list(symbols), timeframe))
+        if "BAD" in symbols:
+            raise ValueError("bad batch")
+        return [f"{symbol}/{timeframe}" for symbol in symbols]
+
+    async def main():
+        batcher = PredictionBatcher(function, None, window=0.01, max_batch=3)
+        symbols = ["A", "B", "C", "D", "E"]
+        results = await asyncio.gather(*[batcher.get(symbol, "short_term") for symbol in symbols])
+        failed = await asyncio.gather(batcher.get("X", "long_term"), batcher.get("BAD", "long_term"),
+                                      return_exceptions=True)
+        return batcher, results, failed
+
+    batcher, results, failed = asyncio.run(main())
+
+    assert results == ["A/short_term", "B/short_term", "C/short_term", "D/short_term", "E/short_term"]
+    assert calls[:2] == [(["A", "B", "C"], "short_term"), (["D", "E"], "short_term")]
+    assert all(isinstance(error, ValueError) for error in failed)
+    assert batcher.stats() == {"batches": 3, "batched_requests": 7, "mean_batch_size": 2.33, "largest_batch": 3}
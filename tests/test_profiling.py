@@ -0,0 +1,119 @@
+"""
+Tests for tracing spans and the sampling profiler
+"""
+
+import threading
+import time
+
+from profiling import NULL_SPAN, SamplingProfiler, Tracer, traced
+from stock_prediction_model import StockPredictionModel
+
+
+class Traced:
+    def __init__(self, tracer):
+        self.tracer = tracer
+
+    @traced("outer")
+    def outer(self):
+        with self.tracer.span("inner"):
+            time.sleep(0.002)
+        return 42
+
+
+def test_disabled_tracer_records_nothing():
+    tracer = Tracer()
+    assert tracer.span("anything") is NULL_SPAN
+    assert Traced(tracer).outer() == 42
+    tracer.count("hits")
+
+    assert tracer.stats() == {"spans": {}, "counters": {}}
+    assert tracer.recent_spans() == []
+
+
+def test_spans_aggregate_per_call_path():
+    tracer = Tracer(enabled=True)
+    for _ in range(3):
+        Traced(tracer).outer()
+    tracer.count("hits", 2)
+
+    stats = tracer.stats()
+    assert list(stats["spans"]) == ["outer", "outer/inner"]
+    assert stats["spans"]["outer"]["count"] == 3
+    assert stats["spans"]["outer/inner"]["mean_ms"] >= 2
+    assert stats["spans"]["outer"]["total_ms"] >= stats["spans"]["outer/inner"]["total_ms"]
+    assert stats["counters"] == {"hits": 2}
+    assert [span["path"] for span in tracer.recent_spans()] == ["outer/inner", "outer"] * 3
+
+    # Collapsed stacks weight each path by its self time
+    lines = dict(line.rsplit(" ", 1) for line in tracer.collapsed().splitlines())
+    assert set(lines) == {"outer", "outer;inner"}
+    assert int(lines["outer;inner"]) >= 6000
+
+    tracer.reset()
+    assert tracer.stats() == {"spans": {}, "counters": {}}
+
+
+def test_spans_nest_per_thread():
+    tracer = Tracer(enabled=True)
+    threads = [threading.Thread(target=Traced(tracer).outer) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert {path: span["count"] for path, span in tracer.stats()["spans"].items()} == {"outer": 4, "outer/inner": 4}
+
+
+def test_model_traces_factor_timings():
+    model = StockPredictionModel(seed=2)
+    model.enable_tracing()
+    symbol = model.stocks["symbol"][0]
+    model.get_prediction(symbol)
+    model.get_prediction(symbol)
+
+    stats = model.get_trace_stats()
+    assert any(path.endswith("factors/technical_indicators") for path in stats["spans"])
+    assert stats["counters"]["prediction_cache.hit"] >= 1
+    assert "cache" in stats
+
+    model.enable_tracing(False)
+    assert model.get_trace_stats()["spans"] == {}
+
+
+def test_sampling_profiler_writes_collapsed_stacks(tmp_path):
+    done = threading.Event()
+
+    def busy_worker():
+        while not done.is_set():
+            sum(range(1000))
+
+    worker = threading.Thread(target=busy_worker, name="busy")
+    worker.start()
+    profiler = SamplingProfiler(interval=0.001)
+    try:
+        profiler.start()
+        deadline = time.monotonic() + 2
+        while profiler.sample_count < 20 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        output_path = str(tmp_path / "profile.collapsed")
+        collapsed = profiler.stop(output_path)
+    finally:
+        done.set()
+        worker.join()
+
+    assert not profiler.running
+    assert any(line.startswith("busy;") and "busy_worker" in line for line in collapsed.splitlines())
+    with open(output_path) as f:
+        assert f.read() == collapsed
+
+
+def test_toggle_starts_then_writes_a_profile(tmp_path):
+    profiler = SamplingProfiler(interval=0.001, output_dir=str(tmp_path))
+
+    assert profiler.toggle() is None
+    assert profiler.running
+    time.sleep(0.02)
+    output_path = profiler.toggle()
+
+    assert not profiler.running
+    assert output_path.startswith(str(tmp_path)) and output_path.endswith(".collapsed")
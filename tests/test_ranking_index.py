@@ -0,0 +1,67 @@
+"""
+Tests for the incremental top-K ranking index
+"""
+
+import numpy as np
+import pytest
+
+from ranking_index import RankingIndex
+
+
+def reference_top(movement, sectors, risks, limit=None, min_movement=0, sector_code=None, risk_code=None):
+    rows = [
+        row for row in sorted(range(len(movement)), key=lambda row: (-abs(movement[row]), row))
+        if abs(movement[row]) >= min_movement
+        and (sector_code is None or sectors[row] == sector_code)
+        and (risk_code is None or risks[row] == risk_code)
+    ]
+    return rows[:limit] if limit else rows
+
+
+@pytest.fixture
+def universe():
+    rng = np.random.default_rng(11)
+    movement = np.round(rng.uniform(-30, 30, 500), 1)
+    sectors = rng.integers(0, 8, 500)
+    risks = rng.integers(0, 4, 500)
+    index = RankingIndex(["medium_term"])
+    index.rebuild("medium_term", movement, sectors, risks)
+    return index, movement, sectors, risks
+
+
+@pytest.mark.parametrize("query", [
+    {},
+    {"limit": 25},
+    {"min_movement": 12.5},
+    {"sector_code": 3, "limit": 10},
+    {"sector_code": 2, "risk_code": 1},
+    {"risk_code": 0, "min_movement": 5, "limit": 40}
+])
+def test_top_matches_a_full_sort(universe, query):
+    index, movement, sectors, risks = universe
+    assert index.top("medium_term", **query) == reference_top(movement, sectors, risks, **query)
+
+
+def test_updates_move_single_rows(universe):
+    index, movement, sectors, risks = universe
+    rng = np.random.default_rng(12)
+
+    for row in rng.integers(0, len(movement), 200).tolist():
+        movement[row] = round(float(rng.uniform(-30, 30)), 1)
+        # Some updates also move the row to another partition
+        if row % 3 == 0:
+            sectors[row] = (sectors[row] + 1) % 8
+        index.update("medium_term", row, movement[row], sectors[row], risks[row])
+
+    assert index.top("medium_term") == reference_top(movement, sectors, risks)
+    assert index.top("medium_term", sector_code=4, limit=15) == reference_top(
+        movement, sectors, risks, sector_code=4, limit=15)
+
+
+def test_ties_are_ordered_by_row():
+    index = RankingIndex(["short_term"])
+    index.rebuild("short_term", np.array([5.0, -7.0, 7.0, 5.0]), np.zeros(4), np.zeros(4))
+    assert index.top("short_term") == [1, 2, 0, 3]
+
+    index.update("short_term", 3, -7.0, 0, 0)
+    assert index.top("short_term", limit=3) == [1, 2, 3]
@@ -0,0 +1,141 @@
+"""
+Tests for coalescing live price ticks into model repricing batches
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from repricing import DebouncedRepricer
+
+
+class RecordingModel:
+    """
+    Stands in for StockPredictionModel, recording each batch
+    """
+
+    def __init__(self):
+        self.batches = []
+        self.threads = []
+
+    def update_prices(self, updates):
+        self.batches.append({symbol: tuple(update) for symbol, update in updates.items()})
+        self.threads.append(threading.current_thread().name)
+        return len(updates)
+
+
+def wait_for(condition, timeout=2):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.005)
+    return condition()
+
+
+def test_ticks_coalesce_per_symbol():
+    model = RecordingModel()
+    repricer = DebouncedRepricer(model)
+
+    repricer.submit("BHP.AX", 45.0, 1.0)
+    repricer.submit("CBA.AX", 120.0)
+    repricer.submit("BHP.AX", 45.5)
+    repricer.submit("BHP.AX", 46.0)
+    assert repricer.stats()["pending"] == 2
+
+    assert repricer.flush() == 2
+    # The latest price wins; a tick without a daily change keeps the last one
+    assert model.batches == [{"BHP.AX": (46.0, 1.0), "CBA.AX": (120.0, None)}]
+    assert repricer.flush() == 0
+
+    stats = repricer.stats()
+    assert (stats["ticks"], stats["coalesced"], stats["pending"]) == (4, 2, 0)
+    assert (stats["batches"], stats["repriced"], stats["mean_batch_size"]) == (1, 2, 2)
+
+
+def test_a_burst_is_applied_once_it_goes_quiet():
+    model = RecordingModel()
+    repricer = DebouncedRepricer(model, window=0.05, max_delay=5)
+    repricer.start()
+    try:
+        for tick in range(20):
+            repricer.submit(f"S{tick % 5}.AX", 10.0 + tick)
+        assert wait_for(lambda: model.batches)
+        time.sleep(0.1)
+    finally:
+        repricer.stop()
+
+    assert len(model.batches) == 1
+    assert model.batches[0] == {f"S{index}.AX": (25.0 + index, None) for index in range(5)}
+
+
+def test_a_continuous_stream_is_applied_every_max_delay():
+    model = RecordingModel()
+    repricer = DebouncedRepricer(model, window=0.05, max_delay=0.1)
+    repricer.start()
+    try:
+        # Ticks closer together than the window never let the stream settle
+        deadline = time.monotonic() + 0.45
+        tick = 0
+        while time.monotonic() < deadline:
+            repricer.submit("BHP.AX", 45.0 + tick)
+            tick += 1
+            time.sleep(0.01)
+        assert len(model.batches) >= 2
+    finally:
+        repricer.stop()
+
+    assert model.batches[-1] == {"BHP.AX": (45.0 + tick - 1, None)}
+    assert repricer.stats()["ticks"] == tick
+
+
+def test_stop_applies_pending_ticks():
+    model = RecordingModel()
+    repricer = DebouncedRepricer(model, window=10, max_delay=10)
+    repricer.start()
+    repricer.submit("BHP.AX", 45.0)
+    repricer.stop()
+
+    assert model.batches == [{"BHP.AX": (45.0, None)}]
+    assert repricer.stats()["pending"] == 0
+
+
+def test_batches_run_on_the_model_executor():
+    model = RecordingModel()
+    with ThreadPoolExecutor(max_workers=1, thread_name_prefix="model-owner") as executor:
+        repricer = DebouncedRepricer(model, executor=executor)
+        repricer.submit("BHP.AX", 45.0)
+        repricer.flush()
+
+    assert model.threads[0].startswith("model-owner")
+
+
+def test_stream_payloads_of_both_shapes_are_submitted():
+    model = RecordingModel()
+    repricer = DebouncedRepricer(model)
+
+    # A streamed trade, then a fetched quote batch
+    repricer._on_quotes({"symbol": "BHP.AX", "price": 45.0})
+    repricer._on_quotes({"CBA.AX": {"symbol": "CBA.AX", "price": 120.0, "change_pct": 0.3},
+                         "BHP.AX": {"symbol": "BHP.AX", "price": 45.2, "change_pct": -0.1}})
+    repricer.flush()
+
+    assert model.batches == [{"BHP.AX": (45.2, -0.1), "CBA.AX": (120.0, 0.3)}]
+
+
+def test_model_reprices_from_submitted_ticks(synthetic_model):
+    model = synthetic_model
+    symbol = model.stocks["symbol"][7]
+    version = model.data_version
+    assert model.get_prediction(symbol)["current_price"] != 123.45
+
+    repricer = model.start_repricing(window=0.01)
+    repricer.submit(symbol, 123.45, 2.5)
+    repricer.submit("UNKNOWN.AX", 1.0)
+    model.stop_repricing()
+
+    assert model.repricer is None
+    assert model.data_version > version
+    row = model.stocks.row(model.stocks.lookup(symbol))
+    assert (row["current_price"], row["price_change_pct"]) == (123.45, 2.5)
+    assert repricer.stats()["repriced"] == 1
+    # The prediction cached before the tick is not served again
+    assert model.get_prediction(symbol)["current_price"] == 123.45
@@ -0,0 +1,79 @@
+"""
+Tests for streaming beta and volatility estimates against NumPy and pandas
+references
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from correlation_engine import CorrelationEngine
+from risk_estimators import RiskEstimator
+
+from .conftest import BAR_MS, FACTORS, STOCKS, feed, price_paths
+from .test_correlation_engine import reference
+
+
+def make_estimator(window, min_bars=20, halflife=15):
+    engine = CorrelationEngine(STOCKS, FACTORS, bar_seconds=BAR_MS / 1000, window=window,
+                               halflife=halflife, min_bars=min_bars)
+    return engine, RiskEstimator(engine)
+
+
+@pytest.mark.parametrize("bars, window", [(120, 200), (300, 60)])
+def test_realized_volatility_and_beta_match_numpy(bars, window):
+    engine, estimator = make_estimator(window)
+    returns = feed(engine, price_paths(bars, 6))[-window:]
+    estimates = estimator.estimates()
+
+    stock_returns = returns[:, :len(STOCKS)]
+    valid = ~np.isnan(stock_returns)
+    mean_square = np.nansum(stock_returns ** 2, axis=0) / valid.sum(axis=0)
+    expected = np.sqrt(mean_square * estimator.bars_per_year) * 100
+
+    np.testing.assert_allclose(estimates["realized_volatility"], expected, rtol=1e-9)
+    np.testing.assert_allclose(estimates["beta"], reference(returns, "beta", 20)[:, FACTORS.index("^AXJO")],
+                               rtol=1e-8)
+
+
+def test_ewma_volatility_matches_pandas():
+    engine, estimator = make_estimator(60)
+    returns = pd.DataFrame(feed(engine, price_paths(200, 7))[:, :len(STOCKS)], columns=STOCKS)
+    estimates = estimator.estimates()
+
+    for row, stock in enumerate(STOCKS):
+        squares = returns[stock].dropna() ** 2
+        variance = squares.ewm(alpha=engine.alpha, adjust=False).mean().iloc[-1]
+        assert estimates["ewma_volatility"][row] == pytest.approx(
+            np.sqrt(variance * estimator.bars_per_year) * 100, rel=1e-9)
+
+
+def test_estimates_wait_for_min_bars_and_record_updates():
+    engine, estimator = make_estimator(200, min_bars=30)
+    feed(engine, price_paths(60, 8))
+
+    late = estimator.get("LATE.AX")
+    assert late["beta"] is None
+    assert late["realized_volatility"] is None
+    assert late["ewma_volatility"] is None
+    assert late["updated_ms"] == engine.last_bar_ms
+
+    measured = estimator.get("BHP.AX")
+    assert all(measured[name] is not None for name in ["beta", "realized_volatility", "ewma_volatility"])
+    assert estimator.get("UNKNOWN.AX") is None
+    assert estimator.version == engine.bars
+
+
+def test_close_stops_updates():
+    engine, estimator = make_estimator(60)
+    estimator.close()
+    feed(engine, price_paths(40, 9))
+
+    assert estimator.version == 0
+    assert np.isnan(estimator.estimates()["realized_volatility"]).all()
+
+
+def test_benchmark_must_be_tracked():
+    engine = CorrelationEngine(STOCKS, ["AUD/USD"])
+    with pytest.raises(ValueError):
+        RiskEstimator(engine)
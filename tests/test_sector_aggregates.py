@@ -0,0 +1,61 @@
+"""
+Tests for incrementally maintained sector aggregates
+"""
+
+import numpy as np
+
+from sector_aggregates import SectorAggregates
+
+
+def random_predictions(rng, size):
+    movement = np.round(rng.uniform(-30, 30, size), 1)
+    return {
+        "sector_codes": rng.integers(0, 6, size),
+        "movement": movement,
+        "confidence": rng.integers(0, 101, size),
+        "bullish": movement > 0
+    }
+
+
+def test_single_row_updates_match_a_rebuild():
+    rng = np.random.default_rng(21)
+    predictions = random_predictions(rng, 300)
+    incremental = SectorAggregates(["medium_term"])
+    incremental.rebuild("medium_term", **predictions)
+
+    for row in rng.integers(0, 300, 500).tolist():
+        update = random_predictions(rng, 1)
+        for name, values in update.items():
+            predictions[name][row] = values[0]
+        incremental.update("medium_term", row, predictions["sector_codes"][row], predictions["movement"][row],
+                           predictions["confidence"][row], predictions["bullish"][row])
+
+    rebuilt = SectorAggregates(["medium_term"])
+    rebuilt.rebuild("medium_term", **predictions)
+    assert incremental.snapshot("medium_term") == rebuilt.snapshot("medium_term")
+
+
+def test_movement_sums_do_not_drift():
+    aggregates = SectorAggregates(["short_term"])
+    aggregates.rebuild("short_term", np.zeros(2, dtype=np.int64), np.array([0.1, 0.2]), np.array([50, 50]),
+                       np.array([True, True]))
+
+    for _ in range(1000):
+        aggregates.update("short_term", 0, 0, 0.3, 50, True)
+        aggregates.update("short_term", 0, 0, 0.1, 50, True)
+
+    assert aggregates.snapshot("short_term")[0]["movement_sum"] == 0.3
+
+
+def test_moving_the_last_member_drops_its_sector():
+    aggregates = SectorAggregates(["long_term"])
+    aggregates.rebuild("long_term", np.array([0, 1]), np.array([4.5, -6.0]), np.array([40, 60]),
+                       np.array([True, False]))
+
+    aggregates.update("long_term", 1, 0, -6.0, 60, False)
+
+    snapshot = aggregates.snapshot("long_term")
+    assert list(snapshot) == [0]
+    assert snapshot[0]["count"] == 2
+    assert snapshot[0]["top_bullish"] == [(4.5, 0)]
+    assert snapshot[0]["top_bearish"] == [(-6.0, 1)]
@@ -0,0 +1,33 @@
+"""
+Tests for service metrics and the real-time integration's metric labels
+"""
+
+import numpy as np
+
+from real_time_data_integration import RealTimeDataIntegration
+from service_metrics import LatencyHistogram, MetricsRegistry
+
+
+def test_histogram_quantiles_within_bucket_error():
+    histogram = LatencyHistogram()
+    values = np.random.default_rng(1).integers(1_000, 50_000_000, 20_000)
+    for value in values:
+        histogram.record(int(value))
+
+    for quantile, estimate in zip([0.5, 0.9, 0.99], histogram.quantiles([0.5, 0.9, 0.99])):
+        expected = np.quantile(values, quantile)
+        assert abs(estimate - expected) / expected < 0.02
+
+
+def test_prometheus_rendering_uses_family_labels():
+    registry = MetricsRegistry('test')
+    registry.counter('errors', 'Errors by stage', ('stage',)).labels('fetch').inc(3)
+
+    assert 'test_errors_total{stage="fetch"} 3' in registry.render_prometheus()
+
+
+def test_fetch_latency_labelled_by_data_type(tmp_path):
+    integration = RealTimeDataIntegration(data_dir=str(tmp_path))
+    integration._fetch_forex_rates()
+
+    assert "data_type=forex_rates" in integration.stats()["histograms"]["fetch_latency"]
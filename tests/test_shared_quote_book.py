@@ -0,0 +1,125 @@
+"""
+Tests for the shared-memory quote book
+"""
+
+import subprocess
+import sys
+import threading
+import uuid
+
+import numpy as np
+import pytest
+
+from shared_quote_book import SharedQuoteBookPublisher, SharedQuoteBookReader
+
+
+@pytest.fixture
+def book_name():
+    return f"test_book_{uuid.uuid4().hex[:12]}"
+
+
+@pytest.fixture
+def publisher(book_name):
+    publisher = SharedQuoteBookPublisher(book_name, stock_capacity=8, forex_capacity=4, index_capacity=4)
+    yield publisher
+    publisher.close()
+
+
+def quote(symbol, value):
+    return {'symbol': symbol, 'price': value, 'change_pct': value, 'volume': int(value),
+            'timestamp': int(value), 'name': f"{symbol} Ltd"}
+
+
+def test_reader_sees_published_records(publisher, book_name):
+    publisher.publish('stock_quotes', [quote('BHP.AX', 45.0), quote('CBA.AX', 120.0)])
+    publisher.publish('forex_rates', [{'pair': 'AUD/USD', 'rate': 0.65, 'change_pct': 0.1, 'timestamp': 1}])
+    publisher.publish('stock_quotes', [quote('BHP.AX', 46.0)])
+
+    reader = SharedQuoteBookReader(book_name)
+    try:
+        quotes = reader.get_stock_quotes()
+        assert quotes['BHP.AX']['price'] == 46.0
+        assert quotes['CBA.AX']['name'] == 'CBA.AX Ltd'
+        assert list(reader.get_stock_quotes(['CBA.AX', 'UNKNOWN.AX'])) == ['CBA.AX']
+        assert reader.get_forex_rates()['AUD/USD']['rate'] == 0.65
+        assert reader.get_market_indices() == {}
+        assert reader.version() == 3
+    finally:
+        reader.close()
+
+
+def test_reader_retries_a_record_being_written(publisher, book_name):
+    publisher.publish('stock_quotes', [quote('BHP.AX', 45.0)])
+    record = publisher.region.records['stock_quotes'][0]
+
+    reader = SharedQuoteBookReader(book_name, max_retries=5)
+    try:
+        # An odd sequence marks a write in progress
+        record['seq'] += 1
+        with pytest.raises(RuntimeError):
+            reader.read_records('stock_quotes')
+
+        record['price'] = 47.0
+        record['seq'] += 1
+        assert reader.get_stock_quotes()['BHP.AX']['price'] == 47.0
+    finally:
+        reader.close()
+
+
+def test_readers_never_see_torn_records(publisher, book_name):
+    symbols = [f"S{index}.AX" for index in range(8)]
+    publisher.publish('stock_quotes', [quote(symbol, 1.0) for symbol in symbols])
+    done = threading.Event()
+
+    def write():
+        value = 1.0
+        while not done.is_set():
+            value += 1
+            publisher.publish('stock_quotes', [quote(symbol, value) for symbol in symbols])
+
+    writer = threading.Thread(target=write)
+    writer.start()
+    reader = SharedQuoteBookReader(book_name, max_retries=10_000)
+    try:
+        for _ in range(2000):
+            records = reader.read_records('stock_quotes')
+            # Every field of a record comes from the same publish
+            np.testing.assert_array_equal(records['price'], records['change_pct'])
+            np.testing.assert_array_equal(records['price'], records['volume'])
+            assert (records['seq'] % 2 == 0).all()
+    finally:
+        done.set()
+        writer.join()
+        reader.close()
+
+
+def test_second_publisher_fails_while_the_first_is_alive(publisher, book_name):
+    publisher.publish('stock_quotes', [quote('BHP.AX', 45.0)])
+
+    with pytest.raises(FileExistsError):
+        SharedQuoteBookPublisher(book_name)
+
+    reader = SharedQuoteBookReader(book_name)
+    try:
+        assert reader.get_stock_quotes()['BHP.AX']['price'] == 45.0
+    finally:
+        reader.close()
+
+
+def test_book_of_a_dead_publisher_is_taken_over(book_name):
+    stale = SharedQuoteBookPublisher(book_name)
+    dead = subprocess.run([sys.executable, '-c', 'import os; print(os.getpid())'],
+                          capture_output=True, text=True, check=True)
+    stale.region.header['publisher_pid'] = int(dead.stdout)
+    # Detach without unlinking, as a crashed publisher would
+    stale.region.release()
+    stale.shm.close()
+
+    publisher = SharedQuoteBookPublisher(book_name)
+    try:
+        publisher.publish('stock_quotes', [quote('BHP.AX', 45.0)])
+        reader = SharedQuoteBookReader(book_name)
+        assert reader.get_stock_quotes()['BHP.AX']['price'] == 45.0
+        reader.close()
+    finally:
+        publisher.close()
@@ -0,0 +1,199 @@
+"""
+Tests for StockPredictionModel incremental updates
+"""
+
+import numpy as np
+import pytest
+
+from prediction_engine import FACTOR_NAMES, compute_factor_matrix
+from stock_prediction_model import FACTORS_CACHE_KEY, StockPredictionModel
+
+
+@pytest.fixture
+def model():
+    model = StockPredictionModel(seed=7)
+    model.get_all_predictions(min_movement=0, limit=10)
+    return model
+
+
+def factor_scores(model, symbol):
+    return model._get_factor_matrix()[model.stocks.lookup(symbol)].copy()
+
+
+def test_indicator_update_leaves_drawn_factors_unchanged(model):
+    symbol = model.stocks["symbol"][0]
+    before = factor_scores(model, symbol)
+
+    assert model.update_indicators(symbol, rsi=25)
+
+    after = factor_scores(model, symbol)
+    technical = FACTOR_NAMES.index("technical_indicators")
+    unchanged = [index for index in range(len(FACTOR_NAMES)) if index != technical]
+    np.testing.assert_array_equal(after[unchanged], before[unchanged])
+
+    row = model.stocks.lookup(symbol)
+    subset = {name: model.stocks[name][[row]] for name in model.stocks.columns}
+    assert after[technical] == compute_factor_matrix(subset, model.sector_mappings, None)[0, technical]
+
+
+def test_sector_momentum_change_leaves_other_sectors_unchanged(model):
+    matrix = model._get_factor_matrix().copy()
+    sector = model.stocks["sector"][0]
+    others = ~model.stocks.mask("sector", sector)
+
+    model.set_sector_momentum(sector, "negative")
+
+    after = model._get_factor_matrix()
+    np.testing.assert_array_equal(after[others], matrix[others])
+    rows = ~others
+    momentum = FACTOR_NAMES.index("sector_momentum")
+    assert (after[rows, momentum] == 25).all()
+    technical = FACTOR_NAMES.index("technical_indicators")
+    np.testing.assert_array_equal(after[rows, technical], matrix[rows, technical])
+
+
+def apply_updates(model, seed=9):
+    rng = np.random.default_rng(seed)
+    symbols = list(model.stocks["symbol"])
+
+    model.update_prices({symbol: [float(rng.uniform(5, 200)), float(rng.uniform(-6, 6))]
+                         for symbol in rng.choice(symbols, 40, replace=False)})
+    for symbol in rng.choice(symbols, 10, replace=False):
+        model.update_indicators(symbol, rsi=float(rng.uniform(10, 90)), beta=float(rng.uniform(0.3, 2.5)))
+    model.update_price(symbols[0], 1.0, -10.0)
+    model.set_sector_momentum(model.stocks["sector"][5], "negative")
+
+
+@pytest.mark.parametrize("timeframe", ["short_term", "medium_term", "long_term"])
+def test_single_predictions_match_the_batch_after_updates(synthetic_model, timeframe):
+    model = synthetic_model
+    apply_updates(model)
+
+    batch = model.get_batch_predictions()
+    index = batch["timeframes"].index(timeframe)
+    symbols = model.stocks["symbol"]
+
+    for row in range(len(symbols)):
+        prediction = model.get_prediction(symbols[row], timeframe)
+        assert prediction["movement_pct"] == batch["movement_pct"][index, row]
+        assert prediction["confidence_score"] == batch["confidence_score"][index, row]
+        assert prediction["price_target"] == batch["price_target"][index, row]
+        assert prediction["direction"] == ("bullish" if batch["bullish"][index, row] else "bearish")
+
+
+@pytest.mark.parametrize("timeframe", ["short_term", "medium_term", "long_term"])
+def test_rankings_match_a_sort_of_the_batch_after_updates(synthetic_model, timeframe):
+    model = synthetic_model
+    apply_updates(model)
+
+    batch = model.get_batch_predictions()
+    movement = batch["movement_pct"][batch["timeframes"].index(timeframe)]
+    symbols = model.stocks["symbol"]
+    expected = sorted(range(len(symbols)), key=lambda row: (-abs(movement[row]), row))
+
+    ranked = model.get_all_predictions(timeframe, min_movement=0, limit=50)
+    assert [prediction["symbol"] for prediction in ranked] == [symbols[row] for row in expected[:50]]
+
+    risk = model.stocks["risk_profile"][3]
+    ranked = model.get_all_predictions(timeframe, min_movement=5, risk_profile=risk, limit=None)
+    assert [prediction["symbol"] for prediction in ranked] == [
+        symbols[row] for row in expected
+        if abs(movement[row]) >= 5 and model.stocks["risk_profile"][row] == risk
+    ]
+
+
+def test_factor_weight_change_rebuilds_indexes(synthetic_model):
+    model = synthetic_model
+    model.set_factor_weights({"tariff_sensitivity": 0.6, "technical_indicators": 0.05})
+
+    batch = model.get_batch_predictions()
+    movement = batch["movement_pct"][batch["timeframes"].index("medium_term")]
+    top = model.get_all_predictions("medium_term", min_movement=0, limit=5)
+    assert [prediction["movement_pct"] for prediction in top] == sorted(
+        movement.tolist(), key=lambda value: -abs(value))[:5]
+
+
+def sector_view(model, timeframe):
+    return {
+        sector: {key: value for key, value in prediction.items() if key != "timestamp"}
+        for sector, prediction in model.get_sector_predictions(timeframe).items()
+    }
+
+
+@pytest.mark.parametrize("timeframe", ["short_term", "medium_term", "long_term"])
+def test_sector_aggregates_match_a_rebuild_after_updates(synthetic_model, timeframe):
+    model = synthetic_model
+    apply_updates(model)
+
+    incremental = sector_view(model, timeframe)
+    model.prediction_indexes_current = False
+    assert sector_view(model, timeframe) == incremental
+
+    batch = model.get_batch_predictions()
+    index = batch["timeframes"].index(timeframe)
+    movement = batch["movement_pct"][index]
+    for sector, prediction in incremental.items():
+        members = model.stocks["sector"] == sector
+        assert prediction["stock_count"] == members.sum()
+        assert prediction["bullish_count"] == batch["bullish"][index][members].sum()
+        assert prediction["avg_movement_pct"] == pytest.approx(round(movement[members].mean(), 1), abs=0.051)
+
+
+def test_indicator_update_keeps_fractional_rsi(model):
+    symbol = model.stocks["symbol"][0]
+    model.update_indicators(symbol, rsi=55.7)
+
+    assert model.stocks.row(model.stocks.lookup(symbol))["rsi"] == 55.7
+    factors = model.get_prediction(symbol, "medium_term")["factors"]
+    assert factors["technical_indicators"]["rsi"] == 55.7
+
+
+def test_rationale_uses_the_weights_the_prediction_was_made_with(model):
+    symbol = model.stocks["symbol"][0]
+    weights = dict(model.factor_weights)
+
+    prediction = model.get_prediction(symbol, "medium_term")
+    factors = prediction["factors"]
+    weakest = min(factors, key=lambda name: factors[name]["score"])
+    model.set_factor_weights({weakest: 100.0})
+    assert not prediction.rationale_rendered
+    rationale = prediction["rationale"]
+
+    # A fresh prediction under the original weights explains it the same way
+    model.set_factor_weights(weights)
+    assert model.get_prediction(symbol, "medium_term")["rationale"] == rationale
+
+
+def test_multi_horizon_matches_single_predictions(synthetic_model):
+    model = synthetic_model
+    symbol = model.stocks["symbol"][42]
+
+    horizons = model.get_multi_horizon_prediction(symbol)["horizons"]
+    for timeframe, prediction in horizons.items():
+        single = model.get_prediction(symbol, timeframe)
+        for key in ["movement_pct", "confidence_score", "direction", "price_target"]:
+            assert prediction[key] == single[key]
+        assert prediction["rationale"] == single["rationale"]
+
+
+def test_timeframes_share_one_cached_copy_of_the_factors(synthetic_model):
+    model = synthetic_model
+    symbol, neighbour = model.stocks["symbol"][5], model.stocks["symbol"][6]
+    model.prediction_cache.clear()
+
+    predictions = [model.get_prediction(symbol, timeframe) for timeframe in model.prediction_horizon]
+    multi_horizon = model.get_multi_horizon_prediction(symbol)
+    model.get_prediction(neighbour)
+
+    # One factors entry next to the per-timeframe predictions, referenced by all
+    factors = model.prediction_cache.get((symbol, FACTORS_CACHE_KEY))[1]
+    assert all(prediction["factors"] is factors for prediction in predictions)
+    assert multi_horizon["factors"] is factors
+    assert all((symbol, timeframe) in model.prediction_cache for timeframe in model.prediction_horizon)
+
+    # A price change drops the stock's factors with its predictions only
+    model.update_price(symbol, model.stocks["current_price"][model.stocks.lookup(symbol)] * 1.1)
+    assert (symbol, FACTORS_CACHE_KEY) not in model.prediction_cache
+    assert not any((symbol, timeframe) in model.prediction_cache for timeframe in model.prediction_horizon)
+    assert (neighbour, FACTORS_CACHE_KEY) in model.prediction_cache
+    assert model.get_prediction(symbol)["factors"] is not factors
@@ -0,0 +1,81 @@
+"""
+Tests for the columnar stock universe table
+"""
+
+import numpy as np
+import pytest
+
+from stock_universe import StockUniverseTable
+
+RECORDS = [
+    {"symbol": "BHP.AX", "name": "BHP Group", "sector": "Materials", "risk_profile": "medium",
+     "tariff_sensitivity": 80, "current_price": 45.2, "beta": 1.1},
+    {"symbol": "CBA.AX", "name": "Commonwealth Bank", "sector": "Financials", "risk_profile": "low",
+     "tariff_sensitivity": 30, "current_price": 120.5, "beta": 0.9},
+    {"symbol": "FMG.AX", "name": "Fortescue", "sector": "Materials", "risk_profile": "high",
+     "tariff_sensitivity": 85, "current_price": 18.7, "beta": 1.6}
+]
+
+
+@pytest.fixture
+def table():
+    return StockUniverseTable.from_records(RECORDS)
+
+
+def test_columns_are_typed_and_indexed(table):
+    assert len(table) == 3
+    assert "CBA.AX" in table and "XYZ.AX" not in table
+    assert table.lookup("FMG.AX") == 2
+    assert table.lookup("XYZ.AX") is None
+
+    assert table.columns["tariff_sensitivity"].dtype == np.int64
+    assert table.columns["current_price"].dtype == np.float64
+    assert table.columns["sector"].dtype == np.int16
+    assert table.categories["sector"] == ["Financials", "Materials"]
+    assert list(table["sector"]) == ["Materials", "Financials", "Materials"]
+    assert list(table.mask("sector", "Materials")) == [True, False, True]
+    assert not table.mask("sector", "Energy").any()
+
+
+def test_updates_change_only_their_cells(table):
+    table.set_value(1, "current_price", 121.0)
+    table.set_values(np.array([0, 2]), "beta", np.array([1.2, 1.7]))
+
+    assert list(table["current_price"]) == [45.2, 121.0, 18.7]
+    assert list(table["beta"]) == [1.2, 0.9, 1.7]
+    assert table.row(1) == dict(RECORDS[1], current_price=121.0)
+    assert table.records()[0]["beta"] == 1.2
+
+
+def test_categorical_and_string_columns_are_not_writable(table):
+    with pytest.raises(ValueError):
+        table.set_value(0, "sector", "Energy")
+    with pytest.raises(ValueError):
+        table.set_values(np.array([0]), "symbol", np.array(["XYZ.AX"]))
+    with pytest.raises(ValueError):
+        table.add_column("name", ["a", "b", "c"])
+
+
+def test_added_columns_follow_the_column_types(table):
+    table.add_column("sentiment", [0.25, np.nan, -0.5])
+    table.add_column("us_revenue_pct", [10, 20, 30])
+
+    assert table.columns["sentiment"].dtype == np.float64
+    assert table.columns["us_revenue_pct"].dtype == np.int64
+    assert table.row(2)["sentiment"] == -0.5
+
+
+def test_empty_table_has_no_rows():
+    table = StockUniverseTable.from_records([])
+    assert len(table) == 0
+    assert table.records() == []
+
+
+def test_live_readings_are_not_truncated():
+    table = StockUniverseTable.from_records([dict(RECORDS[0], rsi=55, volume=1000)])
+
+    table.set_value(0, "rsi", 55.7)
+    table.set_values(np.array([0]), "volume", np.array([2499.6]))
+
+    assert table.row(0)["rsi"] == 55.7
+    assert table.row(0)["volume"] == 2500
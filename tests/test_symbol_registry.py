@@ -0,0 +1,51 @@
+"""
+Tests for the symbol registry
+"""
+
+from symbol_registry import SymbolRegistry, KIND_STOCK, KIND_FOREX, default_registry
+
+
+def test_load_rows_assigns_dense_ids():
+    registry = SymbolRegistry()
+    registry.load_rows([
+        {'symbol': 'BHP.AX', 'name': 'BHP Group', 'kind': KIND_STOCK, 'sector': 'Materials'},
+        {'symbol': 'AUD/USD', 'name': 'AUD/USD', 'kind': KIND_FOREX}
+    ])
+
+    assert registry.id_of('BHP.AX') == 0
+    assert registry.id_of('AUD/USD') == 1
+    assert registry.get('BHP.AX', 'sector') == 'Materials'
+    assert registry.symbols_of_kind(KIND_FOREX) == ['AUD/USD']
+
+
+def test_symbol_repeated_in_batch_registered_once_from_last_row():
+    registry = SymbolRegistry()
+    registry.load_rows([
+        {'symbol': 'BHP.AX', 'name': 'Old name', 'kind': KIND_STOCK, 'sector': 'Energy'},
+        {'symbol': 'CBA.AX', 'name': 'Commonwealth Bank', 'kind': KIND_STOCK, 'sector': 'Financials'},
+        {'symbol': 'BHP.AX', 'name': 'BHP Group', 'kind': KIND_STOCK, 'sector': 'Materials'}
+    ])
+
+    assert len(registry) == 2
+    assert registry.symbols == ['BHP.AX', 'CBA.AX']
+    assert registry.id_of('CBA.AX') == 1
+    assert registry.name('BHP.AX') == 'BHP Group'
+    assert registry.get('BHP.AX', 'sector') == 'Materials'
+
+
+def test_reloading_updates_metadata_in_place():
+    registry = SymbolRegistry()
+    registry.load_rows([{'symbol': 'BHP.AX', 'name': 'BHP', 'kind': KIND_STOCK}])
+    registry.load_rows([{'symbol': 'BHP.AX', 'name': 'BHP Group', 'kind': KIND_STOCK, 'sector': 'Materials'},
+                        {'symbol': 'RIO.AX', 'kind': KIND_STOCK}])
+
+    assert registry.id_of('BHP.AX') == 0
+    assert registry.id_of('RIO.AX') == 1
+    assert registry.name('BHP.AX') == 'BHP Group'
+    assert registry.intern('RIO.AX') == 1
+    assert registry.intern('WDS.AX', kind=KIND_STOCK) == 2
+
+
+def test_default_registry_has_unique_symbols():
+    registry = default_registry()
+    assert len(set(registry.symbols)) == len(registry.symbols) == len(registry)
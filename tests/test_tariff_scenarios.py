@@ -0,0 +1,91 @@
+"""
+Tests for the sharded Monte Carlo tariff-shock simulation
+"""
+
+import numpy as np
+import pytest
+
+from stock_prediction_model import StockPredictionModel
+from tariff_scenarios import _lowest, _merge_stock_results, _summarize_paths, simulate
+
+from .conftest import synthetic_universe
+
+
+@pytest.fixture(scope="module")
+def inputs():
+    mappings = StockPredictionModel(seed=1).sector_mappings
+    table = synthetic_universe(60, 4, sorted(mappings))
+    universe = {name: table[name] for name in
+                ["tariff_sensitivity", "us_revenue_pct", "china_revenue_pct", "beta", "annualized_volatility"]}
+    return universe, table.columns["sector"], table.categories["sector"], mappings
+
+
+def run(inputs, **kwargs):
+    universe, codes, sectors, mappings = inputs
+    options = dict(n_scenarios=2300, steps=4, seed=17, workers=1, shard_size=500)
+    options.update(kwargs)
+    return simulate(universe, codes, sectors, mappings, **options)
+
+
+def assert_results_equal(first, second):
+    for group in ["stocks", "sectors"]:
+        assert first[group].keys() == second[group].keys()
+        for name in first[group]:
+            np.testing.assert_array_equal(first[group][name], second[group][name])
+
+
+def test_results_do_not_depend_on_the_worker_count(inputs):
+    serial = run(inputs, workers=1)
+    assert_results_equal(run(inputs, workers=3), serial)
+
+
+def test_seed_fixes_the_results(inputs):
+    assert_results_equal(run(inputs), run(inputs))
+
+    other = run(inputs, seed=18)
+    assert not np.array_equal(other["stocks"]["expected_move_pct"], run(inputs)["stocks"]["expected_move_pct"])
+
+
+def test_output_shapes(inputs):
+    result = run(inputs, drawdown_thresholds=(5.0, 10.0))
+    universe, _, sectors, _ = inputs
+
+    assert result["scenarios"] == 2300
+    assert result["stocks"]["expected_move_pct"].shape == (len(universe["beta"]),)
+    assert result["stocks"]["drawdown_probability"].shape == (2, len(universe["beta"]))
+    assert result["sectors"]["var_pct"].shape == (len(sectors),)
+    # Deeper drawdowns are never more likely than shallower ones
+    assert (np.diff(result["stocks"]["drawdown_probability"], axis=0) <= 0).all()
+    assert (result["stocks"]["expected_shortfall_pct"] >= result["stocks"]["var_pct"]).all()
+
+
+@pytest.mark.parametrize("shard_sizes", [[1000], [400, 400, 200], [130] * 7 + [90], [37] * 27 + [1]])
+def test_shard_merge_matches_the_unsharded_summary(shard_sizes):
+    rng = np.random.default_rng(5)
+    terminal = rng.normal(1.0, 8.0, (1000, 12)).astype(np.float32)
+    min_ratio = 1 - np.abs(rng.normal(0, 0.1, (1000, 12)))
+    thresholds = np.array([5.0, 10.0, 20.0])
+    confidence = 0.95
+    tail_size = 50
+
+    results = []
+    start = 0
+    for size in shard_sizes:
+        shard = terminal[start:start + size]
+        ratio = min_ratio[start:start + size]
+        results.append({
+            "return_sum": shard.sum(axis=0, dtype=np.float64),
+            "return_squares": np.square(shard, dtype=np.float64).sum(axis=0),
+            "drawdown_counts": (ratio[None] <= (1 - thresholds / 100)[:, None, None]).sum(axis=1),
+            "tail": _lowest(shard, tail_size)
+        })
+        start += size
+
+    merged = _merge_stock_results(results, len(terminal), tail_size)
+    expected = _summarize_paths(terminal.astype(np.float64), (1 - min_ratio) * 100, confidence, thresholds)
+
+    np.testing.assert_allclose(merged["expected_move_pct"], expected["expected_move_pct"], rtol=1e-9)
+    np.testing.assert_allclose(merged["volatility_pct"], expected["volatility_pct"], rtol=1e-6)
+    np.testing.assert_array_equal(merged["var_pct"], expected["var_pct"])
+    np.testing.assert_allclose(merged["expected_shortfall_pct"], expected["expected_shortfall_pct"], rtol=1e-12)
+    np.testing.assert_array_equal(merged["drawdown_probability"], expected["drawdown_probability"])
@@ -0,0 +1,121 @@
+"""
+Tests for the compressed time-series codec and TimeSeriesFile
+"""
+
+import os
+
+import numpy as np
+import pytest
+
+from timeseries_codec import (TimeSeriesFile, KIND_TIMESTAMP, KIND_FLOAT, KIND_UINT, decode_floats,
+                              decode_timestamps, encode_floats, encode_timestamps, varint_decode,
+                              varint_encode)
+
+SCHEMA = [("timestamp", KIND_TIMESTAMP), ("price", KIND_FLOAT), ("volume", KIND_UINT)]
+
+
+def make_rows(count, seed=0, start=1_700_000_000_000):
+    rng = np.random.default_rng(seed)
+    return {
+        "timestamp": start + np.cumsum(rng.integers(1, 5000, count)),
+        "price": np.round(100 + np.cumsum(rng.normal(0, 0.1, count)), 4),
+        "volume": rng.integers(0, 1_000_000, count)
+    }
+
+
+def assert_rows_equal(columns, expected):
+    for name, _ in SCHEMA:
+        np.testing.assert_array_equal(columns[name], expected[name])
+
+
+def test_column_encodings_round_trip():
+    rows = make_rows(1000)
+    special = np.array([0.0, -0.0, np.nan, np.inf, -np.inf, 1e-300, 123.456])
+
+    np.testing.assert_array_equal(decode_timestamps(encode_timestamps(rows["timestamp"]), 1000), rows["timestamp"])
+    np.testing.assert_array_equal(decode_floats(encode_floats(rows["price"]), 1000), rows["price"])
+    np.testing.assert_array_equal(decode_floats(encode_floats(special), len(special)), special)
+    np.testing.assert_array_equal(varint_decode(varint_encode(rows["volume"]), 1000), rows["volume"])
+
+
+def test_file_round_trip(tmp_path):
+    rows = make_rows(10_000)
+    tsc_file = TimeSeriesFile(str(tmp_path / "ticks.tsc"))
+
+    tsc_file.write(rows, SCHEMA, {"symbol": "BHP.AX"}, block_size=1000)
+    columns, schema, metadata = tsc_file.read()
+
+    assert schema == SCHEMA
+    assert metadata == {"symbol": "BHP.AX"}
+    assert_rows_equal(columns, rows)
+
+
+def test_append_extends_file(tmp_path):
+    first = make_rows(500, seed=1)
+    second = make_rows(300, seed=2, start=1_800_000_000_000)
+    tsc_file = TimeSeriesFile(str(tmp_path / "ticks.tsc"))
+
+    tsc_file.append(first, SCHEMA)
+    tsc_file.append(second, SCHEMA)
+
+    columns, _, _ = tsc_file.read()
+    assert_rows_equal(columns, {name: np.concatenate([first[name], second[name]]) for name, _ in SCHEMA})
+
+
+def test_append_after_torn_tail_keeps_new_rows(tmp_path):
+    path = str(tmp_path / "ticks.tsc")
+    first = make_rows(200, seed=1)
+    second = make_rows(100, seed=2, start=1_800_000_000_000)
+    tsc_file = TimeSeriesFile(path)
+
+    tsc_file.append(first, SCHEMA, block_size=100)
+    with open(path, 'r+b') as f:
+        f.truncate(os.path.getsize(path) - 10)
+    tsc_file.append(second, SCHEMA)
+
+    columns, _, _ = tsc_file.read()
+    assert_rows_equal(columns, {name: np.concatenate([first[name][:100], second[name]]) for name, _ in SCHEMA})
+
+
+def test_append_after_torn_header_rewrites_header(tmp_path):
+    path = str(tmp_path / "ticks.tsc")
+    rows = make_rows(50)
+    tsc_file = TimeSeriesFile(path)
+
+    tsc_file.append(rows, SCHEMA)
+    with open(path, 'r+b') as f:
+        f.truncate(6)
+    tsc_file.append(rows, SCHEMA)
+
+    columns, _, _ = tsc_file.read()
+    assert_rows_equal(columns, rows)
+
+
+def test_append_rejects_foreign_file(tmp_path):
+    path = tmp_path / "ticks.tsc"
+    path.write_bytes(b"not a time-series file")
+
+    with pytest.raises(ValueError):
+        TimeSeriesFile(str(path)).append(make_rows(10), SCHEMA)
+
+
+def test_appends_scan_for_a_torn_tail_only_when_the_file_changed(tmp_path, monkeypatch):
+    path = str(tmp_path / "ticks.tsc")
+    scans = []
+    scan = TimeSeriesFile._truncate_torn_tail
+    monkeypatch.setattr(TimeSeriesFile, '_truncate_torn_tail', lambda self: (scans.append(1), scan(self)))
+
+    TimeSeriesFile(path).write(make_rows(100), SCHEMA)
+    for seed in range(5):
+        TimeSeriesFile(path).append(make_rows(100, seed=seed), SCHEMA)
+    assert len(scans) == 0
+
+    # Another writer tore the tail: the next append scans and truncates
+    with open(path, 'r+b') as f:
+        f.truncate(os.path.getsize(path) - 10)
+    TimeSeriesFile(path).append(make_rows(100), SCHEMA)
+    TimeSeriesFile(path).append(make_rows(100), SCHEMA)
+    assert len(scans) == 1
+
+    columns, _, _ = TimeSeriesFile(path).read()
+    assert len(columns["timestamp"]) == 100 * 7